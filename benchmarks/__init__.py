@@ -0,0 +1,10 @@
+"""
+Benchmarks of the Orange County Lettings site.
+
+The benchmarks are standalone scripts, run from the root of the project against a temporary
+SQLite database seeded for the occasion, e.g.::
+
+    $ python -m benchmarks.streaming_index --rows 100000
+
+They are not part of the test suite.
+"""
@@ -0,0 +1,107 @@
+"""
+Benchmark of the JSON API against the HTML index pages.
+
+Walks through every page of the lettings and profiles, following the cursors, from the HTML
+index pages (rendered at once) and from the JSON API, and reports the number of rows served per
+second by each of them.
+
+Usage::
+
+    $ python -m benchmarks.api_serialization --rows 20000 --size 500
+"""
+
+import argparse
+import os
+import re
+import tempfile
+import time
+
+from benchmarks.utils import seed_lettings, seed_profiles, setup_django
+
+ENDPOINTS = {
+    "lettings": ("/lettings/", "/api/lettings/"),
+    "profiles": ("/profiles/", "/api/profiles/"),
+}
+
+NEXT_LINK = re.compile(r'href="(\?[^"]*after=[^"]*)" rel="next"')
+
+
+def walk_html(client, url, size):
+    """
+    Request every page of an HTML index page, following its "Next" links.
+
+    :param client: The test client.
+    :type client: Client
+    :param url: The URL of the index page.
+    :type url: str
+    :param size: The number of rows per page.
+    :type size: int
+    :return: The number of pages requested.
+    :rtype: int
+    """
+
+    pages = 0
+    response = client.get(url, {"size": size})
+    while True:
+        pages += 1
+        match = NEXT_LINK.search(response.content.decode())
+        if not match:
+            return pages
+        response = client.get(url + match.group(1).replace("&amp;", "&"))
+
+
+def walk_json(client, url, size):
+    """
+    Request every page of a JSON endpoint, following its ``next`` URLs.
+
+    :param client: The test client.
+    :type client: Client
+    :param url: The URL of the endpoint.
+    :type url: str
+    :param size: The number of rows per page.
+    :type size: int
+    :return: The number of pages requested.
+    :rtype: int
+    """
+
+    pages = 0
+    response = client.get(url, {"size": size})
+    while True:
+        pages += 1
+        next_url = response.json()["next"]
+        if next_url is None:
+            return pages
+        response = client.get(next_url)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--rows", type=int, default=20000, help="rows per resource")
+    parser.add_argument("--size", type=int, default=500, help="rows per page")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as directory:
+        setup_django(os.path.join(directory, "benchmark.sqlite3"))
+        seed_lettings(args.rows)
+        seed_profiles(args.rows)
+
+        from django.test import Client, override_settings
+
+        client = Client()
+        print(f"{'resource':<10}{'format':<7}{'pages':>7}{'seconds':>9}{'rows/s':>10}")
+        with override_settings(STREAMING_INDEX_PAGES=False, PAGINATION_MAX_PAGE_SIZE=args.size):
+            for resource, (html_url, json_url) in ENDPOINTS.items():
+                for name, walk, url in (("html", walk_html, html_url),
+                                        ("json", walk_json, json_url)):
+                    client.get(url, {"size": 1})  # Load the templates and open the connection.
+                    start = time.perf_counter()
+                    pages = walk(client, url, args.size)
+                    seconds = time.perf_counter() - start
+                    print(
+                        f"{resource:<10}{name:<7}{pages:>7}{seconds:>9.2f}"
+                        f"{args.rows / seconds:>10.0f}"
+                    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,124 @@
+"""
+Benchmark of the compression levels of the dynamic responses.
+
+Renders the pages of the project with the test client, without compression, then compresses
+each page with gzip and Brotli at each of their levels (see ``core.compression``), and reports,
+for each level:
+
+- the bytes of the pages once compressed, and the share of the bytes saved;
+- the median time of the compression of a page, and the throughput, the CPU cost paid on every
+  response which is not served from the page cache.
+
+The pages are the home page, the index pages of the lettings and profiles, at their default
+page size and at their largest one, and the detail pages of a letting and of a profile.
+
+Usage::
+
+    $ python -m benchmarks.compression --rows 2000 --repeat 20
+"""
+
+import argparse
+import os
+import statistics
+import tempfile
+import time
+
+from benchmarks.utils import seed_lettings, seed_profiles, setup_django
+
+LEVELS = {"gzip": (1, 4, 6, 9), "br": (1, 3, 4, 5, 6, 9, 11)}
+
+
+def render_pages(rows):
+    """
+    Render the pages of the project, without compression.
+
+    :param rows: The number of seeded lettings and profiles.
+    :type rows: int
+    :return: The content of each page, by URL.
+    :rtype: dict
+    """
+
+    from django.conf import settings
+    from django.test import Client
+
+    size = min(rows, settings.PAGINATION_MAX_PAGE_SIZE)
+    urls = (
+        "/",
+        "/lettings/",
+        f"/lettings/?size={size}",
+        "/lettings/1/",
+        "/profiles/",
+        f"/profiles/?size={size}",
+        "/profiles/user00000001/",
+    )
+    client = Client()
+    pages = {}
+    for url in urls:
+        response = client.get(url)
+        assert response.status_code == 200, (url, response.status_code)
+        assert not response.has_header("Content-Encoding"), url
+        pages[url] = response.content
+    return pages
+
+
+def measure(pages, encoding, level, repeat):
+    """
+    Compress each page at a level, a number of times.
+
+    :param pages: The content of each page.
+    :type pages: dict
+    :param encoding: ``"gzip"`` or ``"br"``.
+    :type encoding: str
+    :param level: The level of the encoding.
+    :type level: int
+    :param repeat: The number of compressions of each page.
+    :type repeat: int
+    :return: The compressed bytes of the pages, and the median time of a compression of each
+        page, in seconds.
+    :rtype: tuple
+    """
+
+    from django.test import override_settings
+
+    from core.compression import compress
+
+    size, times = 0, []
+    with override_settings(COMPRESSION_LEVELS={encoding: level}):
+        for content in pages.values():
+            durations = []
+            for _ in range(repeat):
+                start = time.perf_counter()
+                compressed = compress(content, encoding)
+                durations.append(time.perf_counter() - start)
+            size += len(compressed)
+            times.append(statistics.median(durations))
+    return size, times
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--rows", type=int, default=2000, help="rows per resource")
+    parser.add_argument("--repeat", type=int, default=20, help="compressions per page and level")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as directory:
+        setup_django(os.path.join(directory, "benchmark.sqlite3"))
+        seed_lettings(args.rows)
+        seed_profiles(args.rows)
+        pages = render_pages(args.rows)
+
+        total = sum(len(content) for content in pages.values())
+        print(f"{len(pages)} pages, {total} B uncompressed")
+        print(f"{'encoding':<10}{'level':>6}{'bytes':>10}{'saved':>8}{'ms/page':>10}{'MB/s':>8}")
+        for encoding, levels in LEVELS.items():
+            for level in levels:
+                size, times = measure(pages, encoding, level, args.repeat)
+                seconds = sum(times)
+                print(
+                    f"{encoding:<10}{level:>6}{size:>10}{1 - size / total:>8.1%}"
+                    f"{seconds / len(pages) * 1000:>10.3f}{total / seconds / 1e6:>8.1f}"
+                )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,136 @@
+"""
+Benchmark of the memory used by the export of the catalog.
+
+Seeds a database with lettings and profiles, then exports a catalog in a fresh process and
+reports the growth of its peak resident set size during the export, which must not depend on
+the number of rows.
+
+Usage::
+
+    $ python -m benchmarks.export_catalog --rows 1000000 --catalog lettings --format columns
+"""
+
+import argparse
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import time
+
+from benchmarks.utils import (
+    current_rss_kib,
+    peak_rss_kib,
+    seed_lettings,
+    seed_profiles,
+    setup_django,
+)
+
+
+def measure(database, catalog, file_format):
+    """
+    Export a catalog to ``os.devnull`` and measure it, in the current process.
+
+    :param database: The path of the seeded SQLite database.
+    :type database: str
+    :param catalog: ``"lettings"`` or ``"profiles"``.
+    :type catalog: str
+    :param file_format: ``"csv"``, ``"ndjson"`` or ``"columns"``.
+    :type file_format: str
+    :return: The measures.
+    :rtype: dict
+    """
+
+    setup_django(database, migrate=False)
+
+    from django.conf import settings
+
+    from core.export import export_catalog
+
+    # The page cache and the memory mapping of SQLite grow with the database up to their limits
+    # in settings.SQLITE_PRAGMAS. They are kept to the defaults of SQLite, so the measure shows
+    # the memory used by the export itself.
+    settings.SQLITE_PRAGMAS = {**settings.SQLITE_PRAGMAS, "cache_size": -2000, "mmap_size": 0}
+
+    # Import the modules and open the connection before measuring.
+    next(export_catalog(catalog, file_format, chunk_size=1))
+    rss_before = current_rss_kib()
+    start = time.perf_counter()
+    size = 0
+    with open(os.devnull, "w") as output:
+        for chunk in export_catalog(catalog, file_format):
+            size += len(chunk)
+            output.write(chunk)
+    return {
+        "seconds": round(time.perf_counter() - start, 2),
+        "characters": size,
+        "rss_before_kib": rss_before,
+        "peak_rss_kib": peak_rss_kib(),
+    }
+
+
+def run(rows, catalog, file_format, database=None):
+    """
+    Seed a database if none is given, then measure the export in a fresh process.
+
+    :param rows: The number of rows of the catalog.
+    :type rows: int
+    :param catalog: ``"lettings"`` or ``"profiles"``.
+    :type catalog: str
+    :param file_format: ``"csv"``, ``"ndjson"`` or ``"columns"``.
+    :type file_format: str
+    :param database: An existing seeded database to reuse.
+    :type database: str, optional
+    :return: The measures, with the growth of the peak resident set size in ``rss_growth_kib``.
+    :rtype: dict
+    """
+
+    with tempfile.TemporaryDirectory() as directory:
+        if database is None:
+            database = os.path.join(directory, "benchmark.sqlite3")
+            subprocess.run(
+                [sys.executable, "-m", "benchmarks.export_catalog", "--rows", str(rows),
+                 "--catalog", catalog, "--database", database, "--seed"],
+                check=True,
+            )
+        output = subprocess.run(
+            [sys.executable, "-m", "benchmarks.export_catalog", "--catalog", catalog,
+             "--format", file_format, "--database", database, "--measure"],
+            check=True,
+            capture_output=True,
+            text=True,
+        ).stdout
+    result = json.loads(output.splitlines()[-1])
+    result["rss_growth_kib"] = result["peak_rss_kib"] - result["rss_before_kib"]
+    return result
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--rows", type=int, default=100000, help="rows in the catalog")
+    parser.add_argument("--catalog", choices=("lettings", "profiles"), default="lettings")
+    parser.add_argument("--format", choices=("csv", "ndjson", "columns"), default="csv")
+    parser.add_argument("--database", help="an existing seeded database to reuse")
+    parser.add_argument("--seed", action="store_true", help=argparse.SUPPRESS)
+    parser.add_argument("--measure", action="store_true", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.seed:
+        setup_django(args.database)
+        seed = seed_lettings if args.catalog == "lettings" else seed_profiles
+        seed(args.rows)
+        return
+    if args.measure:
+        print(json.dumps(measure(args.database, args.catalog, args.format)))
+        return
+
+    result = run(args.rows, args.catalog, args.format, args.database)
+    print(
+        f"{args.catalog} {args.format}: {result['seconds']}s, "
+        f"{result['characters'] / 2**20:.1f} MiB written, peak RSS "
+        f"{result['peak_rss_kib'] / 1024:.1f} MiB (+{result['rss_growth_kib'] / 1024:.1f})"
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,129 @@
+"""
+Byte-savings report of the fonts of the CSS bundles.
+
+Runs ``collectstatic`` with the production settings (``oc_lettings_site.settings``) to a
+temporary ``STATIC_ROOT``, and compares, for each ``@font-face`` rule of the sources of the CSS
+bundles, the font of the source with the subsetted WOFF2 font of the bundle (see
+``core.fonts``):
+
+- the bytes of the source font, uncompressed and with gzip, as WhiteNoise serves it;
+- the bytes of the WOFF2 font, which is compressed already, or ``dropped`` when the bundle does
+  not use the face.
+
+The totals are those of the fonts collected to ``STATIC_ROOT``, and of the fonts used by the
+pages: the faces of the weights and styles the bundle uses, which a page downloads at most.
+
+Usage::
+
+    $ python -m benchmarks.fonts
+"""
+
+import argparse
+import gzip
+import os
+import posixpath
+import tempfile
+
+
+def face_fonts(css, directory):
+    """
+    Return the font of each ``@font-face`` rule of a stylesheet, with its weights and style.
+
+    :param css: The stylesheet.
+    :type css: str
+    :param directory: The directory of the stylesheet, resolving its relative URLs.
+    :type directory: str
+    :return: The ``(family, weight, style)`` faces and the names of their fonts, in the order of
+        the rules: ``dict()`` keeps the last font of a face, which the browsers use.
+    :rtype: list of tuple
+    """
+
+    import tinycss2
+
+    from core.fonts import SRC_URL, _declarations, _face_weights
+
+    faces = []
+    for rule in tinycss2.parse_stylesheet(css, skip_comments=True, skip_whitespace=True):
+        if rule.type == "at-rule" and rule.lower_at_keyword == "font-face":
+            descriptors = dict(_declarations(rule))
+            match = SRC_URL.search(descriptors.get("src", ""))
+            if not match:
+                continue
+            family = descriptors.get("font-family", "").strip("\"'")
+            style = "italic" if "italic" in descriptors.get("font-style", "") else "normal"
+            name = posixpath.normpath(posixpath.join(directory, match.group(2)))
+            for weight in _face_weights(descriptors.get("font-weight", "400")):
+                faces.append(((family, weight, style), name))
+    return faces
+
+
+def run():
+    """
+    Collect the static files and compare the fonts of the sources and of the bundles.
+
+    :return: The bytes of each face, by ``(family, weight, style)``: those of the source, with
+        gzip, and of the WOFF2 font, or None if it is dropped; and the bytes of all the fonts
+        collected, with gzip, before and after.
+    :rtype: tuple
+    """
+
+    with tempfile.TemporaryDirectory() as directory:
+        os.environ.update(
+            DJANGO_SETTINGS_MODULE="oc_lettings_site.settings",
+            SECRET_KEY="fonts",
+            STATIC_ROOT=directory,
+        )
+
+        import django
+
+        django.setup()
+
+        from django.conf import settings
+        from django.contrib.staticfiles import finders
+        from django.core.management import call_command
+
+        call_command("collectstatic", interactive=False, verbosity=0)
+
+        faces, before, after = {}, {}, {}
+        for bundle, sources in settings.STATIC_BUNDLES.items():
+            if not bundle.endswith(".css"):
+                continue
+            with open(os.path.join(directory, bundle), encoding="utf-8") as file:
+                built = dict(face_fonts(file.read(), posixpath.dirname(bundle)))
+            for name in built.values():
+                after[name] = os.path.getsize(os.path.join(directory, name))
+            for source in sources:
+                with open(finders.find(source), encoding="utf-8") as file:
+                    declared = face_fonts(file.read(), posixpath.dirname(source))
+                for _, name in declared:
+                    with open(finders.find(name), "rb") as file:
+                        data = file.read()
+                    before[name] = (len(data), len(gzip.compress(data)))
+                for face, name in dict(declared).items():
+                    woff2 = after[built[face]] if face in built else None
+                    faces[face] = (*before[name], woff2)
+    collected = sum(gzip_size for _, gzip_size in before.values()), sum(after.values())
+    return faces, collected
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.parse_args()
+
+    results, collected = run()
+    print(f"{'face':<28}{'source':>10}{'gzip':>10}{'woff2':>10}")
+    for (family, weight, style), (size, gzip_size, woff2) in sorted(results.items()):
+        face = f"{family} {weight} {style}"
+        print(f"{face:<28}{size:>10}{gzip_size:>10}{'dropped' if woff2 is None else woff2:>10}")
+
+    used = [(gzip_size, woff2) for _, gzip_size, woff2 in results.values() if woff2 is not None]
+    print(f"\n{'':<28}{'before':>10}{'after':>10}{'saving':>10}")
+    for label, before, after in (
+        ("collected fonts, gzip", *collected),
+        ("fonts of the pages, gzip", sum(size for size, _ in used), sum(w for _, w in used)),
+    ):
+        print(f"{label:<28}{before:>10}{after:>10}{1 - after / before:>10.0%}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,86 @@
+"""
+Benchmark of the ``import_lettings`` management command.
+
+Writes a feed of lettings in CSV or NDJSON, imports it into an empty SQLite database with the
+command and prints its report (rows per second and peak memory).
+
+Usage::
+
+    $ python -m benchmarks.import_lettings --rows 500000 --format ndjson
+"""
+
+import argparse
+import csv
+import json
+import os
+import tempfile
+
+from benchmarks.utils import setup_django
+
+COLUMNS = ("title", "number", "street", "city", "state", "zip_code", "country_iso_code")
+
+
+def feed_row(index):
+    """
+    Return the values of a row of the feed.
+
+    :param index: The index of the row.
+    :type index: int
+    :return: The values, in the order of ``COLUMNS``.
+    :rtype: tuple
+    """
+
+    return (
+        f"Letting {index}",
+        index % 10000,
+        f"Street {index}",
+        "Benchmark City",
+        "BC",
+        index % 100000,
+        "USA",
+    )
+
+
+def write_feed(path, rows, file_format):
+    """
+    Write a feed of lettings.
+
+    :param path: The path of the file.
+    :type path: str
+    :param rows: The number of rows.
+    :type rows: int
+    :param file_format: ``"csv"`` or ``"ndjson"``.
+    :type file_format: str
+    :return: None
+    :rtype: None
+    """
+
+    with open(path, "w", encoding="utf-8", newline="") as stream:
+        if file_format == "csv":
+            writer = csv.writer(stream)
+            writer.writerow(COLUMNS)
+            writer.writerows(feed_row(index) for index in range(rows))
+        else:
+            for index in range(rows):
+                stream.write(json.dumps(dict(zip(COLUMNS, feed_row(index)))) + "\n")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--rows", type=int, default=200000, help="rows in the feed")
+    parser.add_argument("--format", choices=("csv", "ndjson"), default="csv")
+    parser.add_argument("--batch-size", type=int, default=10000)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as directory:
+        feed = os.path.join(directory, f"feed.{args.format}")
+        write_feed(feed, args.rows, args.format)
+        setup_django(os.path.join(directory, "benchmark.sqlite3"))
+
+        from django.core.management import call_command
+
+        call_command("import_lettings", feed, batch_size=args.batch_size)
+
+
+if __name__ == "__main__":
+    main()
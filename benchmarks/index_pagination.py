@@ -0,0 +1,134 @@
+"""
+Benchmark of the paginated index pages as the tables grow.
+
+Measures the median time of the lettings and profiles index pages with a growing number of rows:
+the query reading the version of the page (the validators, see ``core.conditional``), the first
+page, a page in the middle of the table selected by its cursor, and a ``304 Not Modified``
+answer. Every page request runs the version query, so its time is included in the page times.
+The aggregate over the table which read the version before ``core.IndexVersion`` is measured
+too, for reference.
+
+Usage::
+
+    $ python -m benchmarks.index_pagination --rows 1000 100000 1000000
+"""
+
+import argparse
+import os
+import statistics
+import tempfile
+import time
+
+from benchmarks.utils import seed_lettings, seed_profiles, setup_django
+
+URLS = {"lettings": "/lettings/", "profiles": "/profiles/"}
+
+
+def median_ms(function, repeat):
+    """
+    Call a function several times and return its median duration.
+
+    :param function: The function to call, without arguments.
+    :type function: callable
+    :param repeat: The number of calls.
+    :type repeat: int
+    :return: The median duration in milliseconds.
+    :rtype: float
+    """
+
+    durations = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        function()
+        durations.append(time.perf_counter() - start)
+    return round(statistics.median(durations) * 1000, 3)
+
+
+def measure(page, rows, repeat):
+    """
+    Measure the version query and the requests of an index page.
+
+    :param page: ``"lettings"`` or ``"profiles"``.
+    :type page: str
+    :param rows: The number of rows in the table.
+    :type rows: int
+    :param repeat: The number of requests per measure.
+    :type repeat: int
+    :return: The measures.
+    :rtype: dict
+    """
+
+    from django.db.models import Count, Max
+    from django.db.models.functions import Greatest
+    from django.test import Client
+
+    from core.pagination import encode_cursor
+    from lettings.models import Letting
+    from lettings.views import index_version as letting_index_version
+    from profiles.models import Profile
+    from profiles.views import index_version as profile_index_version
+
+    if page == "lettings":
+        version = letting_index_version
+        middle = (rows // 2,)
+
+        def aggregate():
+            return Letting.objects.aggregate(
+                count=Count("id"),
+                updated_at=Greatest(Max("updated_at"), Max("address__updated_at")),
+            )
+
+    else:
+        version = profile_index_version
+        middle = (f"user{rows // 2:08d}",)
+
+        def aggregate():
+            return Profile.objects.aggregate(count=Count("id"), updated_at=Max("updated_at"))
+
+    client = Client()
+    url = URLS[page]
+    etag = client.get(url)["ETag"]
+    cursor = encode_cursor(middle)
+    return {
+        "page": page,
+        "rows": rows,
+        "aggregate_ms": median_ms(aggregate, repeat),
+        "version_ms": median_ms(lambda: version(None), repeat),
+        "first_ms": median_ms(lambda: client.get(url), repeat),
+        "middle_ms": median_ms(lambda: client.get(url, {"after": cursor}), repeat),
+        "not_modified_ms": median_ms(lambda: client.get(url, HTTP_IF_NONE_MATCH=etag), repeat),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument(
+        "--rows", type=int, nargs="+", default=[1000, 100000, 1000000],
+        help="row counts, in increasing order",
+    )
+    parser.add_argument("--repeat", type=int, default=50, help="requests per measure")
+    args = parser.parse_args()
+
+    results = []
+    with tempfile.TemporaryDirectory() as directory:
+        setup_django(os.path.join(directory, "benchmark.sqlite3"))
+        for rows in sorted(args.rows):
+            seed_lettings(rows)
+            seed_profiles(rows)
+            for page in URLS:
+                results.append(measure(page, rows, args.repeat))
+
+    print(
+        f"{'page':<10}{'rows':>10}{'aggregate ms':>14}{'version ms':>12}{'first ms':>10}"
+        f"{'middle ms':>11}{'304 ms':>9}"
+    )
+    for result in results:
+        print(
+            f"{result['page']:<10}{result['rows']:>10}{result['aggregate_ms']:>14}"
+            f"{result['version_ms']:>12}{result['first_ms']:>10}{result['middle_ms']:>11}"
+            f"{result['not_modified_ms']:>9}"
+        )
+
+
+if __name__ == "__main__":
+    main()
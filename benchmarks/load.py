@@ -0,0 +1,300 @@
+"""
+Load-testing harness of the routes of the project.
+
+Seeds a database with ``--rows`` lettings and profiles, serves it with the server profile of
+``deploy.sh`` (``oc_lettings_site.gunicorn_config``) on a local port, then loads each route of
+``oc_lettings_site/urls.py`` in turn with an asyncio client keeping ``--connections`` requests in
+flight for ``--seconds``. For each route, it records:
+
+- the answered requests per second and the 50th, 90th and 99th percentile latencies;
+- the failed requests: not answered within 30 seconds, or with a status code other than 200;
+- the database queries of a request with an empty page cache, counted in the current process
+  with the test client of Django;
+- the largest resident set size of the workers after the load of the route.
+
+The results are written to a JSON file, with sorted keys and one value per line, which can be
+committed as a baseline and diffed between commits, or compared with ``--compare``.
+
+The routes of the admin site, ``trigger_error_sentry``, which raises an error on purpose, and
+``metrics``, which is scraped by Prometheus, are left out. ``ROUTES`` must name every other
+route, which is checked by ``core.tests``. The export requires a staff member, so its requests
+carry the session of a staff user created by the harness.
+
+Usage::
+
+    $ python -m benchmarks.load --rows 10000 --connections 50 --seconds 10 --output new.json
+    $ python -m benchmarks.load --compare baseline.json new.json
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import platform
+import random
+import resource
+import subprocess
+import sys
+import tempfile
+
+from benchmarks.utils import (
+    load,
+    process_rss_kib,
+    seed_lettings,
+    seed_profiles,
+    server_workers,
+    setup_django,
+    start_server,
+)
+
+# The path of a request to each route, from a random generator and the number of rows.
+ROUTES = {
+    "core:index": lambda generator, rows: "/",
+    "core:export": lambda generator, rows: "/export/lettings/ndjson/",
+    "lettings:lettings_index": lambda generator, rows: "/lettings/",
+    "lettings:lettings_search": (
+        lambda generator, rows: f"/lettings/search/?q=Letting+{generator.randint(1, rows)}"
+    ),
+    "lettings:letting": lambda generator, rows: f"/lettings/{generator.randint(1, rows)}/",
+    "lettings:api_lettings_index": lambda generator, rows: "/api/lettings/?sort=city",
+    "profiles:profiles_index": lambda generator, rows: "/profiles/",
+    "profiles:profile": (
+        lambda generator, rows: f"/profiles/user{generator.randint(1, rows):08d}/"
+    ),
+    "profiles:api_profiles_index": lambda generator, rows: "/api/profiles/",
+}
+
+# The routes left out, by namespace or name.
+EXCLUDED_ROUTES = {"admin", "core:trigger_error_sentry", "core:metrics"}
+
+# The routes served to staff members only.
+STAFF_ROUTES = {"core:export"}
+
+# The metrics compared by --compare, and whether a higher value is better.
+METRICS = {
+    "requests_per_second": True,
+    "p50_ms": False,
+    "p90_ms": False,
+    "p99_ms": False,
+    "failures": False,
+    "queries": False,
+    "worker_rss_kib": False,
+}
+
+
+def count_queries(path, client):
+    """
+    Request a path with an empty page cache and count its database queries.
+
+    :param path: The path of the request.
+    :type path: str
+    :param client: The test client, logged in as a staff member.
+    :type client: django.test.Client
+    :return: The number of queries.
+    :rtype: int
+    :raises RuntimeError: If the path is not answered with a ``200 OK``.
+    """
+
+    from django.core.cache import cache
+    from django.db import connection
+    from django.test.utils import CaptureQueriesContext
+
+    cache.clear()
+    with CaptureQueriesContext(connection) as queries:
+        response = client.get(path)
+        if response.streaming:
+            for _ in response.streaming_content:
+                pass
+    if response.status_code != 200:
+        raise RuntimeError(f"{path} is answered with {response.status_code}.")
+    return len(queries)
+
+
+def commit():
+    """
+    Return the commit of the working tree, if it is a git repository.
+
+    :return: The abbreviated commit hash, with ``-dirty`` when there are uncommitted changes.
+    :rtype: str or None
+    """
+
+    try:
+        return subprocess.run(
+            ["git", "describe", "--always", "--dirty"],
+            capture_output=True, check=True, text=True,
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def run(rows, connections, seconds, workers, mode, port):
+    """
+    Seed a database, serve it and load each route.
+
+    :param rows: The number of lettings and profiles.
+    :type rows: int
+    :param connections: The number of concurrent requests.
+    :type connections: int
+    :param seconds: The duration of the load of each route.
+    :type seconds: float
+    :param workers: The number of gunicorn workers.
+    :type workers: int
+    :param mode: ``"wsgi"`` or ``"asgi"``.
+    :type mode: str
+    :param port: The port of the server.
+    :type port: int
+    :return: The configuration of the run and the metrics of each route.
+    :rtype: dict
+    """
+
+    with tempfile.TemporaryDirectory() as directory:
+        database = os.path.join(directory, "benchmark.sqlite3")
+        setup_django(database)
+        seed_lettings(rows)
+        seed_profiles(rows)
+
+        from django.conf import settings
+        from django.contrib.auth import get_user_model
+        from django.db import connections as databases
+        from django.test import Client
+
+        staff = get_user_model().objects.create_user(
+            "benchmark-staff", password=None, is_staff=True
+        )
+        client = Client()
+        client.force_login(staff)
+        headers = f"Cookie: {settings.SESSION_COOKIE_NAME}="
+        headers += f"{client.cookies[settings.SESSION_COOKIE_NAME].value}\r\n"
+        generator = random.Random(0)
+        queries = {
+            name: count_queries(path(generator, rows), client) for name, path in ROUTES.items()
+        }
+        databases.close_all()
+
+        # The static files of the pages are served from the manifest of collectstatic.
+        static_root = os.path.join(directory, "static")
+        subprocess.run(
+            [sys.executable, "manage.py", "collectstatic", "--noinput", "--verbosity", "0"],
+            env=dict(
+                os.environ,
+                DJANGO_SETTINGS_MODULE="oc_lettings_site.settings",
+                SECRET_KEY=settings.SECRET_KEY,
+                STATIC_ROOT=static_root,
+            ),
+            check=True,
+        )
+        server = start_server(
+            ["-c", "python:oc_lettings_site.gunicorn_config", "--backlog", "2048"],
+            {
+                "DJANGO_SETTINGS_MODULE": "oc_lettings_site.settings",
+                # The session of the staff user is signed with the secret key of this process.
+                "SECRET_KEY": settings.SECRET_KEY,
+                "ALLOWED_HOSTS": "*",
+                "DATABASE_NAME": database,
+                "CACHE_LOCATION": os.path.join(directory, "cache"),
+                "STATIC_ROOT": static_root,
+                "GUNICORN_WORKERS": str(workers),
+                "SERVER_MODE": mode,
+            },
+            port,
+        )
+        results = {}
+        try:
+            for name, path in ROUTES.items():
+                result = asyncio.run(
+                    load(
+                        port,
+                        connections,
+                        seconds,
+                        lambda generator: path(generator, rows),
+                        headers if name in STAFF_ROUTES else "",
+                    )
+                )
+                result["queries"] = queries[name]
+                result["worker_rss_kib"] = max(map(process_rss_kib, server_workers(server)))
+                results[name] = result
+        finally:
+            server.terminate()
+            server.wait()
+
+    return {
+        "configuration": {
+            "commit": commit(),
+            "python": platform.python_version(),
+            "cpus": os.cpu_count(),
+            "rows": rows,
+            "connections": connections,
+            "seconds": seconds,
+            "workers": workers,
+            "mode": mode,
+        },
+        "routes": results,
+    }
+
+
+def compare(baseline, current):
+    """
+    Print the change of each metric of each route between two results.
+
+    :param baseline: The results of the baseline.
+    :type baseline: dict
+    :param current: The current results.
+    :type current: dict
+    :return: None
+    :rtype: None
+    """
+
+    print(f"{'route':<30}{'metric':<21}{'baseline':>12}{'current':>12}{'change':>9}")
+    for name, result in current["routes"].items():
+        previous = baseline["routes"].get(name)
+        if previous is None:
+            print(f"{name:<30}new route")
+            continue
+        for metric, higher_is_better in METRICS.items():
+            before, after = previous[metric], result[metric]
+            change = (after - before) / before * 100 if before else 0.0
+            worse = change < 0 if higher_is_better else change > 0
+            flag = " !" if worse and abs(change) >= 10 else ""
+            print(
+                f"{name:<30}{metric:<21}{before:>12}{after:>12}{change:>+8.0f}%{flag}"
+            )
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--rows", type=int, default=10000, help="lettings and profiles")
+    parser.add_argument("--connections", type=int, default=50, help="concurrent requests")
+    parser.add_argument("--seconds", type=float, default=10, help="duration of each route")
+    parser.add_argument("--workers", type=int, default=2, help="gunicorn worker processes")
+    parser.add_argument("--mode", choices=("wsgi", "asgi"), default="wsgi", help="serving mode")
+    parser.add_argument("--port", type=int, default=8767, help="port of the server")
+    parser.add_argument("--output", default="benchmark.json", help="JSON file of the results")
+    parser.add_argument(
+        "--compare", nargs=2, metavar=("BASELINE", "CURRENT"), help="compare two JSON files"
+    )
+    args = parser.parse_args()
+
+    if args.compare:
+        with open(args.compare[0]) as baseline, open(args.compare[1]) as current:
+            compare(json.load(baseline), json.load(current))
+        return
+
+    # Each request in flight holds a socket of the client.
+    _, hard = resource.getrlimit(resource.RLIMIT_NOFILE)
+    resource.setrlimit(resource.RLIMIT_NOFILE, (hard, hard))
+
+    results = run(args.rows, args.connections, args.seconds, args.workers, args.mode, args.port)
+    with open(args.output, "w") as output:
+        json.dump(results, output, indent=2, sort_keys=True)
+        output.write("\n")
+    for name, result in results["routes"].items():
+        print(
+            f"{name:<30}{result['requests_per_second']:>8.0f} req/s"
+            f"  p50 {result['p50_ms']:>7.1f} ms  p99 {result['p99_ms']:>7.1f} ms"
+            f"  {result['queries']:>2} queries  {result['failures']} failed"
+            f"  {result['worker_rss_kib'] / 1024:.0f} MiB"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,449 @@
+"""
+Page-weight report of the pages of the project.
+
+Serves the home page and the detail pages of a letting and of a profile with the production
+settings (``oc_lettings_site.settings``, after ``collectstatic``), and reports for each page
+the resources its HTML loads (stylesheets, scripts, icons and images):
+
+- the requests, and the third-party origins they are sent to, each costing a DNS lookup and a
+  TLS handshake on a first visit;
+- the render-blocking resources: the stylesheets and the scripts without ``async`` or
+  ``defer`` of the ``<head>``, which the browser loads before it paints the page;
+- the bytes of the HTML and of the resources, uncompressed and as transferred with gzip, those
+  of the CSS, inlined in ``<style>`` tags or loaded, and those of the images and icons;
+- the resources served with a far-future ``Cache-Control: immutable`` header, which a returning
+  visitor does not request again;
+- an estimate of the first contentful paint of a first visit on a slow mobile network (see
+  ``estimate_fcp``).
+
+The static files of the project are requested through WhiteNoise, with the test client of
+Django. The third-party resources are downloaded, unless ``--offline`` is given; those which
+can not be downloaded are counted as not measured, and their bytes are left out of the totals.
+The resources loaded by the resources themselves (the fonts and images of the CSS) are not
+counted. Of the images of a ``<picture>`` tag or of a ``srcset``, the one a mobile browser
+downloads is counted: the first format of ``IMAGE_TYPES``, at ``DEVICE_PIXEL_RATIO``.
+
+With ``--baseline``, the pages of another commit are measured too, in a temporary git worktree,
+and the report compares the two.
+
+Usage::
+
+    $ python -m benchmarks.page_weight
+    $ python -m benchmarks.page_weight --baseline HEAD~1 --output page_weight.json
+"""
+
+import argparse
+import gzip
+import json
+import os
+import subprocess
+import sys
+import tempfile
+from html.parser import HTMLParser
+from urllib.parse import urlsplit
+from urllib.request import Request, urlopen
+
+# The pages measured, by URL name, and their paths.
+PAGES = {
+    "core:index": "/",
+    "lettings:letting": "/lettings/1/",
+    "profiles:profile": "/profiles/user00000001/",
+}
+
+# The metrics of a page compared by the report.
+METRICS = (
+    "requests",
+    "third_party_origins",
+    "render_blocking",
+    "bytes",
+    "gzip_bytes",
+    "css_bytes",
+    "css_gzip_bytes",
+    "image_bytes",
+    "immutable",
+    "not_measured",
+    "fcp_ms",
+)
+
+# The network of the first contentful paint estimate: the "Slow 4G" profile of Lighthouse, with
+# the initial congestion window of TCP (10 segments).
+RTT_MS = 150
+THROUGHPUT_KBPS = 1638.4
+INITIAL_WINDOW_BYTES = 14600
+
+# The screen of the mobile device of Lighthouse, and the image formats of a current browser.
+DEVICE_PIXEL_RATIO = 1.75
+IMAGE_TYPES = ("image/avif", "image/webp", "image/png", "image/jpeg", "image/gif", "image/svg+xml")
+
+
+def srcset_candidate(srcset):
+    """
+    Return the image of a ``srcset`` attribute which a browser downloads at
+    ``DEVICE_PIXEL_RATIO``: the smallest density covering it, or the largest one.
+
+    :param srcset: The attribute, e.g. ``"logo-70w.avif 1x, logo-140w.avif 2x"``.
+    :type srcset: str
+    :return: The URL of the image.
+    :rtype: str
+    """
+
+    candidates = []
+    for candidate in srcset.split(","):
+        url, _, descriptor = candidate.strip().partition(" ")
+        density = descriptor.strip()
+        candidates.append((float(density[:-1]) if density.endswith("x") else 1.0, url))
+    covering = [candidate for candidate in candidates if candidate[0] >= DEVICE_PIXEL_RATIO]
+    return min(covering)[1] if covering else max(candidates)[1]
+
+
+class ResourceParser(HTMLParser):
+    """
+    Parser collecting the resources loaded by an HTML page, and its inline CSS.
+
+    Each resource is a dict with its ``url``, its ``kind`` (``stylesheet``, ``script``, ``icon``
+    or ``image``) and whether it is ``render_blocking``. The tags of ``<noscript>`` are left out,
+    as the browsers running JavaScript ignore them, and so are the images of a ``<picture>`` tag
+    but the one of its first ``<source>`` of a supported type, or of its ``<img>``.
+    """
+
+    def __init__(self):
+        super().__init__()
+        self.resources = []
+        self.inline_css = ""
+        self.in_head = False
+        self.in_noscript = False
+        self.in_style = False
+        self.in_picture = False
+        self.picture_source = None
+
+    def handle_starttag(self, tag, attrs):
+        attrs = dict(attrs)
+        if tag == "head":
+            self.in_head = True
+        elif tag in ("noscript", "style"):
+            setattr(self, f"in_{tag}", True)
+        elif self.in_noscript:
+            return
+        elif tag == "picture":
+            self.in_picture, self.picture_source = True, None
+        elif tag == "source" and self.in_picture and attrs.get("srcset"):
+            if self.picture_source is None and attrs.get("type", IMAGE_TYPES[0]) in IMAGE_TYPES:
+                self.picture_source = srcset_candidate(attrs["srcset"])
+        elif tag == "link" and attrs.get("href"):
+            rel = (attrs.get("rel") or "").split()
+            if "stylesheet" in rel:
+                blocking = self.in_head and attrs.get("media", "all") in ("all", "screen")
+                self.add(attrs["href"], "stylesheet", blocking)
+            elif "preload" in rel and attrs.get("as") == "style":
+                self.add(attrs["href"], "stylesheet", False)
+            elif "icon" in rel:
+                self.add(attrs["href"], "icon", False)
+        elif tag == "script" and attrs.get("src"):
+            deferred = "async" in attrs or "defer" in attrs or attrs.get("type") == "module"
+            self.add(attrs["src"], "script", self.in_head and not deferred)
+        elif tag == "img" and (attrs.get("src") or attrs.get("srcset")):
+            url = self.picture_source if self.in_picture else None
+            if url is None and attrs.get("srcset"):
+                url = srcset_candidate(attrs["srcset"])
+            self.add(url or attrs["src"], "image", False)
+
+    def handle_endtag(self, tag):
+        if tag == "head":
+            self.in_head = False
+        elif tag in ("noscript", "style", "picture"):
+            setattr(self, f"in_{tag}", False)
+
+    def handle_data(self, data):
+        if self.in_style:
+            self.inline_css += data
+
+    def add(self, url, kind, render_blocking):
+        if all(resource["url"] != url for resource in self.resources):
+            self.resources.append({"url": url, "kind": kind, "render_blocking": render_blocking})
+
+
+def download(url):
+    """
+    Download a third-party resource, as a browser would with gzip.
+
+    :param url: The URL of the resource, possibly protocol-relative.
+    :type url: str
+    :return: The uncompressed and the transferred bytes, or None if it can not be downloaded.
+    :rtype: tuple of int or None
+    """
+
+    if url.startswith("//"):
+        url = "https:" + url
+    request = Request(url, headers={"Accept-Encoding": "gzip", "User-Agent": "page-weight"})
+    try:
+        with urlopen(request, timeout=10) as response:
+            body = response.read()
+            if response.headers.get("Content-Encoding") == "gzip":
+                return len(gzip.decompress(body)), len(body)
+            return len(body), len(gzip.compress(body))
+    except (OSError, ValueError):
+        return None
+
+
+def transfer_ms(size):
+    """
+    Estimate the time of the transfer of a response on the network of ``RTT_MS`` and
+    ``THROUGHPUT_KBPS``, with the slow start of TCP, which doubles the bytes sent per round
+    trip from ``INITIAL_WINDOW_BYTES``.
+
+    :param size: The bytes of the response.
+    :type size: int
+    :return: The time of the transfer, in milliseconds.
+    :rtype: float
+    """
+
+    round_trips, window, sent = 0, INITIAL_WINDOW_BYTES, 0
+    while sent + window < size:
+        sent += window
+        window *= 2
+        round_trips += 1
+    return round_trips * RTT_MS + size * 8 / THROUGHPUT_KBPS
+
+
+def estimate_fcp(html_gzip_bytes, resources):
+    """
+    Estimate the first contentful paint of a first visit, when the HTML and the render-blocking
+    resources are loaded.
+
+    The connection to an origin takes three round trips (DNS, TCP and TLS), and each request one
+    more. The render-blocking resources are requested in parallel once the HTML is received,
+    sharing the throughput, and those of the origin of the page reuse its connection. The time
+    of parsing, of the layout and of the resources not measured is left out: the estimate is
+    for comparisons, not a prediction.
+
+    :param html_gzip_bytes: The bytes of the HTML, as transferred with gzip.
+    :type html_gzip_bytes: int
+    :param resources: The resources of the page (see ``measure_page``).
+    :type resources: list of dict
+    :return: The estimated first contentful paint, in milliseconds.
+    :rtype: int
+    """
+
+    fcp = 4 * RTT_MS + transfer_ms(html_gzip_bytes)
+    blocking = [resource for resource in resources if resource["render_blocking"]]
+    if blocking:
+        connection = 3 * RTT_MS if any(urlsplit(r["url"]).netloc for r in blocking) else 0
+        size = sum(resource["gzip_bytes"] or 0 for resource in blocking)
+        fcp += connection + RTT_MS + transfer_ms(size)
+    return round(fcp)
+
+
+def measure_page(client, path, offline):
+    """
+    Request a page and the resources it loads.
+
+    :param client: The test client of Django.
+    :type client: django.test.Client
+    :param path: The path of the page.
+    :type path: str
+    :param offline: Whether to leave the third-party resources unmeasured.
+    :type offline: bool
+    :return: The metrics of the page and its resources.
+    :rtype: dict
+    :raises RuntimeError: If the page or one of its static files is not answered with a
+        ``200 OK``.
+    """
+
+    def get(url, **headers):
+        response = client.get(url, **headers)
+        if response.status_code != 200:
+            raise RuntimeError(f"{url} is answered with {response.status_code}.")
+        if response.streaming:
+            return response, b"".join(response.streaming_content)
+        return response, response.content
+
+    _, html = get(path)
+    parser = ResourceParser()
+    parser.feed(html.decode("utf-8"))
+
+    origins = set()
+    for resource in parser.resources:
+        url = resource["url"]
+        if urlsplit(url).netloc:
+            origins.add(urlsplit(url).netloc)
+            size = None if offline else download(url)
+            cache_control = None
+        else:
+            _, body = get(url)
+            response, compressed = get(url, HTTP_ACCEPT_ENCODING="gzip")
+            size = len(body), len(compressed)
+            cache_control = response.get("Cache-Control")
+        resource["bytes"], resource["gzip_bytes"] = size or (None, None)
+        resource["immutable"] = "immutable" in (cache_control or "")
+
+    measured = [resource for resource in parser.resources if resource["bytes"] is not None]
+    stylesheets = [resource for resource in measured if resource["kind"] == "stylesheet"]
+    images = [resource for resource in measured if resource["kind"] in ("image", "icon")]
+    inline_css = parser.inline_css.encode("utf-8")
+    return {
+        "requests": 1 + len(parser.resources),
+        "third_party_origins": len(origins),
+        "render_blocking": sum(resource["render_blocking"] for resource in parser.resources),
+        "bytes": len(html) + sum(resource["bytes"] for resource in measured),
+        "gzip_bytes": len(gzip.compress(html))
+        + sum(resource["gzip_bytes"] for resource in measured),
+        "css_bytes": len(inline_css) + sum(resource["bytes"] for resource in stylesheets),
+        "css_gzip_bytes": (len(gzip.compress(inline_css)) if inline_css else 0)
+        + sum(resource["gzip_bytes"] for resource in stylesheets),
+        "image_bytes": sum(resource["bytes"] for resource in images),
+        "immutable": sum(resource["immutable"] for resource in parser.resources),
+        "not_measured": len(parser.resources) - len(measured),
+        "fcp_ms": estimate_fcp(len(gzip.compress(html)), parser.resources),
+        "resources": parser.resources,
+    }
+
+
+def measure(output, offline):
+    """
+    Measure the pages of the working tree, in the current process, and write the results to a
+    JSON file.
+
+    The process must run from the root of the tree, with the environment set by ``run``.
+
+    :param output: The path of the JSON file.
+    :type output: str
+    :param offline: Whether to leave the third-party resources unmeasured.
+    :type offline: bool
+    :return: None
+    :rtype: None
+    """
+
+    from benchmarks.utils import seed_lettings, seed_profiles, setup_django
+
+    setup_django(os.environ["DATABASE_NAME"], "oc_lettings_site.settings")
+    seed_lettings(1)
+    seed_profiles(1)
+
+    from django.core.management import call_command
+    from django.test import Client
+
+    call_command("collectstatic", interactive=False, verbosity=0)
+    client = Client()
+    results = {name: measure_page(client, path, offline) for name, path in PAGES.items()}
+    with open(output, "w") as file:
+        json.dump(results, file, indent=2, sort_keys=True)
+
+
+def run(root, offline):
+    """
+    Measure the pages of a working tree in a new process.
+
+    :param root: The root of the working tree.
+    :type root: str
+    :param offline: Whether to leave the third-party resources unmeasured.
+    :type offline: bool
+    :return: The metrics of each page.
+    :rtype: dict
+    """
+
+    with tempfile.TemporaryDirectory() as directory:
+        output = os.path.join(directory, "page_weight.json")
+        subprocess.run(
+            [sys.executable, "-m", "benchmarks.page_weight", "--measure", output]
+            + (["--offline"] if offline else []),
+            cwd=root,
+            env=dict(
+                os.environ,
+                DJANGO_SETTINGS_MODULE="oc_lettings_site.settings",
+                SECRET_KEY="page-weight",
+                ALLOWED_HOSTS="*",
+                DATABASE_NAME=os.path.join(directory, "benchmark.sqlite3"),
+                CACHE_LOCATION=os.path.join(directory, "cache"),
+                STATIC_ROOT=os.path.join(directory, "static"),
+                TIMING_LOG_LEVEL="WARNING",
+                # The baseline tree runs its own copy of this module.
+                PYTHONPATH=root,
+            ),
+            check=True,
+        )
+        with open(output) as file:
+            return json.load(file)
+
+
+def run_baseline(revision, offline):
+    """
+    Measure the pages of another commit, checked out in a temporary git worktree.
+
+    The benchmark itself is copied to the worktree, as the commit may predate it.
+
+    :param revision: The commit, e.g. ``HEAD~1``.
+    :type revision: str
+    :param offline: Whether to leave the third-party resources unmeasured.
+    :type offline: bool
+    :return: The metrics of each page.
+    :rtype: dict
+    """
+
+    with tempfile.TemporaryDirectory() as directory:
+        root = os.path.join(directory, "baseline")
+        subprocess.run(
+            ["git", "worktree", "add", "--detach", "--quiet", root, revision], check=True
+        )
+        try:
+            with open(__file__) as source, open(
+                os.path.join(root, "benchmarks", "page_weight.py"), "w"
+            ) as copy:
+                copy.write(source.read())
+            return run(root, offline)
+        finally:
+            subprocess.run(["git", "worktree", "remove", "--force", root], check=True)
+
+
+def report(results, baseline=None):
+    """
+    Print the metrics of each page, and their change from a baseline.
+
+    :param results: The metrics of each page.
+    :type results: dict
+    :param baseline: The metrics of each page in the baseline.
+    :type baseline: dict or None
+    :return: None
+    :rtype: None
+    """
+
+    for name, page in results.items():
+        print(name)
+        for resource in page["resources"]:
+            size = "not measured" if resource["bytes"] is None else (
+                f"{resource['bytes']:>8} B, {resource['gzip_bytes']:>7} B gzip"
+            )
+            flags = " render-blocking" if resource["render_blocking"] else ""
+            flags += " immutable" if resource["immutable"] else ""
+            print(f"    {resource['kind']:<11}{size:<29}{resource['url']}{flags}")
+        for metric in METRICS:
+            line = f"  {metric:<22}{page[metric]:>10}"
+            if baseline and name in baseline:
+                line = f"  {metric:<22}{baseline[name][metric]:>10}{page[metric]:>10}"
+            print(line)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--baseline", metavar="REVISION", help="a commit to compare with")
+    parser.add_argument("--offline", action="store_true", help="do not download third parties")
+    parser.add_argument("--output", help="JSON file of the results")
+    parser.add_argument("--measure", metavar="OUTPUT", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.measure:
+        measure(args.measure, args.offline)
+        return
+
+    results = run(os.getcwd(), args.offline)
+    baseline = run_baseline(args.baseline, args.offline) if args.baseline else None
+    if args.output:
+        with open(args.output, "w") as output:
+            json.dump({"baseline": baseline, "current": results}, output, indent=2, sort_keys=True)
+            output.write("\n")
+    if baseline:
+        print(f"{'':<24}{'baseline':>10}{'current':>10}")
+    report(results, baseline)
+
+
+if __name__ == "__main__":
+    main()
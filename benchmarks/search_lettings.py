@@ -0,0 +1,154 @@
+"""
+Benchmark of the full-text search of the lettings.
+
+Seeds a database with lettings whose titles, streets and cities are drawn from a vocabulary with
+a skewed (Zipf) distribution, like real text where a few words are very common, then times the
+search of common, rare and prefix words, and of several words.
+
+Usage::
+
+    $ python -m benchmarks.search_lettings --rows 1000000
+"""
+
+import argparse
+import os
+import random
+import statistics
+import tempfile
+import time
+from itertools import accumulate
+
+from benchmarks.utils import setup_django
+
+SYLLABLES = ("ka", "lo", "mar", "ve", "sun", "ri", "ta", "no", "bel", "cor", "di", "an", "po")
+STREET_TYPES = ("Street", "Avenue", "Road", "Drive", "Lane", "Court")
+
+
+def vocabulary(size, generator):
+    """
+    Return a list of distinct made-up words.
+
+    :param size: The number of words.
+    :type size: int
+    :param generator: The random generator.
+    :type generator: random.Random
+    :return: The words.
+    :rtype: list of str
+    """
+
+    words = set()
+    while len(words) < size:
+        words.add("".join(generator.choices(SYLLABLES, k=generator.randint(2, 4))))
+    return sorted(words)
+
+
+def ranked_vocabulary():
+    """
+    Return the vocabulary of the lettings, the most common word first.
+
+    :return: The words.
+    :rtype: list of str
+    """
+
+    generator = random.Random(0)
+    words = vocabulary(5000, generator)
+    generator.shuffle(words)
+    return words
+
+
+def seed(rows, batch_size=20000):
+    """
+    Create ``rows`` lettings with titles, streets and cities drawn with a Zipf distribution.
+
+    :param rows: The number of lettings.
+    :type rows: int
+    :param batch_size: The number of rows inserted per transaction.
+    :type batch_size: int
+    :return: None
+    :rtype: None
+    """
+
+    from django.db import connection, transaction
+    from django.utils import timezone
+
+    from core.bulk import bulk_insert
+    from lettings.models import Address, Letting
+
+    generator = random.Random(1)
+    words = ranked_vocabulary()
+    weights = list(accumulate(1 / rank for rank in range(1, len(words) + 1)))
+    cities = words[:300]
+    updated_at = Letting._meta.get_field("updated_at").get_db_prep_save(
+        timezone.now(), connection
+    )
+
+    for start in range(1, rows + 1, batch_size):
+        ids = range(start, min(start + batch_size, rows + 1))
+        titles = [
+            " ".join(generator.choices(words, cum_weights=weights, k=3)).title() for _ in ids
+        ]
+        streets = generator.choices(words, cum_weights=weights, k=len(ids))
+        with transaction.atomic():
+            bulk_insert(
+                Address,
+                ("id", "number", "street", "city", "state", "zip_code", "country_iso_code",
+                 "updated_at"),
+                (
+                    (pk, pk % 10000, f"{street.title()} {STREET_TYPES[pk % 6]}",
+                     generator.choice(cities).title(), "BC", pk % 100000, "USA", updated_at)
+                    for pk, street in zip(ids, streets)
+                ),
+            )
+            bulk_insert(
+                Letting,
+                ("id", "title", "address", "updated_at"),
+                ((pk, title, pk, updated_at) for pk, title in zip(ids, titles)),
+            )
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--rows", type=int, default=1000000, help="lettings in the database")
+    parser.add_argument("--repeat", type=int, default=50, help="runs of each search")
+    parser.add_argument("--limit", type=int, default=50, help="results per search")
+    parser.add_argument("--database", help="a database seeded by a previous run, to reuse")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as directory:
+        database = args.database or os.path.join(directory, "benchmark.sqlite3")
+        seeded = os.path.exists(database)
+        setup_django(database)
+        if not seeded:
+            start = time.perf_counter()
+            seed(args.rows)
+            print(f"Seeded {args.rows} lettings in {time.perf_counter() - start:.1f}s.")
+        words = ranked_vocabulary()
+
+        from lettings.search import search_lettings
+
+        searches = {
+            "most common word": words[0],
+            "10th word": words[9],
+            "rare word": words[-1],
+            "2-letter prefix": words[0][:2],
+            "3-letter prefix": words[50][:3],
+            "two common words": f"{words[0]} {words[1]}",
+            "common + rare word": f"{words[0]} {words[-1][:4]}",
+        }
+        print(f"{'search':<22}{'text':<24}{'results':>8}{'p50 ms':>9}{'p95 ms':>9}")
+        for name, text in searches.items():
+            timings = []
+            for _ in range(args.repeat):
+                start = time.perf_counter()
+                results = list(search_lettings(text, args.limit))
+                timings.append((time.perf_counter() - start) * 1000)
+            timings.sort()
+            p95 = timings[int(len(timings) * 0.95) - 1]
+            print(
+                f"{name:<22}{text[:23]:<24}{len(results):>8}"
+                f"{statistics.median(timings):>9.2f}{p95:>9.2f}"
+            )
+
+
+if __name__ == "__main__":
+    main()
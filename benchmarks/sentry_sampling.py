@@ -0,0 +1,181 @@
+"""
+Benchmark of the overhead of the Sentry tracing.
+
+Calls the WSGI application of the project on the index and detail pages of the lettings and
+profiles, without Sentry and with Sentry at several sampling settings, and reports the median
+time of a request in each mode and its overhead over the mode without Sentry. The events are
+dropped by a transport which sends nothing, so the time of the network is not measured, but the
+time of building the traces is. The detail pages are served from the page cache after their first
+request, which makes the overhead of the tracing stand out.
+
+Each mode runs in a process of its own, as Sentry can not be turned off once it is initialized.
+The processes run their rounds in turn, so a drift of the machine affects all the modes alike, and
+the overhead of a mode is the median of its ratios to the ``off`` mode over the rounds.
+
+Modes:
+    - off: Sentry is not initialized.
+    - errors: Sentry only reports the errors, no request is traced.
+    - policy: The sampling policy of ``core.tracing``, with the rates of the settings.
+    - traces=0.1: 10% of the requests are traced.
+    - traces=1: Every request is traced.
+    - traces=1+profiles=1: Every request is traced and profiled.
+    - former: Every request is traced and profiled, with the spans of each middleware and signal
+      receiver: the former setting of the project.
+
+All the modes but ``former`` use the Django integration of ``core.tracing.django_integration``.
+
+Usage::
+
+    $ python -m benchmarks.sentry_sampling --rows 2000 --rounds 20
+"""
+
+import argparse
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+from benchmarks.server_timing import urls
+from benchmarks.utils import seed_lettings, seed_profiles, setup_django
+
+MODES = {
+    "off": None,
+    "errors": {},
+    "policy": {"traces_sampler": "core.tracing.sample_trace"},
+    "traces=0.1": {"traces_sample_rate": 0.1},
+    "traces=1": {"traces_sample_rate": 1.0},
+    "traces=1+profiles=1": {"traces_sample_rate": 1.0, "profiles_sample_rate": 1.0},
+    "former": {"traces_sample_rate": 1.0, "profiles_sample_rate": 1.0, "integrations": []},
+}
+
+
+def measure(database, mode, rows, requests):
+    """
+    Call the WSGI application in a mode, in the current process, for each round requested on the
+    standard input, and write the mean time of a request of the round to the standard output.
+
+    :param database: The path of the seeded SQLite database.
+    :type database: str
+    :param mode: The name of the mode, a key of ``MODES``.
+    :type mode: str
+    :param rows: The number of seeded lettings and profiles.
+    :type rows: int
+    :param requests: The number of requests per page per round.
+    :type requests: int
+    :return: None
+    :rtype: None
+    """
+
+    setup_django(database, migrate=False)
+
+    import logging
+
+    import sentry_sdk
+    from django.conf import settings
+    from django.core.wsgi import get_wsgi_application
+    from django.test import RequestFactory
+    from sentry_sdk.transport import Transport
+
+    from core.tracing import django_integration, sample_trace
+
+    class NullTransport(Transport):
+        def capture_envelope(self, envelope):
+            pass
+
+        def capture_event(self, event):
+            pass
+
+    logging.getLogger("core.timing").setLevel(logging.WARNING)
+    options = MODES[mode]
+    if options is not None:
+        options = {"integrations": [django_integration()], **options}
+        if "traces_sampler" in options:
+            # As settings.py does when SENTRY_DSN is set.
+            options["traces_sampler"] = sample_trace
+            settings.MIDDLEWARE.insert(
+                settings.MIDDLEWARE.index("core.timing.ServerTimingMiddleware"),
+                "core.tracing.TraceSamplingMiddleware",
+            )
+        sentry_sdk.init(dsn="https://public@localhost/1", transport=NullTransport, **options)
+
+    application = get_wsgi_application()
+    factory = RequestFactory()
+    paths = urls(rows)
+
+    def start_response(status, headers, exc_info=None):
+        assert status.startswith("200"), status
+
+    def request(path):
+        environ = factory.get(path).environ
+        start = time.perf_counter()
+        response = application(environ, start_response)
+        for _ in response:
+            pass
+        response.close()
+        return time.perf_counter() - start
+
+    for path in paths:
+        request(path)  # Load the templates and fill the page cache.
+    print("ready", flush=True)
+    for _ in sys.stdin:
+        elapsed = sum(request(path) for _ in range(requests) for path in paths)
+        print(elapsed / (requests * len(paths)), flush=True)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--rows", type=int, default=2000, help="rows per resource")
+    parser.add_argument("--rounds", type=int, default=20, help="rounds per mode")
+    parser.add_argument("--requests", type=int, default=10, help="requests per page per round")
+    parser.add_argument("--database", help="an existing seeded database to reuse")
+    parser.add_argument("--measure", choices=MODES, help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.measure:
+        measure(args.database, args.measure, args.rows, args.requests)
+        return
+
+    with tempfile.TemporaryDirectory() as directory:
+        database = args.database or os.path.join(directory, "benchmark.sqlite3")
+        if not args.database:
+            setup_django(database)
+            seed_lettings(args.rows)
+            seed_profiles(args.rows)
+
+        processes = {
+            mode: subprocess.Popen(
+                [sys.executable, "-m", "benchmarks.sentry_sampling", "--rows", str(args.rows),
+                 "--requests", str(args.requests), "--database", database, "--measure", mode],
+                stdin=subprocess.PIPE,
+                stdout=subprocess.PIPE,
+                text=True,
+            )
+            for mode in MODES
+        }
+        times = {mode: [] for mode in MODES}
+        try:
+            for process in processes.values():
+                while process.stdout.readline().strip() != "ready":
+                    pass
+            for _ in range(args.rounds):
+                for mode, process in processes.items():
+                    process.stdin.write("\n")
+                    process.stdin.flush()
+                    times[mode].append(float(process.stdout.readline()))
+        finally:
+            for process in processes.values():
+                process.stdin.close()
+                process.wait()
+
+    print(f"{'mode':<22}{'median ms':>11}{'overhead':>10}")
+    for mode, values in times.items():
+        overhead = statistics.median(
+            value / off - 1 for value, off in zip(values, times["off"])
+        )
+        print(f"{mode:<22}{statistics.median(values) * 1000:>11.3f}{overhead:>+10.1%}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,108 @@
+"""
+Benchmark of the WSGI and ASGI serving modes under many concurrent connections.
+
+Seeds a database, then serves it with gunicorn in each mode of ``deploy.sh``, with the same number
+of workers: the sync workers of ``oc_lettings_site.wsgi`` and the uvicorn workers of
+``oc_lettings_site.asgi`` (see ``core.asgi``). For each mode, a client keeps ``--connections``
+requests in flight for a few seconds, to the index and detail pages of the lettings and profiles,
+and reports the requests per second, the median and 99th percentile latencies and the failed
+requests.
+
+Each request opens a new connection (``Connection: close``), as the sync workers of gunicorn do
+not keep the connections alive. The client runs on the same host as the server and shares its
+CPUs, and each mode starts with an empty page cache.
+
+Usage::
+
+    $ python -m benchmarks.server_modes --rows 10000 --connections 500 --seconds 20
+"""
+
+import argparse
+import asyncio
+import os
+import resource
+import tempfile
+
+from benchmarks.utils import load, seed_lettings, seed_profiles, setup_django, start_server
+
+MODES = {
+    "wsgi": ["oc_lettings_site.wsgi:application"],
+    "asgi": ["-k", "uvicorn.workers.UvicornWorker", "oc_lettings_site.asgi:application"],
+}
+
+
+def choose_path(generator, rows):
+    """
+    Return the path of a random index or detail page.
+
+    :param generator: The random generator.
+    :type generator: random.Random
+    :param rows: The number of lettings and profiles in the database.
+    :type rows: int
+    :return: The path.
+    :rtype: str
+    """
+
+    pk = generator.randint(1, rows)
+    return generator.choice(
+        ["/lettings/", f"/lettings/{pk}/", "/profiles/", f"/profiles/user{pk:08d}/"]
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--rows", type=int, default=10000, help="lettings and profiles")
+    parser.add_argument("--connections", type=int, default=500, help="concurrent requests")
+    parser.add_argument("--seconds", type=float, default=20, help="duration of each run")
+    parser.add_argument("--workers", type=int, default=2, help="gunicorn worker processes")
+    parser.add_argument("--port", type=int, default=8765, help="port of the server")
+    args = parser.parse_args()
+
+    # Each request in flight holds a socket of the client.
+    _, hard = resource.getrlimit(resource.RLIMIT_NOFILE)
+    resource.setrlimit(resource.RLIMIT_NOFILE, (hard, hard))
+
+    with tempfile.TemporaryDirectory() as directory:
+        database = os.path.join(directory, "benchmark.sqlite3")
+        setup_django(database)
+        seed_lettings(args.rows)
+        seed_profiles(args.rows)
+
+        from django.db import connections
+
+        connections.close_all()
+        print(f"{'mode':<6}{'requests/s':>12}{'p50 ms':>10}{'p99 ms':>10}{'failed':>8}")
+        for mode in MODES:
+            server = start_server(
+                ["-w", str(args.workers), "--backlog", "2048", *MODES[mode]],
+                {
+                    "DJANGO_SETTINGS_MODULE": "oc_lettings_site.settings",
+                    "SECRET_KEY": "benchmark",
+                    "ALLOWED_HOSTS": "*",
+                    "DATABASE_NAME": database,
+                    "CACHE_LOCATION": os.path.join(directory, f"cache-{mode}"),
+                },
+                args.port,
+            )
+            try:
+                # Load the templates.
+                asyncio.run(load(args.port, 4, 1, lambda generator: choose_path(generator, 1)))
+                result = asyncio.run(
+                    load(
+                        args.port,
+                        args.connections,
+                        args.seconds,
+                        lambda generator: choose_path(generator, args.rows),
+                    )
+                )
+            finally:
+                server.terminate()
+                server.wait()
+            print(
+                f"{mode:<6}{result['requests_per_second']:>12.0f}{result['p50_ms']:>10.0f}"
+                f"{result['p99_ms']:>10.0f}{result['failures']:>8}"
+            )
+
+
+if __name__ == "__main__":
+    main()
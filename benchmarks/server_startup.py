@@ -0,0 +1,142 @@
+"""
+Benchmark of the time from the start of the server, or the restart of a worker, to the first
+response.
+
+Seeds a database and serves it with one gunicorn worker, in two configurations:
+
+- bare: ``gunicorn oc_lettings_site.wsgi:application``, the command of ``deploy.sh`` before the
+  server profile, where each worker imports Django and loads everything on its first request.
+- profile: the server profile of ``oc_lettings_site.gunicorn_config``, which loads the
+  application in the master process and warms it up before forking the workers.
+
+For each configuration, it measures the time from the launch of gunicorn to the first response
+of the lettings index page, then the time from the termination of the worker, as when it is
+recycled, to the first response of its replacement, and reports the median of several runs.
+The workers are found through ``/proc``, so the benchmark only runs on Linux.
+
+Usage::
+
+    $ python -m benchmarks.server_startup --runs 5
+"""
+
+import argparse
+import os
+import signal
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+import urllib.error
+import urllib.request
+
+from benchmarks.utils import seed_lettings, seed_profiles, server_workers, setup_django
+
+CONFIGURATIONS = {
+    "bare": ["oc_lettings_site.wsgi:application"],
+    "profile": ["-c", "python:oc_lettings_site.gunicorn_config"],
+}
+
+# Seconds after which the server is considered unable to answer.
+TIMEOUT = 60
+
+
+def first_response(url, start):
+    """
+    Request a page until it is answered, and return the time since a start.
+
+    :param url: The URL of the page.
+    :type url: str
+    :param start: The start, from ``time.perf_counter()``.
+    :type start: float
+    :return: The seconds from the start to the first response.
+    :rtype: float
+    :raises RuntimeError: If the page is not answered within ``TIMEOUT`` seconds.
+    """
+
+    while time.perf_counter() - start < TIMEOUT:
+        try:
+            with urllib.request.urlopen(url, timeout=TIMEOUT) as response:
+                response.read()
+            return time.perf_counter() - start
+        except (ConnectionError, urllib.error.URLError):
+            time.sleep(0.005)
+    raise RuntimeError(f"{url} was not answered in {TIMEOUT}s.")
+
+
+def measure(configuration, database, directory, port):
+    """
+    Start gunicorn, wait for its first response, then restart its worker and wait again.
+
+    :param configuration: ``"bare"`` or ``"profile"``.
+    :type configuration: str
+    :param database: The path of the seeded SQLite database.
+    :type database: str
+    :param directory: A directory for the page cache.
+    :type directory: str
+    :param port: The port to listen on.
+    :type port: int
+    :return: The seconds to the first response after the start and after the restart.
+    :rtype: tuple of (float, float)
+    """
+
+    environment = dict(
+        os.environ,
+        DJANGO_SETTINGS_MODULE="oc_lettings_site.settings",
+        SECRET_KEY="benchmark",
+        ALLOWED_HOSTS="*",
+        DATABASE_NAME=database,
+        CACHE_LOCATION=os.path.join(directory, "cache"),
+        GUNICORN_BIND=f"127.0.0.1:{port}",
+        GUNICORN_WORKERS="1",
+    )
+    url = f"http://127.0.0.1:{port}/lettings/"
+    start = time.perf_counter()
+    server = subprocess.Popen(
+        [sys.executable, "-m", "gunicorn", "-b", f"127.0.0.1:{port}", "-w", "1",
+         "--log-level", "warning", *CONFIGURATIONS[configuration]],
+        env=environment,
+        stderr=subprocess.DEVNULL,
+    )
+    try:
+        started = first_response(url, start)
+        (worker,) = server_workers(server)
+        start = time.perf_counter()
+        os.kill(worker, signal.SIGTERM)
+        while server_workers(server) in ([], [worker]):
+            time.sleep(0.001)
+        restarted = first_response(url, start)
+    finally:
+        server.terminate()
+        server.wait()
+    return started, restarted
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--rows", type=int, default=10000, help="lettings and profiles")
+    parser.add_argument("--runs", type=int, default=5, help="runs of each configuration")
+    parser.add_argument("--port", type=int, default=8766, help="port of the server")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as directory:
+        database = os.path.join(directory, "benchmark.sqlite3")
+        setup_django(database)
+        seed_lettings(args.rows)
+        seed_profiles(args.rows)
+
+        from django.db import connections
+
+        connections.close_all()
+        print(f"{'configuration':<15}{'start to response ms':>22}{'restart to response ms':>24}")
+        for configuration in CONFIGURATIONS:
+            results = [
+                measure(configuration, database, directory, args.port) for _ in range(args.runs)
+            ]
+            started = statistics.median(result[0] for result in results)
+            restarted = statistics.median(result[1] for result in results)
+            print(f"{configuration:<15}{started * 1000:>22.0f}{restarted * 1000:>24.0f}")
+
+
+if __name__ == "__main__":
+    main()
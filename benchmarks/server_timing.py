@@ -0,0 +1,123 @@
+"""
+Benchmark of the overhead of the timings of the requests.
+
+Requests the index and detail pages of the lettings and profiles with the test client, with and
+without ``core.timing`` (its middleware and its template backend), and reports the median time
+of a request in each mode and the overhead of the timings. The page cache is emptied before each
+request, so every request queries the database and renders its templates, and the timings are
+logged to ``os.devnull``, so the formatting of the log lines is measured too. The two modes are
+measured in alternate rounds, and the overhead is the median of the ratios of the rounds of a
+pair, so a drift of the machine affects both modes alike.
+
+Usage::
+
+    $ python -m benchmarks.server_timing --rows 2000 --rounds 20
+"""
+
+import argparse
+import logging
+import os
+import statistics
+import tempfile
+import time
+
+from benchmarks.utils import seed_lettings, seed_profiles, setup_django
+
+MIDDLEWARE = "core.timing.ServerTimingMiddleware"
+BACKEND = "core.timing.DjangoTemplates"
+
+
+def urls(rows):
+    """
+    Return the URLs of the pages requested by a round, spread over the seeded rows.
+
+    :param rows: The number of seeded lettings and profiles.
+    :type rows: int
+    :return: The URLs.
+    :rtype: list of str
+    """
+
+    ids = range(1, rows + 1, max(rows // 10, 1))
+    return (
+        ["/lettings/", "/profiles/"]
+        + [f"/lettings/{pk}/" for pk in ids]
+        + [f"/profiles/user{pk:08d}/" for pk in ids]
+    )
+
+
+def run_round(client, paths, requests):
+    """
+    Request each page a number of times, emptying the page cache before each request.
+
+    :param client: The test client.
+    :type client: Client
+    :param paths: The URLs of the pages.
+    :type paths: list of str
+    :param requests: The number of requests per page.
+    :type requests: int
+    :return: The mean time of a request, in seconds.
+    :rtype: float
+    """
+
+    from django.core.cache import cache
+
+    elapsed = 0.0
+    for _ in range(requests):
+        for path in paths:
+            cache.clear()
+            start = time.perf_counter()
+            response = client.get(path)
+            elapsed += time.perf_counter() - start
+            assert response.status_code == 200, (path, response.status_code)
+    return elapsed / (requests * len(paths))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--rows", type=int, default=2000, help="rows per resource")
+    parser.add_argument("--rounds", type=int, default=20, help="rounds per mode")
+    parser.add_argument("--requests", type=int, default=10, help="requests per page per round")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as directory:
+        setup_django(os.path.join(directory, "benchmark.sqlite3"))
+        seed_lettings(args.rows)
+        seed_profiles(args.rows)
+
+        from django.conf import settings
+        from django.test import Client, override_settings
+
+        timing_logger = logging.getLogger("core.timing")
+        timing_logger.setLevel(logging.INFO)
+        timing_logger.handlers = [logging.StreamHandler(open(os.devnull, "w"))]
+
+        bare = {
+            "MIDDLEWARE": [name for name in settings.MIDDLEWARE if name != MIDDLEWARE],
+            "TEMPLATES": [
+                dict(engine, BACKEND="django.template.backends.django.DjangoTemplates")
+                if engine["BACKEND"] == BACKEND else engine
+                for engine in settings.TEMPLATES
+            ],
+        }
+        modes = {"bare": override_settings(**bare), "timed": override_settings()}
+        client = Client()
+        paths = urls(args.rows)
+        times = {mode: [] for mode in modes}
+        for _ in range(args.rounds):
+            for mode, overrides in modes.items():
+                with overrides:
+                    run_round(client, paths, 1)  # Load the templates of the backend.
+                    times[mode].append(run_round(client, paths, args.requests))
+
+    medians = {mode: statistics.median(values) for mode, values in times.items()}
+    print(f"{'mode':<8}{'median ms':>11}")
+    for mode, median in medians.items():
+        print(f"{mode:<8}{median * 1000:>11.3f}")
+    overhead = statistics.median(
+        timed / bare - 1 for bare, timed in zip(times["bare"], times["timed"])
+    )
+    print(f"overhead {overhead:+.2%}")
+
+
+if __name__ == "__main__":
+    main()
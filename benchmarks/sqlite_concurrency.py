@@ -0,0 +1,196 @@
+"""
+Benchmark of concurrent reads and writes on the SQLite database.
+
+Seeds a database with lettings, then runs worker processes for a few seconds, as the workers of
+the web server would: the readers list pages of the JSON API of the lettings and the writers
+edit lettings in transactions, as the admin site does. Each operation runs between the
+``request_started`` and ``request_finished`` signals, so the connections are closed or kept as
+they are at the end of a request. The benchmark runs twice:
+
+- defaults: the SQLite backend of Django, with the rollback journal, the 5 seconds busy
+  timeout of the ``sqlite3`` module and a new connection per request (``CONN_MAX_AGE = 0``).
+- tuned: the backend of ``core.backends.sqlite3``, with the PRAGMAs of
+  ``settings.SQLITE_PRAGMAS`` and ``BEGIN IMMEDIATE`` transactions, and persistent connections
+  (``CONN_MAX_AGE`` of ``settings.DATABASES``).
+
+It reports the operations per second and the "database is locked" errors of each run.
+
+Usage::
+
+    $ python -m benchmarks.sqlite_concurrency --rows 100000 --readers 6 --writers 2 --seconds 10
+"""
+
+import argparse
+import json
+import os
+import random
+import sqlite3
+import subprocess
+import sys
+import tempfile
+import time
+
+from benchmarks.utils import seed_lettings, setup_django
+
+CONFIGURATIONS = ("defaults", "tuned")
+
+
+def work(database, configuration, role, seconds, rows, seed):
+    """
+    Run read or write operations for a number of seconds, in the current process.
+
+    :param database: The path of the seeded SQLite database.
+    :type database: str
+    :param configuration: ``"defaults"`` or ``"tuned"``.
+    :type configuration: str
+    :param role: ``"reader"`` or ``"writer"``.
+    :type role: str
+    :param seconds: The duration of the run.
+    :type seconds: float
+    :param rows: The number of lettings in the database.
+    :type rows: int
+    :param seed: The seed of the random IDs.
+    :type seed: int
+    :return: The number of operations, of "database is locked" errors and the slowest operation.
+    :rtype: dict
+    """
+
+    setup_django(database, migrate=False)
+
+    from django.conf import settings
+    from django.core.signals import request_finished, request_started
+    from django.db import OperationalError, transaction
+    from django.test import RequestFactory
+
+    from lettings import api
+    from lettings.models import Letting
+
+    if configuration == "defaults":
+        settings.DATABASES["default"]["ENGINE"] = "django.db.backends.sqlite3"
+        settings.DATABASES["default"]["CONN_MAX_AGE"] = 0
+
+    generator = random.Random(seed)
+    factory = RequestFactory()
+
+    def read():
+        api.index(factory.get("/api/lettings/", {"sort": "city", "size": 20}))
+
+    def write():
+        with transaction.atomic():
+            letting = Letting.objects.get(pk=generator.randint(1, rows))
+            letting.title = f"Edited Letting {generator.random()}"
+            letting.save()
+
+    operation = read if role == "reader" else write
+    operations = locked = 0
+    slowest = 0.0
+    end = time.perf_counter() + seconds
+    while time.perf_counter() < end:
+        start = time.perf_counter()
+        request_started.send(sender=None)
+        try:
+            operation()
+            operations += 1
+        except OperationalError as error:
+            if "locked" not in str(error):
+                raise
+            locked += 1
+        finally:
+            request_finished.send(sender=None)
+        slowest = max(slowest, time.perf_counter() - start)
+    return {"operations": operations, "locked": locked, "slowest": slowest}
+
+
+def run(database, configuration, readers, writers, seconds, rows):
+    """
+    Run the reader and writer processes together and sum their results.
+
+    :param database: The path of the seeded SQLite database.
+    :type database: str
+    :param configuration: ``"defaults"`` or ``"tuned"``.
+    :type configuration: str
+    :param readers: The number of reader processes.
+    :type readers: int
+    :param writers: The number of writer processes.
+    :type writers: int
+    :param seconds: The duration of the run.
+    :type seconds: float
+    :param rows: The number of lettings in the database.
+    :type rows: int
+    :return: The operations per second, the errors and the slowest operation of each role.
+    :rtype: dict
+    """
+
+    # The journal mode is stored in the database file, so the defaults start from it.
+    journal_mode = "delete" if configuration == "defaults" else "wal"
+    with sqlite3.connect(database) as connection:
+        connection.execute(f"PRAGMA journal_mode = {journal_mode}")
+
+    roles = ["reader"] * readers + ["writer"] * writers
+    processes = [
+        subprocess.Popen(
+            [sys.executable, "-m", "benchmarks.sqlite_concurrency", "--database", database,
+             "--configuration", configuration, "--role", role, "--seconds", str(seconds),
+             "--rows", str(rows), "--seed", str(index), "--work"],
+            stdout=subprocess.PIPE,
+            text=True,
+        )
+        for index, role in enumerate(roles)
+    ]
+    results = {role: {"operations": 0, "locked": 0, "slowest": 0.0} for role in set(roles)}
+    for role, process in zip(roles, processes):
+        output, _ = process.communicate()
+        if process.returncode:
+            raise RuntimeError(f"A {role} process failed.")
+        result = json.loads(output.splitlines()[-1])
+        results[role]["operations"] += result["operations"]
+        results[role]["locked"] += result["locked"]
+        results[role]["slowest"] = max(results[role]["slowest"], result["slowest"])
+    for result in results.values():
+        result["per_second"] = result["operations"] / seconds
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--rows", type=int, default=100000, help="lettings in the database")
+    parser.add_argument("--readers", type=int, default=6, help="reader processes")
+    parser.add_argument("--writers", type=int, default=2, help="writer processes")
+    parser.add_argument("--seconds", type=float, default=10, help="duration of each run")
+    parser.add_argument("--database", help=argparse.SUPPRESS)
+    parser.add_argument("--configuration", choices=CONFIGURATIONS, help=argparse.SUPPRESS)
+    parser.add_argument("--role", choices=("reader", "writer"), help=argparse.SUPPRESS)
+    parser.add_argument("--seed", type=int, default=0, help=argparse.SUPPRESS)
+    parser.add_argument("--work", action="store_true", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.work:
+        result = work(
+            args.database, args.configuration, args.role, args.seconds, args.rows, args.seed
+        )
+        print(json.dumps(result))
+        return
+
+    with tempfile.TemporaryDirectory() as directory:
+        database = os.path.join(directory, "benchmark.sqlite3")
+        setup_django(database)
+        seed_lettings(args.rows)
+
+        from django.db import connections
+
+        connections.close_all()
+        for configuration in CONFIGURATIONS:
+            results = run(
+                database, configuration, args.readers, args.writers, args.seconds, args.rows
+            )
+            print(
+                ", ".join(
+                    f"{configuration} {role}s: {result['per_second']:.0f} ops/s, "
+                    f"{result['locked']} locked, slowest {result['slowest'] * 1000:.0f} ms"
+                    for role, result in sorted(results.items())
+                )
+            )
+
+
+if __name__ == "__main__":
+    main()
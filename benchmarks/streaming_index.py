@@ -0,0 +1,126 @@
+"""
+Benchmark of the streaming mode of the index pages.
+
+Compares the time to the first byte, the total time and the peak resident set size of the
+lettings and profiles index pages, rendered at once (the default) and streamed
+(``STREAMING_INDEX_PAGES``), with every row on a single page. Each measure runs in a fresh
+process, so the peak resident set size of a mode is not inflated by the other one.
+
+Usage::
+
+    $ python -m benchmarks.streaming_index --rows 100000
+"""
+
+import argparse
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import time
+
+from benchmarks.utils import (
+    current_rss_kib,
+    peak_rss_kib,
+    seed_lettings,
+    seed_profiles,
+    setup_django,
+)
+
+URLS = {"lettings": "/lettings/", "profiles": "/profiles/"}
+
+
+def measure(database, page, streaming, rows):
+    """
+    Request an index page with every row and measure it, in the current process.
+
+    :param database: The path of the seeded SQLite database.
+    :type database: str
+    :param page: ``"lettings"`` or ``"profiles"``.
+    :type page: str
+    :param streaming: Whether the streaming mode is enabled.
+    :type streaming: bool
+    :param rows: The number of rows of the page.
+    :type rows: int
+    :return: The measures.
+    :rtype: dict
+    """
+
+    setup_django(database, migrate=False)
+
+    from django.test import Client, override_settings
+
+    client = Client()
+    client.get(URLS[page], {"size": 1})  # Load the templates and open the connection.
+    rss_before = current_rss_kib()
+    with override_settings(
+        STREAMING_INDEX_PAGES=streaming,
+        PAGINATION_MAX_PAGE_SIZE=rows,
+        STREAMING_MAX_PAGE_SIZE=rows,
+    ):
+        start = time.perf_counter()
+        response = client.get(URLS[page], {"size": rows})
+        if response.streaming:
+            chunks = iter(response.streaming_content)
+            first = next(chunks)
+            ttfb = time.perf_counter() - start
+            size = len(first) + sum(len(chunk) for chunk in chunks)
+        else:
+            ttfb = time.perf_counter() - start
+            size = len(response.content)
+        total = time.perf_counter() - start
+
+    return {
+        "page": page,
+        "mode": "streaming" if streaming else "rendered",
+        "ttfb_ms": round(ttfb * 1000, 2),
+        "total_ms": round(total * 1000, 2),
+        "bytes": size,
+        "rss_before_kib": rss_before,
+        "peak_rss_kib": peak_rss_kib(),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--rows", type=int, default=100000, help="rows per index page")
+    parser.add_argument("--database", help="an existing seeded database to reuse")
+    parser.add_argument("--measure", nargs=2, metavar=("PAGE", "MODE"), help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.measure:
+        page, mode = args.measure
+        print(json.dumps(measure(args.database, page, mode == "streaming", args.rows)))
+        return
+
+    with tempfile.TemporaryDirectory() as directory:
+        database = args.database or os.path.join(directory, "benchmark.sqlite3")
+        if not args.database:
+            setup_django(database)
+            seed_lettings(args.rows)
+            seed_profiles(args.rows)
+
+        results = []
+        for page in URLS:
+            for mode in ("rendered", "streaming"):
+                output = subprocess.run(
+                    [sys.executable, "-m", "benchmarks.streaming_index", "--rows",
+                     str(args.rows), "--database", database, "--measure", page, mode],
+                    check=True,
+                    capture_output=True,
+                    text=True,
+                ).stdout
+                results.append(json.loads(output.splitlines()[-1]))
+
+    print(f"{'page':<10}{'mode':<11}{'TTFB ms':>10}{'total ms':>10}{'MiB':>8}{'peak RSS MiB':>14}")
+    for result in results:
+        growth = (result["peak_rss_kib"] - result["rss_before_kib"]) / 1024
+        print(
+            f"{result['page']:<10}{result['mode']:<11}{result['ttfb_ms']:>10}"
+            f"{result['total_ms']:>10}{result['bytes'] / 2**20:>8.1f}"
+            f"{result['peak_rss_kib'] / 1024:>10.1f} (+{growth:.1f})"
+        )
+
+
+if __name__ == "__main__":
+    main()
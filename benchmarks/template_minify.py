@@ -0,0 +1,153 @@
+"""
+Benchmark of the minification of the templates.
+
+Requests the pages of the project with the test client, with the templates loaded as they are
+written and with the minifying loaders of ``core.loaders``, both behind the cached loader of
+Django, and reports for each page:
+
+- the bytes of the response, uncompressed and with gzip;
+- the median time of a request, emptying the page cache before each one, so every request
+  renders its templates.
+
+The two modes are measured in alternate rounds, in turns first, so a drift of the machine and
+the order of the modes affect both alike.
+
+Usage::
+
+    $ python -m benchmarks.template_minify --rows 2000 --rounds 10
+"""
+
+import argparse
+import gzip
+import os
+import statistics
+import tempfile
+import time
+
+from benchmarks.utils import seed_lettings, seed_profiles, setup_django
+
+LOADERS = {
+    "plain": [
+        "django.template.loaders.filesystem.Loader",
+        "django.template.loaders.app_directories.Loader",
+    ],
+    "minified": ["core.loaders.FilesystemLoader", "core.loaders.AppDirectoriesLoader"],
+}
+
+
+def urls(rows):
+    """
+    Return the URLs of the pages requested.
+
+    :param rows: The number of seeded lettings and profiles.
+    :type rows: int
+    :return: The URLs.
+    :rtype: list of str
+    """
+
+    from django.conf import settings
+
+    size = min(rows, settings.PAGINATION_MAX_PAGE_SIZE)
+    return [
+        "/",
+        "/lettings/",
+        f"/lettings/?size={size}",
+        "/lettings/1/",
+        "/profiles/",
+        f"/profiles/?size={size}",
+        "/profiles/user00000001/",
+    ]
+
+
+def run_round(client, paths, requests):
+    """
+    Request each page a number of times, emptying the page cache before each request.
+
+    :param client: The test client.
+    :type client: Client
+    :param paths: The URLs of the pages.
+    :type paths: list of str
+    :param requests: The number of requests per page.
+    :type requests: int
+    :return: The mean time of a request of each page, in seconds, and its content.
+    :rtype: dict
+    """
+
+    from django.core.cache import cache
+
+    results = {}
+    for path in paths:
+        elapsed = 0.0
+        for _ in range(requests):
+            cache.clear()
+            start = time.perf_counter()
+            response = client.get(path)
+            elapsed += time.perf_counter() - start
+            assert response.status_code == 200, (path, response.status_code)
+        results[path] = (elapsed / requests, response.content)
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--rows", type=int, default=2000, help="rows per resource")
+    parser.add_argument("--rounds", type=int, default=10, help="rounds per mode")
+    parser.add_argument("--requests", type=int, default=10, help="requests per page per round")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as directory:
+        setup_django(os.path.join(directory, "benchmark.sqlite3"))
+        seed_lettings(args.rows)
+        seed_profiles(args.rows)
+
+        from django.conf import settings
+        from django.test import Client, override_settings
+
+        modes = {
+            mode: override_settings(
+                TEMPLATES=[
+                    dict(
+                        engine,
+                        OPTIONS=dict(
+                            engine["OPTIONS"],
+                            loaders=[("django.template.loaders.cached.Loader", loaders)],
+                        ),
+                    )
+                    for engine in settings.TEMPLATES
+                ]
+            )
+            for mode, loaders in LOADERS.items()
+        }
+        client = Client()
+        paths = urls(args.rows)
+        times = {mode: {path: [] for path in paths} for mode in modes}
+        contents = {}
+        for number in range(args.rounds):
+            order = list(modes) if number % 2 == 0 else list(reversed(modes))
+            for mode in order:
+                with modes[mode]:
+                    run_round(client, paths, 1)  # Load and compile the templates.
+                    for path, (seconds, content) in run_round(
+                        client, paths, args.requests
+                    ).items():
+                        times[mode][path].append(seconds)
+                        contents[mode, path] = content
+
+    print(f"{'page':<26}{'mode':<10}{'bytes':>9}{'gzip':>8}{'median ms':>11}")
+    for path in paths:
+        for mode in modes:
+            content = contents[mode, path]
+            median = statistics.median(times[mode][path]) * 1000
+            print(
+                f"{path:<26}{mode:<10}{len(content):>9}{len(gzip.compress(content)):>8}"
+                f"{median:>11.3f}"
+            )
+    for mode in modes:
+        size = sum(len(contents[mode, path]) for path in paths)
+        compressed = sum(len(gzip.compress(contents[mode, path])) for path in paths)
+        total = sum(statistics.median(times[mode][path]) for path in paths) * 1000
+        print(f"{'all pages':<26}{mode:<10}{size:>9}{compressed:>8}{total:>11.3f}")
+
+
+if __name__ == "__main__":
+    main()
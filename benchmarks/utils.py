@@ -0,0 +1,309 @@
+"""
+Helpers shared by the benchmarks.
+
+Functions:
+    - setup_django: Configures Django to use a given SQLite database and migrates it.
+    - seed_lettings: Creates lettings and their addresses in bulk.
+    - seed_profiles: Creates users and their profiles in bulk.
+    - peak_rss_kib: Returns the peak resident set size of the current process.
+    - current_rss_kib: Returns the resident set size of the current process.
+    - process_rss_kib: Returns the resident set size of another process.
+    - start_server: Starts gunicorn and waits until it accepts connections.
+    - server_workers: Returns the process IDs of the workers of gunicorn.
+    - fetch: Sends a request on a new connection and reads its response.
+    - load: Keeps a number of requests in flight for a number of seconds.
+"""
+
+import asyncio
+import os
+import random
+import resource
+import socket
+import statistics
+import subprocess
+import sys
+import time
+
+# Seconds after which a server which does not start, or a request which is not answered, fails.
+TIMEOUT = 30
+
+
+def setup_django(database, settings_module="oc_lettings_site.settings-ci", migrate=True):
+    """
+    Configure Django to use a SQLite database and create its tables.
+
+    :param database: The path of the SQLite database file.
+    :type database: str
+    :param settings_module: The settings module of the project.
+    :type settings_module: str
+    :param migrate: Whether to apply the migrations to the database.
+    :type migrate: bool
+    :return: None
+    :rtype: None
+    """
+
+    os.environ.setdefault("DJANGO_SETTINGS_MODULE", settings_module)
+
+    import django
+    from django.conf import settings
+
+    settings.DATABASES["default"]["NAME"] = database
+    django.setup()
+    if migrate:
+        from django.core.management import call_command
+
+        call_command("migrate", verbosity=0)
+
+
+def seed_lettings(count, batch_size=10000):
+    """
+    Create lettings and their addresses until ``count`` lettings exist.
+
+    :param count: The number of lettings the database must hold.
+    :type count: int
+    :param batch_size: The number of rows inserted per statement batch.
+    :type batch_size: int
+    :return: None
+    :rtype: None
+    """
+
+    from django.db import connection, transaction
+    from django.utils import timezone
+
+    from core.bulk import bulk_insert
+    from lettings.models import Address, Letting
+
+    updated_at = Letting._meta.get_field("updated_at").get_db_prep_save(
+        timezone.now(), connection
+    )
+    start = Letting.objects.count() + 1
+    for batch_start in range(start, count + 1, batch_size):
+        ids = range(batch_start, min(batch_start + batch_size, count + 1))
+        with transaction.atomic():
+            bulk_insert(
+                Address,
+                ("id", "number", "street", "city", "state", "zip_code", "country_iso_code",
+                 "updated_at"),
+                (
+                    (pk, pk % 10000, f"Benchmark Street {pk}", "Benchmark City", "BC",
+                     pk % 100000, "USA", updated_at)
+                    for pk in ids
+                ),
+            )
+            bulk_insert(
+                Letting,
+                ("id", "title", "address", "updated_at"),
+                ((pk, f"Benchmark Letting {pk}", pk, updated_at) for pk in ids),
+            )
+
+
+def seed_profiles(count, batch_size=10000):
+    """
+    Create users and their profiles until ``count`` profiles exist.
+
+    :param count: The number of profiles the database must hold.
+    :type count: int
+    :param batch_size: The number of rows inserted per statement batch.
+    :type batch_size: int
+    :return: None
+    :rtype: None
+    """
+
+    from django.contrib.auth import get_user_model
+    from django.db import transaction
+
+    from profiles.models import Profile
+
+    user_model = get_user_model()
+    start = Profile.objects.count() + 1
+    for batch_start in range(start, count + 1, batch_size):
+        ids = range(batch_start, min(batch_start + batch_size, count + 1))
+        with transaction.atomic():
+            user_model.objects.bulk_create(
+                user_model(id=pk, username=f"user{pk:08d}", email=f"user{pk}@mail.com")
+                for pk in ids
+            )
+            Profile.objects.bulk_create(
+                Profile(id=pk, user_id=pk, favorite_city="Benchmark City") for pk in ids
+            )
+
+
+def peak_rss_kib():
+    """
+    Return the peak resident set size of the current process.
+
+    ``VmHWM`` is read from ``/proc`` on Linux, as ``ru_maxrss`` also covers the process which
+    forked the current one.
+
+    :return: The peak resident set size in KiB.
+    :rtype: int
+    """
+
+    try:
+        with open("/proc/self/status") as status:
+            for line in status:
+                if line.startswith("VmHWM:"):
+                    return int(line.split()[1])
+    except OSError:
+        pass
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+
+
+def current_rss_kib():
+    """
+    Return the resident set size of the current process, read from ``/proc`` on Linux.
+
+    :return: The resident set size in KiB, or the peak resident set size on other systems.
+    :rtype: int
+    """
+
+    try:
+        with open("/proc/self/statm") as statm:
+            pages = int(statm.read().split()[1])
+    except OSError:
+        return peak_rss_kib()
+    return pages * os.sysconf("SC_PAGE_SIZE") // 1024
+
+
+def process_rss_kib(pid):
+    """
+    Return the resident set size of a process, read from ``/proc`` on Linux.
+
+    :param pid: The process ID.
+    :type pid: int
+    :return: The resident set size in KiB.
+    :rtype: int
+    """
+
+    with open(f"/proc/{pid}/statm") as statm:
+        pages = int(statm.read().split()[1])
+    return pages * os.sysconf("SC_PAGE_SIZE") // 1024
+
+
+def start_server(arguments, environment, port):
+    """
+    Start gunicorn and wait until it accepts connections.
+
+    :param arguments: The arguments of gunicorn.
+    :type arguments: list of str
+    :param environment: The environment variables added to those of the current process.
+    :type environment: dict
+    :param port: The port gunicorn listens on.
+    :type port: int
+    :return: The gunicorn process.
+    :rtype: subprocess.Popen
+    :raises RuntimeError: If gunicorn exits or does not accept connections within ``TIMEOUT``
+        seconds.
+    """
+
+    server = subprocess.Popen(
+        [sys.executable, "-m", "gunicorn", "-b", f"127.0.0.1:{port}", "--log-level", "warning",
+         *arguments],
+        env=dict(os.environ, **environment),
+    )
+    deadline = time.monotonic() + TIMEOUT
+    while time.monotonic() < deadline and server.poll() is None:
+        try:
+            socket.create_connection(("127.0.0.1", port), timeout=1).close()
+            return server
+        except OSError:
+            time.sleep(0.1)
+    server.terminate()
+    raise RuntimeError(f"gunicorn {' '.join(arguments)} did not start.")
+
+
+def server_workers(server):
+    """
+    Return the process IDs of the workers of a gunicorn master process, found through ``/proc``
+    on Linux.
+
+    :param server: The master process.
+    :type server: subprocess.Popen
+    :return: The process IDs.
+    :rtype: list of int
+    """
+
+    with open(f"/proc/{server.pid}/task/{server.pid}/children") as children:
+        return [int(pid) for pid in children.read().split()]
+
+
+async def fetch(port, path, headers=""):
+    """
+    Send a ``GET`` request on a new connection and read the response until the server closes it.
+
+    :param port: The port of the server.
+    :type port: int
+    :param path: The path of the request.
+    :type path: str
+    :param headers: Additional header lines, each ending with ``\\r\\n``.
+    :type headers: str
+    :return: The status code of the response.
+    :rtype: int
+    """
+
+    reader, writer = await asyncio.open_connection("127.0.0.1", port)
+    try:
+        writer.write(
+            f"GET {path} HTTP/1.1\r\nHost: localhost\r\n{headers}Connection: close\r\n\r\n"
+            .encode()
+        )
+        response = await reader.read()
+    finally:
+        writer.close()
+    return int(response[9:12] or 0)
+
+
+async def load(port, connections, seconds, choose_path, headers=""):
+    """
+    Keep a number of requests in flight for a number of seconds.
+
+    Each request opens a new connection, as the sync workers of gunicorn do not keep the
+    connections alive. A request fails if it is not answered within ``TIMEOUT`` seconds or with
+    a status code other than 200.
+
+    :param port: The port of the server.
+    :type port: int
+    :param connections: The number of concurrent requests.
+    :type connections: int
+    :param seconds: The duration of the run.
+    :type seconds: float
+    :param choose_path: A function returning the path of a request from a random generator.
+    :type choose_path: callable
+    :param headers: Additional header lines of the requests, each ending with ``\\r\\n``.
+    :type headers: str
+    :return: The answered requests per second, the 50th, 90th and 99th percentile latencies in
+        milliseconds and the number of failed requests.
+    :rtype: dict
+    """
+
+    latencies = []
+    failures = 0
+    start = time.perf_counter()
+    end = start + seconds
+
+    async def client(seed):
+        nonlocal failures
+        generator = random.Random(seed)
+        while time.perf_counter() < end:
+            sent = time.perf_counter()
+            try:
+                status = await asyncio.wait_for(
+                    fetch(port, choose_path(generator), headers), TIMEOUT
+                )
+            except (OSError, asyncio.TimeoutError):
+                status = 0
+            if status == 200:
+                latencies.append(time.perf_counter() - sent)
+            else:
+                failures += 1
+
+    await asyncio.gather(*(client(seed) for seed in range(connections)))
+    elapsed = time.perf_counter() - start
+    percentiles = statistics.quantiles(latencies, n=100) if len(latencies) > 1 else [0.0] * 99
+    return {
+        "requests_per_second": round(len(latencies) / elapsed, 1),
+        "p50_ms": round(percentiles[49] * 1000, 1),
+        "p90_ms": round(percentiles[89] * 1000, 1),
+        "p99_ms": round(percentiles[98] * 1000, 1),
+        "failures": failures,
+    }
@@ -0,0 +1,148 @@
+"""
+Helpers for the read-only JSON API of the lettings and profiles apps.
+
+The API serializes rows read with ``QuerySet.values_list()`` instead of model instances: each
+field of a resource is mapped to a database column, the selected columns are read as tuples and
+the tuples are turned into JSON objects, possibly nested (e.g. the address of a letting).
+
+Classes:
+    - FieldSelectionError: An exception raised when unknown fields are requested.
+
+Functions:
+    - select_fields: Returns the fields requested with the ``fields`` query parameter.
+    - json_page: Returns a JSON response holding one page of rows, with the requested fields.
+    - row_builder: Returns a function turning row tuples into (nested) dictionaries.
+
+Notes:
+    The fields of a resource are declared as a dictionary mapping the dotted name of a field in
+    the JSON output to the column it is read from, e.g. ``{"address.city": "address__city"}``.
+    A prefix selects all the fields below it: ``?fields=title,address`` selects the title and
+    every field of the address.
+
+Example:
+    To list the lettings::
+
+        return json_page(request, Letting.objects.all(), LETTING_FIELDS, keys=("id",))
+
+:param json: The module serializing the rows.
+:param HttpResponse: The response holding the JSON document.
+:param JsonResponse: The response holding the JSON error documents.
+:param paginate_keyset: A function returning one page of a queryset selected by a cursor.
+"""
+
+import json
+
+from django.http import HttpResponse, JsonResponse
+
+from core.pagination import paginate_keyset
+
+
+class FieldSelectionError(ValueError):
+    """
+    Exception raised when the ``fields`` query parameter holds unknown fields.
+    """
+
+
+def select_fields(request, available):
+    """
+    Return the fields requested with the ``fields`` query parameter.
+
+    :param request: The HTTP request object.
+    :type request: HttpRequest
+    :param available: The fields of the resource, mapping their dotted name to their column.
+    :type available: dict
+    :return: The requested fields, in the order of ``available``, or all of them if the
+        parameter is missing.
+    :rtype: dict
+    :raises FieldSelectionError: If a requested field is unknown.
+    """
+
+    requested = [name for name in request.GET.get("fields", "").split(",") if name]
+    if not requested:
+        return dict(available)
+
+    selected = {}
+    for name in requested:
+        matches = {
+            field: column
+            for field, column in available.items()
+            if field == name or field.startswith(f"{name}.")
+        }
+        if not matches:
+            raise FieldSelectionError(f"Unknown field: {name!r}.")
+        selected.update(matches)
+    return {field: column for field, column in available.items() if field in selected}
+
+
+def row_builder(fields):
+    """
+    Return a function turning a tuple of column values into a (nested) dictionary.
+
+    The paths of the nested dictionaries are computed once, not for each row.
+
+    :param fields: The dotted names of the fields, in the order of the columns.
+    :type fields: list of str
+    :return: The function.
+    :rtype: callable
+    """
+
+    paths = [field.split(".") for field in fields]
+    if all(len(path) == 1 for path in paths):
+        return lambda row: dict(zip(fields, row))
+
+    def build(row):
+        data = {}
+        for path, value in zip(paths, row):
+            target = data
+            for part in path[:-1]:
+                target = target.setdefault(part, {})
+            target[path[-1]] = value
+        return data
+
+    return build
+
+
+def json_page(request, queryset, available, keys):
+    """
+    Return a JSON response holding one page of rows, paginated with a cursor.
+
+    Only the fields requested with the ``fields`` query parameter are read from the database,
+    and an unknown field is answered with a ``400 Bad Request`` response holding the error.
+
+    The ordering keys are read in the first columns of each row, so they are available to build
+    the cursors even when they are not among the selected fields.
+
+    The document is ``{"results": [...], "next": url, "previous": url}``, where ``next`` and
+    ``previous`` are the URLs of the other pages, or null.
+
+    :param request: The HTTP request object.
+    :type request: HttpRequest
+    :param queryset: The rows to list.
+    :type queryset: QuerySet
+    :param available: The fields of the resource, mapping their dotted name to their column.
+    :type available: dict
+    :param keys: The unique ordering keys, e.g. ``("id",)``.
+    :type keys: tuple of str
+    :return: The JSON response.
+    :rtype: HttpResponse
+    :raises Http404: If the cursor is invalid.
+    """
+
+    try:
+        fields = select_fields(request, available)
+    except FieldSelectionError as error:
+        return JsonResponse({"error": str(error)}, status=400)
+
+    rows = queryset.values_list(*keys, *fields.values())
+    page = paginate_keyset(request, rows, keys, key_values=lambda row: row[: len(keys)])
+
+    build = row_builder(list(fields))
+    offset = len(keys)
+    document = {
+        "results": [build(row[offset:]) for row in page.object_list],
+        "next": request.path + page.next_url if page.has_next else None,
+        "previous": request.path + page.previous_url if page.has_previous else None,
+    }
+    return HttpResponse(
+        json.dumps(document, separators=(",", ":")), content_type="application/json"
+    )
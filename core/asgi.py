@@ -0,0 +1,210 @@
+"""
+ASGI handler serving the project with a bounded pool of threads.
+
+The ASGI handler of Django 3.0 runs the views, which are synchronous, with ``sync_to_async``,
+which runs every request in the same thread, and iterates the streaming responses in the event
+loop, where the database can not be queried. This handler runs each request in a thread of a
+pool of ``settings.ASGI_THREADS`` threads instead: the middleware, the view and its database
+queries, the iteration of a streaming response and the ``request_finished`` signal all run in the
+same thread, so each thread uses its own database connections, as a worker of a WSGI server does.
+The event loop only reads the request bodies and writes the responses, so the slow clients do not
+hold a thread while they send their requests.
+
+Classes:
+    - ASGIHandler: The ASGI handler running the requests in a pool of threads.
+
+Functions:
+    - get_asgi_application: Sets Django up and returns the ASGI handler.
+
+Notes:
+    - The requests beyond the size of the pool wait for a thread in the event loop, which bounds
+      the number of database connections of a process.
+    - A thread sending a response waits for each message to be sent, so a slow client reading a
+      streaming response holds its thread until the response is read.
+    - The connections of a thread are only used by its requests, so the warmup of a worker opens
+      them in each thread of the pool, with ``ASGIHandler.open_connections`` (see
+      ``oc_lettings_site.gunicorn_config``).
+
+Example:
+    To serve the project with uvicorn workers of gunicorn::
+
+        $ gunicorn -k uvicorn.workers.UvicornWorker oc_lettings_site.asgi:application
+
+:param asyncio: The module running the messages of a thread in the event loop.
+:param contextvars: The module copying the context of a request into its thread.
+:param threading: The module holding the threads of the pool during the warmup.
+:param ThreadPoolExecutor: The pool of threads running the requests.
+:param django: The module setting Django up.
+:param settings: The settings of the project.
+:param signals: The signals sent at the start and the end of a request.
+:param asgi: The module of the ASGI handler of Django.
+:param RequestAborted: The exception raised when a client disconnects before sending its request.
+:param FileResponse: The response sending a file.
+:param set_script_prefix: A function setting the prefix of the URLs of a request.
+:param open_connections: A function opening the database connections of the current thread.
+"""
+
+import asyncio
+import contextvars
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+import django
+from django.conf import settings
+from django.core import signals
+from django.core.exceptions import RequestAborted
+from django.core.handlers import asgi
+from django.http import FileResponse
+from django.urls import set_script_prefix
+
+from core.warmup import open_connections
+
+# The seconds the threads of the pool wait for each other during the warmup.
+WARMUP_TIMEOUT = 10
+
+
+class ASGIHandler(asgi.ASGIHandler):
+    """
+    ASGI handler running each request, from the middleware to the last chunk of its response, in
+    a thread of a bounded pool.
+
+    :param threads: The number of threads of the pool, ``settings.ASGI_THREADS``.
+    :type threads: int
+    :param executor: The pool of threads.
+    :type executor: ThreadPoolExecutor
+    """
+
+    def __init__(self):
+        super().__init__()
+        self.threads = settings.ASGI_THREADS
+        self.executor = ThreadPoolExecutor(max_workers=self.threads, thread_name_prefix="asgi")
+
+    def open_connections(self):
+        """
+        Open the database connections of each thread of the pool, before the first request.
+
+        A task is run in each thread, and each task waits for the others before it opens the
+        connections of its thread, so no thread runs two of them.
+
+        :return: The aliases of the databases.
+        :rtype: list of str
+        :raises DatabaseError: If a connection can not be opened.
+        :raises threading.BrokenBarrierError: If the threads are not all started in
+            ``WARMUP_TIMEOUT`` seconds.
+        """
+
+        barrier = threading.Barrier(self.threads, timeout=WARMUP_TIMEOUT)
+
+        def warm_up():
+            barrier.wait()
+            return open_connections()
+
+        tasks = [self.executor.submit(warm_up) for _ in range(self.threads)]
+        return [task.result() for task in tasks][0]
+
+    async def __call__(self, scope, receive, send):
+        """
+        Read the body of a request, then handle the request in a thread of the pool.
+
+        :param scope: The connection scope.
+        :type scope: dict
+        :param receive: The coroutine function receiving the messages of the client.
+        :type receive: callable
+        :param send: The coroutine function sending the messages to the client.
+        :type send: callable
+        :return: None
+        :rtype: None
+        :raises ValueError: If the connection is not an HTTP connection.
+        """
+
+        if scope["type"] != "http":
+            raise ValueError(
+                f"Django can only handle ASGI/HTTP connections, not {scope['type']}."
+            )
+        try:
+            body_file = await self.read_body(receive)
+        except RequestAborted:
+            return
+
+        loop = asyncio.get_running_loop()
+        context = contextvars.copy_context()
+        await loop.run_in_executor(
+            self.executor, context.run, self.handle, scope, body_file, send, loop
+        )
+
+    def handle(self, scope, body_file, send, loop):
+        """
+        Handle a request and send its response, in a thread of the pool.
+
+        :param scope: The connection scope.
+        :type scope: dict
+        :param body_file: The body of the request.
+        :type body_file: SpooledTemporaryFile
+        :param send: The coroutine function sending the messages to the client.
+        :type send: callable
+        :param loop: The event loop of the connection.
+        :type loop: AbstractEventLoop
+        :return: None
+        :rtype: None
+        """
+
+        set_script_prefix(self.get_script_prefix(scope))
+        signals.request_started.send(sender=self.__class__, scope=scope)
+        request, response = self.create_request(scope, body_file)
+        if request is not None:
+            response = self.get_response(request)
+        response._handler_class = self.__class__
+        if isinstance(response, FileResponse):
+            response.block_size = self.chunk_size
+
+        def send_message(message):
+            asyncio.run_coroutine_threadsafe(send(message), loop).result()
+
+        try:
+            self.send_response_sync(response, send_message)
+        finally:
+            response.close()
+
+    def send_response_sync(self, response, send_message):
+        """
+        Send a response, iterating the chunks of a streaming response in the current thread.
+
+        :param response: The response.
+        :type response: HttpResponseBase
+        :param send_message: The function sending a message to the client and waiting for it to be
+            sent.
+        :type send_message: callable
+        :return: None
+        :rtype: None
+        """
+
+        headers = [
+            (header.encode("ascii"), value.encode("latin1")) for header, value in response.items()
+        ]
+        for cookie in response.cookies.values():
+            headers.append((b"Set-Cookie", cookie.output(header="").encode("ascii").strip()))
+        send_message(
+            {"type": "http.response.start", "status": response.status_code, "headers": headers}
+        )
+        if response.streaming:
+            for part in response:
+                for chunk, _ in self.chunk_bytes(part):
+                    send_message({"type": "http.response.body", "body": chunk, "more_body": True})
+            send_message({"type": "http.response.body"})
+        else:
+            for chunk, last in self.chunk_bytes(response.content):
+                send_message(
+                    {"type": "http.response.body", "body": chunk, "more_body": not last}
+                )
+
+
+def get_asgi_application():
+    """
+    Set Django up and return the ASGI handler of the project.
+
+    :return: The ASGI handler.
+    :rtype: ASGIHandler
+    """
+
+    django.setup(set_prefix=False)
+    return ASGIHandler()
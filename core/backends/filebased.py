@@ -0,0 +1,91 @@
+"""
+File based cache backend culling without listing the cache on every write.
+
+The file based cache of Django lists every file of the cache directory on each ``set()`` to
+count the entries and cull them when ``MAX_ENTRIES`` is reached, so a write takes about 3 ms with
+1 000 entries and 26 ms with 10 000. The default ``MAX_ENTRIES`` of 300 keeps the listing short
+but holds only 100 detail pages with their Brotli and gzip variants (see ``core.compression``).
+This backend is the file based cache of Django with one change: after listing the directory, it
+counts the room left before ``MAX_ENTRIES`` and lists it again only once that many entries were
+written by the process, so large caches are culled at about the same cost per write.
+
+Notes:
+    Each worker process counts its own writes, so the cache may exceed ``MAX_ENTRIES`` by the
+    entries written by the other workers since their last listing, at most
+    ``MAX_ENTRIES / CULL_FREQUENCY`` per worker once the cache is full.
+
+Example:
+    To use the backend::
+
+        CACHES = {
+            "default": {
+                "BACKEND": "core.backends.filebased.FileBasedCache",
+                "LOCATION": "/var/tmp/django_cache",
+                "OPTIONS": {"MAX_ENTRIES": 30000, "CULL_FREQUENCY": 10},
+            }
+        }
+
+:param random: The module choosing the culled entries.
+:param filebased: The file based cache backend of Django.
+"""
+
+import random
+
+from django.core.cache.backends import filebased
+
+
+class FileBasedCache(filebased.FileBasedCache):
+    """
+    File based cache counting its writes to list its directory less often.
+
+    Methods:
+        - clear: Removes every entry and resets the room left.
+        - _cull: Removes random entries when the cache holds ``MAX_ENTRIES`` entries.
+
+    :param _room: The number of entries which can be written before the directory is listed
+        again.
+    :type _room: int
+    """
+
+    def __init__(self, dir, params):
+        super().__init__(dir, params)
+        self._room = 0
+
+    def clear(self):
+        """
+        Remove every entry of the cache.
+
+        :return: None
+        :rtype: None
+        """
+
+        super().clear()
+        self._room = 0
+
+    def _cull(self):
+        """
+        Remove a random ``1 / CULL_FREQUENCY`` of the entries if ``MAX_ENTRIES`` is reached.
+
+        The directory is listed only when the entries written since the last listing may have
+        filled the room left then. A ``CULL_FREQUENCY`` of 0 clears the whole cache.
+
+        :return: None
+        :rtype: None
+        """
+
+        if self._room > 0:
+            self._room -= 1
+            return
+        filelist = self._list_cache_files()
+        num_entries = len(filelist)
+        if num_entries >= self._max_entries:
+            if self._cull_frequency == 0:
+                filebased.FileBasedCache.clear(self)
+                num_entries = 0
+            else:
+                culled = random.sample(filelist, int(num_entries / self._cull_frequency))
+                for fname in culled:
+                    self._delete(fname)
+                num_entries -= len(culled)
+        # The entry being written takes one place.
+        self._room = max(self._max_entries - num_entries - 1, 0)
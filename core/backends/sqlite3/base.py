@@ -0,0 +1,88 @@
+"""
+SQLite database backend tuned for concurrent workers.
+
+The default settings of SQLite favour durability and small memory use over concurrency: with the
+rollback journal, a writer waits until no process reads the database and the readers wait while
+it writes, so the workers of the web server serialize on the database locks. This backend is the
+SQLite backend of Django with two changes:
+
+- The PRAGMAs of ``settings.SQLITE_PRAGMAS`` are applied to each new connection, in
+  ``init_connection_state``.
+- The transactions of ``transaction.atomic()`` start with ``BEGIN IMMEDIATE``, which takes the
+  write lock at once, instead of ``BEGIN``, which takes it at the first write.
+
+PRAGMAs:
+    - ``journal_mode = wal``: The readers read a snapshot of the database while a writer appends
+      to the write-ahead log, so they do not block each other. The mode is stored in the
+      database file: ``oc-lettings-site.sqlite3`` is committed in this mode, so the PRAGMA does
+      not rewrite it, and the ``-wal`` and ``-shm`` files SQLite writes next to it while it is
+      open are ignored by git.
+    - ``synchronous = normal``: The log is synced to the disk at the checkpoints only, not at
+      every commit. A commit can be lost on a power failure, but the database is not corrupted.
+    - ``busy_timeout``: The milliseconds a connection waits for a lock before failing with
+      "database is locked".
+    - ``cache_size``: The size of the page cache of a connection, in KiB when negative.
+    - ``mmap_size``: The bytes of the database file read through memory mapping, shared by the
+      processes instead of copied into each page cache.
+    - ``temp_store = memory``: The temporary tables and indexes (e.g. of a sort) are kept in
+      memory.
+
+Notes:
+    - A transaction started with ``BEGIN`` which reads, e.g. ``Letting.objects.get()``, then
+      writes fails at once with "database is locked" when another connection wrote in between,
+      whatever the busy timeout: its snapshot is stale. With ``BEGIN IMMEDIATE`` it waits for
+      the write lock up to the busy timeout instead. The read-only transactions take the write
+      lock too, so they should not use ``transaction.atomic()``.
+    - The PRAGMAs are run on the ``sqlite3`` connection directly, so they are not logged as
+      queries nor counted in the query budgets of the views.
+    - With ``CONN_MAX_AGE`` set in ``settings.DATABASES``, each thread of a worker keeps its
+      connection between requests and the PRAGMAs run once per connection rather than once per
+      request.
+
+Example:
+    To use the backend::
+
+        DATABASES = {"default": {"ENGINE": "core.backends.sqlite3", "NAME": "db.sqlite3"}}
+
+    To keep the defaults of SQLite, e.g. to compare with them::
+
+        SQLITE_PRAGMAS = {}
+
+:param settings: The settings of the project.
+:param base: The SQLite backend of Django.
+"""
+
+from django.conf import settings
+from django.db.backends.sqlite3 import base
+
+
+class DatabaseWrapper(base.DatabaseWrapper):
+    """
+    The SQLite backend of Django, applying ``settings.SQLITE_PRAGMAS`` to each new connection and
+    starting the transactions with ``BEGIN IMMEDIATE``.
+
+    Methods:
+        - init_connection_state: Applies the PRAGMAs to a new connection.
+    """
+
+    def init_connection_state(self):
+        """
+        Apply the PRAGMAs of ``settings.SQLITE_PRAGMAS`` to a new connection.
+
+        :return: None
+        :rtype: None
+        """
+
+        super().init_connection_state()
+        for name, value in getattr(settings, "SQLITE_PRAGMAS", {}).items():
+            self.connection.execute(f"PRAGMA {name} = {value}")
+
+    def _start_transaction_under_autocommit(self):
+        """
+        Start a transaction taking the write lock at once.
+
+        :return: None
+        :rtype: None
+        """
+
+        self.cursor().execute("BEGIN IMMEDIATE")
@@ -0,0 +1,52 @@
+"""
+Bulk insertion of rows which are already validated.
+
+``QuerySet.bulk_create`` builds a model instance per row and compiles every value through its
+field before running the query, which costs more than the insert itself on SQLite. This module
+inserts rows given as tuples of values ready for the database with a single
+``cursor.executemany()`` per batch.
+
+Functions:
+    - bulk_insert: Inserts rows of values into the table of a model.
+
+Notes:
+    Like ``bulk_create``, no ``save()`` method is called and no signal is sent. The values are not
+    converted: they must be those the database expects (e.g. the result of
+    ``Field.get_db_prep_save()`` for dates), the ``auto_now`` fields are not filled and the primary
+    keys must be given explicitly.
+
+Example:
+    To insert two addresses::
+
+        bulk_insert(Address, ("id", "number", "street", ...), [(1, 12, "Main St", ...), ...])
+
+:param connections: The database connections of the project.
+:param router: The database router, choosing the database written to.
+"""
+
+from django.db import connections, router
+
+
+def bulk_insert(model, field_names, rows, using=None):
+    """
+    Insert rows of values into the table of a model with a single ``executemany()``.
+
+    :param model: The model whose table the rows are inserted into.
+    :type model: class
+    :param field_names: The names of the fields, in the order of the values of each row.
+    :type field_names: tuple of str
+    :param rows: The rows, as tuples of values ready for the database.
+    :type rows: iterable of tuple
+    :param using: The alias of the database, chosen by the router if not given.
+    :type using: str, optional
+    :return: None
+    :rtype: None
+    """
+
+    connection = connections[using or router.db_for_write(model)]
+    quote = connection.ops.quote_name
+    columns = ", ".join(quote(model._meta.get_field(name).column) for name in field_names)
+    placeholders = ", ".join(["%s"] * len(field_names))
+    sql = f"INSERT INTO {quote(model._meta.db_table)} ({columns}) VALUES ({placeholders})"
+    with connection.cursor() as cursor:
+        cursor.executemany(sql, rows)
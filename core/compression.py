@@ -0,0 +1,259 @@
+"""
+Compression of the dynamic responses, with Brotli or gzip.
+
+WhiteNoise serves the static files compressed ahead of time, but the pages rendered by the views
+were sent as they are. ``CompressionMiddleware`` compresses the responses of the views with the
+encoding the client prefers among those of ``settings.COMPRESSION_LEVELS``, Brotli then gzip,
+at the level set for each one.
+
+Functions:
+    - accepted_encoding: Returns the encoding of a response, from the ``Accept-Encoding`` header
+      of its request.
+    - is_compressible: Returns whether a response may be compressed.
+    - holds_secrets: Returns whether a response may hold a secret of the user, which is not
+      compressed.
+    - compress: Compresses a content with an encoding.
+    - compress_stream: Compresses the chunks of a streaming response, one by one.
+
+Classes:
+    - CompressionMiddleware: Compresses the responses of the views.
+
+Notes:
+    A response is sent as it is when it is already encoded, when its ``Cache-Control`` header
+    forbids it (``no-transform``), when its content type is not text (see ``is_compressible``),
+    or when it is shorter than ``settings.COMPRESSION_MIN_LENGTH``: the headers of a compressed
+    response would outweigh the bytes saved. Each response gets a ``Vary: Accept-Encoding``
+    header, for the caches between the server and the clients, and the ``ETag`` of a compressed
+    response is made weak, as its bytes differ from those of the page.
+
+    The pages of the admin site and the responses using or setting the CSRF token are never
+    compressed (see ``holds_secrets``): the length of a compressed page holding a secret and
+    text from the request, e.g. the ``?q=`` of a search, tells an attacker which guesses of the
+    secret match it (the BREACH attack). The public pages and the API hold no secret.
+
+    The chunks of a streaming response are compressed and flushed one by one, so the client
+    receives the top of an index page before its rows are read (see ``core.streaming``).
+
+    The compressed content of a page of the page cache (see ``core.page_cache``) is cached too,
+    under the key of the page, its encoding and a digest of its content: a cached page is not
+    compressed again, and a page rendered again with another content gets another key.
+
+    ``benchmarks/compression.py`` measures the time and the bytes of each level on the pages of
+    the project.
+
+:param hashlib: The module computing the digests of the cached pages.
+:param zlib: The module compressing with gzip.
+:param brotli: The module compressing with Brotli.
+:param settings: The settings of the project.
+:param cache: The default cache, holding the compressed pages.
+:param patch_vary_headers: A function adding a header to the ``Vary`` header of a response.
+:param reverse: A function returning the path of the admin site.
+"""
+
+import hashlib
+import zlib
+
+import brotli
+from django.conf import settings
+from django.core.cache import cache
+from django.urls import reverse
+from django.utils.cache import patch_vary_headers
+
+# The content types compressed, besides text/*.
+COMPRESSIBLE_TYPES = {
+    "application/javascript",
+    "application/json",
+    "application/xml",
+    "image/svg+xml",
+}
+
+
+def accepted_encoding(header):
+    """
+    Return the encoding of ``settings.COMPRESSION_LEVELS`` which an ``Accept-Encoding`` header
+    prefers.
+
+    The encoding of the highest quality value wins, and Brotli wins a tie, as it compresses
+    more; ``*`` stands for the encodings the header does not name.
+
+    :param header: The ``Accept-Encoding`` header, e.g. ``"gzip, deflate, br"``.
+    :type header: str
+    :return: ``"br"``, ``"gzip"``, or None if the client accepts neither.
+    :rtype: str or None
+    """
+
+    qualities = {}
+    for item in header.lower().split(","):
+        coding, _, parameters = item.strip().partition(";")
+        quality = 1.0
+        for parameter in parameters.split(";"):
+            name, _, value = parameter.strip().partition("=")
+            if name == "q":
+                try:
+                    quality = float(value)
+                except ValueError:
+                    quality = 0.0
+        qualities[coding.strip()] = quality
+
+    best, best_quality = None, 0.0
+    for encoding in settings.COMPRESSION_LEVELS:
+        quality = qualities.get(encoding, qualities.get("*", 0.0))
+        if quality > best_quality:
+            best, best_quality = encoding, quality
+    return best
+
+
+def is_compressible(response):
+    """
+    Return whether a response may be compressed: its content type is text, it is not encoded
+    already, and its ``Cache-Control`` header allows it.
+
+    :param response: The response.
+    :type response: HttpResponseBase
+    :return: Whether to compress the response.
+    :rtype: bool
+    """
+
+    content_type = response.get("Content-Type", "").split(";")[0].strip().lower()
+    return (
+        (content_type.startswith("text/") or content_type in COMPRESSIBLE_TYPES)
+        and not response.has_header("Content-Encoding")
+        and "no-transform" not in response.get("Cache-Control", "")
+    )
+
+
+def holds_secrets(request, response):
+    """
+    Return whether a response may hold a secret of the user: it is a page of the admin site, or
+    it uses or sets the CSRF token.
+
+    :param request: The request.
+    :type request: HttpRequest
+    :param response: The response.
+    :type response: HttpResponseBase
+    :return: Whether to send the response uncompressed.
+    :rtype: bool
+    """
+
+    return (
+        request.path.startswith(reverse("admin:index"))
+        or request.META.get("CSRF_COOKIE_USED", False)
+        or settings.CSRF_COOKIE_NAME in response.cookies
+    )
+
+
+def compress(content, encoding):
+    """
+    Compress a content with an encoding, at its level of ``settings.COMPRESSION_LEVELS``.
+
+    :param content: The content.
+    :type content: bytes
+    :param encoding: ``"br"`` or ``"gzip"``.
+    :type encoding: str
+    :return: The compressed content.
+    :rtype: bytes
+    """
+
+    level = settings.COMPRESSION_LEVELS[encoding]
+    if encoding == "br":
+        return brotli.compress(content, mode=brotli.MODE_TEXT, quality=level)
+    # wbits=31 writes the gzip header and trailer.
+    compressor = zlib.compressobj(level, zlib.DEFLATED, 31)
+    return compressor.compress(content) + compressor.flush()
+
+
+def compress_stream(chunks, encoding):
+    """
+    Compress the chunks of a streaming response, flushing the compressor after each chunk so
+    the client can decompress it at once.
+
+    :param chunks: The chunks of the response.
+    :type chunks: iterator of bytes
+    :param encoding: ``"br"`` or ``"gzip"``.
+    :type encoding: str
+    :return: A generator of compressed chunks.
+    :rtype: generator
+    """
+
+    level = settings.COMPRESSION_LEVELS[encoding]
+    if encoding == "br":
+        compressor = brotli.Compressor(mode=brotli.MODE_TEXT, quality=level)
+        for chunk in chunks:
+            data = compressor.process(chunk) + compressor.flush()
+            if data:
+                yield data
+        yield compressor.finish()
+    else:
+        compressor = zlib.compressobj(level, zlib.DEFLATED, 31)
+        for chunk in chunks:
+            data = compressor.compress(chunk) + compressor.flush(zlib.Z_SYNC_FLUSH)
+            if data:
+                yield data
+        yield compressor.flush()
+
+
+def _compress_cached_page(content, encoding, key):
+    """
+    Return the compressed content of a page of the page cache, compressing and caching it on a
+    miss.
+
+    :param content: The content of the page.
+    :type content: bytes
+    :param encoding: ``"br"`` or ``"gzip"``.
+    :type encoding: str
+    :param key: The key of the page in the page cache.
+    :type key: str
+    :return: The compressed content.
+    :rtype: bytes
+    """
+
+    digest = hashlib.md5(content).hexdigest()
+    compressed_key = f"{key}:{encoding}:{settings.COMPRESSION_LEVELS[encoding]}:{digest}"
+    compressed = cache.get(compressed_key)
+    if compressed is None:
+        compressed = compress(content, encoding)
+        cache.set(compressed_key, compressed, settings.PAGE_CACHE_TIMEOUT)
+    return compressed
+
+
+class CompressionMiddleware:
+    """
+    Middleware compressing the responses of the views with Brotli or gzip.
+
+    :param get_response: The next middleware or the view.
+    :type get_response: callable
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        response = self.get_response(request)
+        if not is_compressible(response) or holds_secrets(request, response):
+            return response
+        patch_vary_headers(response, ("Accept-Encoding",))
+        if not response.streaming and len(response.content) < settings.COMPRESSION_MIN_LENGTH:
+            return response
+        encoding = accepted_encoding(request.META.get("HTTP_ACCEPT_ENCODING", ""))
+        if encoding is None:
+            return response
+
+        if response.streaming:
+            response.streaming_content = compress_stream(response.streaming_content, encoding)
+            del response["Content-Length"]
+        else:
+            key = getattr(response, "page_cache_key", None)
+            if key is None:
+                content = compress(response.content, encoding)
+            else:
+                content = _compress_cached_page(response.content, encoding, key)
+            if len(content) >= len(response.content):
+                return response
+            response.content = content
+            response["Content-Length"] = str(len(content))
+
+        etag = response.get("ETag")
+        if etag and etag.startswith('"'):
+            response["ETag"] = f"W/{etag}"
+        response["Content-Encoding"] = encoding
+        return response
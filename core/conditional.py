@@ -0,0 +1,138 @@
+"""
+Conditional GET support for the public pages.
+
+This module adds the ``ETag`` and ``Last-Modified`` validators to the responses of the views and
+answers ``304 Not Modified`` when the validators sent by the client still match, without calling
+the view, so the page is neither queried nor rendered.
+
+Functions:
+    - templates_version: Returns a digest of the templates of the project.
+    - build_version: Returns a digest of the templates and static files of the deployment.
+    - read_index_version: Returns the version of an index page.
+    - versioned_page: A view decorator computing the validators from the version of the page.
+
+Notes:
+    The version of a page is read by a single small query: the modification timestamps of the
+    object of a detail page, or the row of the :class:`core.IndexVersion` of an index page, read
+    by its primary key and kept up to date by triggers, so the query does not depend on the
+    number of rows listed. The ETag also covers the templates, and the static files the pages
+    link to by their hashed names and inline (see ``core.storage.static_version``), so a
+    deployment changing them invalidates the pages cached by the clients.
+
+Example:
+    To add validators to the lettings index page::
+
+        def lettings_version(request):
+            return read_index_version("lettings")
+
+        @versioned_page(lettings_version)
+        def index(request):
+            ...
+
+:param hashlib: The module used to compute the ETags.
+:param Path: A class to walk through the template directories.
+:param lru_cache: A decorator computing the version of the templates once per process.
+:param engines: The template engines of the project.
+:param condition: A decorator provided by Django to handle the conditional requests.
+:param static_version: A function returning a digest of the static files of the pages.
+:param IndexVersion: Represents the version of an index page in the database.
+:type IndexVersion: class:`core.IndexVersion`
+"""
+
+import hashlib
+from functools import lru_cache
+from pathlib import Path
+
+from django.template import engines
+from django.views.decorators.http import condition
+
+from core.models import IndexVersion
+from core.storage import static_version
+
+
+@lru_cache(maxsize=None)
+def templates_version():
+    """
+    Return a digest of the content of the templates of the project.
+
+    The digest is computed once per process and is the same in every worker process running the
+    same templates.
+
+    :return: The hexadecimal digest.
+    :rtype: str
+    """
+
+    digest = hashlib.md5()
+    for directory in engines["django"].template_dirs:
+        for path in sorted(Path(directory).glob("**/*.html")):
+            digest.update(str(path.relative_to(directory)).encode())
+            digest.update(path.read_bytes())
+    return digest.hexdigest()
+
+
+def build_version():
+    """
+    Return a short digest of the templates and of the static files linked by the pages.
+
+    The digest changes with each deployment changing what the pages render, e.g. a template or
+    a stylesheet, and is the same in every worker process of a deployment.
+
+    :return: The hexadecimal digest.
+    :rtype: str
+    """
+
+    data = templates_version() + static_version()
+    return hashlib.md5(data.encode()).hexdigest()[:12]
+
+
+def read_index_version(name):
+    """
+    Return the version of an index page.
+
+    The version is read from the row of the page in the :class:`core.IndexVersion` table, by its
+    primary key, and is increased by the triggers of the tables listed on the page.
+
+    :param name: The name of the index page, e.g. ``"lettings"``.
+    :type name: str
+    :return: The number of writes to the tables of the page and the date of the last one, or
+        None if the page has no version.
+    :rtype: dict or None
+    """
+
+    return IndexVersion.objects.filter(pk=name).values("version", "updated_at").first()
+
+
+def versioned_page(get_version):
+    """
+    Decorate a view to handle the conditional requests from the version of its page.
+
+    ``get_version`` is called with the arguments of the view and returns a dictionary describing
+    the version of the page, with an optional ``updated_at`` datetime used as ``Last-Modified``,
+    or None if the page does not exist. It is called once per request, whatever the number of
+    validators sent by the client.
+
+    :param get_version: The function returning the version of the page.
+    :type get_version: callable
+    :return: The decorator.
+    :rtype: callable
+    """
+
+    def version(request, *args, **kwargs):
+        if not hasattr(request, "_page_version"):
+            request._page_version = get_version(request, *args, **kwargs)
+        return request._page_version
+
+    def etag(request, *args, **kwargs):
+        page_version = version(request, *args, **kwargs)
+        if page_version is None:
+            return None
+        data = repr(sorted(page_version.items())) + templates_version() + static_version()
+        return hashlib.md5(data.encode()).hexdigest()
+
+    def last_modified(request, *args, **kwargs):
+        page_version = version(request, *args, **kwargs)
+        if page_version is None:
+            return None
+        return page_version.get("updated_at")
+
+    return condition(etag_func=etag, last_modified_func=last_modified)
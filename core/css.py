@@ -0,0 +1,257 @@
+"""
+Purge of the unused CSS rules, and critical CSS of the pages.
+
+The stylesheet of the project comes from a theme built on Bootstrap, and the templates use a small
+part of its rules. This module removes the rules whose selectors match nothing the project can
+render: a selector is kept when each of its classes, IDs and element names is a word of the
+templates of the project or of the scripts of the bundles (Bootstrap adds classes such as
+``show`` or ``collapsing`` at run time, and names them in its code), or when one of its classes
+matches a pattern of ``settings.CSS_PURGE_SAFELIST``. The ``@font-face`` and ``@keyframes`` rules
+are kept when a remaining rule uses their font or animation.
+
+The critical CSS of a bundle is the part of the purged bundle needed by the templates of the top
+of the pages (``settings.STATIC_CRITICAL_CSS``), purged again with the words of these templates
+only. It is inlined in the ``<head>`` of the pages, which are painted without waiting for the
+bundle, which is loaded without blocking the rendering (see ``core.templatetags.bundles``).
+
+Functions:
+    - words: Returns the words of texts, the candidate classes, IDs and element names.
+    - project_templates: Returns the source of the templates of the project.
+    - purge_css: Removes the rules of a stylesheet matching none of a set of words.
+    - absolute_urls: Rewrites the relative URLs of a stylesheet as absolute URLs.
+
+Notes:
+    The matching is conservative: the pseudo-classes (``:hover``, ``:not(.x)``, ...) and the
+    attribute selectors are not checked, and a selector of only these, such as ``:root`` or
+    ``[hidden]``, is kept. A class built by a template or a script from several words, such as
+    ``"bs-tooltip-" + placement``, is only kept through the safelist.
+
+:param re: The module finding the words and the parts of the selectors.
+:param os: The module listing the template files.
+:param urljoin: A function resolving the relative URLs of a stylesheet.
+:param tinycss2: The CSS parser.
+:param settings: The settings of the project.
+:param engines: The template engines of the project.
+"""
+
+import os
+import re
+from urllib.parse import urljoin
+
+import tinycss2
+from django.conf import settings
+from django.template import engines
+
+# The words of a text, as the candidate classes, IDs and element names of the selectors.
+WORD = re.compile(r"[A-Za-z0-9_-]+")
+
+# The parts of a selector which are not checked, and its classes, IDs and element names.
+ATTRIBUTE = re.compile(r"\[[^\]]*\]")
+PSEUDO = re.compile(r"::?[-\w]+(\((?:[^()]|\([^()]*\))*\))?")
+NAME = re.compile(r"([.#]?)((?:[-\w]|\\.)+)")
+
+# The at-rules holding rules, which are purged in turn.
+GROUPING_RULES = {"media", "supports", "document", "-moz-document"}
+
+# The URL of a stylesheet, with its quotes.
+URL = re.compile(r"""url\(\s*(['"]?)([^'")]+)\1\s*\)""")
+
+
+def words(*texts):
+    """
+    Return the words of texts, the candidate classes, IDs and element names of the selectors.
+
+    :param texts: The templates, scripts, ...
+    :type texts: str
+    :return: The words.
+    :rtype: set of str
+    """
+
+    return {word for text in texts for word in WORD.findall(text)}
+
+
+def project_templates():
+    """
+    Return the source of the templates of the project, leaving out those of the installed
+    packages.
+
+    :return: The source of each template, by template name.
+    :rtype: dict
+    """
+
+    templates = {}
+    for engine in engines.all():
+        for directory in engine.template_dirs:
+            directory = str(directory)
+            if not directory.startswith(str(settings.BASE_DIR)):
+                continue
+            for root, _, files in os.walk(directory):
+                for name in files:
+                    path = os.path.join(root, name)
+                    with open(path, encoding="utf-8") as file:
+                        templates.setdefault(os.path.relpath(path, directory), file.read())
+    return templates
+
+
+def _selector_is_used(selector, used, safelist):
+    """
+    Return whether a selector may match an element of the project.
+
+    :param selector: The selector, without commas.
+    :type selector: str
+    :param used: The words of the templates and scripts.
+    :type used: set of str
+    :param safelist: The patterns of the classes kept in any case.
+    :type safelist: list of re.Pattern
+    :return: Whether each class, ID and element name of the selector is used.
+    :rtype: bool
+    """
+
+    selector = PSEUDO.sub("", ATTRIBUTE.sub("", selector))
+    for prefix, name in NAME.findall(selector):
+        name = name.replace("\\", "")
+        if prefix == "." and any(pattern.search(name) for pattern in safelist):
+            continue
+        if name not in used and (prefix or name.lower() not in used):
+            return False
+    return True
+
+
+def _split_selectors(prelude):
+    """
+    Split the prelude of a rule at its commas, leaving the commas of the parentheses.
+
+    :param prelude: The selectors of the rule.
+    :type prelude: str
+    :return: The selectors.
+    :rtype: list of str
+    """
+
+    selectors, depth, start = [], 0, 0
+    for index, character in enumerate(prelude):
+        if character in "([":
+            depth += 1
+        elif character in ")]":
+            depth -= 1
+        elif character == "," and depth == 0:
+            selectors.append(prelude[start:index].strip())
+            start = index + 1
+    selectors.append(prelude[start:].strip())
+    return selectors
+
+
+def _purge_rules(rules, used, safelist):
+    """
+    Purge a list of rules.
+
+    The ``@font-face`` and ``@keyframes`` rules are returned as ``(kind, name, text)`` tuples,
+    as they are kept or removed once all the rules are purged.
+
+    :param rules: The rules parsed by tinycss2.
+    :type rules: list
+    :param used: The words of the templates and scripts.
+    :type used: set of str
+    :param safelist: The patterns of the classes kept in any case.
+    :type safelist: list of re.Pattern
+    :return: The text of the remaining rules, and the pending tuples.
+    :rtype: list
+    """
+
+    kept = []
+    for rule in rules:
+        if rule.type == "comment":
+            # The comments starting with ! hold the licenses.
+            if rule.value.startswith("!"):
+                kept.append(tinycss2.serialize([rule]))
+        elif rule.type == "qualified-rule":
+            selectors = [
+                selector
+                for selector in _split_selectors(tinycss2.serialize(rule.prelude))
+                if _selector_is_used(selector, used, safelist)
+            ]
+            if selectors:
+                kept.append(f"{','.join(selectors)}{{{tinycss2.serialize(rule.content)}}}")
+        elif rule.type == "at-rule" and rule.lower_at_keyword in GROUPING_RULES:
+            nested = tinycss2.parse_rule_list(rule.content, skip_comments=True)
+            nested = _purge_rules(nested, used, safelist)
+            if nested:
+                prelude = tinycss2.serialize(rule.prelude)
+                kept.append((None, None, f"@{rule.at_keyword}{prelude}{{"))
+                kept.extend(nested)
+                kept.append((None, None, "}"))
+        elif rule.type == "at-rule" and rule.lower_at_keyword.endswith("keyframes"):
+            name = tinycss2.serialize(rule.prelude).strip().strip("\"'")
+            kept.append(("keyframes", name, tinycss2.serialize([rule])))
+        elif rule.type == "at-rule" and rule.lower_at_keyword == "font-face":
+            family = next(
+                (
+                    tinycss2.serialize(declaration.value).strip().strip("\"'")
+                    for declaration in tinycss2.parse_declaration_list(rule.content)
+                    if declaration.type == "declaration"
+                    and declaration.lower_name == "font-family"
+                ),
+                "",
+            )
+            kept.append(("font-face", family, tinycss2.serialize([rule])))
+        elif rule.type == "at-rule":
+            kept.append(tinycss2.serialize([rule]))
+    return kept
+
+
+def purge_css(css, used, safelist=()):
+    """
+    Remove the rules of a stylesheet whose selectors match none of a set of words, and the
+    ``@font-face`` and ``@keyframes`` rules which the remaining rules do not use.
+
+    :param css: The stylesheet.
+    :type css: str
+    :param used: The words of the templates and scripts (see ``words``).
+    :type used: set of str
+    :param safelist: The patterns of the classes kept in any case.
+    :type safelist: list of str
+    :return: The purged stylesheet.
+    :rtype: str
+    """
+
+    safelist = [re.compile(pattern) for pattern in safelist]
+    rules = tinycss2.parse_stylesheet(css, skip_comments=False, skip_whitespace=True)
+    kept = _purge_rules(rules, used, safelist)
+
+    # The text of the rules using the fonts and animations, without the pending rules.
+    text = "".join(part for part in kept if isinstance(part, str))
+    parts = []
+    for part in kept:
+        if isinstance(part, str):
+            parts.append(part)
+        elif part[0] is None:
+            parts.append(part[2])
+        elif re.search(rf"(?<![-\w]){re.escape(part[1])}(?![-\w])", text, re.IGNORECASE):
+            parts.append(part[2])
+    # The grouping rules left empty by the pending rules are removed.
+    css = "".join(parts)
+    previous = None
+    while previous != css:
+        previous = css
+        css = re.sub(r"@(?:-moz-)?(?:media|supports|document)[^{};]*\{\}", "", css)
+    return css
+
+
+def absolute_urls(css, base_url):
+    """
+    Rewrite the relative URLs of a stylesheet as absolute URLs, so it can be inlined in a page.
+
+    :param css: The stylesheet.
+    :type css: str
+    :param base_url: The URL of the stylesheet.
+    :type base_url: str
+    :return: The stylesheet with absolute URLs.
+    :rtype: str
+    """
+
+    def rewrite(match):
+        quote, url = match.groups()
+        if url.startswith(("/", "#", "data:", "http:", "https:")):
+            return match.group(0)
+        return f"url({quote}{urljoin(base_url, url)}{quote})"
+
+    return URL.sub(rewrite, css)
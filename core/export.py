@@ -0,0 +1,176 @@
+"""
+Streaming export of the catalog of lettings and profiles.
+
+This module writes every :class:`lettings.Letting` with its :class:`lettings.Address`, or every
+:class:`profiles.Profile` with its :class:`User`, as a stream of text chunks. The rows are read in
+chunks of ``settings.EXPORT_CHUNK_SIZE`` with one short keyset query per chunk
+(``WHERE id > <last id> ORDER BY id LIMIT n``), and each chunk is written and released before the
+next one is read, so the memory used does not depend on the size of the tables.
+
+Functions:
+    - export_catalog: Returns the chunks of text exporting a catalog in a format.
+    - read_chunks: Reads the rows of a queryset in chunks with keyset queries.
+
+Formats:
+    - csv: A header with the names of the fields, then one line per row. The lettings export can
+      be imported back with ``manage.py import_lettings``.
+    - ndjson: One JSON object per line, the address of a letting nested in an ``address`` object
+      as in ``/api/lettings/``.
+    - columns: A columnar format in the spirit of Parquet row groups, as newline-delimited JSON:
+      a first line ``{"format": "columns", "fields": [...]}`` then one line per chunk of rows,
+      ``{"rows": n, "columns": {"field": [values...], ...}}``.
+
+Notes:
+    The export is used by the ``export_catalog`` management command and by the ``export`` view,
+    which streams it to staff members.
+
+Example:
+    To write the lettings to a CSV file::
+
+        with open("lettings.csv", "w", newline="") as output:
+            output.writelines(export_catalog("lettings", "csv"))
+
+:param csv: The module writing the CSV format.
+:param io: The module providing the buffer of each CSV chunk.
+:param json: The module writing the JSON formats.
+:param settings: The settings of the project.
+:param LETTING_FIELDS: The fields of a letting, as exposed by the JSON API.
+:param PROFILE_FIELDS: The fields of a profile, as exposed by the JSON API.
+"""
+
+import csv
+import io
+import json
+
+from django.conf import settings
+
+from core.api import row_builder
+from lettings.api import LETTING_FIELDS
+from lettings.models import Letting
+from profiles.api import PROFILE_FIELDS
+from profiles.models import Profile
+
+CATALOGS = {
+    "lettings": (Letting, LETTING_FIELDS),
+    "profiles": (Profile, {**PROFILE_FIELDS, "email": "user__email"}),
+}
+
+
+def read_chunks(queryset, columns, chunk_size):
+    """
+    Read the rows of a queryset in chunks, with one keyset query on the primary key per chunk.
+
+    Unlike a single server-side cursor, no query stays open while a chunk is written, so a slow
+    client does not hold a read transaction on the database.
+
+    :param queryset: The rows to read.
+    :type queryset: QuerySet
+    :param columns: The columns to read.
+    :type columns: list of str
+    :param chunk_size: The number of rows per chunk.
+    :type chunk_size: int
+    :return: A generator of lists of row tuples, holding the values of ``columns``.
+    :rtype: generator
+    """
+
+    rows = queryset.order_by("pk").values_list("pk", *columns)
+    last = None
+    while True:
+        chunk = list((rows if last is None else rows.filter(pk__gt=last))[:chunk_size])
+        if not chunk:
+            return
+        last = chunk[-1][0]
+        yield [row[1:] for row in chunk]
+
+
+def write_csv(fields, chunks):
+    """
+    Yield the CSV export of chunks of rows, named by the last part of the field names.
+
+    :param fields: The dotted names of the fields.
+    :type fields: list of str
+    :param chunks: The chunks of row tuples.
+    :type chunks: iterable of list
+    :return: A generator of text chunks.
+    :rtype: generator
+    """
+
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    writer.writerow(field.rpartition(".")[2] for field in fields)
+    for chunk in chunks:
+        writer.writerows(chunk)
+        yield buffer.getvalue()
+        buffer.seek(0)
+        buffer.truncate()
+    yield buffer.getvalue()
+
+
+def write_ndjson(fields, chunks):
+    """
+    Yield the NDJSON export of chunks of rows, with nested objects for the dotted field names.
+
+    :param fields: The dotted names of the fields.
+    :type fields: list of str
+    :param chunks: The chunks of row tuples.
+    :type chunks: iterable of list
+    :return: A generator of text chunks.
+    :rtype: generator
+    """
+
+    build = row_builder(fields)
+    for chunk in chunks:
+        yield "".join(json.dumps(build(row), separators=(",", ":")) + "\n" for row in chunk)
+
+
+def write_columns(fields, chunks):
+    """
+    Yield the columnar export of chunks of rows, one group of columns per chunk.
+
+    :param fields: The dotted names of the fields.
+    :type fields: list of str
+    :param chunks: The chunks of row tuples.
+    :type chunks: iterable of list
+    :return: A generator of text chunks.
+    :rtype: generator
+    """
+
+    yield json.dumps({"format": "columns", "fields": fields}) + "\n"
+    for chunk in chunks:
+        group = {"rows": len(chunk), "columns": dict(zip(fields, map(list, zip(*chunk))))}
+        yield json.dumps(group, separators=(",", ":")) + "\n"
+
+
+FORMATS = {
+    "csv": (write_csv, "text/csv", "csv"),
+    "ndjson": (write_ndjson, "application/x-ndjson", "ndjson"),
+    "columns": (write_columns, "application/x-ndjson", "columns.ndjson"),
+}
+
+
+def export_catalog(catalog, file_format, chunk_size=None):
+    """
+    Return the chunks of text exporting a catalog in a format.
+
+    :param catalog: ``"lettings"`` or ``"profiles"``.
+    :type catalog: str
+    :param file_format: ``"csv"``, ``"ndjson"`` or ``"columns"``.
+    :type file_format: str
+    :param chunk_size: The number of rows read per query, defaults to
+        ``settings.EXPORT_CHUNK_SIZE``.
+    :type chunk_size: int, optional
+    :return: A generator of text chunks, reading the database while it is consumed.
+    :rtype: generator
+    :raises ValueError: If the catalog or the format is unknown.
+    """
+
+    if catalog not in CATALOGS:
+        raise ValueError(f"Unknown catalog {catalog!r}.")
+    if file_format not in FORMATS:
+        raise ValueError(f"Unknown format {file_format!r}.")
+
+    model, fields = CATALOGS[catalog]
+    chunks = read_chunks(
+        model.objects.all(), list(fields.values()), chunk_size or settings.EXPORT_CHUNK_SIZE
+    )
+    return FORMATS[file_format][0](list(fields), chunks)
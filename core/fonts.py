@@ -0,0 +1,289 @@
+"""
+Fonts of the CSS bundles, converted to subsetted WOFF2.
+
+The theme of the project declares the 18 weights and styles of the Metropolis font, as OpenType
+files. When ``collectstatic`` builds a CSS bundle (see ``core.storage``), this module keeps the
+``@font-face`` rules of the weights and styles which the rules of the bundle use, converts their
+fonts to WOFF2, with the characters of ``settings.FONT_UNICODE_RANGE`` only (the Latin range by
+default), and removes the other rules. The remaining rules load the WOFF2 files, with
+``font-display: swap``: the text is painted with a fallback font until the font is loaded.
+
+Functions:
+    - used_faces: Returns the weights and styles used by the rules of a stylesheet.
+    - nearest_weight: Returns the weight of the face drawing a weight.
+    - optimize_fonts: Keeps and converts the ``@font-face`` rules of the used faces.
+    - to_woff2: Converts a font to WOFF2, with a subset of its characters.
+    - preloaded_fonts: Returns the URLs of the fonts used by a stylesheet, to preload.
+
+Notes:
+    A weight without a face of its own is drawn by the browser with the nearest face (see
+    ``nearest_weight``), which is the one kept. When several faces are declared for the same
+    weight and style, as the ``Black`` and ``ExtraBold`` faces of the theme are, the browser
+    uses the last one, which is the one kept.
+
+    The relative weights (``bolder``, ``lighter``) are taken from the normal weight, 400, and a
+    stylesheet using the ``italic`` or ``oblique`` style uses it with each of its weights.
+
+:param io: The module holding the fonts in memory.
+:param re: The module reading the ``font`` shorthand.
+:param lru_cache: A decorator keeping the fonts to preload of each stylesheet.
+:param tinycss2: The CSS parser.
+:param subset: The font subsetter of fontTools.
+:param TTFont: The font class of fontTools.
+"""
+
+import io
+import re
+from functools import lru_cache
+
+import tinycss2
+from fontTools import subset
+from fontTools.ttLib import TTFont
+
+# The weights of the keywords of font-weight, the relative ones from the normal weight.
+WEIGHT_KEYWORDS = {"normal": 400, "bold": 700, "bolder": 700, "lighter": 100}
+
+# The URL of the src descriptor of a @font-face rule.
+SRC_URL = re.compile(r"""url\(\s*(['"]?)([^'")]+)\1\s*\)""")
+
+
+def _rules(css):
+    """
+    Yield the rules of a stylesheet, those of the ``@media`` and ``@supports`` rules included.
+
+    :param css: The stylesheet, or the content of a grouping rule.
+    :type css: str or list
+    :return: The qualified and at-rules.
+    :rtype: generator
+    """
+
+    if isinstance(css, str):
+        rules = tinycss2.parse_stylesheet(css, skip_comments=True, skip_whitespace=True)
+    else:
+        rules = tinycss2.parse_rule_list(css, skip_comments=True, skip_whitespace=True)
+    for rule in rules:
+        yield rule
+        if rule.type == "at-rule" and rule.lower_at_keyword in ("media", "supports"):
+            yield from _rules(rule.content or [])
+
+
+def _declarations(rule):
+    """
+    Return the declarations of a rule, by lowercase name.
+
+    :param rule: A qualified rule or a ``@font-face`` rule.
+    :type rule: tinycss2.ast.Node
+    :return: The value of each declaration, serialized.
+    :rtype: list of tuple
+    """
+
+    return [
+        (declaration.lower_name, tinycss2.serialize(declaration.value).strip())
+        for declaration in tinycss2.parse_declaration_list(
+            rule.content or [], skip_comments=True, skip_whitespace=True
+        )
+        if declaration.type == "declaration"
+    ]
+
+
+def _weights(value):
+    """
+    Return the weights of a ``font-weight`` value, or of a ``@font-face`` weight range.
+
+    :param value: The value.
+    :type value: str
+    :return: The weights, empty for a value such as ``inherit`` or ``var(--weight)``.
+    :rtype: list of int
+    """
+
+    value = value.replace("!important", "").strip().lower()
+    if value in WEIGHT_KEYWORDS:
+        return [WEIGHT_KEYWORDS[value]]
+    return [int(number) for number in re.findall(r"\b[1-9]00\b", value)]
+
+
+def _face_weights(value):
+    """
+    Return the weights of the ``font-weight`` descriptor of a ``@font-face`` rule.
+
+    :param value: The descriptor, a weight or a range such as ``100 900``.
+    :type value: str
+    :return: The weights of the face, in steps of 100.
+    :rtype: list of int
+    """
+
+    weights = _weights(value) or [400]
+    return list(range(weights[0], weights[-1] + 1, 100))
+
+
+def used_faces(css):
+    """
+    Return the weights and styles used by the rules of a stylesheet, leaving out its
+    ``@font-face`` rules.
+
+    The weights are those of the ``font-weight`` and ``font`` declarations, and of the custom
+    properties whose name ends with ``font-weight``, which the declarations use through
+    ``var()``.
+
+    :param css: The stylesheet.
+    :type css: str
+    :return: The ``(weight, style)`` pairs, with the normal weight and style.
+    :rtype: set of tuple
+    """
+
+    weights, styles = {400}, {"normal"}
+    for rule in _rules(css):
+        if rule.type != "qualified-rule":
+            continue
+        for name, value in _declarations(rule):
+            if name == "font-weight" or (name.startswith("--") and name.endswith("font-weight")):
+                weights.update(_weights(value))
+            elif name == "font":
+                weights.update(
+                    weight
+                    for word in value.lower().split()
+                    if word in ("bold", "bolder", "lighter") or re.fullmatch(r"[1-9]00", word)
+                    for weight in _weights(word)
+                )
+            if name in ("font", "font-style") and re.search(r"\b(italic|oblique)\b", value):
+                styles.add("italic")
+    return {(weight, style) for weight in weights for style in styles}
+
+
+def nearest_weight(weight, available):
+    """
+    Return the weight of the face drawing a weight, as the browsers choose it.
+
+    :param weight: The desired weight.
+    :type weight: int
+    :param available: The weights of the faces.
+    :type available: set of int
+    :return: The weight of the chosen face, or None without faces.
+    :rtype: int or None
+    """
+
+    if weight in available:
+        return weight
+    lighter = sorted((w for w in available if w < weight), reverse=True)
+    heavier = sorted(w for w in available if w > weight)
+    if weight == 400:
+        order = [w for w in heavier if w <= 500] + lighter + [w for w in heavier if w > 500]
+    elif weight == 500:
+        order = [w for w in lighter if w >= 400] + heavier + [w for w in lighter if w < 400]
+    elif weight < 400:
+        order = lighter + heavier
+    else:
+        order = heavier + lighter
+    return order[0] if order else None
+
+
+def to_woff2(data, unicode_range):
+    """
+    Convert a font to WOFF2, with a subset of its characters.
+
+    :param data: The font, in a format read by fontTools (OpenType, TrueType, WOFF).
+    :type data: bytes
+    :param unicode_range: The characters to keep, as a CSS ``unicode-range``.
+    :type unicode_range: str
+    :return: The WOFF2 font.
+    :rtype: bytes
+    """
+
+    font = TTFont(io.BytesIO(data))
+    options = subset.Options()
+    options.layout_features = ["*"]
+    subsetter = subset.Subsetter(options)
+    subsetter.populate(unicodes=subset.parse_unicodes(unicode_range))
+    subsetter.subset(font)
+    font.flavor = "woff2"
+    output = io.BytesIO()
+    font.save(output)
+    return output.getvalue()
+
+
+def optimize_fonts(css, convert, unicode_range):
+    """
+    Keep the ``@font-face`` rules of the faces used by a stylesheet, loading WOFF2 fonts, and
+    remove the others.
+
+    :param css: The stylesheet.
+    :type css: str
+    :param convert: A function converting the font of a URL of the stylesheet to WOFF2, and
+        returning the URL of the WOFF2 font.
+    :type convert: callable
+    :param unicode_range: The characters of the WOFF2 fonts, as a CSS ``unicode-range``.
+    :type unicode_range: str
+    :return: The stylesheet, and the URLs of the fonts of the former ``@font-face`` rules.
+    :rtype: tuple
+    """
+
+    rules = tinycss2.parse_stylesheet(css, skip_comments=False, skip_whitespace=True)
+    faces = {}
+    for index, rule in enumerate(rules):
+        if rule.type == "at-rule" and rule.lower_at_keyword == "font-face":
+            descriptors = dict(_declarations(rule))
+            family = descriptors.get("font-family", "").strip("\"'").lower()
+            style = "italic" if "italic" in descriptors.get("font-style", "") else "normal"
+            # The last face of a weight and style is used by the browsers.
+            for weight in _face_weights(descriptors.get("font-weight", "400")):
+                faces[family, weight, style] = index
+
+    kept = set()
+    for weight, style in used_faces(css):
+        for family in {family for family, _, _ in faces}:
+            available = {w for f, w, s in faces if f == family and s == style}
+            nearest = nearest_weight(weight, available)
+            if nearest is not None:
+                kept.add(faces[family, nearest, style])
+
+    parts, sources = [], []
+    for index, rule in enumerate(rules):
+        if not (rule.type == "at-rule" and rule.lower_at_keyword == "font-face"):
+            parts.append(tinycss2.serialize([rule]))
+            continue
+        descriptors = _declarations(rule)
+        urls = [match.group(2) for name, value in descriptors if name == "src"
+                for match in SRC_URL.finditer(value)]
+        sources.extend(urls)
+        if index not in kept or not urls:
+            continue
+        declarations = [
+            f"{name}:{value}" for name, value in descriptors
+            if name not in ("src", "font-display", "unicode-range")
+        ]
+        declarations += [
+            f'src:url("{convert(urls[0])}") format("woff2")',
+            "font-display:swap",
+            f"unicode-range:{unicode_range}",
+        ]
+        parts.append(f"@font-face{{{';'.join(declarations)}}}")
+    return "".join(parts), sources
+
+
+@lru_cache(maxsize=16)
+def preloaded_fonts(css):
+    """
+    Return the URLs of the fonts used by the rules of a stylesheet, such as the critical CSS of
+    the pages, which the pages preload.
+
+    :param css: The stylesheet, with its ``@font-face`` rules.
+    :type css: str
+    :return: The URLs of the WOFF2 fonts.
+    :rtype: list of str
+    """
+
+    faces, urls = {}, []
+    for rule in _rules(css):
+        if rule.type == "at-rule" and rule.lower_at_keyword == "font-face":
+            descriptors = dict(_declarations(rule))
+            style = "italic" if "italic" in descriptors.get("font-style", "") else "normal"
+            match = SRC_URL.search(descriptors.get("src", ""))
+            if match and match.group(2).endswith(".woff2"):
+                for weight in _face_weights(descriptors.get("font-weight", "400")):
+                    faces[weight, style] = match.group(2)
+    for weight, style in sorted(used_faces(css)):
+        available = {w for w, s in faces if s == style}
+        nearest = nearest_weight(weight, available)
+        if nearest is not None and faces[nearest, style] not in urls:
+            urls.append(faces[nearest, style])
+    return urls
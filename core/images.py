@@ -0,0 +1,175 @@
+"""
+Responsive variants of the static images, in modern formats, and the favicons of the pages.
+
+The pages displayed ``assets/img/logo.png``, a 273x260 PNG, in a 70x70 box, and used it as
+their favicon. When ``collectstatic`` runs (see ``core.storage``), this module resizes each PNG
+and JPEG static image to its display width, ``settings.STATIC_IMAGES``, at each pixel density of
+``settings.IMAGE_DENSITIES``, and encodes every size in the formats of
+``settings.IMAGE_FORMATS`` (AVIF and WebP) and in the format of the image, for the browsers
+supporting neither. The ``picture`` template tag of ``core.templatetags.images`` loads them, and
+the browser downloads the first format it supports, at the density of its screen.
+
+The favicons of ``FAVICONS`` are drawn from ``settings.FAVICON``, as small square PNG files.
+
+Functions:
+    - image_format: Returns the format of a static image, from its name.
+    - variant_widths: Returns the widths of the variants of an image, by pixel density.
+    - display_size: Returns the size of an image at its display width.
+    - variant_name: Returns the name of a variant of an image.
+    - encode: Resizes an image and encodes it in a format.
+    - square_icon: Draws an image centered on a transparent square, as a PNG icon.
+
+Notes:
+    An image without a display width in ``settings.STATIC_IMAGES`` is displayed at its own
+    width: its variants only change its format. The images are never enlarged: a density whose
+    width exceeds the width of the image is left out.
+
+:param io: The module holding the encoded images in memory.
+:param posixpath: The module building the names of the variants.
+:param Image: The image class of Pillow.
+"""
+
+import io
+import posixpath
+
+from PIL import Image
+
+# The extensions of the static images with variants, and their format.
+IMAGE_EXTENSIONS = {".png": "png", ".jpg": "jpeg", ".jpeg": "jpeg"}
+
+# The media types of the formats, for the type attribute of the <source> tags.
+MEDIA_TYPES = {
+    "avif": "image/avif",
+    "webp": "image/webp",
+    "png": "image/png",
+    "jpeg": "image/jpeg",
+}
+
+# The quality of the lossy formats, which a logo or a photo displays without visible artifacts.
+QUALITY = {"avif": 60, "webp": 80, "jpeg": 85}
+
+# The favicons of the pages: their rel attribute, their size and their file name.
+FAVICONS = (
+    ("icon", 32, "favicon-32.png"),
+    ("apple-touch-icon", 180, "apple-touch-icon.png"),
+)
+
+
+def image_format(name):
+    """
+    Return the format of a static image, from the extension of its name.
+
+    :param name: The name of the image.
+    :type name: str
+    :return: The format, e.g. ``"png"``, or None if the file has no variants.
+    :rtype: str or None
+    """
+
+    return IMAGE_EXTENSIONS.get(posixpath.splitext(name)[1].lower())
+
+
+def variant_widths(width, display_width, densities):
+    """
+    Return the widths of the variants of an image, by pixel density.
+
+    :param width: The width of the image, in pixels.
+    :type width: int
+    :param display_width: The width of the image in the pages, in CSS pixels.
+    :type display_width: int
+    :param densities: The pixel densities of the screens, e.g. ``[1, 2]``.
+    :type densities: list of int
+    :return: The ``(density, width)`` pairs, at least the first density with the width of the
+        image.
+    :rtype: list of tuple
+    """
+
+    widths = [
+        (density, round(display_width * density))
+        for density in densities
+        if round(display_width * density) <= width
+    ]
+    return widths or [(densities[0], width)]
+
+
+def display_size(size, display_width):
+    """
+    Return the size of an image at its display width, keeping its aspect ratio.
+
+    :param size: The width and height of the image.
+    :type size: tuple of int
+    :param display_width: The width of the image in the pages, or None for its own width.
+    :type display_width: int or None
+    :return: The width and height, in CSS pixels.
+    :rtype: tuple of int
+    """
+
+    width, height = size
+    if display_width is None:
+        return width, height
+    return display_width, max(1, round(height * display_width / width))
+
+
+def variant_name(name, width, format):
+    """
+    Return the name of a variant of an image, next to the image.
+
+    :param name: The name of the image, e.g. ``"assets/img/logo.png"``.
+    :type name: str
+    :param width: The width of the variant.
+    :type width: int
+    :param format: The format of the variant.
+    :type format: str
+    :return: The name of the variant, e.g. ``"assets/img/logo-70w.avif"``.
+    :rtype: str
+    """
+
+    extension = "jpg" if format == "jpeg" else format
+    return f"{posixpath.splitext(name)[0]}-{width}w.{extension}"
+
+
+def encode(image, width, format):
+    """
+    Resize an image to a width, keeping its aspect ratio, and encode it in a format.
+
+    :param image: The image.
+    :type image: PIL.Image.Image
+    :param width: The width of the encoded image.
+    :type width: int
+    :param format: The format, ``"avif"``, ``"webp"``, ``"png"`` or ``"jpeg"``.
+    :type format: str
+    :return: The encoded image.
+    :rtype: bytes
+    """
+
+    height = max(1, round(image.height * width / image.width))
+    resized = image if image.width == width else image.resize((width, height), Image.LANCZOS)
+    if format == "jpeg" and resized.mode not in ("RGB", "L"):
+        resized = resized.convert("RGB")
+    output = io.BytesIO()
+    options = {"optimize": True} if format in ("png", "jpeg") else {}
+    if format in QUALITY:
+        options["quality"] = QUALITY[format]
+    resized.save(output, format=format.upper(), **options)
+    return output.getvalue()
+
+
+def square_icon(image, size):
+    """
+    Draw an image centered on a transparent square, as a PNG icon.
+
+    :param image: The image.
+    :type image: PIL.Image.Image
+    :param size: The width and height of the icon.
+    :type size: int
+    :return: The PNG icon.
+    :rtype: bytes
+    """
+
+    icon = Image.new("RGBA", (size, size))
+    scale = size / max(image.size)
+    width, height = max(1, round(image.width * scale)), max(1, round(image.height * scale))
+    resized = image.convert("RGBA").resize((width, height), Image.LANCZOS)
+    icon.paste(resized, ((size - width) // 2, (size - height) // 2))
+    output = io.BytesIO()
+    icon.save(output, format="PNG", optimize=True)
+    return output.getvalue()
@@ -0,0 +1,157 @@
+"""
+Template loaders minifying the HTML of the templates.
+
+The templates of the project are indented for their readers, and the indentation, the blank
+lines and the comments were sent with every page, once per row of the index pages. The loaders
+of this module minify the source of the ``.html`` and ``.svg`` templates of the project when
+they are loaded, before they are compiled: ``settings.TEMPLATES`` wraps them in the cached loader
+of Django, so each template is read, minified and compiled once per process, and the pages are
+rendered from the minified templates at no cost per request.
+
+Functions:
+    - minify_html: Removes the indentation, the blank lines and the comments of a template.
+    - is_project_template: Tells if a template belongs to the project.
+
+Classes:
+    - FilesystemLoader: Loads the templates of ``DIRS``, minified.
+    - AppDirectoriesLoader: Loads the templates of the installed apps, minified.
+
+Notes:
+    The minified template renders the same page to the browsers:
+
+    - a run of whitespace holding a line break becomes a single line break, which the browsers
+      display as the run; the whitespace of a line is left as it is;
+    - a block tag alone on its line, such as ``{% if %}`` or ``{% endfor %}``, which outputs
+      nothing, is joined to the line before it, so the lines around it are not separated by two
+      line breaks in the page; a ``{# ... #}`` comment alone on its line is removed;
+    - the HTML comments are removed, but those holding template syntax and the conditional
+      comments (``<!--[if IE]>``).
+
+    The content of the ``<pre>``, ``<textarea>``, ``<script>`` and ``<style>`` elements, and of
+    the ``{% verbatim %}`` and ``{% blocktrans %}`` tags, whose whitespace matters, is left as
+    it is.
+
+    Only the templates of ``DIRS`` and of the apps of the project are minified. The templates of
+    the installed packages, such as the admin site and ``registration/password_reset_email.html``,
+    whose text is sent as a plain-text email, are loaded as they are written.
+
+    ``benchmarks/template_minify.py`` measures the render time and the bytes of the pages with
+    and without the minification.
+
+:param re: The module finding the whitespace, the tags and the comments.
+:param sysconfig: The module locating the directories of the installed packages.
+:param Path: A class comparing the directories of the templates.
+:param settings: The settings of the project.
+:param app_directories: The loader of the templates of the installed apps.
+:param filesystem: The loader of the templates of ``DIRS``.
+"""
+
+import re
+import sysconfig
+from pathlib import Path
+
+from django.conf import settings
+from django.template.loaders import app_directories, filesystem
+
+# The templates minified, by extension.
+MINIFIED_EXTENSIONS = (".html", ".svg")
+
+# The parts of a template left as they are.
+PRESERVED = re.compile(
+    r"<(pre|textarea|script|style)\b.*?</\1\s*>"
+    r"|{%\s*(verbatim|blocktrans|blocktranslate)\b.*?{%\s*end\2\b.*?%}",
+    re.DOTALL | re.IGNORECASE,
+)
+
+# The HTML comments, but the conditional comments and those holding template syntax.
+HTML_COMMENT = re.compile(r"<!--(?!\[if)(?:(?!{[%{#]).)*?-->", re.DOTALL)
+
+# A block tag outputting nothing, or a comment, alone on its line, with the line break and the
+# indentation before it.
+STANDALONE_TAG = re.compile(
+    r"[ \t]*\n\s*"
+    r"({%\s*(?:if|elif|else|endif|for|empty|endfor|block|endblock|with|endwith|load|extends"
+    r"|comment|endcomment)\b[^%]*%}|{#.*?#})"
+    r"(?=[ \t]*(?:\n|$))"
+)
+
+# A run of whitespace holding a line break.
+LINE_BREAKS = re.compile(r"[ \t\r\f\v]*\n\s*")
+
+
+def _minify_part(source):
+    """
+    Minify a part of a template holding none of the ``PRESERVED`` parts.
+
+    :param source: The part of the template.
+    :type source: str
+    :return: The minified part.
+    :rtype: str
+    """
+
+    source = HTML_COMMENT.sub("", source)
+    source = STANDALONE_TAG.sub(
+        lambda match: "" if match.group(1).startswith("{#") else match.group(1), source
+    )
+    return LINE_BREAKS.sub("\n", source)
+
+
+def minify_html(source):
+    """
+    Remove the indentation, the blank lines and the comments of the source of a template.
+
+    :param source: The source of the template.
+    :type source: str
+    :return: The minified source.
+    :rtype: str
+    """
+
+    parts, start = [], 0
+    for match in PRESERVED.finditer(source):
+        parts.append(_minify_part(source[start:match.start()]))
+        parts.append(match.group(0))
+        start = match.end()
+    parts.append(_minify_part(source[start:]))
+    return "".join(parts)
+
+
+def is_project_template(path):
+    """
+    Tell if a template belongs to the project rather than to an installed package.
+
+    :param path: The path of the template file.
+    :type path: str
+    :return: True if the file is in the project directory and not in the installed packages,
+        which may be in a virtual environment created in the project directory.
+    :rtype: bool
+    """
+
+    path = Path(path).resolve()
+    packages = {Path(sysconfig.get_path(name)).resolve() for name in ("purelib", "platlib")}
+    return Path(settings.BASE_DIR).resolve() in path.parents and packages.isdisjoint(path.parents)
+
+
+class MinifyingLoaderMixin:
+    """
+    Mixin of a template loader minifying the ``MINIFIED_EXTENSIONS`` templates of the project it
+    reads.
+    """
+
+    def get_contents(self, origin):
+        contents = super().get_contents(origin)
+        if origin.name.lower().endswith(MINIFIED_EXTENSIONS) and is_project_template(origin.name):
+            return minify_html(contents)
+        return contents
+
+
+class FilesystemLoader(MinifyingLoaderMixin, filesystem.Loader):
+    """
+    Loader of the templates of the ``DIRS`` of ``settings.TEMPLATES``, minified.
+    """
+
+
+class AppDirectoriesLoader(MinifyingLoaderMixin, app_directories.Loader):
+    """
+    Loader of the templates of the ``templates`` directory of the installed apps, minified for
+    the apps of the project.
+    """
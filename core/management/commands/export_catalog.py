@@ -0,0 +1,63 @@
+"""
+Management command exporting the catalog of lettings or profiles.
+
+This command writes every :class:`lettings.Letting` with its :class:`lettings.Address`, or every
+:class:`profiles.Profile` with its :class:`User`, in CSV, NDJSON or a columnar format (see
+``core.export``). The rows are read and written one chunk at a time, so the memory used does not
+depend on the size of the tables.
+
+Usage::
+
+    $ python manage.py export_catalog lettings > lettings.csv
+    $ python manage.py export_catalog profiles --format ndjson --output profiles.ndjson
+    $ python manage.py export_catalog lettings --format columns --chunk-size 20000
+
+:param BaseCommand: The base class of the management commands.
+:param CommandError: The exception raised when the command can not run.
+:param export_catalog: A function returning the chunks of an export.
+"""
+
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+
+from core.export import CATALOGS, FORMATS, export_catalog
+
+
+class Command(BaseCommand):
+    help = "Export the lettings or the profiles in CSV, NDJSON or a columnar format."
+
+    def add_arguments(self, parser):
+        parser.add_argument("catalog", choices=sorted(CATALOGS), help="The catalog to export.")
+        parser.add_argument(
+            "--format", choices=sorted(FORMATS), default="csv", help="The format of the export."
+        )
+        parser.add_argument(
+            "--output", default="-", help='The file written to, "-" (the default) for stdout.'
+        )
+        parser.add_argument(
+            "--chunk-size",
+            type=int,
+            help="The number of rows read per query, defaults to settings.EXPORT_CHUNK_SIZE.",
+        )
+
+    def handle(self, *args, **options):
+        if options["chunk_size"] is not None and options["chunk_size"] < 1:
+            raise CommandError("The chunk size must be positive.")
+        chunks = export_catalog(options["catalog"], options["format"], options["chunk_size"])
+
+        if options["output"] == "-":
+            for chunk in chunks:
+                self.stdout.write(chunk, ending="")
+            return
+
+        start = time.perf_counter()
+        try:
+            with open(options["output"], "w", encoding="utf-8", newline="") as output:
+                output.writelines(chunks)
+        except OSError as error:
+            raise CommandError(f"Can not write {options['output']}: {error.strerror}.")
+        self.stdout.write(
+            f"Exported {options['catalog']} to {options['output']} "
+            f"in {time.perf_counter() - start:.2f}s."
+        )
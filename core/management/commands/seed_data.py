@@ -0,0 +1,350 @@
+"""
+Management command generating realistic lettings and profiles in bulk.
+
+This command adds synthetic :class:`lettings.Address`, :class:`lettings.Letting`, :class:`User`
+and :class:`profiles.Profile` rows to the database, so the pages, the benchmarks and the query
+plans can be checked against production volumes. The rows are generated in batches and inserted
+with one ``executemany()`` per table and batch (see ``core.bulk``), each batch in its own
+transaction.
+
+Usage::
+
+    $ python manage.py seed_data --lettings 1000000 --profiles 1000000
+    $ python manage.py seed_data --lettings 50000 --profiles 0 --seed 42
+
+Data:
+    - The addresses are spread over the cities of ``CITIES`` with a Zipf distribution, so a few
+      cities and states hold most of the lettings, as in a real catalog; the zip codes are near
+      that of their city.
+    - The titles, streets and names are combined from short lists of words.
+    - Every value is valid against the fields and the validators of the models, and the usernames
+      are unique.
+    - The users share the password given by ``--password``, hashed once.
+
+Notes:
+    - The rows depend only on ``--seed`` and on the largest existing primary keys: the same
+      command run on the same database generates the same rows.
+    - The primary keys are allocated from the largest existing ones, so no other process must
+      create rows during the command.
+    - No ``post_save`` signal is sent. The search index is updated with one statement per batch
+      (see ``lettings.search``).
+
+:param random: The module generating the rows from the seed.
+:param time: The module measuring the duration of the command.
+:param accumulate: A function computing the cumulative weights of the cities.
+:param get_user_model: A function provided by Django to get the currently active user model.
+:param BaseCommand: The base class of the management commands.
+:param CommandError: The exception raised when the command can not run.
+:param make_password: A function hashing the password of the users.
+:param connections: The database connections, converting the dates.
+:param router: The database router, choosing the database written to.
+:param transaction: The module running each batch in a transaction.
+:param Max: The aggregate reading the largest existing primary keys.
+:param timezone: The module giving the dates of the rows.
+:param bulk_insert: A function inserting rows of values with a single query.
+:param deferred_search_indexing: A context manager skipping the indexing of each letting.
+:param index_lettings: A function indexing a range of lettings with one statement.
+"""
+
+import random
+import time
+from itertools import accumulate
+
+from django.contrib.auth import get_user_model
+from django.contrib.auth.hashers import make_password
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connections, router, transaction
+from django.db.models import Max
+from django.utils import timezone
+
+from core.bulk import bulk_insert
+from lettings.models import Address, Letting
+from lettings.search import deferred_search_indexing, index_lettings
+from profiles.models import Profile
+
+UserModel = get_user_model()
+
+# The cities, by decreasing number of lettings: name, state, first zip code and country.
+CITIES = [
+    ("New York", "NY", 10001, "USA"),
+    ("Los Angeles", "CA", 90001, "USA"),
+    ("Chicago", "IL", 60601, "USA"),
+    ("Houston", "TX", 77001, "USA"),
+    ("Miami", "FL", 33101, "USA"),
+    ("San Francisco", "CA", 94102, "USA"),
+    ("Boston", "MA", 2108, "USA"),
+    ("Seattle", "WA", 98101, "USA"),
+    ("Austin", "TX", 73301, "USA"),
+    ("San Diego", "CA", 92101, "USA"),
+    ("Philadelphia", "PA", 19102, "USA"),
+    ("Phoenix", "AZ", 85001, "USA"),
+    ("Dallas", "TX", 75201, "USA"),
+    ("Denver", "CO", 80201, "USA"),
+    ("Atlanta", "GA", 30301, "USA"),
+    ("Toronto", "ON", 10001, "CAN"),
+    ("Las Vegas", "NV", 88901, "USA"),
+    ("Nashville", "TN", 37201, "USA"),
+    ("Portland", "OR", 97201, "USA"),
+    ("Orlando", "FL", 32801, "USA"),
+    ("New Orleans", "LA", 70112, "USA"),
+    ("Minneapolis", "MN", 55401, "USA"),
+    ("Montreal", "QC", 20001, "CAN"),
+    ("Honolulu", "HI", 96801, "USA"),
+    ("Salt Lake City", "UT", 84101, "USA"),
+    ("Santa Barbara", "CA", 93101, "USA"),
+    ("Vancouver", "BC", 30001, "CAN"),
+    ("Charleston", "SC", 29401, "USA"),
+    ("Savannah", "GA", 31401, "USA"),
+    ("Albuquerque", "NM", 87101, "USA"),
+    ("Boise", "ID", 83701, "USA"),
+    ("Anchorage", "AK", 99501, "USA"),
+    ("Burlington", "VT", 5401, "USA"),
+    ("Malibu", "CA", 90265, "USA"),
+    ("Tahoe City", "CA", 96145, "USA"),
+    ("Key West", "FL", 33040, "USA"),
+    ("Aspen", "CO", 81611, "USA"),
+    ("Cheyenne", "WY", 82001, "USA"),
+    ("Bar Harbor", "ME", 4609, "USA"),
+    ("Sedona", "AZ", 86336, "USA"),
+]
+
+# The exponent of the Zipf distribution of the cities: the n-th city holds about 1 / n**1.1 of
+# the lettings of the first one.
+CITY_SKEW = 1.1
+
+CITY_WEIGHTS = list(accumulate(1 / rank**CITY_SKEW for rank in range(1, len(CITIES) + 1)))
+
+ADJECTIVES = [
+    "Cozy", "Sunny", "Spacious", "Charming", "Modern", "Quiet", "Bright", "Elegant", "Rustic",
+    "Stylish", "Historic", "Luxury", "Renovated", "Peaceful", "Airy", "Classic",
+]
+KINDS = [
+    "Apartment", "Studio", "Loft", "Cottage", "Bungalow", "Townhouse", "Villa", "Cabin",
+    "Penthouse", "Flat", "Condo", "Duplex", "Chalet", "Beach House",
+]
+FEATURES = [
+    "with Garden", "near the Park", "with Sea View", "Downtown", "with Balcony",
+    "by the Lake", "with Pool", "near the University", "in the Old Town", "with Terrace",
+]
+STREET_NAMES = [
+    "Main", "Oak", "Pine", "Maple", "Cedar", "Elm", "Washington", "Lake", "Hill", "Park",
+    "Sunset", "Lincoln", "Jackson", "River", "Church", "Highland", "Franklin", "Madison",
+    "Willow", "Spring", "Chestnut", "Meadow", "Forest", "Harbor",
+]
+STREET_SUFFIXES = ["Street", "Avenue", "Boulevard", "Road", "Lane", "Drive", "Court", "Way"]
+FIRST_NAMES = [
+    "James", "Mary", "Robert", "Patricia", "John", "Jennifer", "Michael", "Linda", "David",
+    "Elizabeth", "William", "Barbara", "Richard", "Susan", "Joseph", "Jessica", "Thomas", "Sarah",
+    "Charles", "Karen", "Daniel", "Lisa", "Matthew", "Nancy", "Anthony", "Betty", "Mark",
+    "Sandra", "Paul", "Ashley", "Steven", "Emily", "Andrew", "Donna", "Joshua", "Michelle",
+]
+LAST_NAMES = [
+    "Smith", "Johnson", "Williams", "Brown", "Jones", "Garcia", "Miller", "Davis", "Rodriguez",
+    "Martinez", "Hernandez", "Lopez", "Gonzalez", "Wilson", "Anderson", "Thomas", "Taylor",
+    "Moore", "Jackson", "Martin", "Lee", "Perez", "Thompson", "White", "Harris", "Sanchez",
+    "Clark", "Ramirez", "Lewis", "Robinson", "Walker", "Young", "Allen", "King",
+]
+EMAIL_DOMAINS = ["example.com", "example.org", "example.net", "mail.example.com"]
+
+
+def address_and_letting_rows(generator, ids, updated_at):
+    """
+    Generate the addresses and the lettings of a batch, each letting at the address of the same
+    ID.
+
+    :param generator: The random generator.
+    :type generator: random.Random
+    :param ids: The IDs of the addresses and the lettings.
+    :type ids: range
+    :param updated_at: The date of the last change of the rows, converted for the database.
+    :return: The rows of the addresses and of the lettings.
+    :rtype: tuple of (list of tuple, list of tuple)
+    """
+
+    cities = generator.choices(CITIES, cum_weights=CITY_WEIGHTS, k=len(ids))
+    choice, randint = generator.choice, generator.randint
+    addresses = []
+    lettings = []
+    for pk, (city, state, zip_code, country) in zip(ids, cities):
+        addresses.append(
+            (pk, randint(1, 9999), f"{choice(STREET_NAMES)} {choice(STREET_SUFFIXES)}", city,
+             state, zip_code + randint(0, 49), country, updated_at)
+        )
+        lettings.append(
+            (pk, f"{choice(ADJECTIVES)} {choice(KINDS)} {choice(FEATURES)}", pk, updated_at)
+        )
+    return addresses, lettings
+
+
+def user_and_profile_rows(generator, ids, password, date_joined):
+    """
+    Generate the users and the profiles of a batch, each profile of the user of the same ID.
+
+    :param generator: The random generator.
+    :type generator: random.Random
+    :param ids: The IDs of the users and the profiles.
+    :type ids: range
+    :param password: The hashed password of the users.
+    :type password: str
+    :param date_joined: The date the users joined and of the last change of the profiles,
+        converted for the database.
+    :return: The rows of the users and of the profiles.
+    :rtype: tuple of (list of tuple, list of tuple)
+    """
+
+    cities = generator.choices(CITIES, cum_weights=CITY_WEIGHTS, k=len(ids))
+    choice = generator.choice
+    users = []
+    profiles = []
+    for pk, (city, *_) in zip(ids, cities):
+        first_name, last_name = choice(FIRST_NAMES), choice(LAST_NAMES)
+        # The ID makes the username unique.
+        username = f"{first_name.lower()}.{last_name.lower()}{pk}"
+        users.append(
+            (pk, password, False, username, first_name, last_name,
+             f"{username}@{choice(EMAIL_DOMAINS)}", False, True, date_joined)
+        )
+        profiles.append((pk, pk, city, date_joined))
+    return users, profiles
+
+
+class Command(BaseCommand):
+    help = "Add realistic synthetic lettings and profiles to the database."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--lettings", type=int, default=10000, help="The number of lettings to add."
+        )
+        parser.add_argument(
+            "--profiles", type=int, default=10000, help="The number of profiles to add."
+        )
+        parser.add_argument(
+            "--seed", type=int, default=0, help="The seed of the generated rows."
+        )
+        parser.add_argument(
+            "--password",
+            default="seed-data-password",
+            help="The password of the generated users.",
+        )
+        parser.add_argument(
+            "--batch-size",
+            type=int,
+            default=20000,
+            help="The number of rows generated and inserted per transaction.",
+        )
+
+    def handle(self, *args, **options):
+        if options["lettings"] < 0 or options["profiles"] < 0:
+            raise CommandError("The numbers of lettings and profiles can not be negative.")
+        if options["batch_size"] < 1:
+            raise CommandError("The batch size must be positive.")
+
+        start = time.perf_counter()
+        self.batch_size = options["batch_size"]
+        self.seed_lettings(random.Random(f"{options['seed']}-lettings"), options["lettings"])
+        self.seed_profiles(
+            random.Random(f"{options['seed']}-profiles"),
+            options["profiles"],
+            make_password(options["password"]),
+        )
+        seconds = time.perf_counter() - start
+
+        rows = 2 * (options["lettings"] + options["profiles"])
+        rate = rows / seconds if seconds else 0
+        self.stdout.write(
+            f"Added {options['lettings']} lettings and {options['profiles']} profiles in "
+            f"{seconds:.2f}s ({rate:.0f} rows/s)."
+        )
+
+    def batches(self, count, *models):
+        """
+        Yield the IDs of each batch of new rows of models sharing their IDs, after the largest
+        existing ID of these models.
+
+        :param count: The number of new rows.
+        :type count: int
+        :param models: The models of the rows.
+        :type models: class
+        :return: A generator of ranges of IDs.
+        :rtype: generator
+        """
+
+        first = 1 + max(
+            model.objects.using(self.database).aggregate(id=Max("id"))["id"] or 0
+            for model in models
+        )
+        for batch_start in range(first, first + count, self.batch_size):
+            yield range(batch_start, min(batch_start + self.batch_size, first + count))
+
+    def now(self, model, field_name):
+        """
+        Return the current date, as stored in a date column of a model.
+
+        :param model: The model.
+        :type model: class
+        :param field_name: The name of the date field.
+        :type field_name: str
+        :return: The date, converted for the database.
+        """
+
+        field = model._meta.get_field(field_name)
+        return field.get_db_prep_save(timezone.now(), connections[self.database])
+
+    def seed_lettings(self, generator, count):
+        """
+        Add lettings and their addresses.
+
+        :param generator: The random generator.
+        :type generator: random.Random
+        :param count: The number of lettings.
+        :type count: int
+        :return: None
+        :rtype: None
+        """
+
+        self.database = router.db_for_write(Letting)
+        updated_at = self.now(Letting, "updated_at")
+        for ids in self.batches(count, Address, Letting):
+            addresses, lettings = address_and_letting_rows(generator, ids, updated_at)
+            with transaction.atomic(using=self.database), deferred_search_indexing(self.database):
+                bulk_insert(
+                    Address,
+                    ("id", "number", "street", "city", "state", "zip_code", "country_iso_code",
+                     "updated_at"),
+                    addresses,
+                    self.database,
+                )
+                bulk_insert(
+                    Letting, ("id", "title", "address", "updated_at"), lettings, self.database
+                )
+                index_lettings(ids[0], ids[-1], self.database)
+
+    def seed_profiles(self, generator, count, password):
+        """
+        Add users and their profiles.
+
+        :param generator: The random generator.
+        :type generator: random.Random
+        :param count: The number of profiles.
+        :type count: int
+        :param password: The hashed password of the users.
+        :type password: str
+        :return: None
+        :rtype: None
+        """
+
+        self.database = router.db_for_write(Profile)
+        date_joined = self.now(UserModel, "date_joined")
+        for ids in self.batches(count, UserModel, Profile):
+            users, profiles = user_and_profile_rows(generator, ids, password, date_joined)
+            with transaction.atomic(using=self.database):
+                bulk_insert(
+                    UserModel,
+                    ("id", "password", "is_superuser", "username", "first_name", "last_name",
+                     "email", "is_staff", "is_active", "date_joined"),
+                    users,
+                    self.database,
+                )
+                bulk_insert(
+                    Profile, ("id", "user", "favorite_city", "updated_at"), profiles, self.database
+                )
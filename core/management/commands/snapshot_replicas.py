@@ -0,0 +1,91 @@
+"""
+Management command refreshing the read-only replicas of the database.
+
+This command copies the primary database to each path of ``settings.DATABASE_REPLICAS`` with the
+online backup of SQLite, which reads a consistent snapshot while the workers keep writing. Each
+copy is written next to its replica and renamed over it, so the workers reading the replica never
+see a partial copy: their open connections keep reading the previous file until they are closed,
+and the new connections read the new one. The connections to the replicas are closed at the end
+of each request (``CONN_MAX_AGE = 0``), so the requests started after a snapshot read it.
+
+Usage::
+
+    $ DATABASE_REPLICAS=/srv/replica-0.sqlite3,/srv/replica-1.sqlite3 \\
+        python manage.py snapshot_replicas
+
+Notes:
+    - The command is run periodically, e.g. every minute from cron, which bounds the lag of the
+      replicas. The interval must be shorter than ``settings.REPLICA_PIN_SECONDS``, during
+      which the writers and the invalidated pages read from the primary database.
+    - The copies use the rollback journal, so they can be opened with ``immutable=1`` without
+      their write-ahead log.
+    - The cache of the rendered pages is cleared once the replicas are refreshed (see
+      ``core.routers``), with the marks of the invalidated pages: a page changed while the
+      command runs may be rendered from the previous snapshot until the next one (see
+      ``core.page_cache``).
+
+:param os: The module renaming the copies over the replicas.
+:param sqlite3: The module writing the copies.
+:param time: The module measuring the duration of the snapshots.
+:param settings: The settings of the project.
+:param cache: The cache of the rendered pages.
+:param BaseCommand: The base class of the management commands.
+:param CommandError: The exception raised when the command can not run.
+:param connections: The database connections.
+:param PRIMARY_DATABASE: The alias of the primary database.
+"""
+
+import os
+import sqlite3
+import time
+
+from django.conf import settings
+from django.core.cache import cache
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connections
+
+from core.routers import PRIMARY_DATABASE
+
+
+def snapshot(path):
+    """
+    Copy the primary database to a path, replacing the file at once.
+
+    :param path: The path of the replica.
+    :type path: str
+    :return: None
+    :rtype: None
+    :raises sqlite3.Error: If the copy fails.
+    """
+
+    primary = connections[PRIMARY_DATABASE]
+    primary.ensure_connection()
+    temporary = f"{path}.{os.getpid()}.tmp"
+    try:
+        with sqlite3.connect(temporary) as copy:
+            primary.connection.backup(copy)
+            copy.execute("PRAGMA journal_mode = delete")
+        copy.close()
+        os.replace(temporary, path)
+    finally:
+        if os.path.exists(temporary):
+            os.remove(temporary)
+
+
+class Command(BaseCommand):
+    help = "Copy the primary database to the read-only replicas."
+
+    def handle(self, *args, **options):
+        if connections[PRIMARY_DATABASE].vendor != "sqlite":
+            raise CommandError("The replicas are snapshots of a SQLite database.")
+        if not settings.DATABASE_REPLICAS:
+            raise CommandError("No replica is configured in DATABASE_REPLICAS.")
+
+        for path in settings.DATABASE_REPLICAS:
+            start = time.perf_counter()
+            try:
+                snapshot(path)
+            except (OSError, sqlite3.Error) as error:
+                raise CommandError(f"Can not write {path}: {error}.")
+            self.stdout.write(f"Copied to {path} in {time.perf_counter() - start:.2f}s.")
+        cache.clear()
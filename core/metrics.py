@@ -0,0 +1,195 @@
+"""
+Metrics of the requests, in the Prometheus format.
+
+This module counts the requests and records the distribution of their latency and of their
+number of database queries, labelled by the name of the URL pattern of the view
+(``lettings:letting``, ``profiles:profile``, ...) and by the status code of the response, as well
+as the hits and misses of the page cache (see ``core.page_cache``) by URL name. The metrics are
+served to Prometheus by the ``core.views.metrics`` view, at ``/metrics``.
+
+Metrics:
+    - oc_lettings_requests_total: The requests, by URL name, method and status.
+    - oc_lettings_request_duration_seconds: A histogram of the time of the requests, by URL name
+      and status.
+    - oc_lettings_request_queries: A histogram of the number of database queries of the
+      requests, by URL name and status.
+    - oc_lettings_page_cache_lookups_total: The lookups of the page cache, by URL name and
+      result (``hit`` or ``miss``). The hit ratio of a page is
+      ``rate(..._total{result="hit"}) / rate(..._total)``.
+
+Classes:
+    - MetricsMiddleware: Records the metrics of each request.
+
+Functions:
+    - collect_metrics: Returns the metrics of all the worker processes.
+    - is_authorized: Returns whether a request may read the metrics.
+
+Notes:
+    The latency, the queries and the lookups of the page cache are read from the timings of
+    ``core.timing``, so ``MetricsMiddleware`` must come before
+    ``core.timing.ServerTimingMiddleware`` in ``settings.MIDDLEWARE``. The requests which do not
+    match a URL pattern are labelled ``-``. A streaming response is measured once its chunks are
+    sent, so its latency and queries include those of its chunks.
+
+    When the ``PROMETHEUS_MULTIPROC_DIR`` environment variable is set, as it is by the server
+    profile of gunicorn (``oc_lettings_site.gunicorn_config``), each worker process writes its
+    metrics to memory-mapped files of this directory, and ``collect_metrics`` adds up the files
+    of all the workers, including those of the workers which were replaced since the server
+    started. Otherwise, e.g. with ``manage.py runserver``, the metrics are those of the current
+    process.
+
+    The metrics tell the latency and the queries of each view, so ``/metrics`` is only served to
+    the clients of the networks of ``settings.METRICS_ALLOWED_NETWORKS`` (the host itself by
+    default) and to the requests holding the bearer token ``settings.METRICS_TOKEN``, e.g. a
+    Prometheus server scraping through a proxy. The other requests are refused with ``403``.
+
+:param ipaddress: The module matching the address of a client with the allowed networks.
+:param os: The module reading the environment.
+:param prometheus_client: The client library of Prometheus.
+:param multiprocess: The collector of the metrics of the worker processes.
+:param settings: The settings of the project.
+:param constant_time_compare: A function comparing the token in a time which does not tell how
+    much of it matches.
+"""
+
+import ipaddress
+import os
+
+from django.conf import settings
+from django.utils.crypto import constant_time_compare
+from prometheus_client import (
+    REGISTRY,
+    CollectorRegistry,
+    Counter,
+    Histogram,
+    generate_latest,
+    multiprocess,
+)
+
+REQUESTS = Counter(
+    "oc_lettings_requests",
+    "Requests, by URL name, method and status.",
+    ["url_name", "method", "status"],
+)
+REQUEST_DURATION = Histogram(
+    "oc_lettings_request_duration_seconds",
+    "Time of the requests, from the first middleware to the response.",
+    ["url_name", "status"],
+    buckets=(0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0),
+)
+REQUEST_QUERIES = Histogram(
+    "oc_lettings_request_queries",
+    "Database queries of the requests.",
+    ["url_name", "status"],
+    buckets=(0, 1, 2, 3, 5, 10, 25, 50, 100),
+)
+PAGE_CACHE_LOOKUPS = Counter(
+    "oc_lettings_page_cache_lookups",
+    "Lookups of the page cache, by URL name and result.",
+    ["url_name", "result"],
+)
+
+
+def _observe_stream(content, observe):
+    """
+    Yield the chunks of a streaming response, then record the metrics of its request.
+
+    :param content: The chunks of the response.
+    :type content: iterator
+    :param observe: The function recording the metrics, called once the last chunk is sent or
+        the response is closed.
+    :type observe: callable
+    :return: A generator of chunks.
+    :rtype: generator
+    """
+
+    try:
+        yield from content
+    finally:
+        observe()
+
+
+class MetricsMiddleware:
+    """
+    Middleware recording the metrics of each request.
+
+    :param get_response: The next middleware or the view.
+    :type get_response: callable
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        response = self.get_response(request)
+        if response.streaming:
+            response.streaming_content = _observe_stream(
+                response.streaming_content, lambda: self.observe(request, response)
+            )
+        else:
+            self.observe(request, response)
+        return response
+
+    def observe(self, request, response):
+        """
+        Record the metrics of a request, from its timings.
+
+        :param request: The HTTP request object.
+        :type request: HttpRequest
+        :param response: The response to the request.
+        :type response: HttpResponse or StreamingHttpResponse
+        :return: None
+        :rtype: None
+        """
+
+        match = request.resolver_match
+        url_name = match.view_name if match else "-"
+        status = str(response.status_code)
+        timings = request.timings
+        REQUESTS.labels(url_name, request.method, status).inc()
+        REQUEST_DURATION.labels(url_name, status).observe(timings.total)
+        REQUEST_QUERIES.labels(url_name, status).observe(timings.queries)
+        if timings.cache_hits:
+            PAGE_CACHE_LOOKUPS.labels(url_name, "hit").inc(timings.cache_hits)
+        if timings.cache_misses:
+            PAGE_CACHE_LOOKUPS.labels(url_name, "miss").inc(timings.cache_misses)
+
+
+def collect_metrics():
+    """
+    Return the metrics of all the worker processes, in the text format of Prometheus.
+
+    :return: The metrics.
+    :rtype: bytes
+    """
+
+    if "PROMETHEUS_MULTIPROC_DIR" in os.environ:
+        registry = CollectorRegistry()
+        multiprocess.MultiProcessCollector(registry)
+    else:
+        registry = REGISTRY
+    return generate_latest(registry)
+
+
+def is_authorized(request):
+    """
+    Return whether a request may read the metrics: it comes from a network of
+    ``settings.METRICS_ALLOWED_NETWORKS``, or holds the bearer token ``settings.METRICS_TOKEN``.
+
+    :param request: The request.
+    :type request: HttpRequest
+    :return: Whether to serve the metrics.
+    :rtype: bool
+    """
+
+    token = settings.METRICS_TOKEN
+    authorization = request.META.get("HTTP_AUTHORIZATION", "")
+    if token and constant_time_compare(authorization, f"Bearer {token}"):
+        return True
+    try:
+        address = ipaddress.ip_address(request.META.get("REMOTE_ADDR", ""))
+    except ValueError:
+        return False
+    return any(
+        address in ipaddress.ip_network(network) for network in settings.METRICS_ALLOWED_NETWORKS
+    )
@@ -0,0 +1,84 @@
+"""
+Middleware of the project.
+
+Classes:
+    - ReplicaPinningMiddleware: Chooses the database read by a request, the primary database or
+      one of its read-only replicas (see ``core.routers``).
+
+Notes:
+    The admin site and the requests which may write (``POST``, ``PUT``, ``PATCH``, ``DELETE``)
+    read from the primary database. The response to such a request sets the ``REPLICA_PIN_COOKIE``
+    cookie for ``settings.REPLICA_PIN_SECONDS``, during which the requests of the same client
+    read from the primary database too: a staff member editing a letting in the admin site
+    sees the change on the public pages, while the replicas are refreshed.
+
+:param settings: The settings of the project.
+:param reverse: A function provided by Django for generating URLs based on view names.
+:param PRIMARY_DATABASE: The alias of the primary database.
+:param choose_replica: A function returning a random replica.
+:param read_from: A context manager sending the reads of a block to a database.
+:param replica_aliases: A function returning the aliases of the replicas.
+"""
+
+from django.conf import settings
+from django.urls import reverse
+
+from core.routers import PRIMARY_DATABASE, choose_replica, read_from, replica_aliases
+
+REPLICA_PIN_COOKIE = "read_primary"
+
+SAFE_METHODS = ("GET", "HEAD", "OPTIONS", "TRACE")
+
+
+def _stream_from(alias, content):
+    """
+    Yield the chunks of a streaming response, reading from a database while they are produced.
+
+    :param alias: The alias of the database.
+    :type alias: str
+    :param content: The chunks of the response.
+    :type content: iterator
+    :return: A generator of chunks.
+    :rtype: generator
+    """
+
+    with read_from(alias):
+        yield from content
+
+
+class ReplicaPinningMiddleware:
+    """
+    Middleware sending all the reads of a request to the same database.
+
+    :param get_response: The next middleware or the view.
+    :type get_response: callable
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        writes = request.method not in SAFE_METHODS
+        if (
+            writes
+            or request.path.startswith(reverse("admin:index"))
+            or REPLICA_PIN_COOKIE in request.COOKIES
+        ):
+            alias = PRIMARY_DATABASE
+        else:
+            alias = choose_replica()
+
+        with read_from(alias):
+            response = self.get_response(request)
+        if response.streaming:
+            response.streaming_content = _stream_from(alias, response.streaming_content)
+
+        if writes and replica_aliases():
+            response.set_cookie(
+                REPLICA_PIN_COOKIE,
+                "1",
+                max_age=settings.REPLICA_PIN_SECONDS,
+                httponly=True,
+                samesite="Lax",
+            )
+        return response
@@ -0,0 +1,22 @@
+# Generated by Django 3.0 on 2026-10-17 18:31
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    initial = True
+
+    dependencies = [
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='IndexVersion',
+            fields=[
+                ('name', models.CharField(max_length=32, primary_key=True, serialize=False)),
+                ('version', models.BigIntegerField(default=0)),
+                ('updated_at', models.DateTimeField()),
+            ],
+        ),
+    ]
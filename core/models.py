@@ -0,0 +1,45 @@
+"""
+Model holding the versions of the index pages.
+
+This module defines the :class:`core.IndexVersion` model, one row per index page (``"lettings"``,
+``"profiles"``), holding a counter increased by every write to the tables listed on the page and
+the date of the last write. The version of an index page is then read by its primary key, whatever
+the number of rows listed (see ``core.conditional.read_index_version``).
+
+Model:
+    - IndexVersion: Represents the version of an index page.
+
+Notes:
+    The rows are created and updated by SQLite triggers, defined by the migrations of the apps
+    owning the tables (``lettings/migrations/0006_index_version.py`` and
+    ``profiles/migrations/0003_index_version.py``). The triggers run for every written row,
+    including the queryset ``update()``, the bulk inserts and the writes of the management
+    commands, which do not send the signals of Django.
+
+:param models: Import Django's database models module.
+"""
+
+from django.db import models
+
+
+class IndexVersion(models.Model):
+    """
+    Model for the version of an index page.
+
+    Represents the version of the rows listed on an index page, updated by the triggers of the
+    tables of the page.
+
+    :param name: The name of the index page, e.g. ``"lettings"``.
+    :type name: CharField, primary key
+    :param version: The number of writes to the tables of the page.
+    :type version: BigIntegerField
+    :param updated_at: The date and time of the last write to the tables of the page.
+    :type updated_at: DateTimeField
+    """
+
+    name = models.CharField(max_length=32, primary_key=True)
+    version = models.BigIntegerField(default=0)
+    updated_at = models.DateTimeField()
+
+    def __str__(self):
+        return self.name
@@ -0,0 +1,157 @@
+"""
+Cache of the rendered detail pages.
+
+This module stores the HTML of the detail pages in the default cache, keyed by the object they
+display (the ID of a :class:`lettings.Letting`, the username of a :class:`profiles.Profile`), so a
+cached page is served without querying the database nor rendering a template. The keys also hold
+the version of the templates and static files of the deployment (see
+``core.conditional.build_version``), so a deployment changing them does not serve the pages
+rendered by the previous one, which expire after ``settings.PAGE_CACHE_TIMEOUT`` or are culled.
+
+Functions:
+    - page_cache_key: Returns the cache key of the page of an object.
+    - invalidation_key: Returns the cache key marking a page as recently invalidated.
+    - cache_rendered_page: A view decorator serving the page from the cache, or rendering and
+      caching it.
+    - invalidate_pages: Removes pages from the cache.
+
+Notes:
+    The pages are invalidated by the ``post_save`` and ``post_delete`` signal receivers of the
+    lettings and profiles apps (``lettings/signals.py`` and ``profiles/signals.py``), so edits made
+    through the admin are visible immediately. Queryset ``update()`` and ``bulk_create()`` do not
+    send these signals: their changes are visible once ``settings.PAGE_CACHE_TIMEOUT`` expires,
+    or once the replicas are refreshed when the project has some.
+
+    With read-only replicas (see ``core.routers``), the request rendering a page after its
+    invalidation may read a replica copied before the change. The invalidation also marks the
+    page for ``settings.REPLICA_PIN_SECONDS``, during which the page is rendered from the primary
+    database when it is not cached, so the cached page holds the change. The page is then stale
+    only if the change is committed while ``snapshot_replicas`` runs: the marks are cleared with
+    the cache when the replicas are refreshed, and the page can be rendered from a replica
+    copied before the change until the next snapshot. ``REPLICA_PIN_SECONDS`` must exceed the
+    interval between the snapshots.
+
+Example:
+    To cache the page of a letting::
+
+        @cache_rendered_page("letting", "letting_id")
+        def letting(request, letting_id):
+            ...
+
+    To invalidate it::
+
+        invalidate_pages(page_cache_key("letting", letting_id))
+
+:param wraps: A decorator to keep the name and docstring of the decorated view.
+:param quote: A function to escape the identifiers used in the cache keys.
+:param settings: The settings of the project.
+:param replica_aliases: A function returning the aliases of the replicas.
+:param use_primary: A context manager sending the reads of a block to the primary database.
+:param cache: The default cache.
+:param HttpResponse: The response returned when the page is found in the cache.
+:param count_cache_lookup: A function counting the hits and misses in the metrics of the request.
+:param build_version: A function returning a digest of the templates and static files.
+"""
+
+from functools import wraps
+from urllib.parse import quote
+
+from django.conf import settings
+from django.core.cache import cache
+from django.http import HttpResponse
+
+from core.conditional import build_version
+from core.routers import replica_aliases, use_primary
+from core.timing import count_cache_lookup
+
+
+def page_cache_key(name, identifier):
+    """
+    Return the cache key of the page displaying an object, rendered by the current deployment.
+
+    :param name: The name of the page, e.g. ``"letting"``.
+    :type name: str
+    :param identifier: The identifier of the object, e.g. its ID or username.
+    :type identifier: int or str
+    :return: The cache key.
+    :rtype: str
+    """
+
+    return f"page:{build_version()}:{name}:{quote(str(identifier), safe='')}"
+
+
+def invalidation_key(key):
+    """
+    Return the cache key marking a page as invalidated since the last snapshot of the replicas.
+
+    :param key: The cache key of the page, as returned by ``page_cache_key``.
+    :type key: str
+    :return: The cache key of the mark.
+    :rtype: str
+    """
+
+    return f"{key}:invalidated"
+
+
+def cache_rendered_page(name, kwarg):
+    """
+    Decorate a view to serve its page from the cache.
+
+    On a cache miss the view is called and the content of its response is cached if the status
+    code is 200. The errors raised by the view, e.g. Http404, are not cached. The responses of
+    the cached pages have a ``page_cache_key`` attribute, under which ``core.compression``
+    caches their compressed content. A page invalidated since the last snapshot of the replicas
+    is rendered from the primary database.
+
+    :param name: The name of the page, used in the cache key.
+    :type name: str
+    :param kwarg: The name of the view argument identifying the object.
+    :type kwarg: str
+    :return: The decorator.
+    :rtype: callable
+    """
+
+    def decorator(view):
+        @wraps(view)
+        def wrapper(request, *args, **kwargs):
+            key = page_cache_key(name, kwargs[kwarg])
+            content = cache.get(key)
+            count_cache_lookup(content is not None)
+            if content is not None:
+                response = HttpResponse(content)
+                response.page_cache_key = key
+                return response
+            if replica_aliases() and cache.get(invalidation_key(key)) is not None:
+                with use_primary():
+                    response = view(request, *args, **kwargs)
+            else:
+                response = view(request, *args, **kwargs)
+            if response.status_code == 200:
+                cache.set(key, response.content, settings.PAGE_CACHE_TIMEOUT)
+                response.page_cache_key = key
+            return response
+
+        return wrapper
+
+    return decorator
+
+
+def invalidate_pages(*keys):
+    """
+    Remove pages from the cache.
+
+    With replicas, the pages are also marked as invalidated for ``settings.REPLICA_PIN_SECONDS``,
+    so they are rendered again from the primary database rather than from a replica which may
+    not hold the change yet.
+
+    :param keys: The cache keys of the pages, as returned by ``page_cache_key``.
+    :type keys: str
+    :return: None
+    :rtype: None
+    """
+
+    cache.delete_many(keys)
+    if replica_aliases():
+        cache.set_many(
+            {invalidation_key(key): True for key in keys}, settings.REPLICA_PIN_SECONDS
+        )
@@ -0,0 +1,401 @@
+"""
+Keyset (cursor) pagination for the index pages.
+
+This module paginates a queryset on a unique ordering key instead of an ``OFFSET``: the next page
+is selected with ``WHERE key > <last key of the page>``, which the database answers from the index
+of the key, so the cost of a page does not depend on how deep it is in the table.
+
+Classes:
+    - KeysetPage: A page of results with the cursors of the previous and next pages.
+    - StreamingKeysetPage: A page of results read lazily from the database, for the streaming
+      responses.
+
+Functions:
+    - paginate_keyset: Returns the page of a queryset selected by the cursor of the request.
+    - stream_keyset: Returns the page of a queryset selected by the cursor of the request, read
+      lazily.
+    - encode_cursor: Encodes the key values of a row into an opaque cursor.
+    - decode_cursor: Decodes an opaque cursor into the key values of a queryset.
+
+Notes:
+    The cursors are read from the ``after`` and ``before`` query parameters and the page size from
+    the ``size`` parameter, bounded by ``settings.PAGINATION_MAX_PAGE_SIZE``. Only one query is run
+    per page: one more row than the page size is fetched to know if there is a page after it.
+
+Performance:
+    The index views also run the query reading the version of the page before the page query
+    (see ``core.conditional``), which is read by primary key. ``benchmarks/index_pagination.py``
+    measures both on the first page and on a page in the middle of the table: with 1 000 and
+    1 000 000 lettings, the version takes about 0.3 ms, the first and middle pages about 5 ms
+    and a ``304 Not Modified`` about 1 ms, where the aggregate the version replaced took
+    0.4 ms and 240 ms.
+
+Example:
+    To paginate the lettings on their ID::
+
+        page = paginate_keyset(request, Letting.objects.only("id", "title"), keys=("id",))
+        context = {"lettings_list": page.object_list, "page": page}
+
+:param base64: The module used to make the cursors URL safe.
+:param json: The module used to serialize the key values of the cursors.
+:param settings: The settings of the project.
+:param Q: An object used to build the keyset condition.
+:param Http404: An exception raised when the cursor is invalid.
+:param ValidationError: An exception raised when a value of a cursor is invalid for its key.
+"""
+
+import base64
+import binascii
+import json
+
+from django.conf import settings
+from django.core.exceptions import ValidationError
+from django.db.models import Q
+from django.http import Http404
+
+
+def encode_cursor(values):
+    """
+    Encode the key values of a row into an opaque and URL safe cursor.
+
+    :param values: The values of the ordering keys of a row.
+    :type values: tuple
+    :return: The cursor.
+    :rtype: str
+    """
+
+    data = json.dumps(list(values), separators=(",", ":")).encode()
+    return base64.urlsafe_b64encode(data).decode().rstrip("=")
+
+
+def _key_field(queryset, key):
+    """
+    Return the model field of an ordering key of a queryset.
+
+    :param queryset: The queryset ordered on the key.
+    :type queryset: QuerySet
+    :param key: The ordering key, which may follow relations with ``__`` or name an annotation.
+    :type key: str
+    :return: The field holding the values of the key.
+    :rtype: Field
+    """
+
+    if key in queryset.query.annotations:
+        return queryset.query.annotations[key].output_field
+    model = queryset.model
+    *relations, name = key.split("__")
+    for relation in relations:
+        model = model._meta.get_field(relation).related_model
+    return model._meta.get_field(name)
+
+
+def decode_cursor(cursor, queryset, keys):
+    """
+    Decode an opaque cursor into the key values of a row of a queryset.
+
+    Each value is converted with the field of its key, so a cursor holding a value of the wrong
+    type is rejected here rather than by the database.
+
+    :param cursor: The cursor read from the query string.
+    :type cursor: str
+    :param queryset: The queryset paginated by the cursor.
+    :type queryset: QuerySet
+    :param keys: The ordering keys.
+    :type keys: tuple of str
+    :return: The values of the ordering keys.
+    :rtype: tuple
+    :raises Http404: If the cursor can not be decoded, or holds a value invalid for its key.
+    """
+
+    try:
+        data = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4))
+        values = json.loads(data)
+    except (binascii.Error, ValueError):
+        raise Http404("Invalid cursor.")
+    if not isinstance(values, list) or len(values) != len(keys):
+        raise Http404("Invalid cursor.")
+    # The keys are unique and not null, and a value is a JSON scalar.
+    if any(value is None or isinstance(value, (list, dict)) for value in values):
+        raise Http404("Invalid cursor.")
+    try:
+        return tuple(
+            _key_field(queryset, key).to_python(value) for key, value in zip(keys, values)
+        )
+    except (TypeError, ValueError, ValidationError):
+        raise Http404("Invalid cursor.")
+
+
+def _key_value(row, key):
+    """
+    Read the value of an ordering key from a model instance or a ``values()`` dictionary.
+
+    :param row: A row of the page.
+    :type row: Model or dict
+    :param key: The ordering key, which may follow relations with ``__``.
+    :type key: str
+    :return: The value of the key.
+    """
+
+    if isinstance(row, dict):
+        return row[key]
+    for attribute in key.split("__"):
+        row = getattr(row, attribute)
+    return row
+
+
+def _row_cursor(row, keys, key_values=None):
+    """
+    Return the cursor pointing at a row.
+
+    :param row: A row of the page.
+    :type row: Model or dict or tuple
+    :param keys: The ordering keys.
+    :type keys: tuple of str
+    :param key_values: A function returning the values of the ordering keys of the row, if it
+        is neither a model instance nor a ``values()`` dictionary.
+    :type key_values: callable, optional
+    :return: The cursor.
+    :rtype: str
+    """
+
+    if key_values is not None:
+        return encode_cursor(key_values(row))
+    return encode_cursor(_key_value(row, key) for key in keys)
+
+
+def _keyset_condition(keys, values, lookup):
+    """
+    Build the condition selecting the rows after (or before) the given key values.
+
+    For the keys ``(a, b)`` and ``lookup="gt"`` the condition is
+    ``a >= x AND (a > x OR (a = x AND b > y))``: the leading ``a >= x`` is redundant, but it lets
+    the database seek to the page in an index on ``(a, b)`` instead of scanning the index from
+    its start.
+
+    :param keys: The ordering keys.
+    :type keys: tuple of str
+    :param values: The values of the ordering keys.
+    :type values: tuple
+    :param lookup: ``"gt"`` to select the rows after the values, ``"lt"`` for the rows before.
+    :type lookup: str
+    :return: The condition.
+    :rtype: Q
+    """
+
+    condition = Q()
+    for index, key in enumerate(keys):
+        equal = {keys[i]: values[i] for i in range(index)}
+        condition |= Q(**equal, **{f"{key}__{lookup}": values[index]})
+    if len(keys) > 1:
+        condition &= Q(**{f"{keys[0]}__{lookup}e": values[0]})
+    return condition
+
+
+def get_page_size(request, maximum=None):
+    """
+    Read the page size from the ``size`` query parameter.
+
+    :param request: The HTTP request object.
+    :type request: HttpRequest
+    :param maximum: The largest page size allowed, defaults to
+        ``settings.PAGINATION_MAX_PAGE_SIZE``.
+    :type maximum: int, optional
+    :return: The requested page size bounded by ``maximum``, or ``settings.PAGINATION_PAGE_SIZE``
+        if the parameter is missing or invalid.
+    :rtype: int
+    """
+
+    try:
+        size = int(request.GET["size"])
+    except (KeyError, ValueError):
+        return settings.PAGINATION_PAGE_SIZE
+    return max(1, min(size, maximum or settings.PAGINATION_MAX_PAGE_SIZE))
+
+
+class KeysetPage:
+    """
+    A page of results selected by keyset pagination.
+
+    :param object_list: The rows of the page.
+    :type object_list: list
+    :param next_cursor: The cursor of the next page, or None if this is the last page.
+    :type next_cursor: str or None
+    :param previous_cursor: The cursor of the previous page, or None if this is the first page.
+    :type previous_cursor: str or None
+    :param request: The HTTP request object, used to build the links to the other pages.
+    :type request: HttpRequest
+    """
+
+    def __init__(self, object_list, next_cursor, previous_cursor, request):
+        self.object_list = object_list
+        self.next_cursor = next_cursor
+        self.previous_cursor = previous_cursor
+        self.request = request
+
+    @property
+    def has_next(self):
+        return self.next_cursor is not None
+
+    @property
+    def has_previous(self):
+        return self.previous_cursor is not None
+
+    def _url(self, parameter, cursor):
+        query = self.request.GET.copy()
+        query.pop("after", None)
+        query.pop("before", None)
+        query[parameter] = cursor
+        return f"?{query.urlencode()}"
+
+    @property
+    def next_url(self):
+        return self._url("after", self.next_cursor) if self.has_next else None
+
+    @property
+    def previous_url(self):
+        return self._url("before", self.previous_cursor) if self.has_previous else None
+
+
+def paginate_keyset(request, queryset, keys, page_size=None, key_values=None):
+    """
+    Return the page of a queryset selected by the ``after`` or ``before`` cursor of the request.
+
+    The queryset is ordered on ``keys``, which must identify a row uniquely, and a single query
+    fetching ``page_size + 1`` rows is run.
+
+    :param request: The HTTP request object.
+    :type request: HttpRequest
+    :param queryset: The rows to paginate.
+    :type queryset: QuerySet
+    :param keys: The unique ordering keys, e.g. ``("id",)``.
+    :type keys: tuple of str
+    :param page_size: The number of rows per page, read from the request if not given.
+    :type page_size: int, optional
+    :param key_values: A function returning the values of the ordering keys of a row, for the
+        rows which are neither model instances nor ``values()`` dictionaries, e.g. the tuples of
+        ``values_list()``.
+    :type key_values: callable, optional
+    :return: The page.
+    :rtype: KeysetPage
+    :raises Http404: If the cursor is invalid.
+    """
+
+    if page_size is None:
+        page_size = get_page_size(request)
+    after = request.GET.get("after")
+    before = request.GET.get("before")
+
+    if before:
+        values = decode_cursor(before, queryset, keys)
+        queryset = queryset.filter(_keyset_condition(keys, values, "lt"))
+        queryset = queryset.order_by(*(f"-{key}" for key in keys))
+        rows = list(queryset[: page_size + 1])
+        has_more = len(rows) > page_size
+        rows = rows[:page_size][::-1]
+        has_previous, has_next = has_more, True
+    else:
+        if after:
+            values = decode_cursor(after, queryset, keys)
+            queryset = queryset.filter(_keyset_condition(keys, values, "gt"))
+        rows = list(queryset.order_by(*keys)[: page_size + 1])
+        has_next = len(rows) > page_size
+        rows = rows[:page_size]
+        has_previous = bool(after)
+
+    next_cursor = _row_cursor(rows[-1], keys, key_values) if rows and has_next else None
+    previous_cursor = _row_cursor(rows[0], keys, key_values) if rows and has_previous else None
+    return KeysetPage(rows, next_cursor, previous_cursor, request)
+
+
+class StreamingKeysetPage(KeysetPage):
+    """
+    A page of results read lazily, for the streaming responses.
+
+    Iterating the page reads its rows with ``QuerySet.iterator()``, ``chunk_size`` rows at a time,
+    so they are not all held in memory. The cursors of the previous and next pages are only known
+    once the page has been iterated.
+
+    Pages selected with a ``before`` cursor are read in reverse order by the database, so they are
+    read at once with ``paginate_keyset`` before being iterated.
+
+    :param request: The HTTP request object.
+    :type request: HttpRequest
+    :param queryset: The rows to paginate.
+    :type queryset: QuerySet
+    :param keys: The unique ordering keys, e.g. ``("id",)``.
+    :type keys: tuple of str
+    :param page_size: The number of rows per page.
+    :type page_size: int
+    :param chunk_size: The number of rows read from the database at a time.
+    :type chunk_size: int
+    """
+
+    def __init__(self, request, queryset, keys, page_size, chunk_size):
+        super().__init__(None, None, None, request)
+        self.queryset = queryset
+        self.keys = keys
+        self.page_size = page_size
+        self.chunk_size = chunk_size
+        self.object_count = 0
+
+    def __iter__(self):
+        if self.request.GET.get("before"):
+            page = paginate_keyset(self.request, self.queryset, self.keys, self.page_size)
+            self.next_cursor, self.previous_cursor = page.next_cursor, page.previous_cursor
+            self.object_count = len(page.object_list)
+            yield from page.object_list
+            return
+
+        queryset = self.queryset
+        after = self.request.GET.get("after")
+        if after:
+            values = decode_cursor(after, queryset, self.keys)
+            queryset = queryset.filter(_keyset_condition(self.keys, values, "gt"))
+        queryset = queryset.order_by(*self.keys)[: self.page_size + 1]
+
+        last = None
+        for row in queryset.iterator(chunk_size=self.chunk_size):
+            if self.object_count == self.page_size:
+                self.next_cursor = _row_cursor(last, self.keys)
+                break
+            if self.object_count == 0 and after:
+                self.previous_cursor = _row_cursor(row, self.keys)
+            self.object_count += 1
+            last = row
+            yield row
+
+
+def stream_keyset(request, queryset, keys, page_size=None, chunk_size=None):
+    """
+    Return the page of a queryset selected by the cursor of the request, read lazily.
+
+    The cursor is validated before the page is returned, so an invalid cursor raises Http404
+    from the view rather than while the response is streamed.
+
+    :param request: The HTTP request object.
+    :type request: HttpRequest
+    :param queryset: The rows to paginate.
+    :type queryset: QuerySet
+    :param keys: The unique ordering keys, e.g. ``("id",)``.
+    :type keys: tuple of str
+    :param page_size: The number of rows per page, read from the request if not given and
+        bounded by ``settings.STREAMING_MAX_PAGE_SIZE``.
+    :type page_size: int, optional
+    :param chunk_size: The number of rows read from the database at a time, defaults to
+        ``settings.STREAMING_CHUNK_SIZE``.
+    :type chunk_size: int, optional
+    :return: The page.
+    :rtype: StreamingKeysetPage
+    :raises Http404: If the cursor is invalid.
+    """
+
+    for parameter in ("after", "before"):
+        if request.GET.get(parameter):
+            decode_cursor(request.GET[parameter], queryset, keys)
+    return StreamingKeysetPage(
+        request,
+        queryset,
+        keys,
+        page_size or get_page_size(request, settings.STREAMING_MAX_PAGE_SIZE),
+        chunk_size or settings.STREAMING_CHUNK_SIZE,
+    )
@@ -0,0 +1,134 @@
+"""
+Routing of the database queries between the primary database and its read-only replicas.
+
+The replicas are snapshots of the primary SQLite database, copied by the ``snapshot_replicas``
+management command and opened read-only (``mode=ro&immutable=1``), one alias ``replica_<n>`` per
+path of ``settings.DATABASE_REPLICAS``. The reads of the public pages are spread over the
+replicas, while the writes, the admin site and the sessions use the primary database.
+
+Classes:
+    - ReplicaRouter: The database router sending the reads to a replica and the writes to the
+      primary database.
+
+Functions:
+    - replica_aliases: Returns the aliases of the replicas.
+    - choose_replica: Returns a random replica, or the primary database without replicas.
+    - read_from: A context manager sending the reads of the block to a database.
+    - use_primary: A context manager sending the reads of the block to the primary database.
+
+Notes:
+    - ``core.middleware.ReplicaPinningMiddleware`` sends all the reads of a request to the same
+      database, so the version of a page and the page are read from the same snapshot. The
+      reads go to the primary database for the admin site, for the requests which may write,
+      and for the requests of a client which wrote in the last ``settings.REPLICA_PIN_SECONDS``,
+      so a client reads its own writes. Outside of a request, each read goes to a random
+      replica.
+    - The replicas are only as recent as their last snapshot. A page invalidated by a change
+      is rendered again from the primary database for ``settings.REPLICA_PIN_SECONDS`` (see
+      ``core.page_cache``), and the command clears the cache of the rendered pages once the
+      replicas are refreshed, for the changes which invalidate no page, e.g. a queryset
+      ``update()``.
+    - The migrations only run on the primary database.
+
+Example:
+    To read from the primary database outside of a request::
+
+        with use_primary():
+            letting = Letting.objects.get(pk=letting_id)
+
+:param random: The module choosing the replica of each read.
+:param contextmanager: A decorator defining the context manager of ``use_primary``.
+:param ContextVar: The variable holding the database read by the current request or thread.
+:param settings: The settings of the project.
+"""
+
+import random
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+from django.conf import settings
+
+PRIMARY_DATABASE = "default"
+
+# The apps whose tables are read and written by the same request: the session of a client and
+# the history of the admin site.
+PRIMARY_APPS = {"admin", "sessions"}
+
+_read_database = ContextVar("read_database", default=None)
+
+
+def replica_aliases():
+    """
+    Return the aliases of the read-only replicas, one per path of ``settings.DATABASE_REPLICAS``.
+
+    :return: The aliases, empty without replicas.
+    :rtype: list of str
+    """
+
+    return [f"replica_{index}" for index in range(len(settings.DATABASE_REPLICAS))]
+
+
+def choose_replica():
+    """
+    Return a random replica, or the primary database without replicas.
+
+    :return: The alias of the database.
+    :rtype: str
+    """
+
+    replicas = replica_aliases()
+    return random.choice(replicas) if replicas else PRIMARY_DATABASE
+
+
+@contextmanager
+def read_from(alias):
+    """
+    Send the reads of the block to a database, but those of the ``PRIMARY_APPS``.
+
+    :param alias: The alias of the database.
+    :type alias: str
+    :return: A context manager.
+    """
+
+    token = _read_database.set(alias)
+    try:
+        yield
+    finally:
+        _read_database.reset(token)
+
+
+def use_primary():
+    """
+    Send the reads of the block to the primary database.
+
+    :return: A context manager.
+    """
+
+    return read_from(PRIMARY_DATABASE)
+
+
+class ReplicaRouter:
+    """
+    Database router sending the reads to a replica and the writes to the primary database.
+
+    Methods:
+        - db_for_read: Returns the database of the current request or block, or a random
+          replica. The ``PRIMARY_APPS`` are read from the primary database.
+        - db_for_write: Returns the primary database.
+        - allow_relation: Allows the relations between the databases, which hold the same data.
+        - allow_migrate: Only allows the migrations on the primary database.
+    """
+
+    def db_for_read(self, model, **hints):
+        if model._meta.app_label in PRIMARY_APPS:
+            return PRIMARY_DATABASE
+        return _read_database.get() or choose_replica()
+
+    def db_for_write(self, model, **hints):
+        return PRIMARY_DATABASE
+
+    def allow_relation(self, obj1, obj2, **hints):
+        return True
+
+    def allow_migrate(self, db, app_label, model_name=None, **hints):
+        return db == PRIMARY_DATABASE
@@ -4,8 +4,7 @@
     * Licensed under SEE_LICENSE (https://github.com/BlackrockDigital/sb-ui-kit-pro/blob/master/LICENSE)
     */
     window.addEventListener('DOMContentLoaded', event => {
-    // Activate feather
-    feather.replace();
+    // The feather icons are inline SVG, see core/templates/icons.
 
     // Enable tooltips globally
     var tooltipTriggerList = [].slice.call(document.querySelectorAll('[data-bs-toggle="tooltip"]'));
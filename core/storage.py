@@ -0,0 +1,520 @@
+"""
+Storage of the static files, building the bundles of the front-end assets.
+
+This module is the ``STATICFILES_STORAGE`` of the project. When ``manage.py collectstatic`` has
+copied the static files to ``STATIC_ROOT``, the storage concatenates and minifies the sources of
+each bundle of ``settings.STATIC_BUNDLES`` into one file, then names every file, bundles
+included, after a hash of its content and compresses it (see
+``whitenoise.storage.CompressedManifestStaticFilesStorage``). WhiteNoise serves the hashed files
+with a far-future ``Cache-Control: immutable`` header: a new version of a file has a new name.
+
+The CSS bundles are purged of the rules which match nothing in the templates of the project and
+the scripts of the bundles, and the critical CSS of the bundles of
+``settings.STATIC_CRITICAL_CSS`` is saved next to them, as ``<bundle>.critical.css`` (see
+``core.css``). The fonts of the faces the CSS bundles use are converted to subsetted WOFF2, and
+the fonts they declared before are removed from ``STATIC_ROOT`` (see ``core.fonts``). The static
+images get resized variants in modern formats, and ``settings.FAVICON`` a set of favicons (see
+``core.images``).
+
+Classes:
+    - BundledStaticFilesStorage: The storage of the static files, building the bundles.
+
+Functions:
+    - bundle_names: Returns the names of the files to load for a bundle.
+    - critical_css: Returns the critical CSS of a bundle, to inline in the pages.
+    - critical_name: Returns the name of the critical CSS of a bundle.
+    - favicon_urls: Returns the favicons of the pages.
+    - minify: Minifies the content of a CSS or JavaScript file.
+    - responsive_image: Returns the variants of a static image, and its size in the pages.
+    - static_version: Returns a digest of the static files the pages link to and inline.
+
+Notes:
+    The bundles only exist in ``STATIC_ROOT``: with ``DEBUG`` on, or with another storage, as in
+    the tests, ``bundle_names`` returns the sources of a bundle, which are loaded one by one. The
+    ``bundle`` template tag of ``core.templatetags.bundles`` loads a bundle either way, as the
+    tags of ``core.templatetags.images`` load an image, or the favicon, without variants. The
+    sources are not purged: a class added to a template is styled before ``collectstatic`` runs
+    again.
+
+    The relative ``url()`` of a CSS source are rewritten for the directory of its bundle. The
+    ``/*! ... */`` comments, which hold the licenses, are kept, and the sources already minified
+    (``.min.css``, ``.min.js``) are copied as they are.
+
+:param hashlib: The module computing the digest of the static files.
+:param posixpath: The module resolving the relative URLs of the CSS sources.
+:param lru_cache: A decorator keeping the critical CSS, the size of the images and the digest of
+    the static files read from the storage.
+:param re: The module finding the URLs of the CSS sources.
+:param rcssmin: The CSS minifier.
+:param rjsmin: The JavaScript minifier.
+:param settings: The settings of the project.
+:param finders: The finders of the static files, reading the images which are not collected.
+:param ContentFile: The file holding the content of a bundle.
+:param staticfiles_storage: The storage of the static files of the project.
+:param absolute_urls: A function rewriting the URLs of the critical CSS for the pages.
+:param project_templates: A function returning the templates of the project.
+:param purge_css: A function removing the unused CSS rules.
+:param words: A function returning the words of the templates and scripts.
+:param optimize_fonts: A function keeping the fonts of the faces a stylesheet uses.
+:param to_woff2: A function converting a font to a subsetted WOFF2 font.
+:param Image: The image class of Pillow.
+:param FAVICONS: The favicons drawn from ``settings.FAVICON``.
+:param MEDIA_TYPES: The media types of the formats of the images.
+:param display_size: A function returning the size of an image in the pages.
+:param encode: A function resizing and encoding an image.
+:param image_format: A function returning the format of a static image.
+:param square_icon: A function drawing a favicon.
+:param variant_name: A function returning the name of a variant of an image.
+:param variant_widths: A function returning the widths of the variants of an image.
+:param CompressedManifestStaticFilesStorage: The storage of WhiteNoise, hashing and compressing
+    the static files.
+"""
+
+import hashlib
+import posixpath
+import re
+from functools import lru_cache
+
+import rcssmin
+import rjsmin
+from django.conf import settings
+from django.contrib.staticfiles import finders
+from django.contrib.staticfiles.storage import staticfiles_storage
+from django.core.files.base import ContentFile
+from PIL import Image
+from whitenoise.storage import CompressedManifestStaticFilesStorage
+
+from core.css import absolute_urls, project_templates, purge_css, words
+from core.fonts import optimize_fonts, to_woff2
+from core.images import (
+    FAVICONS,
+    MEDIA_TYPES,
+    display_size,
+    encode,
+    image_format,
+    square_icon,
+    variant_name,
+    variant_widths,
+)
+
+# The url() of a CSS file, with its quotes.
+CSS_URL = re.compile(r"""url\(\s*(['"]?)([^'")]+)\1\s*\)""")
+
+
+def minify(name, content):
+    """
+    Minify the content of a CSS or JavaScript file, keeping its ``/*! ... */`` comments.
+
+    :param name: The name of the file, whose extension gives its type.
+    :type name: str
+    :param content: The content of the file.
+    :type content: str
+    :return: The minified content, or the content of a file which is already minified.
+    :rtype: str
+    """
+
+    if name.endswith((".min.css", ".min.js")):
+        return content
+    if name.endswith(".css"):
+        return rcssmin.cssmin(content, keep_bang_comments=True)
+    return rjsmin.jsmin(content, keep_bang_comments=True)
+
+
+def _rebase_urls(content, source, bundle):
+    """
+    Rewrite the relative ``url()`` of a CSS source for the directory of its bundle.
+
+    :param content: The content of the source.
+    :type content: str
+    :param source: The name of the source.
+    :type source: str
+    :param bundle: The name of the bundle.
+    :type bundle: str
+    :return: The content with the rewritten URLs.
+    :rtype: str
+    """
+
+    source_dir = posixpath.dirname(source)
+    bundle_dir = posixpath.dirname(bundle)
+    if source_dir == bundle_dir:
+        return content
+
+    def rebase(match):
+        quote, url = match.groups()
+        if url.startswith(("/", "#", "data:", "http:", "https:")):
+            return match.group(0)
+        path = posixpath.normpath(posixpath.join(source_dir, url))
+        return f"url({quote}{posixpath.relpath(path, bundle_dir or '.')}{quote})"
+
+    return CSS_URL.sub(rebase, content)
+
+
+def _collected():
+    """
+    Return whether the static files are served as ``collectstatic`` builds them, with the
+    bundles, the critical CSS and the variants of the images.
+
+    :return: Whether ``DEBUG`` is off, with ``BundledStaticFilesStorage``.
+    :rtype: bool
+    """
+
+    return not settings.DEBUG and isinstance(staticfiles_storage, BundledStaticFilesStorage)
+
+
+def bundle_names(bundle):
+    """
+    Return the names of the static files to load for a bundle.
+
+    :param bundle: The name of the bundle, a key of ``settings.STATIC_BUNDLES``.
+    :type bundle: str
+    :return: The name of the bundle once it is built by ``collectstatic``, its sources otherwise.
+    :rtype: list of str
+    :raises KeyError: If the bundle is unknown.
+    """
+
+    sources = settings.STATIC_BUNDLES[bundle]
+    if not _collected():
+        return list(sources)
+    return [bundle]
+
+
+def critical_name(bundle):
+    """
+    Return the name of the critical CSS of a bundle.
+
+    :param bundle: The name of the CSS bundle, e.g. ``"css/site.css"``.
+    :type bundle: str
+    :return: The name of the critical CSS, e.g. ``"css/site.critical.css"``.
+    :rtype: str
+    """
+
+    root, extension = posixpath.splitext(bundle)
+    return f"{root}.critical{extension}"
+
+
+@lru_cache(maxsize=None)
+def _read_critical_css(stored_name, url):
+    """
+    Read a critical CSS from the storage, with the URLs of its fonts and images made absolute.
+
+    :param stored_name: The hashed name of the critical CSS.
+    :type stored_name: str
+    :param url: The URL of the critical CSS.
+    :type url: str
+    :return: The critical CSS.
+    :rtype: str
+    """
+
+    with staticfiles_storage.open(stored_name) as file:
+        return absolute_urls(file.read().decode("utf-8"), url)
+
+
+def critical_css(bundle):
+    """
+    Return the critical CSS of a bundle, to inline in the pages.
+
+    :param bundle: The name of the CSS bundle.
+    :type bundle: str
+    :return: The critical CSS, or None if the bundle has none or is not built.
+    :rtype: str or None
+    """
+
+    if bundle not in settings.STATIC_CRITICAL_CSS or bundle_names(bundle) != [bundle]:
+        return None
+    name = critical_name(bundle)
+    return _read_critical_css(staticfiles_storage.stored_name(name), staticfiles_storage.url(name))
+
+
+@lru_cache(maxsize=None)
+def _image_size(name, collected):
+    """
+    Read the size of a static image, from ``STATIC_ROOT`` or from its source.
+
+    :param name: The name of the image.
+    :type name: str
+    :param collected: Whether to read the image from ``STATIC_ROOT``.
+    :type collected: bool
+    :return: The width and height of the image.
+    :rtype: tuple of int
+    :raises FileNotFoundError: If the image does not exist.
+    """
+
+    if collected:
+        file = staticfiles_storage.open(name)
+    else:
+        path = finders.find(name)
+        if path is None:
+            raise FileNotFoundError(f"The static image {name} does not exist.")
+        file = open(path, "rb")
+    with file, Image.open(file) as image:
+        return image.size
+
+
+def responsive_image(name):
+    """
+    Return the variants of a static image to load in the pages, and its size in the pages.
+
+    :param name: The name of the image, e.g. ``"assets/img/logo.png"``.
+    :type name: str
+    :return: The ``width`` and ``height`` of the image in the pages, the ``sources``: the media
+        type of each format of ``settings.IMAGE_FORMATS`` and the ``(url, density)`` pairs of its
+        variants, and the ``fallback`` pairs of the format of the image. Without variants, the
+        sources are empty and the fallback is the image itself.
+    :rtype: dict
+    :raises FileNotFoundError: If the image does not exist.
+    """
+
+    collected = _collected()
+    size = _image_size(name, collected)
+    width, height = display_size(size, settings.STATIC_IMAGES.get(name))
+    image = {"width": width, "height": height, "sources": []}
+    own_format = image_format(name)
+    if not collected or own_format is None:
+        image["fallback"] = [(staticfiles_storage.url(name), 1)]
+        return image
+
+    widths = variant_widths(size[0], width, settings.IMAGE_DENSITIES)
+
+    def srcset(format):
+        return [(staticfiles_storage.url(variant_name(name, w, format)), d) for d, w in widths]
+
+    image["sources"] = [
+        (MEDIA_TYPES[format], srcset(format))
+        for format in settings.IMAGE_FORMATS
+        if format != own_format
+    ]
+    image["fallback"] = srcset(own_format)
+    return image
+
+
+def favicon_urls():
+    """
+    Return the favicons of the pages, drawn from ``settings.FAVICON``.
+
+    :return: The ``(rel, size, url)`` of each favicon: the size is None for ``settings.FAVICON``
+        itself, when the favicons are not built.
+    :rtype: list of tuple
+    """
+
+    if not _collected():
+        return [("icon", None, staticfiles_storage.url(settings.FAVICON))]
+    directory = posixpath.dirname(settings.FAVICON)
+    return [
+        (rel, size, staticfiles_storage.url(posixpath.join(directory, filename)))
+        for rel, size, filename in FAVICONS
+    ]
+
+
+@lru_cache(maxsize=None)
+def static_version():
+    """
+    Return a digest of the static files the pages link to and inline: the hashed names of the
+    manifest of ``collectstatic``, and the critical CSS of the bundles.
+
+    The pages name the static files after their hash, so a deployment changing a stylesheet, a
+    font or an image changes the pages too, as their templates are left as they are. The digest
+    is computed once per process, from the manifest the storage loaded.
+
+    :return: The hexadecimal digest, or an empty string if the static files are not collected.
+    :rtype: str
+    """
+
+    if not _collected():
+        return ""
+    digest = hashlib.md5(settings.STATIC_URL.encode())
+    for name, hashed_name in sorted(staticfiles_storage.hashed_files.items()):
+        digest.update(f"{name}\0{hashed_name}\0".encode())
+    for bundle in sorted(settings.STATIC_CRITICAL_CSS):
+        digest.update((critical_css(bundle) or "").encode())
+    return digest.hexdigest()
+
+
+class BundledStaticFilesStorage(CompressedManifestStaticFilesStorage):
+    """
+    Storage of the static files, building the bundles of ``settings.STATIC_BUNDLES`` before the
+    files are hashed and compressed.
+    """
+
+    def build_bundle(self, bundle):
+        """
+        Concatenate and minify the sources of a bundle, and save the bundle.
+
+        :param bundle: The name of the bundle.
+        :type bundle: str
+        :return: None
+        :rtype: None
+        """
+
+        parts = []
+        for source in settings.STATIC_BUNDLES[bundle]:
+            content = self.read(source)
+            if bundle.endswith(".css"):
+                content = _rebase_urls(content, source, bundle)
+            parts.append(minify(source, content).strip())
+        if bundle.endswith(".css"):
+            content = purge_css("\n".join(parts), self.used_words(), settings.CSS_PURGE_SAFELIST)
+            content = self.build_fonts(bundle, content)
+        else:
+            # A semicolon keeps a script without a final one from running into the next.
+            content = ";\n".join(parts)
+        self.replace(bundle, content)
+
+        if bundle in settings.STATIC_CRITICAL_CSS:
+            templates = project_templates()
+            used = words(*(templates[name] for name in settings.STATIC_CRITICAL_CSS[bundle]))
+            self.replace(critical_name(bundle), purge_css(content, used))
+
+    def build_fonts(self, bundle, content):
+        """
+        Convert the fonts of the faces a CSS bundle uses to subsetted WOFF2, and remove the
+        ``@font-face`` rules of the other faces.
+
+        The converted fonts are saved next to their source, e.g. ``Metropolis-Regular.woff2``
+        next to ``Metropolis-Regular.otf``, and the sources are removed by ``post_process``.
+
+        :param bundle: The name of the bundle.
+        :type bundle: str
+        :param content: The content of the bundle.
+        :type content: str
+        :return: The content of the bundle, loading the WOFF2 fonts.
+        :rtype: str
+        """
+
+        directory = posixpath.dirname(bundle)
+
+        def convert(url):
+            name = posixpath.normpath(posixpath.join(directory, url))
+            woff2 = f"{posixpath.splitext(name)[0]}.woff2"
+            with self.open(name) as file:
+                self.replace(woff2, to_woff2(file.read(), settings.FONT_UNICODE_RANGE))
+            self.fonts.add(woff2)
+            return posixpath.relpath(woff2, directory or ".")
+
+        content, sources = optimize_fonts(content, convert, settings.FONT_UNICODE_RANGE)
+        self.removed_fonts.update(
+            posixpath.normpath(posixpath.join(directory, url))
+            for url in sources
+            if not url.startswith(("/", "data:", "http:", "https:"))
+        )
+        return content
+
+    def build_images(self, paths):
+        """
+        Save the variants of the collected images, and the favicons drawn from
+        ``settings.FAVICON``.
+
+        The variants are saved next to their image, e.g. ``logo-70w.avif`` and ``logo-140w.avif``
+        next to ``logo.png`` (see ``core.images.variant_name``), and the favicons next to
+        ``settings.FAVICON``.
+
+        :param paths: The collected files, by name, to which the saved files are added.
+        :type paths: dict
+        :return: None
+        :rtype: None
+        """
+
+        for name in [name for name in paths if image_format(name)]:
+            own_format = image_format(name)
+            with self.open(name) as file, Image.open(file) as image:
+                image.load()
+            width, _ = display_size(image.size, settings.STATIC_IMAGES.get(name))
+            for _, variant_width in variant_widths(image.width, width, settings.IMAGE_DENSITIES):
+                for format in dict.fromkeys([*settings.IMAGE_FORMATS, own_format]):
+                    variant = variant_name(name, variant_width, format)
+                    self.replace(variant, encode(image, variant_width, format))
+                    paths[variant] = (self, variant)
+
+        with self.open(settings.FAVICON) as file, Image.open(file) as image:
+            image.load()
+        for _, size, filename in FAVICONS:
+            name = posixpath.join(posixpath.dirname(settings.FAVICON), filename)
+            self.replace(name, square_icon(image, size))
+            paths[name] = (self, name)
+
+    def read(self, name):
+        """
+        Read a text file of the storage.
+
+        :param name: The name of the file.
+        :type name: str
+        :return: The content of the file.
+        :rtype: str
+        """
+
+        with self.open(name) as file:
+            return file.read().decode("utf-8")
+
+    def replace(self, name, content):
+        """
+        Save a file to the storage, replacing the file of the same name.
+
+        :param name: The name of the file.
+        :type name: str
+        :param content: The content of the file, encoded in UTF-8 if it is text.
+        :type content: str or bytes
+        :return: None
+        :rtype: None
+        """
+
+        if isinstance(content, str):
+            content = content.encode("utf-8")
+        if self.exists(name):
+            self.delete(name)
+        self.save(name, ContentFile(content))
+
+    def used_words(self):
+        """
+        Return the words of the templates of the project and of the scripts of the bundles,
+        which the rules of the CSS bundles must use to be kept.
+
+        :return: The words.
+        :rtype: set of str
+        """
+
+        scripts = [
+            self.read(source)
+            for bundle, sources in settings.STATIC_BUNDLES.items()
+            if bundle.endswith(".js")
+            for source in sources
+        ]
+        return words(*project_templates().values(), *scripts)
+
+    def hashed_name(self, name, content=None, filename=None):
+        """
+        Return the name of a file after the hash of its content, or its name if the file is
+        referenced by a CSS file but does not exist.
+
+        ``css/styles.css`` comes from a theme and references images which are not part of the
+        project. They were not served before either: they are left as they are, instead of
+        failing ``collectstatic``.
+
+        :param name: The name of the file, as referenced.
+        :type name: str
+        :param content: The content of the file, read from the storage if None.
+        :type content: django.core.files.base.File or None
+        :param filename: The name of the file to hash, if it is not ``name``.
+        :type filename: str or None
+        :return: The hashed name.
+        :rtype: str
+        """
+
+        if content is None and not self.exists(filename or name.split("?")[0].split("#")[0]):
+            return name
+        return super().hashed_name(name, content, filename)
+
+    def post_process(self, paths, dry_run=False, **options):
+        if not dry_run:
+            self.fonts, self.removed_fonts = set(), set()
+            for bundle in settings.STATIC_BUNDLES:
+                self.build_bundle(bundle)
+                paths[bundle] = (self, bundle)
+                if bundle in settings.STATIC_CRITICAL_CSS:
+                    paths[critical_name(bundle)] = (self, critical_name(bundle))
+            for name in self.removed_fonts - self.fonts:
+                if self.exists(name):
+                    self.delete(name)
+                paths.pop(name, None)
+            for name in self.fonts:
+                paths[name] = (self, name)
+            self.build_images(paths)
+        yield from super().post_process(paths, dry_run, **options)
@@ -0,0 +1,97 @@
+"""
+Streaming rendering of the index pages.
+
+This module sends an index page in several chunks: the top of the page, up to the list, is
+rendered and sent before the rows are read from the database, then the rows are rendered one by
+one while they are read with ``QuerySet.iterator()``, and the end of the page is sent last. The
+time to the first byte and the memory of the worker do not depend on the number of rows.
+
+Functions:
+    - stream_index: Returns a streaming response rendering an index page.
+
+Notes:
+    The index template renders ``stream_rows`` inside its list and ``stream_footer`` after it
+    when the ``streaming`` context variable is set. The page is rendered once with these
+    placeholders and split around them; each row is rendered with a row template, and the footer
+    holds the pagination links, only known once the rows are read.
+
+    The streaming mode is enabled with ``settings.STREAMING_INDEX_PAGES``.
+
+Example:
+    To stream the lettings index page::
+
+        page = stream_keyset(request, Letting.objects.only("id", "title"), keys=("id",))
+        return stream_index(
+            request, "lettings_index.html", page, "lettings_index_row.html", "letting",
+            "No lettings are available.",
+        )
+
+:param settings: The settings of the project.
+:param StreamingHttpResponse: The response sending the page in chunks.
+:param loader: The module loading the templates.
+:param format_html: A function escaping the message of an empty page.
+:param mark_safe: A function marking the placeholders as safe HTML.
+"""
+
+from django.conf import settings
+from django.http import StreamingHttpResponse
+from django.template import loader
+from django.utils.html import format_html
+from django.utils.safestring import mark_safe
+
+STREAM_ROWS = mark_safe("<!-- stream:rows -->")
+STREAM_FOOTER = mark_safe("<!-- stream:footer -->")
+
+
+def stream_index(
+    request, template_name, page, row_template_name, row_name, empty_message, context=None
+):
+    """
+    Return a streaming response rendering an index page.
+
+    :param request: The HTTP request object.
+    :type request: HttpRequest
+    :param template_name: The index template, rendering the placeholders when streaming.
+    :type template_name: str
+    :param page: The page of rows, read while the response is sent.
+    :type page: StreamingKeysetPage
+    :param row_template_name: The template rendering one row.
+    :type row_template_name: str
+    :param row_name: The name of the row in the context of the row template.
+    :type row_name: str
+    :param empty_message: The message displayed when the page has no row.
+    :type empty_message: str
+    :param context: Additional context for the index template.
+    :type context: dict, optional
+    :return: The streaming response.
+    :rtype: StreamingHttpResponse
+    """
+
+    context = {
+        **(context or {}),
+        "streaming": True,
+        "stream_rows": STREAM_ROWS,
+        "stream_footer": STREAM_FOOTER,
+    }
+    html = loader.render_to_string(template_name, context, request)
+    head, rest = html.split(STREAM_ROWS, 1)
+    middle, tail = rest.split(STREAM_FOOTER, 1)
+    row_template = loader.get_template(row_template_name)
+    flush_rows = settings.STREAMING_FLUSH_ROWS
+
+    def content():
+        yield head
+        rows = []
+        for row in page:
+            rows.append(row_template.render({row_name: row}))
+            if len(rows) >= flush_rows:
+                yield "".join(rows)
+                rows = []
+        yield "".join(rows) + middle
+        if page.object_count:
+            yield loader.render_to_string("pagination.html", {"page": page}, request)
+        else:
+            yield format_html("<p>{}</p>", empty_message)
+        yield tail
+
+    return StreamingHttpResponse(content())
@@ -0,0 +1,78 @@
+"""
+Template tag loading the bundles of the front-end assets.
+
+Functions:
+    - bundle: Returns the tags loading a bundle of ``settings.STATIC_BUNDLES``.
+
+Notes:
+    A CSS bundle is loaded by ``<link rel="stylesheet">`` tags, a JavaScript bundle by
+    ``<script defer>`` tags, which do not block the rendering of the page and run in order once
+    it is parsed. The tags load the bundle built by ``core.storage.BundledStaticFilesStorage``, or
+    its sources one by one when the bundle is not built (see ``core.storage.bundle_names``).
+
+    The critical CSS of a built bundle of ``settings.STATIC_CRITICAL_CSS`` is inlined in a
+    ``<style>`` tag, and the bundle is preloaded, then applied once it is loaded, so it does not
+    block the rendering of the page. Without JavaScript, the ``<noscript>`` tag loads it. The
+    fonts which the critical CSS uses are preloaded (see ``core.fonts.preloaded_fonts``), so they
+    are requested along with the page rather than once the critical CSS is applied.
+
+Example:
+    In a template::
+
+        {% load bundles %}
+        {% bundle "css/site.css" %}
+        {% bundle "js/site.js" %}
+
+:param template: The module of the template library.
+:param static: A function returning the URL of a static file.
+:param format_html: A function escaping the URL of the tags of the critical CSS.
+:param format_html_join: A function escaping the URLs and joining the tags.
+:param mark_safe: A function marking the critical CSS as safe.
+:param bundle_names: A function returning the names of the files of a bundle.
+:param critical_css: A function returning the critical CSS of a bundle.
+:param preloaded_fonts: A function returning the fonts used by the critical CSS.
+"""
+
+from django import template
+from django.templatetags.static import static
+from django.utils.html import format_html, format_html_join
+from django.utils.safestring import mark_safe
+
+from core.fonts import preloaded_fonts
+from core.storage import bundle_names, critical_css
+
+register = template.Library()
+
+# A font used by the critical CSS. Fonts are always fetched in CORS mode, hence crossorigin.
+PRELOADED_FONT = '<link rel="preload" href="{}" as="font" type="font/woff2" crossorigin />\n'
+
+# The critical CSS, and the bundle applied once it is loaded.
+ASYNC_STYLESHEET = (
+    "<style>{css}</style>\n"
+    '<link rel="preload" href="{url}" as="style" '
+    "onload=\"this.onload=null;this.rel='stylesheet'\" />\n"
+    '<noscript><link rel="stylesheet" href="{url}" /></noscript>'
+)
+
+
+@register.simple_tag
+def bundle(name):
+    """
+    Return the tags loading a bundle.
+
+    :param name: The name of the bundle, a key of ``settings.STATIC_BUNDLES``.
+    :type name: str
+    :return: The ``<style>``, ``<link>`` or ``<script>`` tags.
+    :rtype: django.utils.safestring.SafeString
+    :raises KeyError: If the bundle is unknown.
+    """
+
+    if name.endswith(".css"):
+        css = critical_css(name)
+        if css is not None:
+            fonts = format_html_join("", PRELOADED_FONT, ((url,) for url in preloaded_fonts(css)))
+            return fonts + format_html(ASYNC_STYLESHEET, css=mark_safe(css), url=static(name))
+        tag = '<link rel="stylesheet" href="{}" />'
+    else:
+        tag = '<script defer src="{}"></script>'
+    return format_html_join("\n", tag, ((static(file),) for file in bundle_names(name)))
@@ -0,0 +1,102 @@
+"""
+Template tags loading the static images and the favicons.
+
+Functions:
+    - picture: Returns the ``<picture>`` tag of a static image, with its variants.
+    - favicons: Returns the ``<link>`` tags of the favicons of the pages.
+
+Notes:
+    The ``<picture>`` tag lists a ``<source>`` per format of ``settings.IMAGE_FORMATS``, and the
+    ``<img>`` tag the variants in the format of the image, each with a ``srcset`` of the pixel
+    densities: the browser downloads one file, of the first format it supports, at the density
+    of its screen. The ``width`` and ``height`` of the ``<img>`` tag reserve the room of the
+    image before it is loaded, so the page does not move.
+
+    When the variants are not built (see ``core.storage.responsive_image``), the ``<img>`` tag
+    loads the image itself, and the favicon is ``settings.FAVICON``.
+
+Example:
+    In a template::
+
+        {% load images %}
+        {% favicons %}
+        {% picture "assets/img/logo.png" alt="Logo" class="img-responsive" %}
+
+:param template: The module of the template library.
+:param format_html: A function escaping the attributes of the tags.
+:param format_html_join: A function escaping and joining the tags.
+:param favicon_urls: A function returning the favicons of the pages.
+:param responsive_image: A function returning the variants of a static image.
+"""
+
+from django import template
+from django.utils.html import format_html, format_html_join
+
+from core.storage import favicon_urls, responsive_image
+
+register = template.Library()
+
+
+def _srcset(candidates):
+    """
+    Return the ``srcset`` attribute of the variants of an image.
+
+    :param candidates: The ``(url, density)`` pairs of the variants.
+    :type candidates: list of tuple
+    :return: The attribute, e.g. ``"logo-70w.avif 1x, logo-140w.avif 2x"``.
+    :rtype: str
+    """
+
+    return ", ".join(f"{url} {density}x" for url, density in candidates)
+
+
+@register.simple_tag
+def picture(name, **attributes):
+    """
+    Return the ``<picture>`` tag of a static image, loading its variants.
+
+    :param name: The name of the image, e.g. ``"assets/img/logo.png"``.
+    :type name: str
+    :param attributes: The attributes of the ``<img>`` tag, e.g. ``alt`` and ``class``.
+    :type attributes: str
+    :return: The ``<picture>`` tag, or the ``<img>`` tag without variants.
+    :rtype: django.utils.safestring.SafeString
+    :raises FileNotFoundError: If the image does not exist.
+    """
+
+    image = responsive_image(name)
+    img = format_html(
+        '<img src="{}"{} width="{}" height="{}"{} />',
+        image["fallback"][0][0],
+        format_html(' srcset="{}"', _srcset(image["fallback"])) if image["sources"] else "",
+        image["width"],
+        image["height"],
+        format_html_join("", ' {}="{}"', attributes.items()),
+    )
+    if not image["sources"]:
+        return img
+    sources = format_html_join(
+        "",
+        '<source type="{}" srcset="{}" />',
+        ((media_type, _srcset(candidates)) for media_type, candidates in image["sources"]),
+    )
+    return format_html("<picture>{}{}</picture>", sources, img)
+
+
+@register.simple_tag
+def favicons():
+    """
+    Return the ``<link>`` tags of the favicons of the pages.
+
+    :return: The tags.
+    :rtype: django.utils.safestring.SafeString
+    """
+
+    return format_html_join(
+        "\n",
+        '<link rel="{}"{} href="{}" />',
+        (
+            (rel, format_html(' sizes="{}x{}"', size, size) if size else "", url)
+            for rel, size, url in favicon_urls()
+        ),
+    )
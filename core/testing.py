@@ -0,0 +1,130 @@
+"""
+Testing helpers shared by the test suites of the apps.
+
+This module defines a mixin to assert that a view stays within its query budget, i.e. that it
+runs a fixed number of SQL queries whatever the number of rows in the database, and that the
+versions of the pages (see ``core.conditional``) are read without scanning a table.
+
+Classes:
+    - QueryBudgetMixin: A mixin for :class:`django.test.TestCase` which seeds the database with a
+      growing number of rows and counts the queries issued by the views.
+
+Usage:
+    The test case defines ``seed_rows`` and lists the views to check::
+
+        class LettingQueryBudgetTestCase(QueryBudgetMixin, TestCase):
+            def seed_rows(self, count):
+                ...  # create rows until the table holds ``count`` rows
+
+            def test_query_budgets(self):
+                self.assertViewsWithinBudget(
+                    [("index", index, dict, QUERY_BUDGETS["index"])]
+                )
+
+            def test_versions(self):
+                self.assertVersionsReadWithoutScan([("index", index_version, dict)])
+
+:param cache: The default cache, cleared before each view is called.
+:param connection: The default database connection.
+:param RequestFactory: A class provided by Django for creating mock request objects.
+:param CaptureQueriesContext: A context manager recording the queries run on a connection.
+"""
+
+from django.core.cache import cache
+from django.db import connection
+from django.test import RequestFactory
+from django.test.utils import CaptureQueriesContext
+
+
+class QueryBudgetMixin:
+    """
+    Mixin asserting that views run a bounded number of SQL queries.
+
+    For every row count in ``ROW_COUNTS`` the database is seeded up to that count, then each view
+    is called and the number of queries it runs (including the rendering of the template) is
+    compared with its budget. The cache is cleared before each call, so the budget applies to
+    pages which are not cached yet.
+
+    Methods:
+        - seed_rows: Method to create rows until the database holds ``count`` rows. Must be
+          implemented by the test case.
+        - assertViewsWithinBudget: Method to assert that views stay within their budget.
+        - assertVersionsReadWithoutScan: Method to assert that the versions of the pages are read
+          by one query which searches an index instead of scanning a table.
+
+    :param ROW_COUNTS: The number of rows the views are checked against, in increasing order.
+    :type ROW_COUNTS: tuple of int
+    """
+
+    ROW_COUNTS = (10, 1_000, 100_000)
+
+    def seed_rows(self, count):
+        """
+        Create rows until the database holds ``count`` rows.
+
+        :param count: The number of rows the database must hold.
+        :type count: int
+        :raises NotImplementedError: If the test case does not implement it.
+        """
+
+        raise NotImplementedError("Test cases must implement seed_rows().")
+
+    def assertViewsWithinBudget(self, views):
+        """
+        Assert that each view runs at most its budget of queries, for each row count.
+
+        The arguments of a view are given as a callable so they can depend on the seeded rows.
+
+        :param views: The views to check, as ``(name, view, kwargs_factory, budget)`` tuples.
+        :type views: list of tuple
+        :raises AssertionError: If a view runs more queries than its budget.
+        """
+
+        for count in self.ROW_COUNTS:
+            self.seed_rows(count)
+            for name, view, kwargs_factory, budget in views:
+                with self.subTest(view=name, rows=count):
+                    kwargs = kwargs_factory()
+                    request = RequestFactory().get("/")
+                    cache.clear()
+                    with CaptureQueriesContext(connection) as queries:
+                        response = view(request, **kwargs)
+                    self.assertEqual(response.status_code, 200)
+                    self.assertLessEqual(
+                        len(queries),
+                        budget,
+                        f"View {name!r} ran {len(queries)} queries with {count} rows, "
+                        f"its budget is {budget}.",
+                    )
+
+    def assertVersionsReadWithoutScan(self, versions):
+        """
+        Assert that each version function runs one query searching indexes, for each row count.
+
+        The time of a query scanning a table, e.g. an aggregate over the rows, grows with the
+        number of rows even when the number of queries does not. The plan of the query is read
+        with ``EXPLAIN QUERY PLAN`` and every table must be read by a ``SEARCH`` on an index or
+        the primary key, so the query reads a bounded number of rows.
+
+        :param versions: The version functions to check, as ``(name, get_version,
+            kwargs_factory)`` tuples.
+        :type versions: list of tuple
+        :raises AssertionError: If a version function runs several queries or scans a table.
+        """
+
+        for count in self.ROW_COUNTS:
+            self.seed_rows(count)
+            for name, get_version, kwargs_factory in versions:
+                with self.subTest(version=name, rows=count):
+                    kwargs = kwargs_factory()
+                    request = RequestFactory().get("/")
+                    with CaptureQueriesContext(connection) as queries:
+                        self.assertIsNotNone(get_version(request, **kwargs))
+                    self.assertEqual(len(queries), 1)
+                    with connection.cursor() as cursor:
+                        cursor.execute(f"EXPLAIN QUERY PLAN {queries[0]['sql']}")
+                        steps = [row[-1] for row in cursor.fetchall()]
+                    scans = [step for step in steps if step.startswith("SCAN")]
+                    self.assertEqual(
+                        scans, [], f"Version {name!r} scans a table with {count} rows: {steps}"
+                    )
@@ -7,20 +7,261 @@ the application.
 
 Classes:
     - CoreViewTestCase (TestCase): A subclass of TestCase to test the index view.
+    - ValidateBatchTestCase (SimpleTestCase): A test case for the validation of batches of rows.
+    - ExportCatalogTestCase (TestCase): A test case for the export of the catalog.
+    - ExportMemoryTestCase (SimpleTestCase): A test case for the memory used by the export.
+    - SqliteBackendTestCase (SimpleTestCase): A test case for the tuned SQLite backend.
+    - FileBasedCacheTestCase (SimpleTestCase): A test case for the file based cache backend.
+    - ReplicaRoutingTestCase (TransactionTestCase): A test case for the routing of the reads to a
+      read-only replica.
+    - ASGIHandlerTestCase (TransactionTestCase): A test case for the ASGI handler.
+    - ServerProfileTestCase (TestCase): A test case for the server profile of gunicorn and the
+      warmup of its workers.
+    - LoadHarnessTestCase (SimpleTestCase): A test case for the routes of the load-testing
+      harness.
+    - SeedDataTestCase (TestCase): A test case for the ``seed_data`` command.
+    - ServerTimingTestCase (TestCase): A test case for the timings of the requests.
+    - MetricsTestCase (TestCase): A test case for the Prometheus metrics of the requests.
+    - TraceSamplingTestCase (SimpleTestCase): A test case for the sampling of the Sentry traces.
+    - StaticBundlesTestCase (SimpleTestCase): A test case for the bundles of the front-end
+      assets.
+    - CompressionTestCase (TestCase): A test case for the compression of the responses.
+    - TemplateMinifyTestCase (TestCase): A test case for the minification of the templates.
 
 Methods:
     - CoreViewTestCase.test_core_index_view: Method to test the index view of the project.
     - CoreViewTestCase.test_core_trigger_error_view: Method to test a trigger_error for Sentry.
+    - CoreViewTestCase.test_core_index_not_modified: Method to test the ``304 Not Modified``
+      answer of the index view.
+    - ValidateBatchTestCase.test_valid_rows_are_cleaned: Method to test that valid rows are
+      converted.
+    - ValidateBatchTestCase.test_invalid_rows_are_reported: Method to test the errors of the
+      invalid rows.
+    - ExportCatalogTestCase.setUpTestData: Method to set up test data before running tests.
+    - ExportCatalogTestCase.test_export_formats: Method to test the exported rows in each format.
+    - ExportCatalogTestCase.test_export_view_requires_staff: Method to test that the export view
+      is only served to staff members.
+    - ExportCatalogTestCase.test_export_view_streams: Method to test the streamed export.
+    - ExportMemoryTestCase.test_peak_rss_is_flat: Method to test that the peak resident set size
+      of the export does not grow with the number of rows.
+    - SqliteBackendTestCase.connect: Method to open a connection to a new database file.
+    - SqliteBackendTestCase.test_pragmas_are_applied: Method to test that the PRAGMAs are applied
+      to each new connection.
+    - SqliteBackendTestCase.test_pragmas_can_be_disabled: Method to test the backend without
+      PRAGMAs.
+    - SqliteBackendTestCase.test_transactions_take_the_write_lock: Method to test that the
+      transactions take the write lock when they begin.
+    - SqliteBackendTestCase.test_committed_database_uses_wal: Method to test that the database of
+      the repository is stored in WAL mode.
+    - FileBasedCacheTestCase.make_cache: Method to create the cache configured by the settings in
+      a temporary directory.
+    - FileBasedCacheTestCase.test_cache_holds_more_than_300_pages: Method to test that the cache
+      keeps more pages than the default ``MAX_ENTRIES`` of Django.
+    - FileBasedCacheTestCase.test_entries_are_culled: Method to test that the cache holds at most
+      ``MAX_ENTRIES`` entries.
+    - FileBasedCacheTestCase.test_directory_is_listed_once_per_culling: Method to test that the
+      writes do not list the cache directory.
+    - ReplicaRoutingTestCase.setUp: Method to create a primary database and its replica.
+    - ReplicaRoutingTestCase.test_public_pages_read_the_replica: Method to test that the public
+      pages read the last snapshot of the replica.
+    - ReplicaRoutingTestCase.test_invalidated_page_reads_the_primary: Method to test that a page
+      invalidated by a change is rendered from the primary database until the next snapshot.
+    - ReplicaRoutingTestCase.test_open_connections_read_the_new_snapshot: Method to test that a
+      connection opened before a snapshot reads it from the next request.
+    - ReplicaRoutingTestCase.test_writers_read_their_writes: Method to test that a client which
+      wrote reads from the primary database.
+    - ReplicaRoutingTestCase.test_admin_and_writes_use_the_primary: Method to test that the admin
+      site and the writes use the primary database.
+    - ReplicaRoutingTestCase.test_replica_is_read_only: Method to test that the replica can not be
+      written.
+    - ASGIHandlerTestCase.setUp: Method to create a letting and the ASGI handler.
+    - ASGIHandlerTestCase.request: Method to send a request to the ASGI handler.
+    - ASGIHandlerTestCase.test_pages_are_served: Method to test a page served over ASGI.
+    - ASGIHandlerTestCase.test_streaming_responses_read_the_database: Method to test that the
+      streaming responses query the database while they are sent.
+    - ASGIHandlerTestCase.test_connections_are_opened_in_each_thread: Method to test that the
+      warmup opens the database connections of each thread of the pool.
+    - ASGIHandlerTestCase.test_requests_run_in_the_pool: Method to test that the requests run in
+      the bounded pool of threads.
+    - ServerProfileTestCase.load_config: Method to load the server profile with environment
+      variables.
+    - ServerProfileTestCase.test_workers_are_sized_from_the_cpus: Method to test the default
+      number of workers of each mode.
+    - ServerProfileTestCase.test_profile_is_configured_by_the_environment: Method to test the
+      environment variables of the server profile.
+    - ServerProfileTestCase.test_warmup: Method to test that the warmup loads the templates, the
+      URL patterns and the database connections.
+    - LoadHarnessTestCase.test_every_route_is_loaded: Method to test that the harness loads every
+      route of the project.
+    - SeedDataTestCase.seed: Method to run the ``seed_data`` command.
+    - SeedDataTestCase.test_rows_are_valid: Method to test that the generated rows are valid and
+      searchable.
+    - SeedDataTestCase.test_rows_are_deterministic: Method to test that a seed generates the same
+      rows.
+    - SeedDataTestCase.test_cities_are_skewed: Method to test the distribution of the cities.
+    - SeedDataTestCase.test_invalid_options: Method to test that invalid options are rejected.
+    - ServerTimingTestCase.setUpTestData: Method to set up test data before running tests.
+    - ServerTimingTestCase.setUp: Method to empty the page cache.
+    - ServerTimingTestCase.test_timings_are_sent: Method to test the ``Server-Timing`` header.
+    - ServerTimingTestCase.test_timings_are_logged: Method to test the logged timings and URL
+      name.
+    - ServerTimingTestCase.test_streamed_timings_are_logged: Method to test the logged timings
+      of a streamed page.
+    - ServerTimingTestCase.test_header_can_be_disabled: Method to test the ``SERVER_TIMING``
+      setting.
+    - MetricsTestCase.setUpTestData: Method to set up test data before running tests.
+    - MetricsTestCase.setUp: Method to empty the page cache.
+    - MetricsTestCase.test_requests_are_measured: Method to test the metrics of the requests and
+      of the page cache.
+    - MetricsTestCase.test_streamed_requests_are_measured: Method to test the metrics of a
+      streamed page.
+    - MetricsTestCase.test_workers_are_added_up: Method to test that ``/metrics`` serves the
+      metrics of all the worker processes.
+    - MetricsTestCase.test_server_profile_collects_the_workers: Method to test the directory of
+      the metrics of the server profile.
+    - MetricsTestCase.test_metrics_are_refused_to_others: Method to test that ``/metrics`` is
+      only served to the allowed networks and to the holders of the token.
+    - TraceSamplingTestCase.sampler: Method to build a sampling policy.
+    - TraceSamplingTestCase.test_requests_are_sampled_by_route: Method to test the rates of the
+      URL patterns and the ignored paths.
+    - TraceSamplingTestCase.test_parent_decision_is_followed: Method to test the distributed
+      traces.
+    - TraceSamplingTestCase.test_slow_and_failing_routes_are_traced: Method to test the full-rate
+      tracing of the URL patterns after a slow or failing request.
+    - TraceSamplingTestCase.test_budget_caps_the_traces: Method to test the traces per second.
+    - TraceSamplingTestCase.test_middleware_reports_the_requests: Method to test that the
+      middleware reports the slow requests to the policy of the settings.
+    - StaticBundlesTestCase.setUpClass: Method to collect the static files, with the bundles.
+    - StaticBundlesTestCase.read: Method to read a collected static file.
+    - StaticBundlesTestCase.test_bundles_are_hashed: Method to test that the bundles are named
+      after a hash of their content and compressed.
+    - StaticBundlesTestCase.test_bundles_are_minified: Method to test the content of the bundles.
+    - StaticBundlesTestCase.test_tag_loads_the_bundle: Method to test the tags loading a bundle
+      once it is built.
+    - StaticBundlesTestCase.test_tag_inlines_the_critical_css: Method to test the critical CSS
+      inlined in the pages, the fonts they preload, and the bundle loaded without blocking their
+      rendering.
+    - StaticBundlesTestCase.test_unused_rules_are_purged: Method to test the purge of the rules
+      matching nothing in the templates and scripts.
+    - StaticBundlesTestCase.test_fonts_are_converted: Method to test the WOFF2 fonts of the faces
+      the bundles use, and the removal of the other fonts.
+    - StaticBundlesTestCase.test_used_faces_are_kept: Method to test the choice of the
+      ``@font-face`` rules kept in a stylesheet.
+    - StaticBundlesTestCase.test_images_have_variants: Method to test the variants of the static
+      images and the favicons.
+    - StaticBundlesTestCase.test_picture_tag_loads_the_variants: Method to test the tags loading
+      the variants of an image and the favicons.
+    - StaticBundlesTestCase.test_picture_tag_loads_the_image: Method to test the tags loading an
+      image without variants.
+    - StaticBundlesTestCase.test_tag_loads_the_sources: Method to test the tags loading the
+      sources of a bundle when it is not built.
+    - StaticBundlesTestCase.test_pages_are_self_hosted: Method to test that the pages load no
+      third-party asset.
+    - StaticBundlesTestCase.test_static_files_version_the_pages: Method to test that the ETag of
+      the pages covers the static files.
+    - CompressionTestCase.setUpTestData: Method to set up test data before running tests.
+    - CompressionTestCase.setUp: Method to empty the page cache.
+    - CompressionTestCase.test_encoding_is_negotiated: Method to test the encoding chosen from
+      the ``Accept-Encoding`` header.
+    - CompressionTestCase.test_pages_are_compressed: Method to test the pages compressed with
+      Brotli and gzip.
+    - CompressionTestCase.test_responses_left_as_they_are: Method to test the responses which
+      are not compressed.
+    - CompressionTestCase.test_streaming_responses_are_compressed: Method to test that the chunks
+      of a streaming page are compressed one by one.
+    - CompressionTestCase.test_cached_pages_are_compressed_once: Method to test the cache of the
+      compressed pages.
+    - CompressionTestCase.test_pages_holding_secrets_are_not_compressed: Method to test that the
+      admin pages and the responses using the CSRF token are sent uncompressed.
+    - TemplateMinifyTestCase.test_html_is_minified: Method to test the minification of the source
+      of a template.
+    - TemplateMinifyTestCase.test_pages_are_rendered_alike: Method to test that the minified
+      templates render the same pages.
+    - TemplateMinifyTestCase.test_templates_are_cached: Method to test that the templates are
+      minified and compiled once.
+    - TemplateMinifyTestCase.test_package_templates_are_not_minified: Method to test that the
+      templates of the installed packages, such as the password reset email, are not minified.
 
+:param call_command: A function provided by Django to run a management command.
+:param SimpleTestCase: A subclass of Django's TestCase class for tests without a database.
 :param TestCase: A subclass of Django's TestCase class for writing unit tests.
+:param TransactionTestCase: A subclass of Django's TestCase class committing the changes, so
+    they can be copied to a replica or read by the threads of the ASGI handler.
+:param ApplicationCommunicator: A class provided by asgiref for sending messages to an ASGI
+    application.
 :param RequestFactory: A class provided by Django for creating mock request objects.
 :param reverse: A function provided by Django for generating URLs based on view names.
+:param override_settings: A decorator provided by Django to change settings in tests.
+:param Context: A class provided by Django for the context of a template.
+:param Template: A class provided by Django for compiling a template.
 """
 
-from django.test import TestCase, RequestFactory
-from django.urls import reverse
+import asyncio
+import gzip
+import importlib
+import json
+import os
+import random
+import runpy
+import shutil
+import sqlite3
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+import unittest
+import zlib
+from io import StringIO
+from unittest import mock
 
+import brotli
+from asgiref.testing import ApplicationCommunicator
+from django.conf import settings
+from prometheus_client import REGISTRY
+from django.contrib.auth import get_user_model
+from django.contrib.staticfiles.storage import staticfiles_storage
+from django.core.cache import cache
+from django.core.management import CommandError, call_command
+from django.db import OperationalError, close_old_connections, connection, connections, router
+from django.db.models import Count
+from django.http import HttpResponse
+from django.middleware.csrf import get_token
+from django.template import Context, Template, engines
+from django.test import (
+    RequestFactory,
+    SimpleTestCase,
+    TestCase,
+    TransactionTestCase,
+    override_settings,
+)
+from django.urls import URLResolver, get_resolver, resolve, reverse
+from PIL import Image
+
+from benchmarks.export_catalog import run as run_export_benchmark
+from benchmarks.load import EXCLUDED_ROUTES, ROUTES
+from core.asgi import ASGIHandler
+from core.backends.filebased import FileBasedCache
+from core.backends.sqlite3.base import DatabaseWrapper
+from core.conditional import versioned_page
+from core.compression import CompressionMiddleware, accepted_encoding, compress
+from core.export import export_catalog
+from core.loaders import minify_html
+from core.middleware import REPLICA_PIN_COOKIE, ReplicaPinningMiddleware
+from core.css import purge_css, words
+from core.fonts import nearest_weight, optimize_fonts, preloaded_fonts, used_faces
+from core.images import display_size, variant_widths
+from core.storage import minify, static_version
+from core.timing import RequestTimings
+from core.tracing import TraceSampler, trace_sampler
+from core.validation import validate_batch
 from core.views import index, trigger_error
+from core.warmup import compile_templates, open_connections, resolve_urls
+from lettings.models import Address, Letting
+from lettings.search import search_lettings
+from oc_lettings_site import gunicorn_config
+from oc_lettings_site.settings import BASE_DIR
+from profiles.models import Profile
 
 
 class CoreViewTestCase(TestCase):
@@ -32,6 +273,7 @@ class CoreViewTestCase(TestCase):
     Methods:
         - test_core_index_view: Method to test the behavior of the index view.
         - test_core_trigger_error_view: Method to test the behavior of the trigger_error view.
+        - test_core_index_not_modified: Method to test the conditional requests of the index view.
     """
 
     def test_core_index_view(self):
@@ -68,3 +310,1808 @@ class CoreViewTestCase(TestCase):
         request = RequestFactory().get(reverse("core:trigger_error_sentry"))
         with self.assertRaises(ZeroDivisionError):
             trigger_error(request)
+
+    def test_core_index_not_modified(self):
+        """
+        Test the conditional requests of the index view in the core app.
+
+        The homepage does not depend on the database: a request with its ETag is answered with
+        ``304 Not Modified`` without any query.
+
+        :return: None
+        :rtype: None
+        """
+
+        response = self.client.get(reverse("core:index"))
+        with self.assertNumQueries(0):
+            not_modified = self.client.get(
+                reverse("core:index"), HTTP_IF_NONE_MATCH=response["ETag"]
+            )
+
+        self.assertEqual(not_modified.status_code, 304)
+
+
+class ValidateBatchTestCase(SimpleTestCase):
+    """
+    Test case for ``core.validation.validate_batch``.
+
+    Methods:
+        - test_valid_rows_are_cleaned: Method to test the conversion of valid rows.
+        - test_invalid_rows_are_reported: Method to test the error messages of invalid rows.
+    """
+
+    fields = [Address._meta.get_field(name) for name in ("number", "state")]
+
+    def test_valid_rows_are_cleaned(self):
+        """
+        Test that the values of valid rows are converted by their field.
+
+        :return: None
+        :rtype: None
+        """
+
+        columns, errors = validate_batch(
+            [{"number": "12", "state": "CA"}, {"number": 7, "state": "NY"}], self.fields
+        )
+        self.assertEqual(errors, {})
+        self.assertEqual(columns, {"number": [12, 7], "state": ["CA", "NY"]})
+
+    def test_invalid_rows_are_reported(self):
+        """
+        Test that each invalid row is reported with the fields in error, and the others cleaned.
+
+        :return: None
+        :rtype: None
+        """
+
+        rows = [
+            {"number": "12", "state": "CA"},
+            {"number": "10000", "state": "C"},
+            {"number": "-1", "state": ""},
+            {"number": "twelve"},
+        ]
+        columns, errors = validate_batch(rows, self.fields)
+        self.assertEqual(sorted(errors), [1, 2, 3])
+        self.assertEqual(len(errors[1]), 2)
+        self.assertTrue(errors[1][0].startswith("number: "))
+        self.assertTrue(errors[1][1].startswith("state: "))
+        self.assertEqual(len(errors[2]), 2)
+        self.assertEqual(len(errors[3]), 2)
+        self.assertEqual(columns["number"], [12, None, None, None])
+        self.assertEqual(columns["state"], ["CA", None, None, None])
+
+
+class ExportCatalogTestCase(TestCase):
+    """
+    Test case for the export of the catalog, by ``core.export`` and the ``export`` view.
+    """
+
+    @classmethod
+    def setUpTestData(cls):
+        """
+        Create three :class:`lettings.Letting` and a staff :class:`User` with a profile.
+        """
+
+        for number in (1, 2, 3):
+            address = Address.objects.create(
+                number=number,
+                street="Export Street",
+                city="Export City",
+                state="EC",
+                zip_code=12345,
+                country_iso_code="USA",
+            )
+            Letting.objects.create(title=f"House {number}", address=address)
+        cls.staff = get_user_model().objects.create_user(
+            username="staff", password="Password", email="staff@mail.com", is_staff=True
+        )
+        Profile.objects.create(user=cls.staff, favorite_city="Export City")
+
+    def test_export_formats(self):
+        """
+        Test that every row is exported in each format, across several chunks.
+
+        :return: None
+        :rtype: None
+        """
+
+        csv_lines = "".join(export_catalog("lettings", "csv", chunk_size=2)).splitlines()
+        self.assertEqual(
+            csv_lines[0], "id,title,number,street,city,state,zip_code,country_iso_code"
+        )
+        self.assertEqual(len(csv_lines), 4)
+        self.assertTrue(csv_lines[3].endswith(",House 3,3,Export Street,Export City,EC,12345,USA"))
+
+        rows = [
+            json.loads(line)
+            for line in "".join(export_catalog("lettings", "ndjson", chunk_size=2)).splitlines()
+        ]
+        self.assertEqual([row["title"] for row in rows], ["House 1", "House 2", "House 3"])
+        self.assertEqual(rows[0]["address"]["city"], "Export City")
+
+        lines = "".join(export_catalog("lettings", "columns", chunk_size=2)).splitlines()
+        header, groups = json.loads(lines[0]), [json.loads(line) for line in lines[1:]]
+        self.assertEqual(header["format"], "columns")
+        self.assertEqual([group["rows"] for group in groups], [2, 1])
+        self.assertEqual(groups[1]["columns"]["title"], ["House 3"])
+
+        stdout = StringIO()
+        call_command("export_catalog", "profiles", format="ndjson", stdout=stdout)
+        self.assertEqual(
+            json.loads(stdout.getvalue()),
+            {
+                "username": "staff",
+                "first_name": "",
+                "last_name": "",
+                "favorite_city": "Export City",
+                "email": "staff@mail.com",
+            },
+        )
+
+    def test_export_view_requires_staff(self):
+        """
+        Test that anonymous users and users who are not staff members are redirected.
+
+        :return: None
+        :rtype: None
+        """
+
+        url = reverse("core:export", kwargs={"catalog": "lettings", "file_format": "csv"})
+        self.assertEqual(self.client.get(url).status_code, 302)
+
+        get_user_model().objects.create_user(username="visitor", password="Password")
+        self.client.login(username="visitor", password="Password")
+        self.assertEqual(self.client.get(url).status_code, 302)
+
+    def test_export_view_streams(self):
+        """
+        Test that the export is streamed as an attachment, and that unknown formats are 404.
+
+        :return: None
+        :rtype: None
+        """
+
+        self.client.force_login(self.staff)
+        response = self.client.get(
+            reverse("core:export", kwargs={"catalog": "lettings", "file_format": "csv"})
+        )
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(response.streaming)
+        self.assertEqual(response["Content-Disposition"], 'attachment; filename="lettings.csv"')
+        content = b"".join(response.streaming_content).decode()
+        self.assertEqual(len(content.splitlines()), 4)
+
+        response = self.client.get(
+            reverse("core:export", kwargs={"catalog": "lettings", "file_format": "xml"})
+        )
+        self.assertEqual(response.status_code, 404)
+
+
+@unittest.skipUnless(os.path.exists("/proc/self/status"), "Requires /proc to read the RSS.")
+class ExportMemoryTestCase(SimpleTestCase):
+    """
+    Test case for the memory used by the export of the catalog.
+
+    The export runs in a fresh process for each number of rows (see
+    ``benchmarks/export_catalog.py``). The largest number of rows is 100 000 by default and can
+    be raised with the ``EXPORT_MEMORY_MAX_ROWS`` environment variable, e.g. to 1 000 000.
+    """
+
+    def test_peak_rss_is_flat(self):
+        """
+        Test that the peak RSS of the export grows by less than 4 MiB from 10 000 rows to the
+        largest number of rows.
+
+        :return: None
+        :rtype: None
+        """
+
+        max_rows = int(os.environ.get("EXPORT_MEMORY_MAX_ROWS", 100_000))
+        for file_format in ("csv", "columns"):
+            with self.subTest(format=file_format):
+                small = run_export_benchmark(10_000, "lettings", file_format)
+                large = run_export_benchmark(max_rows, "lettings", file_format)
+                self.assertLess(
+                    large["rss_growth_kib"] - small["rss_growth_kib"],
+                    4 * 1024,
+                    f"The peak RSS grew by {small['rss_growth_kib']} KiB with 10000 rows and by "
+                    f"{large['rss_growth_kib']} KiB with {max_rows} rows.",
+                )
+
+
+class SqliteBackendTestCase(SimpleTestCase):
+    """
+    Test case for the SQLite backend of ``core.backends.sqlite3``.
+    """
+
+    def connect(self):
+        """
+        Open a connection to a new database file with the tuned backend.
+
+        :return: The database wrapper, closed and its file removed at the end of the test.
+        :rtype: DatabaseWrapper
+        """
+
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        settings_dict = {
+            **connection.settings_dict,
+            "NAME": os.path.join(directory.name, "tuned.sqlite3"),
+        }
+        wrapper = DatabaseWrapper(settings_dict, alias="tuned")
+        self.addCleanup(wrapper.close)
+        wrapper.ensure_connection()
+        return wrapper
+
+    def pragma(self, wrapper, name):
+        """
+        Return the value of a PRAGMA of a connection.
+
+        :param wrapper: The database wrapper.
+        :type wrapper: DatabaseWrapper
+        :param name: The name of the PRAGMA.
+        :type name: str
+        :return: The value.
+        """
+
+        return wrapper.connection.execute(f"PRAGMA {name}").fetchone()[0]
+
+    @override_settings(
+        SQLITE_PRAGMAS={
+            "journal_mode": "wal",
+            "synchronous": "normal",
+            "busy_timeout": 1234,
+            "cache_size": -4000,
+            "mmap_size": 2**20,
+            "temp_store": "memory",
+        }
+    )
+    def test_pragmas_are_applied(self):
+        """
+        Test that the PRAGMAs of ``settings.SQLITE_PRAGMAS`` are applied to a new connection.
+        """
+
+        wrapper = self.connect()
+        self.assertEqual(self.pragma(wrapper, "journal_mode"), "wal")
+        self.assertEqual(self.pragma(wrapper, "synchronous"), 1)
+        self.assertEqual(self.pragma(wrapper, "busy_timeout"), 1234)
+        self.assertEqual(self.pragma(wrapper, "cache_size"), -4000)
+        self.assertEqual(self.pragma(wrapper, "mmap_size"), 2**20)
+        self.assertEqual(self.pragma(wrapper, "temp_store"), 2)
+        self.assertEqual(self.pragma(wrapper, "foreign_keys"), 1)
+
+    @override_settings(SQLITE_PRAGMAS={})
+    def test_pragmas_can_be_disabled(self):
+        """
+        Test that the defaults of SQLite are kept without PRAGMAs.
+        """
+
+        wrapper = self.connect()
+        self.assertEqual(self.pragma(wrapper, "journal_mode"), "delete")
+        self.assertEqual(self.pragma(wrapper, "synchronous"), 2)
+
+    @override_settings(SQLITE_PRAGMAS={"journal_mode": "wal"})
+    def test_transactions_take_the_write_lock(self):
+        """
+        Test that a transaction takes the write lock before its first write, so another
+        connection can not write in between.
+        """
+
+        wrapper = self.connect()
+        other = sqlite3.connect(wrapper.settings_dict["NAME"], timeout=0)
+        self.addCleanup(other.close)
+        other.execute("CREATE TABLE example (value integer)")
+        other.commit()
+
+        # transaction.atomic() begins its transactions this way.
+        wrapper.set_autocommit(False, force_begin_transaction_with_broken_autocommit=True)
+        try:
+            with self.assertRaisesMessage(sqlite3.OperationalError, "database is locked"):
+                other.execute("INSERT INTO example VALUES (1)")
+        finally:
+            wrapper.rollback()
+            wrapper.set_autocommit(True)
+        other.execute("INSERT INTO example VALUES (1)")
+        other.commit()
+
+    def test_committed_database_uses_wal(self):
+        """
+        Test that the database of the repository is stored in WAL mode, so the ``journal_mode``
+        PRAGMA applied to its connections does not rewrite it.
+        """
+
+        with open(os.path.join(BASE_DIR, "oc-lettings-site.sqlite3"), "rb") as database:
+            header = database.read(20)
+        # The file format write and read versions: 2 for WAL, 1 for the rollback journal.
+        self.assertEqual(header[18:20], b"\x02\x02")
+
+
+class FileBasedCacheTestCase(SimpleTestCase):
+    """
+    Test case for the file based cache of ``core.backends.filebased``, as configured by the
+    settings of the project.
+    """
+
+    def make_cache(self, **options):
+        """
+        Create the default cache of the settings of the project in a temporary directory.
+
+        :param options: The options overriding those of the settings, e.g. ``MAX_ENTRIES``.
+        :return: The cache.
+        :rtype: FileBasedCache
+        """
+
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        with mock.patch.dict(os.environ, {"CACHE_LOCATION": directory.name}):
+            params = runpy.run_module("oc_lettings_site.settings")["CACHES"]["default"]
+        self.assertEqual(params["BACKEND"], "core.backends.filebased.FileBasedCache")
+        params = {**params, "OPTIONS": {**params["OPTIONS"], **options}}
+        return FileBasedCache(params["LOCATION"], params)
+
+    def test_cache_holds_more_than_300_pages(self):
+        """
+        Test that 400 pages stay cached with their Brotli and gzip variants, where the default
+        ``MAX_ENTRIES`` of 300 would cull them.
+        """
+
+        page_cache = self.make_cache()
+        for letting_id in range(1, 401):
+            key = f"page:letting:{letting_id}"
+            page_cache.set(key, b"<html>%d</html>" % letting_id)
+            for encoding in ("br", "gzip"):
+                page_cache.set(f"{key}:{encoding}", b"compressed")
+
+        for letting_id in range(1, 401):
+            self.assertEqual(
+                page_cache.get(f"page:letting:{letting_id}"), b"<html>%d</html>" % letting_id
+            )
+
+    def test_entries_are_culled(self):
+        """
+        Test that the cache never holds more than ``MAX_ENTRIES`` entries.
+        """
+
+        page_cache = self.make_cache(MAX_ENTRIES=50, CULL_FREQUENCY=5)
+        for number in range(500):
+            page_cache.set(f"entry:{number}", number)
+            self.assertLessEqual(len(page_cache._list_cache_files()), 50)
+
+    def test_directory_is_listed_once_per_culling(self):
+        """
+        Test that the writes list the cache directory only when it may be full, rather than on
+        every write as the file based cache of Django does.
+        """
+
+        page_cache = self.make_cache(MAX_ENTRIES=1000, CULL_FREQUENCY=10)
+        with mock.patch.object(
+            page_cache, "_list_cache_files", wraps=page_cache._list_cache_files
+        ) as list_cache_files:
+            for number in range(1500):
+                page_cache.set(f"entry:{number}", number)
+        # On the first write and the 1001st, when the cache is full, then once per 100 writes
+        # (the culled tenth of the entries): 6 times instead of 1500.
+        self.assertEqual(list_cache_files.call_count, 6)
+
+
+class ReplicaRoutingTestCase(TransactionTestCase):
+    """
+    Test case for the routing of the reads to a read-only replica of the primary database.
+
+    The primary database is the test database and the replica a SQLite file written by the
+    ``snapshot_replicas`` command.
+
+    :param letting: A :class:`lettings.Letting` copied to the replica.
+    :type letting: class:`lettings.Letting`
+    """
+
+    def setUp(self):
+        """
+        Create a :class:`lettings.Letting`, configure a replica and copy the database to it.
+        """
+
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        path = os.path.join(directory.name, "replica.sqlite3")
+        # The replica is configured as the settings of the project configure it.
+        with mock.patch.dict(os.environ, {"DATABASE_REPLICAS": path}):
+            databases = runpy.run_module("oc_lettings_site.settings")["DATABASES"]
+        connections.databases["replica_0"] = databases["replica_0"]
+        self.addCleanup(connections.databases.pop, "replica_0")
+        self.addCleanup(self.close_replica)
+        replicas = override_settings(DATABASE_REPLICAS=[path])
+        replicas.enable()
+        self.addCleanup(replicas.disable)
+
+        address = Address.objects.create(
+            number=1,
+            street="Replica Street",
+            city="Replica City",
+            state="RC",
+            zip_code=12345,
+            country_iso_code="USA",
+        )
+        self.letting = Letting.objects.create(title="Copied Letting", address=address)
+        call_command("snapshot_replicas", stdout=StringIO())
+
+    def close_replica(self):
+        """
+        Close the connection to the replica, so it is opened again with the next snapshot.
+        """
+
+        if hasattr(connections._connections, "replica_0"):
+            connections["replica_0"].close()
+            delattr(connections._connections, "replica_0")
+
+    def rename_letting(self, title):
+        """
+        Rename the letting in the primary database.
+
+        :param title: The new title.
+        :type title: str
+        """
+
+        letting = Letting.objects.using("default").get(pk=self.letting.pk)
+        letting.title = title
+        letting.save()
+
+    def test_public_pages_read_the_replica(self):
+        """
+        Test that the public pages show the last snapshot of the replica, refreshed by the
+        ``snapshot_replicas`` command.
+        """
+
+        url = reverse("lettings:letting", args=[self.letting.pk])
+        # A queryset update does not invalidate the cached page of the letting.
+        Letting.objects.using("default").filter(pk=self.letting.pk).update(
+            title="Renamed Letting"
+        )
+        self.assertContains(self.client.get(url), "Copied Letting")
+        self.assertContains(self.client.get(reverse("lettings:lettings_index")), "Copied Letting")
+
+        self.close_replica()
+        call_command("snapshot_replicas", stdout=StringIO())
+        self.assertContains(self.client.get(url), "Renamed Letting")
+
+    def test_invalidated_page_reads_the_primary(self):
+        """
+        Test that a page invalidated by a change is rendered again from the primary database and
+        cached with the change, while the replica does not hold it yet.
+        """
+
+        url = reverse("lettings:letting", args=[self.letting.pk])
+        self.assertContains(self.client.get(url), "Copied Letting")
+        self.rename_letting("Renamed Letting")
+
+        self.assertContains(self.client.get(url), "Renamed Letting")
+        with self.assertNumQueries(0, using="default"):
+            self.assertContains(self.client.get(url), "Renamed Letting")
+        self.assertContains(self.client.get(reverse("lettings:lettings_index")), "Copied Letting")
+
+    def test_open_connections_read_the_new_snapshot(self):
+        """
+        Test that a connection to the replica opened before a snapshot reads the snapshot from
+        the next request.
+        """
+
+        url = reverse("lettings:letting", args=[self.letting.pk])
+        self.assertContains(self.client.get(url), "Copied Letting")
+        replica = connections["replica_0"]
+        replica.ensure_connection()
+        self.rename_letting("Renamed Letting")
+        call_command("snapshot_replicas", stdout=StringIO())
+
+        # The test client does not send request_finished to close_old_connections.
+        close_old_connections()
+        self.assertIs(connections["replica_0"], replica)
+        self.assertEqual(
+            Letting.objects.using("replica_0").get(pk=self.letting.pk).title, "Renamed Letting"
+        )
+        self.assertContains(self.client.get(url), "Renamed Letting")
+
+    def test_writers_read_their_writes(self):
+        """
+        Test that a client which sent a request which may write reads from the primary database.
+        """
+
+        response = self.client.post(reverse("admin:login"), {})
+        self.assertIn(REPLICA_PIN_COOKIE, response.cookies)
+
+        self.rename_letting("Renamed Letting")
+        url = reverse("lettings:letting", args=[self.letting.pk])
+        self.assertContains(self.client.get(url), "Renamed Letting")
+
+    def test_admin_and_writes_use_the_primary(self):
+        """
+        Test that the admin site and the requests which may write read from the primary database,
+        and that the writes go to the primary database.
+        """
+
+        def get_response(request):
+            return HttpResponse(router.db_for_read(Letting))
+
+        middleware = ReplicaPinningMiddleware(get_response)
+        factory = RequestFactory()
+        self.assertEqual(middleware(factory.get("/lettings/")).content, b"replica_0")
+        self.assertEqual(middleware(factory.get(reverse("admin:index"))).content, b"default")
+        self.assertEqual(middleware(factory.post("/lettings/")).content, b"default")
+        self.assertEqual(router.db_for_write(Letting), "default")
+        self.assertEqual(router.db_for_read(get_user_model()), "replica_0")
+
+    def test_replica_is_read_only(self):
+        """
+        Test that the replica can not be written.
+        """
+
+        with self.assertRaisesMessage(OperationalError, "readonly"):
+            Letting.objects.using("replica_0").update(title="Written Letting")
+
+
+class ASGIHandlerTestCase(TransactionTestCase):
+    """
+    Test case for the ASGI handler of ``core.asgi``.
+
+    The changes are committed, so the threads of the handler, which use their own database
+    connections, read them.
+
+    :param letting: A :class:`lettings.Letting` served by the handler.
+    :type letting: class:`lettings.Letting`
+    :param handler: The ASGI handler, with a pool of 2 threads.
+    :type handler: ASGIHandler
+    """
+
+    def setUp(self):
+        """
+        Create a :class:`lettings.Letting` and the ASGI handler.
+        """
+
+        address = Address.objects.create(
+            number=1,
+            street="Async Street",
+            city="Async City",
+            state="AC",
+            zip_code=12345,
+            country_iso_code="USA",
+        )
+        self.letting = Letting.objects.create(title="Served Letting", address=address)
+        with override_settings(ASGI_THREADS=2):
+            self.handler = ASGIHandler()
+        self.addCleanup(self.handler.executor.shutdown)
+
+    def request(self, path):
+        """
+        Send a ``GET`` request to the ASGI handler and read its response.
+
+        :param path: The path of the request.
+        :type path: str
+        :return: The status code, the headers and the body of the response.
+        :rtype: tuple of (int, list, bytes)
+        """
+
+        async def communicate():
+            scope = {
+                "type": "http",
+                "method": "GET",
+                "path": path,
+                "query_string": b"",
+                "headers": [(b"host", b"testserver")],
+            }
+            communicator = ApplicationCommunicator(self.handler, scope)
+            await communicator.send_input({"type": "http.request"})
+            start = await communicator.receive_output(timeout=10)
+            body = b""
+            while True:
+                message = await communicator.receive_output(timeout=10)
+                body += message.get("body", b"")
+                if not message.get("more_body", False):
+                    break
+            await communicator.wait()
+            return start["status"], start["headers"], body
+
+        return asyncio.run(communicate())
+
+    def test_pages_are_served(self):
+        """
+        Test that a page reading the database is served over ASGI, with its headers.
+        """
+
+        status, headers, body = self.request(reverse("lettings:letting", args=[self.letting.pk]))
+        self.assertEqual(status, 200)
+        self.assertIn((b"Content-Type", b"text/html; charset=utf-8"), headers)
+        self.assertIn(b"Served Letting", body)
+
+    @override_settings(STREAMING_INDEX_PAGES=True)
+    def test_streaming_responses_read_the_database(self):
+        """
+        Test that a streaming response reading its rows while it is sent is served over ASGI,
+        which the handler of Django runs in the event loop, where the database can not be queried.
+        """
+
+        status, _, body = self.request(reverse("lettings:lettings_index"))
+        self.assertEqual(status, 200)
+        self.assertIn(b"Served Letting", body)
+        self.assertTrue(body.rstrip().endswith(b"</html>"))
+
+    def test_requests_run_in_the_pool(self):
+        """
+        Test that the requests run in the threads of the bounded pool.
+        """
+
+        threads = set()
+
+        def get_response(request):
+            threads.add(threading.current_thread().name)
+            return HttpResponse("Served")
+
+        self.handler.get_response = get_response
+        for _ in range(4):
+            self.assertEqual(self.request("/")[2], b"Served")
+        self.assertEqual(self.handler.executor._max_workers, 2)
+        self.assertTrue(threads)
+        self.assertTrue(all(name.startswith("asgi") for name in threads))
+
+    def test_connections_are_opened_in_each_thread(self):
+        """
+        Test that the warmup of a worker opens the database connections of each thread of the
+        pool, which serve the requests, rather than those of the main thread.
+        """
+
+        threads = {}
+
+        def open_thread_connections():
+            aliases = open_connections()
+            threads[threading.current_thread().name] = connection.connection is not None
+            return aliases
+
+        worker = mock.Mock(wsgi=self.handler)
+        with mock.patch("core.asgi.open_connections", open_thread_connections):
+            gunicorn_config.post_worker_init(worker)
+        worker.log.debug.assert_called_once_with("Opened the connections to default.")
+        self.assertEqual(len(threads), 2)
+        self.assertTrue(all(name.startswith("asgi") for name in threads))
+        self.assertTrue(all(threads.values()))
+
+
+class ServerProfileTestCase(TestCase):
+    """
+    Test case for the server profile of ``oc_lettings_site.gunicorn_config`` and the warmup of
+    ``core.warmup``.
+    """
+
+    def load_config(self, **environment):
+        """
+        Load the server profile with environment variables, on a host with 4 CPUs.
+
+        :param environment: The environment variables of the server profile.
+        :return: The server profile.
+        :rtype: module
+        """
+
+        variables = ("SERVER_MODE", "GUNICORN_WORKERS", "GUNICORN_THREADS")
+        with mock.patch.dict(os.environ, environment), mock.patch(
+            "os.sched_getaffinity", return_value={0, 1, 2, 3}, create=True
+        ):
+            for variable in variables:
+                if variable not in environment:
+                    os.environ.pop(variable, None)
+            config = importlib.reload(gunicorn_config)
+        self.addCleanup(importlib.reload, gunicorn_config)
+        return config
+
+    def test_workers_are_sized_from_the_cpus(self):
+        """
+        Test that the WSGI mode runs 2 sync workers per CPU plus 1, and the ASGI mode 1 uvicorn
+        worker per CPU.
+        """
+
+        config = self.load_config()
+        self.assertEqual(config.workers, 9)
+        self.assertEqual(config.worker_class, "sync")
+        self.assertEqual(config.wsgi_app, "oc_lettings_site.wsgi:application")
+        self.assertTrue(config.preload_app)
+
+        config = self.load_config(SERVER_MODE="asgi")
+        self.assertEqual(config.workers, 4)
+        self.assertEqual(config.worker_class, "uvicorn.workers.UvicornWorker")
+        self.assertEqual(config.wsgi_app, "oc_lettings_site.asgi:application")
+
+    def test_profile_is_configured_by_the_environment(self):
+        """
+        Test that the environment variables set the workers, their threads and their recycling.
+        """
+
+        config = self.load_config(
+            GUNICORN_WORKERS="3",
+            GUNICORN_THREADS="4",
+            GUNICORN_MAX_REQUESTS="50",
+            GUNICORN_MAX_REQUESTS_JITTER="5",
+        )
+        self.assertEqual(config.workers, 3)
+        self.assertEqual(config.threads, 4)
+        self.assertEqual(config.worker_class, "gthread")
+        self.assertEqual(config.max_requests, 50)
+        self.assertEqual(config.max_requests_jitter, 5)
+
+    def test_warmup(self):
+        """
+        Test that the warmup compiles every template of the project, builds the URL resolvers and
+        opens the database connection.
+        """
+
+        templates = [
+            name
+            for app in os.listdir(BASE_DIR)
+            if os.path.isdir(os.path.join(BASE_DIR, app, "templates"))
+            for _, _, names in os.walk(os.path.join(BASE_DIR, app, "templates"))
+            for name in names
+        ]
+        self.assertEqual(compile_templates(), len(templates))
+        self.assertGreater(resolve_urls(), 0)
+        self.assertTrue(get_resolver()._populated)
+        self.assertEqual(open_connections(), ["default"])
+        self.assertIsNotNone(connection.connection)
+
+
+class LoadHarnessTestCase(SimpleTestCase):
+    """
+    Test case for the routes of the load-testing harness of ``benchmarks/load.py``.
+    """
+
+    def test_every_route_is_loaded(self):
+        """
+        Test that the harness loads every named route of the project, but the excluded ones, and
+        that the path of each route resolves to it.
+        """
+
+        def names(resolver, namespace=""):
+            for pattern in resolver.url_patterns:
+                if isinstance(pattern, URLResolver):
+                    prefix = f"{namespace}{pattern.namespace}:" if pattern.namespace else namespace
+                    if pattern.namespace not in EXCLUDED_ROUTES:
+                        yield from names(pattern, prefix)
+                elif pattern.name and f"{namespace}{pattern.name}" not in EXCLUDED_ROUTES:
+                    yield f"{namespace}{pattern.name}"
+
+        self.assertEqual(set(ROUTES), set(names(get_resolver())))
+        generator = random.Random(0)
+        for name, path in ROUTES.items():
+            with self.subTest(route=name):
+                self.assertEqual(resolve(path(generator, 100).split("?")[0]).view_name, name)
+
+
+class SeedDataTestCase(TestCase):
+    """
+    Test case for the ``seed_data`` management command.
+    """
+
+    def seed(self, **options):
+        """
+        Run the ``seed_data`` command with small batches.
+
+        :param options: The options of the command.
+        :return: The output of the command.
+        :rtype: str
+        """
+
+        stdout = StringIO()
+        call_command("seed_data", batch_size=64, stdout=stdout, **options)
+        return stdout.getvalue()
+
+    def test_rows_are_valid(self):
+        """
+        Test that the generated rows are valid against the models, that the users can log in with
+        the password and that the lettings are searchable.
+        """
+
+        output = self.seed(lettings=150, profiles=100, password="Seeded1234!")
+        self.assertIn("Added 150 lettings and 100 profiles", output)
+        self.assertEqual(Letting.objects.count(), 150)
+        self.assertEqual(Profile.objects.count(), 100)
+        for letting in Letting.objects.select_related("address"):
+            letting.full_clean()
+            letting.address.full_clean()
+        for profile in Profile.objects.select_related("user"):
+            profile.full_clean()
+            profile.user.full_clean()
+        user = get_user_model().objects.first()
+        self.assertTrue(user.check_password("Seeded1234!"))
+        title = Letting.objects.first().title
+        self.assertIn(title, [letting.title for letting in search_lettings(title, 150)])
+
+    def test_rows_are_deterministic(self):
+        """
+        Test that the same seed generates the same rows, and another seed other rows.
+        """
+
+        def rows():
+            return list(
+                Letting.objects.order_by("id").values_list(
+                    "id", "title", "address__street", "address__city", "address__zip_code"
+                )
+            ) + list(Profile.objects.order_by("id").values_list("id", "user__username"))
+
+        self.seed(lettings=50, profiles=50, seed=7)
+        first = rows()
+        Letting.objects.all().delete()
+        Address.objects.all().delete()
+        get_user_model().objects.all().delete()
+        self.seed(lettings=50, profiles=50, seed=7)
+        self.assertEqual(rows(), first)
+
+        self.seed(lettings=50, profiles=50, seed=8)
+        self.assertEqual(Letting.objects.count(), 100)
+        self.assertNotEqual(rows()[50:100], first[:50])
+
+    def test_cities_are_skewed(self):
+        """
+        Test that the first cities hold most of the lettings.
+        """
+
+        self.seed(lettings=1000, profiles=0)
+        counts = list(
+            Address.objects.values("city").annotate(count=Count("id")).order_by("-count")
+        )
+        self.assertEqual(counts[0]["city"], "New York")
+        self.assertGreater(sum(row["count"] for row in counts[:5]), 400)
+
+    def test_invalid_options(self):
+        """
+        Test that negative numbers of rows and batch sizes are rejected.
+        """
+
+        with self.assertRaisesMessage(CommandError, "can not be negative"):
+            self.seed(lettings=-1)
+        with self.assertRaisesMessage(CommandError, "batch size"):
+            call_command("seed_data", batch_size=0)
+
+
+class ServerTimingTestCase(TestCase):
+    """
+    Test case for the timings of the requests, recorded by ``core.timing``.
+    """
+
+    @classmethod
+    def setUpTestData(cls):
+        """
+        Set up a letting to display.
+        """
+
+        address = Address.objects.create(
+            number=7,
+            street="Timing Street",
+            city="Timing City",
+            state="TC",
+            zip_code=12345,
+            country_iso_code="USA",
+        )
+        cls.letting = Letting.objects.create(title="Timed Letting", address=address)
+
+    def setUp(self):
+        """
+        Empty the page cache, so the pages query the database and render their templates.
+        """
+
+        cache.clear()
+
+    def test_timings_are_sent(self):
+        """
+        Test that the ``Server-Timing`` header holds the time of the queries (the one of the
+        conditional view and the one of the page), of the templates, of the view and of the
+        middleware.
+        """
+
+        with self.assertNumQueries(2):
+            response = self.client.get(reverse("lettings:letting", args=[self.letting.id]))
+        metrics = {}
+        for metric in response["Server-Timing"].split(", "):
+            name, *parameters = metric.split(";")
+            metrics[name] = dict(parameter.split("=") for parameter in parameters)
+        self.assertEqual(
+            list(metrics), ["sql", "templates", "view", "middleware", "total"]
+        )
+        self.assertEqual(metrics["sql"]["desc"], '"2 queries"')
+        durations = {name: float(metric["dur"]) for name, metric in metrics.items()}
+        self.assertGreater(durations["templates"], 0)
+        self.assertGreaterEqual(durations["view"], durations["templates"])
+        self.assertAlmostEqual(
+            durations["view"] + durations["middleware"], durations["total"], delta=0.002
+        )
+
+    def test_timings_are_logged(self):
+        """
+        Test that each request is logged with its timings and the name of its URL pattern.
+        """
+
+        with self.assertLogs("core.timing", "INFO") as logs:
+            self.client.get(reverse("lettings:letting", args=[self.letting.id]))
+            self.client.get("/missing/")
+        letting, missing = logs.records
+        self.assertEqual(letting.url_name, "lettings:letting")
+        self.assertEqual(letting.timings["queries"], 2)
+        self.assertGreater(letting.timings["templates_ms"], 0)
+        self.assertRegex(
+            letting.getMessage(),
+            r"^url_name=lettings:letting method=GET status=200 queries=2 sql_ms=[0-9.]+ ",
+        )
+        self.assertEqual(missing.url_name, "-")
+        self.assertEqual(missing.timings["view_ms"], 0)
+
+    @override_settings(STREAMING_INDEX_PAGES=True)
+    def test_streamed_timings_are_logged(self):
+        """
+        Test that a streamed page is logged once its last chunk is sent, with the query reading
+        its rows while it is streamed.
+        """
+
+        with self.assertLogs("core.timing", "INFO") as logs:
+            response = self.client.get(reverse("lettings:lettings_index"))
+            self.assertEqual(logs.output, [])
+            content = b"".join(response.streaming_content)
+        self.assertIn(b"Timed Letting", content)
+        (record,) = logs.records
+        self.assertEqual(record.url_name, "lettings:lettings_index")
+        self.assertEqual(record.timings["queries"], 2)
+
+    @override_settings(SERVER_TIMING=False)
+    def test_header_can_be_disabled(self):
+        """
+        Test that the ``Server-Timing`` header is left out when ``SERVER_TIMING`` is off, while
+        the timings are still recorded.
+        """
+
+        response = self.client.get(reverse("lettings:letting", args=[self.letting.id]))
+        self.assertNotIn("Server-Timing", response)
+        self.assertIsInstance(response.wsgi_request.timings, RequestTimings)
+        self.assertEqual(response.wsgi_request.timings.queries, 2)
+
+
+class MetricsTestCase(TestCase):
+    """
+    Test case for the Prometheus metrics of ``core.metrics``.
+    """
+
+    @classmethod
+    def setUpTestData(cls):
+        """
+        Set up a letting to display.
+        """
+
+        address = Address.objects.create(
+            number=9,
+            street="Metrics Street",
+            city="Metrics City",
+            state="MC",
+            zip_code=12345,
+            country_iso_code="USA",
+        )
+        cls.letting = Letting.objects.create(title="Measured Letting", address=address)
+
+    def setUp(self):
+        """
+        Empty the page cache, so the first request of a page misses it.
+        """
+
+        cache.clear()
+
+    def test_requests_are_measured(self):
+        """
+        Test that the requests, their latency, their queries and the lookups of the page cache are
+        counted by URL name and status, and served at ``/metrics``.
+        """
+
+        labels = {"url_name": "lettings:letting", "status": "200"}
+
+        def sample(name, **extra):
+            labelset = {key: value for key, value in {**labels, **extra}.items() if value}
+            return REGISTRY.get_sample_value(name, labelset) or 0
+
+        def lookups(result):
+            return sample("oc_lettings_page_cache_lookups_total", status=None, result=result)
+
+        before = {
+            "requests": sample("oc_lettings_requests_total", method="GET"),
+            "durations": sample("oc_lettings_request_duration_seconds_count"),
+            "queries": sample("oc_lettings_request_queries_sum"),
+            "hits": lookups("hit"),
+            "misses": lookups("miss"),
+        }
+        url = reverse("lettings:letting", args=[self.letting.id])
+        self.client.get(url)  # Rendered: the query of the ETag and the query of the page.
+        self.client.get(url)  # Cached: the query of the ETag.
+        self.assertEqual(sample("oc_lettings_requests_total", method="GET"),
+                         before["requests"] + 2)
+        self.assertEqual(sample("oc_lettings_request_duration_seconds_count"),
+                         before["durations"] + 2)
+        self.assertEqual(sample("oc_lettings_request_queries_sum"), before["queries"] + 3)
+        self.assertEqual(lookups("hit"), before["hits"] + 1)
+        self.assertEqual(lookups("miss"), before["misses"] + 1)
+
+        self.client.get("/missing/")
+        self.assertGreater(
+            REGISTRY.get_sample_value(
+                "oc_lettings_requests_total", {"url_name": "-", "method": "GET", "status": "404"}
+            ),
+            0,
+        )
+
+        response = self.client.get("/metrics")
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(response["Content-Type"].startswith("text/plain; version=0.0.4"))
+        self.assertIn(
+            b'oc_lettings_request_duration_seconds_bucket{le="0.005",status="200",'
+            b'url_name="lettings:letting"}',
+            response.content,
+        )
+
+    @override_settings(STREAMING_INDEX_PAGES=True)
+    def test_streamed_requests_are_measured(self):
+        """
+        Test that a streamed page is measured once its last chunk is sent, with the query reading
+        its rows while it is streamed.
+        """
+
+        labels = {"url_name": "lettings:lettings_index", "status": "200"}
+        before = REGISTRY.get_sample_value("oc_lettings_request_queries_sum", labels) or 0
+        response = self.client.get(reverse("lettings:lettings_index"))
+        self.assertEqual(
+            REGISTRY.get_sample_value("oc_lettings_request_queries_sum", labels) or 0, before
+        )
+        b"".join(response.streaming_content)
+        self.assertEqual(
+            REGISTRY.get_sample_value("oc_lettings_request_queries_sum", labels), before + 2
+        )
+
+    def test_workers_are_added_up(self):
+        """
+        Test that ``/metrics`` adds up the metrics written by the worker processes to the
+        directory of ``PROMETHEUS_MULTIPROC_DIR``.
+        """
+
+        directory = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, directory)
+        worker = (
+            "from core.metrics import REQUESTS; "
+            "REQUESTS.labels('core:index', 'GET', '200').inc(3)"
+        )
+        for _ in range(2):
+            subprocess.run(
+                [sys.executable, "-c", worker],
+                check=True,
+                cwd=BASE_DIR,
+                env={**os.environ, "PROMETHEUS_MULTIPROC_DIR": directory},
+            )
+
+        with mock.patch.dict(os.environ, {"PROMETHEUS_MULTIPROC_DIR": directory}):
+            response = self.client.get("/metrics")
+        self.assertIn(
+            b'oc_lettings_requests_total{method="GET",status="200",url_name="core:index"} 6.0',
+            response.content,
+        )
+
+    @override_settings(METRICS_ALLOWED_NETWORKS=["10.0.0.0/8", "::1/128"], METRICS_TOKEN="s3cret")
+    def test_metrics_are_refused_to_others(self):
+        """
+        Test that ``/metrics`` is served to the clients of the allowed networks and to the
+        requests holding the bearer token, and refused to the others.
+        """
+
+        cases = [
+            ({"REMOTE_ADDR": "10.1.2.3"}, 200),
+            ({"REMOTE_ADDR": "::1"}, 200),
+            ({"REMOTE_ADDR": "203.0.113.7", "HTTP_AUTHORIZATION": "Bearer s3cret"}, 200),
+            ({"REMOTE_ADDR": "127.0.0.1"}, 403),
+            ({"REMOTE_ADDR": "203.0.113.7"}, 403),
+            ({"REMOTE_ADDR": "203.0.113.7", "HTTP_AUTHORIZATION": "Bearer wrong"}, 403),
+            ({"REMOTE_ADDR": "unknown"}, 403),
+        ]
+        for headers, status in cases:
+            with self.subTest(**headers):
+                response = self.client.get("/metrics", **headers)
+                self.assertEqual(response.status_code, status)
+                if status == 403:
+                    self.assertNotIn(b"oc_lettings_requests_total", response.content)
+
+        with self.settings(METRICS_TOKEN=""):
+            response = self.client.get(
+                "/metrics", REMOTE_ADDR="203.0.113.7", HTTP_AUTHORIZATION="Bearer "
+            )
+            self.assertEqual(response.status_code, 403)
+
+    def test_server_profile_collects_the_workers(self):
+        """
+        Test that the server profile sets ``PROMETHEUS_MULTIPROC_DIR`` for the application and
+        empties the directory when the server starts.
+        """
+
+        directory = os.path.join(tempfile.mkdtemp(), "metrics")
+        self.addCleanup(shutil.rmtree, os.path.dirname(directory))
+        with mock.patch.dict(os.environ, {"PROMETHEUS_MULTIPROC_DIR": directory}):
+            config = importlib.reload(gunicorn_config)
+        self.addCleanup(importlib.reload, gunicorn_config)
+        self.assertIn(f"PROMETHEUS_MULTIPROC_DIR={directory}", config.raw_env)
+
+        os.makedirs(directory)
+        stale = os.path.join(directory, "counter_1.db")
+        open(stale, "w").close()
+        config.on_starting(mock.Mock())
+        self.assertEqual(os.listdir(directory), [])
+
+
+class TraceSamplingTestCase(SimpleTestCase):
+    """
+    Test case for the sampling of the Sentry traces by ``core.tracing``.
+    """
+
+    def sampler(self, **options):
+        """
+        Build a sampling policy tracing every request of ``core:index`` and none of the others.
+
+        :param options: The options replacing those of the policy.
+        :return: The sampling policy.
+        :rtype: TraceSampler
+        """
+
+        return TraceSampler(
+            **{
+                "rate": 0,
+                "route_rates": {"core:index": 1.0},
+                "per_second": 100,
+                "ignored_paths": ["/static/", "/metrics"],
+                "slow_seconds": 1,
+                "boost_seconds": 60,
+                **options,
+            }
+        )
+
+    def test_requests_are_sampled_by_route(self):
+        """
+        Test that the requests are traced at the rate of their URL pattern, in WSGI and ASGI
+        mode, and that the ignored paths are never traced.
+        """
+
+        sampler = self.sampler()
+        self.assertEqual(sampler({"wsgi_environ": {"PATH_INFO": "/"}}), 1)
+        self.assertEqual(sampler({"asgi_scope": {"path": "/"}}), 1)
+        self.assertEqual(sampler({"wsgi_environ": {"PATH_INFO": "/lettings/"}}), 0)
+        self.assertEqual(sampler({"wsgi_environ": {"PATH_INFO": "/missing/"}}), 0)
+
+        sampler = self.sampler(rate=1)
+        self.assertEqual(sampler({"wsgi_environ": {"PATH_INFO": "/lettings/"}}), 1)
+        self.assertEqual(sampler({"wsgi_environ": {"PATH_INFO": "/static/css/style.css"}}), 0)
+        self.assertEqual(sampler({"asgi_scope": {"path": "/metrics"}}), 0)
+
+    def test_parent_decision_is_followed(self):
+        """
+        Test that a request is traced if the trace of the calling service was sampled.
+        """
+
+        sampler = self.sampler()
+        environ = {"PATH_INFO": "/lettings/"}
+        self.assertEqual(sampler({"wsgi_environ": environ, "parent_sampled": True}), 1)
+        self.assertEqual(
+            sampler({"wsgi_environ": {"PATH_INFO": "/"}, "parent_sampled": False}), 0
+        )
+
+    def test_slow_and_failing_routes_are_traced(self):
+        """
+        Test that every request of a URL pattern is traced for a while after one of them was
+        slow or failed.
+        """
+
+        sampler = self.sampler(boost_seconds=60)
+        lettings = {"wsgi_environ": {"PATH_INFO": "/lettings/"}}
+        profiles = {"wsgi_environ": {"PATH_INFO": "/profiles/"}}
+        sampler.observe("lettings:lettings_index", 0.5, 200)
+        self.assertEqual(sampler(lettings), 0)
+
+        sampler.observe("lettings:lettings_index", 1.5, 200)
+        sampler.observe("profiles:profiles_index", 0.1, 500)
+        self.assertEqual(sampler(lettings), 1)
+        self.assertEqual(sampler(profiles), 1)
+
+        with mock.patch("core.tracing.monotonic", return_value=time.monotonic() + 61):
+            self.assertEqual(sampler(lettings), 0)
+
+    def test_budget_caps_the_traces(self):
+        """
+        Test that the traces are capped by the budget, which is refilled over time.
+        """
+
+        sampler = self.sampler(per_second=2)
+        index = {"wsgi_environ": {"PATH_INFO": "/"}}
+        self.assertEqual([sampler(index) for _ in range(3)], [1, 1, 0])
+        sampler.refilled -= 0.5
+        self.assertEqual([sampler(index) for _ in range(2)], [1, 0])
+
+        # A budget below one trace per second still lets a trace through now and then.
+        sampler = self.sampler(per_second=0.5)
+        self.assertEqual([sampler(index) for _ in range(2)], [1, 0])
+        sampler.refilled -= 2
+        self.assertEqual(sampler(index), 1)
+
+    @override_settings(
+        SENTRY_SLOW_REQUEST_SECONDS=0,
+        MIDDLEWARE=["core.tracing.TraceSamplingMiddleware", "core.timing.ServerTimingMiddleware"],
+    )
+    def test_middleware_reports_the_requests(self):
+        """
+        Test that the middleware reports the requests to the sampling policy of the settings.
+        """
+
+        trace_sampler.cache_clear()
+        self.addCleanup(trace_sampler.cache_clear)
+        with mock.patch.dict(os.environ, {"WEB_CONCURRENCY": "4"}):
+            sampler = trace_sampler()
+        self.assertEqual(sampler.per_second, settings.SENTRY_TRACES_PER_SECOND / 4)
+
+        self.client.get(reverse("core:index"))
+        self.assertIn("core:index", sampler.boosted)
+
+
+# The bundles of the project, and a CSS bundle out of the directory of its source, whose URLs
+# are rewritten.
+TEST_BUNDLES = {**settings.STATIC_BUNDLES, "bundle.css": ["css/styles.css"]}
+
+
+class StaticBundlesTestCase(SimpleTestCase):
+    """
+    A test case for the bundles of the front-end assets, built by ``collectstatic``.
+    """
+
+    @classmethod
+    def setUpClass(cls):
+        """
+        Collect the static files to a temporary directory, with the bundles.
+        """
+
+        super().setUpClass()
+        cls.static_root = tempfile.mkdtemp()
+        cls.addClassCleanup(shutil.rmtree, cls.static_root)
+        storage = override_settings(
+            STATIC_ROOT=cls.static_root,
+            STATICFILES_STORAGE="core.storage.BundledStaticFilesStorage",
+            STATIC_BUNDLES=TEST_BUNDLES,
+        )
+        storage.enable()
+        cls.addClassCleanup(storage.disable)
+        call_command("collectstatic", interactive=False, verbosity=0)
+        with open(os.path.join(cls.static_root, "staticfiles.json")) as manifest:
+            cls.paths = json.load(manifest)["paths"]
+
+    def read(self, name):
+        """
+        Read a collected static file by its unhashed name.
+        """
+
+        with open(os.path.join(self.static_root, self.paths[name]), encoding="utf-8") as file:
+            return file.read()
+
+    def test_bundles_are_hashed(self):
+        """
+        Test that the bundles are named after a hash of their content, and compressed.
+        """
+
+        self.assertRegex(self.paths["bundle.css"], r"^bundle\.[0-9a-f]{12}\.css$")
+        self.assertRegex(self.paths["js/site.js"], r"^js/site\.[0-9a-f]{12}\.js$")
+        for name in TEST_BUNDLES:
+            path = os.path.join(self.static_root, self.paths[name])
+            self.assertTrue(os.path.exists(path + ".gz"))
+
+    def test_bundles_are_minified(self):
+        """
+        Test that the bundles hold their minified sources, with their licenses, and that the
+        URLs of the CSS point to the hashed files from the directory of the bundle.
+        """
+
+        css = self.read("bundle.css")
+        self.assertIn("Bootstrap v5.1.3", css)
+        source = os.path.join(self.static_root, "css/styles.css")
+        self.assertLess(len(css), os.path.getsize(source))
+        self.assertRegex(
+            css, r'url\("assets/fonts/metropolis/Metropolis-Bold\.[0-9a-f]{12}\.woff2"\)'
+        )
+
+        js = self.read("js/site.js")
+        self.assertLess(js.index("@popperjs/core"), js.index("Bootstrap v5.1.3"))
+        self.assertIn("navbarCollapse", js)
+        self.assertNotIn("sourceMappingURL", js)
+        self.assertEqual(minify("scripts.js", "var navStick = 1;\n"), "var navStick=1;")
+
+    def test_tag_loads_the_bundle(self):
+        """
+        Test that the ``bundle`` tag loads a bundle with its hashed name once it is built.
+        """
+
+        template = Template('{% load bundles %}{% bundle "bundle.css" %}{% bundle "js/site.js" %}')
+        css, js = self.paths["bundle.css"], self.paths["js/site.js"]
+        self.assertHTMLEqual(
+            template.render(Context()),
+            f'<link rel="stylesheet" href="/static/{css}">'
+            f'<script defer src="/static/{js}"></script>',
+        )
+
+    def test_tag_inlines_the_critical_css(self):
+        """
+        Test that the ``bundle`` tag inlines the critical CSS of a bundle, with absolute URLs,
+        and preloads the bundle.
+        """
+
+        html = Template('{% load bundles %}{% bundle "css/site.css" %}').render(Context())
+        css, critical = self.read("css/site.css"), self.read("css/site.critical.css")
+        self.assertLess(len(critical), len(css))
+        self.assertIn(".navbar-brand{", critical)
+        self.assertNotIn(".card{", critical)
+        self.assertIn(".card{", css)
+
+        url = f"/static/{self.paths['css/site.css']}"
+        self.assertInHTML(f'<link rel="preload" href="{url}" as="style" '
+                          "onload=\"this.onload=null;this.rel='stylesheet'\">", html)
+        self.assertInHTML(f'<noscript><link rel="stylesheet" href="{url}"></noscript>', html)
+        self.assertRegex(html, r'(?s)<style>.*url\("/static/assets/fonts/metropolis/Metropolis-')
+        self.assertNotIn("../", html)
+
+        regular = f"/static/{self.paths['assets/fonts/metropolis/Metropolis-Regular.woff2']}"
+        self.assertInHTML(
+            f'<link rel="preload" href="{regular}" as="font" type="font/woff2" crossorigin>', html
+        )
+        self.assertLess(html.index(regular), html.index("<style>"))
+
+    def test_unused_rules_are_purged(self):
+        """
+        Test that the purge removes the rules matching nothing in the templates and scripts,
+        and the fonts and animations which the remaining rules do not use.
+        """
+
+        css = (
+            "/*! License */:root{--x:1}[hidden]{display:none!important}"
+            ".card,.modal{color:red}.card:not(.modal):hover{color:blue}"
+            "@media (min-width:576px){.modal{top:0}}@media print{body{margin:0}}"
+            '.bs-tooltip-top{top:0}ul li{margin:0}@font-face{font-family:"Used";src:url(a.otf)}'
+            '@font-face{font-family:"Unused";src:url(b.otf)}body{font-family:"Used"}'
+            "@keyframes spin{to{transform:rotate(1turn)}}@keyframes fade{to{opacity:0}}"
+            ".spinner{animation:spin 1s}"
+        )
+        used = words('<body><div class="card spinner">{% if ul %}</div></body>')
+        self.assertEqual(
+            purge_css(css, used, [r"^bs-tooltip-"]),
+            "/*! License */:root{--x:1}[hidden]{display:none!important}"
+            ".card{color:red}.card:not(.modal):hover{color:blue}"
+            "@media print{body{margin:0}}"
+            '.bs-tooltip-top{top:0}@font-face{font-family:"Used";src:url(a.otf)}'
+            'body{font-family:"Used"}'
+            "@keyframes spin{to{transform:rotate(1turn)}}"
+            ".spinner{animation:spin 1s}",
+        )
+
+    def test_fonts_are_converted(self):
+        """
+        Test that the fonts of the faces the bundles use are collected as subsetted WOFF2 fonts,
+        displayed with a fallback font until they are loaded, and that the others are removed.
+        """
+
+        fonts = "assets/fonts/metropolis/Metropolis-{}.{}"
+        for face in ("Light", "Regular", "Medium", "Bold"):
+            self.assertIn(fonts.format(face, "woff2"), self.paths)
+            with open(os.path.join(self.static_root, fonts.format(face, "woff2")), "rb") as file:
+                self.assertEqual(file.read(4), b"wOF2")
+        for face in ("Regular", "Bold", "Thin", "BoldItalic"):
+            self.assertNotIn(fonts.format(face, "otf"), self.paths)
+            path = os.path.join(self.static_root, fonts.format(face, "otf"))
+            self.assertFalse(os.path.exists(path))
+        self.assertNotIn(fonts.format("Thin", "woff2"), self.paths)
+
+        css = self.read("css/site.css")
+        self.assertEqual(css.count("@font-face"), 4)
+        self.assertEqual(css.count("font-display:swap"), 4)
+        self.assertIn(f"unicode-range:{settings.FONT_UNICODE_RANGE}", css)
+        self.assertNotIn(".otf", css)
+
+    def test_used_faces_are_kept(self):
+        """
+        Test that the ``@font-face`` rules of the faces a stylesheet uses are kept, with the
+        nearest face of a weight without its own, and the last face of a weight declared twice.
+        """
+
+        self.assertEqual(nearest_weight(400, {300, 500, 700}), 500)
+        self.assertEqual(nearest_weight(600, {300, 500}), 500)
+        self.assertEqual(nearest_weight(200, {300, 700}), 300)
+        self.assertEqual(used_faces("h1{font:bold 2rem x}em{font-style:italic}@font-face{}"),
+                         {(400, "normal"), (700, "normal"), (400, "italic"), (700, "italic")})
+
+        face = '@font-face{{font-family:"M";src:url({}.otf);font-weight:{};font-style:{}}}'
+        css = (
+            face.format("Regular", 400, "normal") + face.format("Italic", 400, "italic")
+            + face.format("SemiBold", 600, "normal") + face.format("ExtraBold", 800, "normal")
+            + face.format("Black", 800, "normal") + "body{font-family:M}b{font-weight:900}"
+        )
+        css, sources = optimize_fonts(css, lambda url: url.replace(".otf", ".woff2"), "U+0-FF")
+        self.assertEqual(len(sources), 5)
+        self.assertEqual(
+            css,
+            '@font-face{font-family:"M";font-weight:400;font-style:normal;'
+            'src:url("Regular.woff2") format("woff2");font-display:swap;unicode-range:U+0-FF}'
+            '@font-face{font-family:"M";font-weight:800;font-style:normal;'
+            'src:url("Black.woff2") format("woff2");font-display:swap;unicode-range:U+0-FF}'
+            "body{font-family:M}b{font-weight:900}",
+        )
+        self.assertEqual(preloaded_fonts(css), ["Regular.woff2", "Black.woff2"])
+
+    def test_images_have_variants(self):
+        """
+        Test that the static images are collected with their variants, at each pixel density and
+        in each format, and that the favicons are drawn as small squares.
+        """
+
+        self.assertEqual(variant_widths(273, 70, [1, 2]), [(1, 70), (2, 140)])
+        self.assertEqual(variant_widths(100, 70, [1, 2]), [(1, 70)])
+        self.assertEqual(variant_widths(50, 70, [1, 2]), [(1, 50)])
+        self.assertEqual(display_size((273, 260), 70), (70, 67))
+
+        logo = os.path.getsize(os.path.join(self.static_root, "assets/img/logo.png"))
+        for width in (70, 140):
+            for format, kind in (("avif", "AVIF"), ("webp", "WEBP"), ("png", "PNG")):
+                name = f"assets/img/logo-{width}w.{format}"
+                with Image.open(os.path.join(self.static_root, self.paths[name])) as image:
+                    self.assertEqual((image.format, image.width), (kind, width))
+        avif = os.path.join(self.static_root, self.paths["assets/img/logo-70w.avif"])
+        self.assertLess(os.path.getsize(avif) * 10, logo)
+
+        for name, size in (("favicon-32.png", 32), ("apple-touch-icon.png", 180)):
+            path = os.path.join(self.static_root, self.paths[f"assets/img/{name}"])
+            with Image.open(path) as image:
+                self.assertEqual(image.size, (size, size))
+
+    def test_picture_tag_loads_the_variants(self):
+        """
+        Test that the ``picture`` tag loads the variants of an image, with its size in the
+        pages, and that the ``favicons`` tag loads the favicons.
+        """
+
+        template = Template(
+            '{% load images %}{% picture "assets/img/logo.png" alt="Logo" %}{% favicons %}'
+        )
+
+        def srcset(format):
+            return ", ".join(
+                f"/static/{self.paths[f'assets/img/logo-{width}w.{format}']} {density}x"
+                for density, width in ((1, 70), (2, 140))
+            )
+
+        png = self.paths["assets/img/logo-70w.png"]
+        favicon = self.paths["assets/img/favicon-32.png"]
+        touch_icon = self.paths["assets/img/apple-touch-icon.png"]
+        self.assertHTMLEqual(
+            template.render(Context()),
+            f'<picture><source type="image/avif" srcset="{srcset("avif")}">'
+            f'<source type="image/webp" srcset="{srcset("webp")}">'
+            f'<img src="/static/{png}" srcset="{srcset("png")}" width="70" height="67" '
+            'alt="Logo"></picture>'
+            f'<link rel="icon" sizes="32x32" href="/static/{favicon}">'
+            f'<link rel="apple-touch-icon" sizes="180x180" href="/static/{touch_icon}">',
+        )
+
+    def test_picture_tag_loads_the_image(self):
+        """
+        Test that the ``picture`` and ``favicons`` tags load the image itself when its variants
+        are not built.
+        """
+
+        template = Template(
+            '{% load images %}{% picture "assets/img/logo.png" alt="Logo" %}{% favicons %}'
+        )
+        with self.settings(DEBUG=True):
+            html = template.render(Context())
+        self.assertHTMLEqual(
+            html,
+            '<img src="/static/assets/img/logo.png" width="70" height="67" alt="Logo">'
+            '<link rel="icon" href="/static/assets/img/logo.png">',
+        )
+
+    def test_tag_loads_the_sources(self):
+        """
+        Test that the ``bundle`` tag loads the sources of a bundle when it is not built.
+        """
+
+        template = Template('{% load bundles %}{% bundle "js/site.js" %}')
+        with self.settings(DEBUG=True):
+            html = template.render(Context())
+        self.assertHTMLEqual(
+            html,
+            "".join(
+                f'<script defer src="/static/{name}"></script>'
+                for name in TEST_BUNDLES["js/site.js"]
+            ),
+        )
+
+    def test_pages_are_self_hosted(self):
+        """
+        Test that the pages load the bundles from the project, and draw their icons inline.
+        """
+
+        template = Template(
+            '{% extends "base.html" %}'
+            '{% block content %}{% include "icons/home.svg" %}{% endblock %}'
+        )
+        html = template.render(Context())
+        self.assertNotRegex(html, r'(src|href)="(https?:)?//')
+        self.assertIn(f'<script defer src="/static/{self.paths["js/site.js"]}"></script>', html)
+        self.assertIn('<svg xmlns="http://www.w3.org/2000/svg"', html)
+
+    def test_static_files_version_the_pages(self):
+        """
+        Test that the ETag of a page covers the hashed names of the static files and the
+        critical CSS, so a deployment changing only the assets changes it.
+        """
+
+        static_version.cache_clear()
+        self.addCleanup(static_version.cache_clear)
+        view = versioned_page(lambda request: {"count": 1})(lambda request: HttpResponse("Page"))
+        version, etag = static_version(), view(RequestFactory().get("/"))["ETag"]
+        self.assertRegex(version, r"^[0-9a-f]{32}$")
+
+        changes = {
+            "image": mock.patch.dict(
+                staticfiles_storage.hashed_files, {"assets/img/logo.png": "assets/img/logo.1.png"}
+            ),
+            "critical CSS": mock.patch("core.storage.critical_css", return_value="p{margin:0}"),
+        }
+        for name, change in changes.items():
+            with self.subTest(name), change:
+                static_version.cache_clear()
+                self.assertNotEqual(static_version(), version)
+                self.assertNotEqual(view(RequestFactory().get("/"))["ETag"], etag)
+
+        static_version.cache_clear()
+        with self.settings(DEBUG=True):
+            self.assertEqual(static_version(), "")
+
+
+class CompressionTestCase(TestCase):
+    """
+    Test case for the compression of the responses, by ``core.compression``.
+    """
+
+    @classmethod
+    def setUpTestData(cls):
+        """
+        Set up lettings to display.
+        """
+
+        for number in range(1, 31):
+            address = Address.objects.create(
+                number=number,
+                street="Compression Street",
+                city="Compression City",
+                state="CC",
+                zip_code=12345,
+                country_iso_code="USA",
+            )
+            Letting.objects.create(title=f"Compressed Letting {number}", address=address)
+        cls.letting = Letting.objects.first()
+
+    def setUp(self):
+        """
+        Empty the page cache, so the pages are rendered again.
+        """
+
+        cache.clear()
+
+    def test_encoding_is_negotiated(self):
+        """
+        Test that Brotli is preferred to gzip, unless the quality values of the client prefer
+        gzip, and that the other encodings are not used.
+        """
+
+        self.assertEqual(accepted_encoding("gzip, deflate, br"), "br")
+        self.assertEqual(accepted_encoding("gzip, deflate"), "gzip")
+        self.assertEqual(accepted_encoding("br;q=0.5, gzip"), "gzip")
+        self.assertEqual(accepted_encoding("br;q=0, *"), "gzip")
+        self.assertIsNone(accepted_encoding("deflate, identity"))
+        self.assertIsNone(accepted_encoding(""))
+
+    def test_pages_are_compressed(self):
+        """
+        Test that a page is compressed with the encoding accepted by the client, and that it
+        varies on the ``Accept-Encoding`` header.
+        """
+
+        url = reverse("lettings:lettings_index")
+        page = self.client.get(url)
+        self.assertFalse(page.has_header("Content-Encoding"))
+        self.assertEqual(page["Vary"], "Accept-Encoding")
+
+        for encoding, decompress in (("br", brotli.decompress), ("gzip", gzip.decompress)):
+            response = self.client.get(url, HTTP_ACCEPT_ENCODING=f"{encoding}, deflate")
+            self.assertEqual(response["Content-Encoding"], encoding)
+            self.assertEqual(response["Content-Length"], str(len(response.content)))
+            self.assertLess(len(response.content) * 4, len(page.content))
+            self.assertEqual(decompress(response.content), page.content)
+
+    def test_responses_left_as_they_are(self):
+        """
+        Test that the short, binary or already encoded responses are not compressed.
+        """
+
+        request = RequestFactory().get("/", HTTP_ACCEPT_ENCODING="br, gzip")
+        text = "Orange County Lettings " * 100
+        responses = {
+            "short": HttpResponse("Orange County Lettings"),
+            "binary": HttpResponse(text, content_type="image/png"),
+            "encoded": HttpResponse(text),
+            "no-transform": HttpResponse(text),
+        }
+        responses["encoded"]["Content-Encoding"] = "gzip"
+        responses["no-transform"]["Cache-Control"] = "no-transform"
+        for name, response in responses.items():
+            with self.subTest(name):
+                content = response.content
+                response = CompressionMiddleware(lambda request: response)(request)
+                self.assertEqual(response.content, content)
+                self.assertNotEqual(response.get("Content-Encoding"), "br")
+
+    @override_settings(STREAMING_INDEX_PAGES=True, STREAMING_FLUSH_ROWS=10)
+    def test_streaming_responses_are_compressed(self):
+        """
+        Test that the chunks of a streaming page are compressed and flushed one by one, so the
+        client decompresses the top of the page before the rows are read.
+        """
+
+        url = reverse("lettings:lettings_index")
+        page = b"".join(self.client.get(url).streaming_content)
+        response = self.client.get(url, HTTP_ACCEPT_ENCODING="gzip")
+        self.assertTrue(response.streaming)
+        self.assertEqual(response["Content-Encoding"], "gzip")
+        self.assertFalse(response.has_header("Content-Length"))
+
+        decompressor = zlib.decompressobj(31)
+        chunks = [decompressor.decompress(chunk) for chunk in response.streaming_content]
+        self.assertGreater(len(chunks), 3)
+        self.assertTrue(chunks[0].startswith(b"<!DOCTYPE html>"))
+        self.assertEqual(b"".join(chunks), page)
+
+        response = self.client.get(url, HTTP_ACCEPT_ENCODING="br")
+        self.assertEqual(brotli.decompress(b"".join(response.streaming_content)), page)
+
+    def test_cached_pages_are_compressed_once(self):
+        """
+        Test that the compressed content of a page of the page cache is cached too, and that
+        the ETag of a compressed page is weak.
+        """
+
+        url = reverse("lettings:letting", args=[self.letting.id])
+        with mock.patch("core.compression.compress", wraps=compress) as compressor:
+            first = self.client.get(url, HTTP_ACCEPT_ENCODING="br")
+            second = self.client.get(url, HTTP_ACCEPT_ENCODING="br")
+            self.client.get(url, HTTP_ACCEPT_ENCODING="gzip")
+        self.assertEqual([call.args[1] for call in compressor.call_args_list], ["br", "gzip"])
+        self.assertEqual(second.content, first.content)
+        self.assertEqual(brotli.decompress(second.content), self.client.get(url).content)
+        self.assertTrue(second["ETag"].startswith('W/"'))
+
+        response = self.client.get(
+            url, HTTP_ACCEPT_ENCODING="br", HTTP_IF_NONE_MATCH=second["ETag"]
+        )
+        self.assertEqual(response.status_code, 304)
+
+    def test_pages_holding_secrets_are_not_compressed(self):
+        """
+        Test that the pages of the admin site and the responses using or setting the CSRF token
+        are sent uncompressed, so their length tells nothing of their secrets.
+        """
+
+        login = self.client.get(reverse("admin:login"), HTTP_ACCEPT_ENCODING="br, gzip")
+        user = get_user_model().objects.create_superuser("admin", "admin@example.com", "secret")
+        self.client.force_login(user)
+        changelist = self.client.get(
+            reverse("admin:lettings_letting_changelist"),
+            {"q": "Compressed"},
+            HTTP_ACCEPT_ENCODING="br, gzip",
+        )
+        for response in (login, changelist):
+            self.assertEqual(response.status_code, 200)
+            self.assertGreater(len(response.content), settings.COMPRESSION_MIN_LENGTH)
+            self.assertFalse(response.has_header("Content-Encoding"))
+
+        def csrf_page(request):
+            return HttpResponse(f"{get_token(request)} " + "Orange County Lettings " * 100)
+
+        request = RequestFactory().get("/lettings/", HTTP_ACCEPT_ENCODING="br, gzip")
+        response = CompressionMiddleware(csrf_page)(request)
+        self.assertFalse(response.has_header("Content-Encoding"))
+
+
+class TemplateMinifyTestCase(TestCase):
+    """
+    Test case for the minification of the templates, by the loaders of ``core.loaders``.
+    """
+
+    def test_html_is_minified(self):
+        """
+        Test that the indentation, the blank lines, the comments and the lines of the block
+        tags are removed, but the whitespace of the elements and tags where it matters.
+        """
+
+        source = (
+            "{% load static %}\n\n<ul>\n    <!-- The rows -->\n    {% for row in rows %}\n"
+            "        <li class=\"a  b\">{{ row }}</li>\n    {% endfor %}\n</ul>\n"
+            "{# A comment #}\n<p>\n    Text\n</p>\n<!--[if IE]><p>IE</p><![endif]-->\n"
+            "<!-- {{ debug }} -->\n<pre>\n    kept\n</pre>\n"
+            "<script>\n    // kept\n    run();\n</script>\n"
+            "{% verbatim %}\n    {{ kept }}\n{% endverbatim %}\n"
+        )
+        self.assertEqual(
+            minify_html(source),
+            "{% load static %}\n<ul>{% for row in rows %}\n"
+            "<li class=\"a  b\">{{ row }}</li>{% endfor %}\n</ul>\n<p>\nText\n</p>\n"
+            "<!--[if IE]><p>IE</p><![endif]-->\n<!-- {{ debug }} -->\n<pre>\n    kept\n</pre>\n"
+            "<script>\n    // kept\n    run();\n</script>\n"
+            "{% verbatim %}\n    {{ kept }}\n{% endverbatim %}\n",
+        )
+        html = Template(minify_html(source)).render(Context({"rows": [1, 2]}))
+        self.assertIn("<ul>\n<li class=\"a  b\">1</li>\n<li class=\"a  b\">2</li>\n</ul>", html)
+
+    def test_pages_are_rendered_alike(self):
+        """
+        Test that the pages rendered from the minified templates are the pages rendered from
+        the templates as they are written, with less whitespace.
+        """
+
+        address = Address.objects.create(
+            number=7,
+            street="Minified Street",
+            city="Minified City",
+            state="MC",
+            zip_code=12345,
+            country_iso_code="USA",
+        )
+        letting = Letting.objects.create(title="Minified Letting", address=address)
+        plain = [
+            dict(
+                engine,
+                OPTIONS=dict(
+                    engine["OPTIONS"],
+                    loaders=[
+                        "django.template.loaders.filesystem.Loader",
+                        "django.template.loaders.app_directories.Loader",
+                    ],
+                ),
+            )
+            for engine in settings.TEMPLATES
+        ]
+        for url in ("/", "/lettings/", reverse("lettings:letting", args=[letting.id])):
+            with self.subTest(url):
+                cache.clear()
+                minified = self.client.get(url).content.decode()
+                cache.clear()
+                with self.settings(TEMPLATES=plain):
+                    page = self.client.get(url).content.decode()
+                self.assertLess(len(minified), len(page) * 0.8)
+                self.assertNotIn("    ", minified)
+                self.assertHTMLEqual(minified, page)
+
+    def test_templates_are_cached(self):
+        """
+        Test that the templates are minified when they are loaded, and compiled once.
+        """
+
+        engine = engines["django"]
+        template = engine.get_template("base.html")
+        self.assertIs(engine.get_template("base.html").template, template.template)
+        self.assertNotIn("\n ", template.template.source)
+        self.assertNotIn("<!--", template.template.source)
+
+    def test_package_templates_are_not_minified(self):
+        """
+        Test that the templates of the installed packages are loaded as they are written, so the
+        body of the plain-text password reset email keeps its blank lines.
+        """
+
+        engine = engines["django"]
+        for name in ("registration/password_reset_email.html", "admin/base.html"):
+            with self.subTest(name):
+                template = engine.get_template(name).template
+                with open(template.origin.name, encoding="utf-8") as source:
+                    written = source.read()
+                # The minification would change the template.
+                self.assertNotEqual(minify_html(written), written)
+                self.assertEqual(template.source, written)
@@ -0,0 +1,364 @@
+"""
+Timings of the requests.
+
+This module measures where the time of each request goes: the number and the duration of its
+database queries, the rendering of its templates, its view and the whole middleware chain. The
+timings are sent to the client in the ``Server-Timing`` header, which the developer tools of the
+browsers display with the other timings of the request, and logged by the ``core.timing`` logger,
+tagged with the name of the URL pattern of the view (``lettings:letting``,
+``profiles:profile``, ...).
+
+Functions:
+    - count_cache_lookup: Counts a lookup of the page cache in the timings of the current
+      request.
+
+Classes:
+    - RequestTimings: The timings of a request.
+    - Template: A template timing its rendering.
+    - DjangoTemplates: The Django template backend, returning templates timing their rendering.
+    - ServerTimingMiddleware: Records the timings of each request, adds its ``Server-Timing``
+      header and logs them.
+
+Notes:
+    The queries are timed by an execute wrapper installed once on each database connection, which
+    adds the time of a query to the timings of the current request, if any, and the templates by
+    ``DjangoTemplates``, the backend of ``settings.TEMPLATES``. The queries run while a template
+    is rendered, such as those of a queryset iterated by the template, are counted in the time of
+    both.
+
+    The view time starts once the middleware before the view have run, and ends when the response
+    is returned to ``ServerTimingMiddleware``: the time of the other middleware is the total time
+    minus the view time. The chunks of a streaming response, e.g. the streamed index pages and the
+    catalog export, are produced by the view after the headers are sent: their queries and
+    templates are recorded while they are produced, and the view and total times end when the
+    last chunk is sent or the response is closed. The ``Server-Timing`` header of a streaming
+    response, sent before its chunks, holds the timings up to the headers; the log record and the
+    metrics (see ``core.metrics``) hold those of the whole response.
+
+    Each request is logged at the ``INFO`` level, with its timings as key=value pairs and in the
+    ``timings`` attribute of the log record, for a structured formatter.
+
+    ``benchmarks/server_timing.py`` measures the overhead of the timings on the pages of the
+    lettings and profiles: within the noise of the measure, below 1%.
+
+:param logging: The module logging the timings.
+:param contextmanager: A decorator defining the context manager recording the timings.
+:param ContextVar: The class of the variable holding the timings of the current request.
+:param perf_counter: The clock of the timings.
+:param settings: The settings of the project.
+:param connections: The database connections.
+:param TemplateDoesNotExist: The exception raised when a template is not found.
+:param django: The Django template backend.
+:param cached_property: A decorator computing the template directories of the backend once.
+"""
+
+import logging
+from contextlib import contextmanager
+from contextvars import ContextVar
+from time import perf_counter
+
+from django.conf import settings
+from django.db import connections
+from django.template import TemplateDoesNotExist
+from django.template.backends import django
+from django.utils.functional import cached_property
+
+logger = logging.getLogger(__name__)
+
+# The timings of the request being handled by the current thread or task.
+_current_timings = ContextVar("current_timings", default=None)
+
+
+class RequestTimings:
+    """
+    Timings of a request, in seconds.
+
+    :ivar queries: The number of database queries.
+    :vartype queries: int
+    :ivar sql: The time of the database queries.
+    :vartype sql: float
+    :ivar templates: The time of the rendering of the templates.
+    :vartype templates: float
+    :ivar view: The time of the view.
+    :vartype view: float
+    :ivar total: The time of the middleware and the view.
+    :vartype total: float
+    :ivar cache_hits: The pages served from the page cache.
+    :vartype cache_hits: int
+    :ivar cache_misses: The pages not found in the page cache.
+    :vartype cache_misses: int
+    """
+
+    def __init__(self):
+        self.queries = 0
+        self.sql = 0.0
+        self.templates = 0.0
+        self.view = 0.0
+        self.total = 0.0
+        self.cache_hits = 0
+        self.cache_misses = 0
+        self.start = perf_counter()
+        self.view_start = None
+        self.rendering = False
+
+    @contextmanager
+    def record(self):
+        """
+        Record the queries and the templates of the current thread or task in these timings.
+
+        :return: A context manager.
+        :rtype: contextlib.AbstractContextManager
+        """
+
+        for connection in connections.all():
+            if _time_query not in connection.execute_wrappers:
+                connection.execute_wrappers.append(_time_query)
+        token = _current_timings.set(self)
+        try:
+            yield self
+        finally:
+            _current_timings.reset(token)
+
+    def start_view(self):
+        """
+        Start the time of the view.
+
+        :return: None
+        :rtype: None
+        """
+
+        self.view_start = perf_counter()
+
+    def stop(self):
+        """
+        Stop the time of the view, if it started, and the total time.
+
+        :return: None
+        :rtype: None
+        """
+
+        end = perf_counter()
+        if self.view_start is not None:
+            self.view = end - self.view_start
+        self.total = end - self.start
+
+    def as_dict(self):
+        """
+        Return the timings, in milliseconds, and the number of queries.
+
+        :return: The number of queries and the timings by name.
+        :rtype: dict
+        """
+
+        return {
+            "queries": self.queries,
+            "sql_ms": round(self.sql * 1000, 3),
+            "templates_ms": round(self.templates * 1000, 3),
+            "view_ms": round(self.view * 1000, 3),
+            "middleware_ms": round((self.total - self.view) * 1000, 3),
+            "total_ms": round(self.total * 1000, 3),
+        }
+
+    def header(self):
+        """
+        Return the value of the ``Server-Timing`` header of the timings.
+
+        :return: The timings, in milliseconds.
+        :rtype: str
+        """
+
+        return (
+            f'sql;dur={self.sql * 1000:.3f};desc="{self.queries} queries", '
+            f"templates;dur={self.templates * 1000:.3f}, "
+            f"view;dur={self.view * 1000:.3f}, "
+            f"middleware;dur={(self.total - self.view) * 1000:.3f}, "
+            f"total;dur={self.total * 1000:.3f}"
+        )
+
+
+def _time_query(execute, sql, params, many, context):
+    """
+    Time a database query in the timings of the current request, as an execute wrapper of a
+    connection.
+
+    :param execute: The function running the query.
+    :type execute: callable
+    :param sql: The SQL of the query.
+    :type sql: str
+    :param params: The parameters of the query.
+    :type params: list or tuple or dict
+    :param many: Whether the query is run for each parameters of a list.
+    :type many: bool
+    :param context: The connection and the cursor of the query.
+    :type context: dict
+    :return: The result of the query.
+    """
+
+    timings = _current_timings.get()
+    if timings is None:
+        return execute(sql, params, many, context)
+    start = perf_counter()
+    try:
+        return execute(sql, params, many, context)
+    finally:
+        timings.sql += perf_counter() - start
+        timings.queries += 1
+
+
+def count_cache_lookup(hit):
+    """
+    Count a lookup of the page cache in the timings of the current request, if any.
+
+    :param hit: Whether the page was found in the cache.
+    :type hit: bool
+    :return: None
+    :rtype: None
+    """
+
+    timings = _current_timings.get()
+    if timings is None:
+        return
+    if hit:
+        timings.cache_hits += 1
+    else:
+        timings.cache_misses += 1
+
+
+class Template(django.Template):
+    """
+    Template adding the time of its rendering to the timings of the current request.
+
+    The templates rendered while another one is rendered are not timed twice.
+    """
+
+    def render(self, context=None, request=None):
+        timings = _current_timings.get()
+        if timings is None or timings.rendering:
+            return super().render(context, request)
+        timings.rendering = True
+        start = perf_counter()
+        try:
+            return super().render(context, request)
+        finally:
+            timings.templates += perf_counter() - start
+            timings.rendering = False
+
+
+class DjangoTemplates(django.DjangoTemplates):
+    """
+    Django template backend returning templates timing their rendering.
+
+    Its ``template_dirs`` include the directories of its loaders: with the ``loaders`` option
+    of ``settings.TEMPLATES`` (see ``core.loaders``), ``APP_DIRS`` is off, and the directories
+    of the apps would be left out of the templates walked by ``core.conditional``,
+    ``core.css`` and ``core.warmup``.
+    """
+
+    @cached_property
+    def template_dirs(self):
+        directories = list(super().template_dirs)
+        loaders = list(self.engine.template_loaders)
+        while loaders:
+            loader = loaders.pop(0)
+            # The cached loader wraps the loaders reading the files.
+            loaders.extend(getattr(loader, "loaders", []))
+            if hasattr(loader, "get_dirs"):
+                directories += [d for d in loader.get_dirs() if d not in directories]
+        return tuple(directories)
+
+    def from_string(self, template_code):
+        return Template(self.engine.from_string(template_code), self)
+
+    def get_template(self, template_name):
+        try:
+            return Template(self.engine.get_template(template_name), self)
+        except TemplateDoesNotExist as exc:
+            django.reraise(exc, self)
+
+
+def _record_stream(timings, content, finish):
+    """
+    Yield the chunks of a streaming response, recording their queries and templates in the
+    timings of its request, and finish the timings once the chunks are sent.
+
+    :param timings: The timings of the request.
+    :type timings: RequestTimings
+    :param content: The chunks of the response.
+    :type content: iterator
+    :param finish: The function called once the last chunk is sent or the response is closed.
+    :type finish: callable
+    :return: A generator of chunks.
+    :rtype: generator
+    """
+
+    try:
+        with timings.record():
+            yield from content
+    finally:
+        finish()
+
+
+class ServerTimingMiddleware:
+    """
+    Middleware recording the timings of each request, sending them in its ``Server-Timing``
+    header when ``settings.SERVER_TIMING`` is on, and logging them.
+
+    The timings are available to the views and the following middleware as ``request.timings``.
+    The timings of a streaming response are logged once its chunks are sent.
+
+    :param get_response: The next middleware or the view.
+    :type get_response: callable
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        request.timings = timings = RequestTimings()
+        with timings.record():
+            response = self.get_response(request)
+        timings.stop()
+
+        if settings.SERVER_TIMING:
+            response["Server-Timing"] = timings.header()
+        if response.streaming:
+
+            def finish():
+                timings.stop()
+                self.log(request, response)
+
+            response.streaming_content = _record_stream(
+                timings, response.streaming_content, finish
+            )
+        else:
+            self.log(request, response)
+        return response
+
+    def log(self, request, response):
+        """
+        Log the timings of a request.
+
+        :param request: The HTTP request object.
+        :type request: HttpRequest
+        :param response: The response to the request.
+        :type response: HttpResponse or StreamingHttpResponse
+        :return: None
+        :rtype: None
+        """
+
+        if logger.isEnabledFor(logging.INFO):
+            match = request.resolver_match
+            url_name = match.view_name if match else "-"
+            values = request.timings.as_dict()
+            logger.info(
+                "url_name=%s method=%s status=%s queries=%s sql_ms=%s templates_ms=%s view_ms=%s "
+                "middleware_ms=%s total_ms=%s",
+                url_name,
+                request.method,
+                response.status_code,
+                *values.values(),
+                extra={"url_name": url_name, "timings": values},
+            )
+
+    def process_view(self, request, view_func, view_args, view_kwargs):
+        request.timings.start_view()
@@ -0,0 +1,264 @@
+"""
+Sampling of the Sentry traces.
+
+Tracing every request with Sentry adds its spans and their upload to the time of each request.
+This module decides which requests are traced, when they start, with a policy configured in the
+settings:
+
+    - the requests of ``settings.SENTRY_TRACES_IGNORED_PATHS`` (the static files, the metrics
+      scraped by Prometheus, the health checks of the host, ...) are never traced;
+    - the requests of a URL pattern are traced at the rate of the pattern in
+      ``settings.SENTRY_TRACES_ROUTE_RATES``, e.g. ``{"core:export": 1.0}``, or at
+      ``settings.SENTRY_TRACES_SAMPLE_RATE``;
+    - once a request of a URL pattern was slower than ``settings.SENTRY_SLOW_REQUEST_SECONDS``
+      or failed with a 5xx status code, all the requests of the pattern are traced for
+      ``settings.SENTRY_BOOST_SECONDS``;
+    - all the traced requests, those of the previous rule included, are capped by
+      ``settings.SENTRY_TRACES_PER_SECOND``, shared by the worker processes of the server (see
+      ``WEB_CONCURRENCY`` in ``oc_lettings_site.gunicorn_config``).
+
+The decision to trace a request is taken when it starts, so a slow or failing request itself is
+only traced if it was sampled: its successors are. Its errors are reported to Sentry in any case,
+as the errors are not sampled.
+
+Classes:
+    - TraceSampler: The sampling policy, as the ``traces_sampler`` of ``sentry_sdk.init``.
+    - TraceSamplingMiddleware: Reports the slow and failing requests to the sampling policy.
+
+Functions:
+    - django_integration: Returns the Django integration of Sentry, without the spans of each
+      middleware and signal receiver.
+    - trace_sampler: Returns the sampling policy of the settings.
+    - sample_trace: Decides whether a request is traced, as the ``traces_sampler`` of
+      ``sentry_sdk.init``.
+
+Notes:
+    By default, the Django integration of Sentry wraps each middleware and each signal receiver
+    to time it in a span, and the wrappers cost more than the sampling saves, even when the
+    request is not traced. ``django_integration`` leaves them out: the time of the middleware is
+    in the ``Server-Timing`` header of ``core.timing``.
+
+    The state of the policy (the patterns traced at full rate and the budget) is kept by each
+    worker process: the budget of the settings is divided by ``WEB_CONCURRENCY``, the number of
+    worker processes, so the whole server sends at most ``settings.SENTRY_TRACES_PER_SECOND``
+    traces per second when the requests are spread over the workers.
+
+:param os: The module reading the number of worker processes.
+:param random: The random numbers of the sampling.
+:param threading: The lock of the budget, shared by the threads of a worker.
+:param lru_cache: A decorator building the sampling policy once per process, and caching the URL
+    names of the paths.
+:param monotonic: The clock of the budget and of the full-rate periods.
+:param settings: The settings of the project.
+:param Resolver404: The exception raised when a path matches no URL pattern.
+:param resolve: A function returning the URL pattern of a path.
+:param DjangoIntegration: The Django integration of Sentry.
+"""
+
+import os
+import random
+import threading
+from functools import lru_cache
+from time import monotonic
+
+from django.conf import settings
+from django.urls import Resolver404, resolve
+from sentry_sdk.integrations.django import DjangoIntegration
+
+
+@lru_cache(maxsize=4096)
+def _url_name(path):
+    """
+    Return the name of the URL pattern of a path.
+
+    :param path: The path of a request.
+    :type path: str
+    :return: The URL name, e.g. ``"lettings:letting"``, or ``"-"`` if the path matches no pattern.
+    :rtype: str
+    """
+
+    try:
+        return resolve(path).view_name
+    except Resolver404:
+        return "-"
+
+
+class TraceSampler:
+    """
+    Policy deciding which requests are traced by Sentry.
+
+    :param rate: The rate of the URL patterns without a rate of their own, from 0 to 1.
+    :type rate: float
+    :param route_rates: The rates by URL name.
+    :type route_rates: dict
+    :param per_second: The maximum number of traces per second of this process.
+    :type per_second: float
+    :param ignored_paths: The prefixes of the paths which are never traced.
+    :type ignored_paths: list of str
+    :param slow_seconds: The time from which a request is slow.
+    :type slow_seconds: float
+    :param boost_seconds: The time during which the requests of a URL pattern are all traced,
+        after a slow or failing request.
+    :type boost_seconds: float
+    """
+
+    def __init__(self, rate, route_rates, per_second, ignored_paths, slow_seconds, boost_seconds):
+        self.rate = rate
+        self.route_rates = route_rates
+        self.per_second = per_second
+        self.ignored_paths = tuple(ignored_paths)
+        self.slow_seconds = slow_seconds
+        self.boost_seconds = boost_seconds
+        # The time until which the requests of each URL name are all traced.
+        self.boosted = {}
+        # A token bucket holding up to one second of traces, and at least one trace.
+        self.capacity = max(per_second, 1)
+        self.tokens = self.capacity
+        self.refilled = monotonic()
+        self.lock = threading.Lock()
+
+    @classmethod
+    def from_settings(cls):
+        """
+        Return the sampling policy of the settings, with the budget of one worker process.
+
+        :return: The sampling policy.
+        :rtype: TraceSampler
+        """
+
+        workers = max(int(os.environ.get("WEB_CONCURRENCY", 1)), 1)
+        return cls(
+            rate=settings.SENTRY_TRACES_SAMPLE_RATE,
+            route_rates=settings.SENTRY_TRACES_ROUTE_RATES,
+            per_second=settings.SENTRY_TRACES_PER_SECOND / workers,
+            ignored_paths=settings.SENTRY_TRACES_IGNORED_PATHS,
+            slow_seconds=settings.SENTRY_SLOW_REQUEST_SECONDS,
+            boost_seconds=settings.SENTRY_BOOST_SECONDS,
+        )
+
+    def __call__(self, sampling_context):
+        """
+        Decide whether a request is traced.
+
+        The decision of the service which called the project, if any, is followed.
+
+        :param sampling_context: The sampling context of Sentry, holding the WSGI environment
+            or the ASGI scope of the request.
+        :type sampling_context: dict
+        :return: 1 to trace the request, 0 otherwise.
+        :rtype: float
+        """
+
+        if sampling_context.get("parent_sampled") is not None:
+            return float(sampling_context["parent_sampled"])
+        if "wsgi_environ" in sampling_context:
+            path = sampling_context["wsgi_environ"].get("PATH_INFO", "")
+        elif "asgi_scope" in sampling_context:
+            path = sampling_context["asgi_scope"].get("path", "")
+        else:
+            return float(random.random() < self.rate)
+        if path.startswith(self.ignored_paths):
+            return 0.0
+
+        url_name = _url_name(path)
+        if self.boosted.get(url_name, 0) < monotonic():
+            rate = self.route_rates.get(url_name, self.rate)
+            if rate <= 0 or random.random() >= rate:
+                return 0.0
+        return float(self.take_token())
+
+    def take_token(self):
+        """
+        Take a trace from the budget of the current second.
+
+        :return: Whether the budget had a trace left.
+        :rtype: bool
+        """
+
+        with self.lock:
+            now = monotonic()
+            self.tokens = min(
+                self.tokens + (now - self.refilled) * self.per_second, self.capacity
+            )
+            self.refilled = now
+            if self.tokens < 1:
+                return False
+            self.tokens -= 1
+            return True
+
+    def observe(self, url_name, seconds, status_code):
+        """
+        Trace all the requests of a URL pattern for a while, if one of them was slow or failed.
+
+        :param url_name: The name of the URL pattern of the request.
+        :type url_name: str
+        :param seconds: The time of the request.
+        :type seconds: float
+        :param status_code: The status code of the response.
+        :type status_code: int
+        :return: None
+        :rtype: None
+        """
+
+        if seconds >= self.slow_seconds or status_code >= 500:
+            self.boosted[url_name] = monotonic() + self.boost_seconds
+
+
+def django_integration():
+    """
+    Return the Django integration of Sentry, without the spans of each middleware and signal
+    receiver.
+
+    :return: The integration, for the ``integrations`` of ``sentry_sdk.init``.
+    :rtype: DjangoIntegration
+    """
+
+    return DjangoIntegration(middleware_spans=False, signals_spans=False)
+
+
+@lru_cache(maxsize=None)
+def trace_sampler():
+    """
+    Return the sampling policy of the settings, built once per process.
+
+    :return: The sampling policy.
+    :rtype: TraceSampler
+    """
+
+    return TraceSampler.from_settings()
+
+
+def sample_trace(sampling_context):
+    """
+    Decide whether a request is traced, with the sampling policy of the settings.
+
+    :param sampling_context: The sampling context of Sentry.
+    :type sampling_context: dict
+    :return: 1 to trace the request, 0 otherwise.
+    :rtype: float
+    """
+
+    return trace_sampler()(sampling_context)
+
+
+class TraceSamplingMiddleware:
+    """
+    Middleware reporting the time and the status code of each request to the sampling policy.
+
+    The time is read from the timings of ``core.timing``, so this middleware must come before
+    ``core.timing.ServerTimingMiddleware`` in ``settings.MIDDLEWARE``.
+
+    :param get_response: The next middleware or the view.
+    :type get_response: callable
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        response = self.get_response(request)
+        match = request.resolver_match
+        trace_sampler().observe(
+            match.view_name if match else "-", request.timings.total, response.status_code
+        )
+        return response
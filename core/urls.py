@@ -7,6 +7,9 @@ is responsible for handling basic site functionalities such as the homepage.
 Patterns defined here include:
     - ``/`` - URL for the homepage, handled by the ``index`` view.
     - ``/sentry-debug/`` - URL for triggering an error, handled by the ``trigger_error`` view.
+    - ``/export/<catalog>/<format>/`` - URL streaming the export of the lettings or profiles to
+      staff members, handled by the ``export`` view.
+    - ``/metrics`` - URL scraped by Prometheus, handled by the ``metrics`` view.
 
 Note:
     This file should only include URL patterns specific to the core app.
@@ -18,11 +21,14 @@ Note:
 
 from django.urls import path
 
-from core.views import index, trigger_error
+from core.views import export, index, metrics, trigger_error
 
 app_name = "core"
 
 urlpatterns = [
     path("", index, name="index"),
     path("sentry-debug/", trigger_error, name="trigger_error_sentry"),
+    path("export/<str:catalog>/<str:file_format>/", export, name="export"),
+    # Without a trailing slash, the path Prometheus scrapes by default.
+    path("metrics", metrics, name="metrics"),
 ]
@@ -0,0 +1,171 @@
+"""
+Validation of batches of rows against the fields of a model.
+
+Validating rows one model instance at a time with ``full_clean()`` calls every validator of every
+field for every row. This module validates a batch of rows column by column instead: a column is
+converted with the ``to_python()`` method of its field, then each bound validator
+(``MaxValueValidator``, ``MinLengthValidator``, ...) is checked once against the largest or
+smallest value of the column. Only when that check fails are the values of the column validated
+one by one, to find the rows in error.
+
+Functions:
+    - validate_batch: Validates a batch of rows against fields and returns the cleaned columns
+      and the errors of each invalid row.
+
+Notes:
+    The checks are those of ``Field.clean()``: the conversion of the value, the blank values and
+    the validators of the field. Positive integer fields are also checked against their lower
+    bound, which is enforced by the database rather than by a validator. The model-level checks
+    (``Model.clean()``, unique constraints) are not run.
+
+Example:
+    To validate rows read from a CSV file::
+
+        fields = [Address._meta.get_field(name) for name in ("number", "street")]
+        columns, errors = validate_batch(rows, fields)
+        # columns["number"][i] is the cleaned number of rows[i], errors[i] its error messages.
+
+:param defaultdict: A dictionary collecting the error messages of each row.
+:param ValidationError: The exception raised by the fields and validators.
+:param MaxLengthValidator: A validator checked against the longest value of a column.
+:param MaxValueValidator: A validator checked against the largest value of a column.
+:param MinLengthValidator: A validator checked against the shortest value of a column.
+:param MinValueValidator: A validator checked against the smallest value of a column.
+:param ProhibitNullCharactersValidator: A validator checked against a whole column at once.
+:param models: The module defining the model fields.
+"""
+
+from collections import defaultdict
+
+from django.core.exceptions import ValidationError
+from django.core.validators import (
+    MaxLengthValidator,
+    MaxValueValidator,
+    MinLengthValidator,
+    MinValueValidator,
+    ProhibitNullCharactersValidator,
+)
+from django.db import models
+
+BOUND_REDUCERS = {
+    MaxLengthValidator: max,
+    MaxValueValidator: max,
+    MinLengthValidator: min,
+    MinValueValidator: min,
+}
+
+
+def _column_is_valid(validator, values):
+    """
+    Check a validator against a whole column at once.
+
+    :param validator: The validator of the field.
+    :type validator: callable
+    :param values: The cleaned values of the column, without the blank values.
+    :type values: list
+    :return: True if every value is valid, False if some may not be.
+    :rtype: bool
+    """
+
+    reducer = BOUND_REDUCERS.get(type(validator))
+    if reducer is not None:
+        bound = reducer(map(validator.clean, values))
+        return not validator.compare(bound, validator.limit_value)
+    if isinstance(validator, ProhibitNullCharactersValidator):
+        return "\x00" not in "".join(map(str, values))
+    return False
+
+
+def _field_validators(field):
+    """
+    Return the validators of a field, with the lower bound of the positive integer fields.
+
+    :param field: The model field.
+    :type field: Field
+    :return: The validators.
+    :rtype: list
+    """
+
+    validators = list(field.validators)
+    if isinstance(field, (models.PositiveIntegerField, models.PositiveSmallIntegerField)):
+        validators.append(MinValueValidator(0))
+    return validators
+
+
+def _clean_column(field, values, errors):
+    """
+    Convert and validate the values of one column.
+
+    :param field: The model field of the column.
+    :type field: Field
+    :param values: The raw values of the column.
+    :type values: list
+    :param errors: The error messages of each row, updated in place.
+    :type errors: defaultdict
+    :return: The cleaned values, None for the invalid ones.
+    :rtype: list
+    """
+
+    invalid = set()
+
+    def reject(index, error):
+        errors[index].append(f"{field.name}: {' '.join(error.messages)}")
+        cleaned[index] = None
+        invalid.add(index)
+
+    try:
+        cleaned = list(map(field.to_python, values))
+    except ValidationError:
+        cleaned = [None] * len(values)
+        for index, value in enumerate(values):
+            try:
+                cleaned[index] = field.to_python(value)
+            except ValidationError as error:
+                reject(index, error)
+
+    blank_values = (None, "") if field.blank else (None,)
+    if not field.blank and "" in cleaned:
+        for index, value in enumerate(cleaned):
+            if value == "":
+                reject(index, ValidationError(field.error_messages["blank"]))
+    if not field.null and None in cleaned:
+        for index, value in enumerate(cleaned):
+            if value is None and index not in invalid:
+                reject(index, ValidationError(field.error_messages["null"]))
+
+    present = [value for value in cleaned if value not in blank_values]
+    for validator in _field_validators(field):
+        if not present or _column_is_valid(validator, present):
+            continue
+        for index, value in enumerate(cleaned):
+            if value in blank_values:
+                continue
+            try:
+                validator(value)
+            except ValidationError as error:
+                reject(index, error)
+        present = [value for value in cleaned if value not in blank_values]
+    return cleaned
+
+
+def validate_batch(rows, fields):
+    """
+    Validate a batch of rows against model fields, column by column.
+
+    :param rows: The rows, as dictionaries mapping the field names to their raw values. A
+        missing field is treated as None.
+    :type rows: list of dict
+    :param fields: The model fields to validate.
+    :type fields: list of Field
+    :return: The cleaned columns, mapping each field name to the list of its values (None for the
+        invalid ones), and the error messages of the invalid rows, mapping their index in
+        ``rows`` to a list of messages.
+    :rtype: tuple of (dict, dict)
+    """
+
+    errors = defaultdict(list)
+    columns = {
+        field.name: _clean_column(field, [row.get(field.name) for row in rows], errors)
+        for field in fields
+    }
+    return columns, dict(errors)
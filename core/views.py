@@ -5,8 +5,12 @@ This module defines views for handling various HTTP requests in the core app.
 The views are responsible for rendering templates for the homepage.
 
 Views defined here include:
-    - index: Renders the homepage template ('index.html').
+    - index: Renders the homepage template ('index.html'), with an ETag computed from the
+      templates so unchanged pages are answered with ``304 Not Modified``.
     - trigger_error: Triggers an event in Sentry.
+    - export: Streams the export of the catalog of lettings or profiles to staff members.
+    - metrics: Serves the metrics of the requests to Prometheus (see ``core.metrics``), to the
+      authorized clients only.
 
 Note:
     These views are simple render functions that use Django's 'render' shortcut
@@ -14,11 +18,39 @@ Note:
     (urls.py) of the core app.
 
 :param render: A module to render templates in Django views.
+:param versioned_page: A view decorator answering the conditional requests.
+:param staff_member_required: A view decorator redirecting the other users to the admin login.
+:param StreamingHttpResponse: The response streaming the export.
+:param export_catalog: A function returning the chunks of an export.
+:param collect_metrics: A function returning the metrics of the worker processes.
+:param is_authorized: A function returning whether a request may read the metrics.
+:param PermissionDenied: An exception answered ``403 Forbidden``.
 """
 
+from django.contrib.admin.views.decorators import staff_member_required
+from django.core.exceptions import PermissionDenied
+from django.http import Http404, HttpResponse, StreamingHttpResponse
 from django.shortcuts import render
+from prometheus_client import CONTENT_TYPE_LATEST
 
+from core.conditional import versioned_page
+from core.export import FORMATS, export_catalog
+from core.metrics import collect_metrics, is_authorized
 
+
+def index_version(request):
+    """
+    Return the version of the homepage, which does not depend on the database.
+
+    :param HttpRequest request: The HTTP request object.
+    :return: An empty version: the ETag only depends on the templates.
+    :rtype: dict
+    """
+
+    return {}
+
+
+@versioned_page(index_version)
 def index(request):
     """
     Render the homepage.
@@ -48,3 +80,46 @@ def trigger_error(request):
     # Example for triggering an error
     division_by_zero = 1 / 0
     return division_by_zero  # This will raise a ZeroDivisionError
+
+
+@staff_member_required
+def export(request, catalog, file_format):
+    """
+    Stream the export of a catalog as a file attachment.
+
+    The rows are read in chunks while the response is sent (see ``core.export``), so the memory
+    used does not depend on the size of the catalog.
+
+    :param HttpRequest request: The HTTP request object.
+    :param str catalog: ``"lettings"`` or ``"profiles"``.
+    :param str file_format: ``"csv"``, ``"ndjson"`` or ``"columns"``.
+    :return: The streaming response.
+    :rtype: StreamingHttpResponse
+    :raises Http404: If the catalog or the format is unknown.
+    """
+
+    try:
+        chunks = export_catalog(catalog, file_format)
+    except ValueError as error:
+        raise Http404(str(error))
+    _, content_type, extension = FORMATS[file_format]
+    response = StreamingHttpResponse(chunks, content_type=content_type)
+    response["Content-Disposition"] = f'attachment; filename="{catalog}.{extension}"'
+    return response
+
+
+def metrics(request):
+    """
+    Serve the metrics of the requests of all the worker processes, in the text format of
+    Prometheus.
+
+    :param HttpRequest request: The HTTP request object.
+    :return: The metrics.
+    :rtype: HttpResponse
+    :raises PermissionDenied: If the client is neither in an allowed network nor holds the
+        token (see ``core.metrics.is_authorized``).
+    """
+
+    if not is_authorized(request):
+        raise PermissionDenied
+    return HttpResponse(collect_metrics(), content_type=CONTENT_TYPE_LATEST)
@@ -0,0 +1,89 @@
+"""
+Warmup of the worker processes of the web server.
+
+The first request of a new worker process compiles the templates it renders, builds the URL
+resolvers and opens the database connection, which makes it several times slower than the
+following ones. The hooks of ``oc_lettings_site.gunicorn_config`` do this work before the workers
+accept requests: the templates and the URL patterns are loaded once in the master process, which
+the workers are forked from, and each worker opens its database connections.
+
+Functions:
+    - compile_templates: Compiles the templates of the project.
+    - resolve_urls: Builds the URL resolvers of the project.
+    - open_connections: Opens the database connections of the current thread.
+
+Notes:
+    The compiled templates are kept by the cached template loader of ``settings.TEMPLATES``
+    (see ``core.loaders``). The database connections are opened by the thread calling
+    ``open_connections``: the ASGI handler of ``core.asgi`` calls it in each thread of its pool,
+    and the threads of the ``gthread`` workers of gunicorn, which are started by the requests,
+    open their own connections on their first request.
+
+:param os: The module listing the template files.
+:param settings: The settings of the project.
+:param connections: The database connections.
+:param engines: The template engines of the project.
+:param URLResolver: The class of the URL patterns including other URL patterns.
+:param get_resolver: A function returning the root URL resolver.
+"""
+
+import os
+
+from django.conf import settings
+from django.db import connections
+from django.template import engines
+from django.urls import URLResolver, get_resolver
+
+
+def compile_templates():
+    """
+    Compile the templates of the project, leaving out those of the installed packages.
+
+    :return: The number of compiled templates.
+    :rtype: int
+    """
+
+    count = 0
+    for engine in engines.all():
+        for directory in engine.template_dirs:
+            directory = str(directory)
+            if not directory.startswith(str(settings.BASE_DIR)):
+                continue
+            for root, _, files in os.walk(directory):
+                for name in files:
+                    engine.get_template(os.path.relpath(os.path.join(root, name), directory))
+                    count += 1
+    return count
+
+
+def resolve_urls(resolver=None):
+    """
+    Build the URL resolvers of the project, with the patterns they include.
+
+    :param resolver: The resolver to build, the root resolver by default.
+    :type resolver: URLResolver
+    :return: The number of URL patterns.
+    :rtype: int
+    """
+
+    resolver = resolver or get_resolver()
+    resolver.reverse_dict
+    count = 0
+    for pattern in resolver.url_patterns:
+        count += resolve_urls(pattern) if isinstance(pattern, URLResolver) else 1
+    return count
+
+
+def open_connections():
+    """
+    Open the connections of the current thread to each database.
+
+    :return: The aliases of the databases.
+    :rtype: list of str
+    :raises DatabaseError: If a database can not be opened.
+    """
+
+    aliases = list(connections)
+    for alias in aliases:
+        connections[alias].ensure_connection()
+    return aliases
@@ -1,3 +1,5 @@
 python manage.py collectstatic --noinput
 python manage.py migrate --noinput
-gunicorn -b 0.0.0.0:8000 oc_lettings_site.wsgi:application
+# The server profile (see oc_lettings_site/gunicorn_config.py) reads SERVER_MODE=asgi to serve the
+# project with uvicorn workers (see core.asgi), and sizes the workers from the CPUs
+gunicorn -c "${GUNICORN_CONFIG:-python:oc_lettings_site.gunicorn_config}"
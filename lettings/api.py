@@ -0,0 +1,76 @@
+"""
+JSON API of the lettings app.
+
+This module defines the read-only JSON endpoint listing the :class:`lettings.Letting` properties
+with their nested :class:`lettings.Address`, for the partner integrations.
+
+Views defined here include:
+    - index: Returns one page of :class:`lettings.Letting` properties as JSON, ordered by ID or
+      filtered and sorted by place.
+
+Usage:
+    ``GET /api/lettings/`` returns ``{"results": [...], "next": url, "previous": url}``. The
+    query parameters are:
+
+    - ``fields``: The comma separated fields to return, e.g. ``id,title,address.city``. The name
+      ``address`` selects all the fields of the address. All the fields are returned by default.
+    - ``size``: The number of lettings per page, bounded by ``settings.PAGINATION_MAX_PAGE_SIZE``.
+    - ``after`` and ``before``: The cursors of the page, read from the ``next`` and ``previous``
+      URLs.
+    - ``country``, ``state``, ``city``, ``zip`` and ``sort``: Filter the lettings on their
+      address and sort them by place, as on the HTML index page (see ``lettings.filters``).
+
+Notes:
+    The rows are read with ``values_list()`` and only the requested columns are selected, so no
+    model instance is built and no template is rendered (see ``core.api``). The endpoint answers
+    the conditional requests like the HTML index page, from a version which also covers the
+    addresses, as their fields are returned with each letting.
+
+:param LETTING_FIELDS: The fields of a letting, mapping their name in the JSON output to their
+    column.
+:type LETTING_FIELDS: dict
+:param JsonResponse: The response holding the JSON error documents.
+:param versioned_page: A view decorator answering the conditional requests.
+:param json_page: A function returning a JSON response holding one page of rows.
+:param filter_lettings: A function returning the lettings selected by the query parameters.
+:param index_version: A function returning the version of the lettings index.
+"""
+
+from django.http import JsonResponse
+
+from core.api import json_page
+from core.conditional import versioned_page
+from lettings.filters import LettingFilterError, filter_lettings
+from lettings.models import Letting
+from lettings.views import index_version
+
+LETTING_FIELDS = {
+    "id": "id",
+    "title": "title",
+    "address.number": "address__number",
+    "address.street": "address__street",
+    "address.city": "address__city",
+    "address.state": "address__state",
+    "address.zip_code": "address__zip_code",
+    "address.country_iso_code": "address__country_iso_code",
+}
+
+
+@versioned_page(index_version)
+def index(request):
+    """
+    Return one page of lettings as JSON.
+
+    :param request: The HTTP request object.
+    :type request: HttpRequest
+    :return: The JSON response, or a ``400 Bad Request`` response if a field, a filter or the
+        sort order is invalid.
+    :rtype: HttpResponse
+    :raises Http404: If the cursor is invalid.
+    """
+
+    try:
+        lettings, keys = filter_lettings(request, Letting.objects.all())
+    except LettingFilterError as error:
+        return JsonResponse({"error": str(error)}, status=400)
+    return json_page(request, lettings, LETTING_FIELDS, keys)
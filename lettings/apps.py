@@ -3,3 +3,7 @@ from django.apps import AppConfig
 
 class LettingsConfig(AppConfig):
     name = 'lettings'
+
+    def ready(self):
+        # Connect the receivers invalidating the cached letting pages.
+        from lettings import signals  # noqa: F401
@@ -0,0 +1,134 @@
+"""
+Filters and sort orders of the lettings listings.
+
+The lettings index page and the ``/api/lettings/`` endpoint list the :class:`lettings.Letting`
+properties filtered on the fields of their :class:`lettings.Address` and sorted by place. The
+filters and the sort orders follow the indexes of the ``lettings_address`` table, so a page is
+read from an index whatever the number of lettings.
+
+Classes:
+    - LettingFilterError: An exception raised when a filter or a sort order is invalid.
+
+Functions:
+    - filter_lettings: Returns the lettings selected by the query parameters of a request and
+      the keys to paginate them on.
+
+Query parameters:
+    - ``country``, ``state``, ``city`` and ``zip``: Select the lettings whose address has this
+      ``country_iso_code``, ``state``, ``city`` or ``zip_code``. An empty value is ignored.
+    - ``sort``: ``id``, ``country`` (then state and city), ``state`` (then city), ``city`` or
+      ``zip``. A listing is sorted by ID by default, and by the first of its filters in the
+      order above when it is filtered.
+
+Notes:
+    - Each sort order reads the ``address_*`` index starting with its columns, and the filters
+      read the index starting with the filtered column. The sort orders of a filtered listing
+      are read from an index too when the filters are on the leading columns of the index of the
+      sort order, e.g. ``?country=USA&sort=state``. The other combinations, e.g.
+      ``?country=USA&sort=id``, sort every matching letting.
+    - The lettings sorted by place are paginated on the sort columns and then on the ID of their
+      address, which is the last column of every index of the ``lettings_address`` table. The ID
+      is read from the joined address table: the ``address_id`` column of the lettings holds the
+      same value, but SQLite can not sort on it with the index of the addresses.
+
+Example:
+    To list the lettings of a city::
+
+        lettings, keys = filter_lettings(request, Letting.objects.only("id", "title"))
+        page = paginate_keyset(request, lettings, keys)
+
+:param ValidationError: The exception raised by the address fields for an invalid value.
+:param F: An expression reading a column of the address.
+:param IntegerField: The type of the ID of the joined address, converting the cursors.
+:param RawSQL: An expression reading the ID of the joined address.
+:param Address: Represents the :class:`lettings.Address` of a letting.
+:type Address: class:`lettings.Address`
+:param FILTERS: The filters, mapping their query parameter to the filtered column.
+:type FILTERS: dict
+:param SORTS: The sort orders, mapping their name to the filters they sort on.
+:type SORTS: dict
+:param ADDRESS_ID: The ID of the joined address, the last ordering key of the sort orders by
+    place.
+:type ADDRESS_ID: RawSQL
+"""
+
+from django.core.exceptions import ValidationError
+from django.db.models import F, IntegerField
+from django.db.models.expressions import RawSQL
+
+from lettings.models import Address
+
+FILTERS = {
+    "country": "address__country_iso_code",
+    "state": "address__state",
+    "city": "address__city",
+    "zip": "address__zip_code",
+}
+
+SORTS = {
+    "id": (),
+    "country": ("country", "state", "city"),
+    "state": ("state", "city"),
+    "city": ("city",),
+    "zip": ("zip",),
+}
+
+ADDRESS_ID = RawSQL(f'"{Address._meta.db_table}"."id"', (), output_field=IntegerField())
+
+
+class LettingFilterError(ValueError):
+    """
+    Exception raised when a filter value or the sort order of a listing is invalid.
+    """
+
+
+def _filter_value(name, value):
+    """
+    Convert the value of a filter with the address field it filters.
+
+    :param name: The query parameter of the filter.
+    :type name: str
+    :param value: The value read from the query string.
+    :type value: str
+    :return: The converted value.
+    :raises LettingFilterError: If the value is invalid for the field.
+    """
+
+    field = Address._meta.get_field(FILTERS[name].split("__")[1])
+    try:
+        return field.to_python(value)
+    except ValidationError:
+        raise LettingFilterError(f"Invalid {name} {value!r}.")
+
+
+def filter_lettings(request, queryset):
+    """
+    Return the lettings selected by the query parameters of a request and their ordering keys.
+
+    When the lettings are sorted by place, the sort columns and the ID of the address are
+    annotated on each letting as ``sort_<name>`` and ``sort_address_id``, so the cursors of the
+    pages are read without loading the addresses.
+
+    :param request: The HTTP request object.
+    :type request: HttpRequest
+    :param queryset: The lettings to filter.
+    :type queryset: QuerySet
+    :return: The filtered lettings and the unique keys to order and paginate them on.
+    :rtype: tuple of (QuerySet, tuple of str)
+    :raises LettingFilterError: If a filter value or the sort order is invalid.
+    """
+
+    selected = {
+        name: _filter_value(name, request.GET[name]) for name in FILTERS if request.GET.get(name)
+    }
+    sort = request.GET.get("sort") or next(iter(selected), "id")
+    if sort not in SORTS:
+        raise LettingFilterError(f"Unknown sort {sort!r}, use one of: {', '.join(SORTS)}.")
+
+    queryset = queryset.filter(**{FILTERS[name]: value for name, value in selected.items()})
+    if not SORTS[sort]:
+        return queryset, ("id",)
+
+    annotations = {f"sort_{name}": F(FILTERS[name]) for name in SORTS[sort]}
+    annotations["sort_address_id"] = ADDRESS_ID
+    return queryset.annotate(**annotations), tuple(annotations)
@@ -0,0 +1,255 @@
+"""
+Management command importing lettings and their addresses in bulk.
+
+This command reads a feed of :class:`lettings.Letting` and their :class:`lettings.Address` from a
+CSV or NDJSON file, validates it in batches against the fields of the models (see
+``core.validation``) and inserts each batch with one ``executemany()`` per table (see
+``core.bulk``) in its own transaction.
+
+Usage::
+
+    $ python manage.py import_lettings feed.csv
+    $ python manage.py import_lettings feed.ndjson --batch-size 20000
+    $ cat feed.ndjson | python manage.py import_lettings - --format ndjson
+
+Input:
+    Each row holds the ``title`` of the letting and the ``number``, ``street``, ``city``,
+    ``state``, ``zip_code`` and ``country_iso_code`` of its address. A CSV file has a header
+    naming these columns. An NDJSON file holds one JSON object per line, and the address fields
+    may also be nested in an ``address`` object, as returned by ``/api/lettings/``.
+
+Notes:
+    - The input is read lazily, one batch at a time, so the memory used does not depend on the
+      size of the feed.
+    - Invalid rows are reported on stderr with their line number and skipped; the valid rows of
+      the same batch are imported.
+    - The primary keys are allocated from the largest existing ones, so each letting references
+      its address without reading the addresses back. They are read at the beginning of the
+      transaction of each batch, which holds the write lock of the database (``BEGIN
+      IMMEDIATE``, see ``core.backends.sqlite3``), so the rows created by other processes between
+      two batches are not overwritten.
+    - No ``post_save`` signal is sent; the new lettings have no cached page yet and the index
+      pages are not cached, so nothing needs to be invalidated.
+    - The search index is updated with one statement per batch rather than by the insert
+      trigger (see ``lettings.search``).
+
+:param csv: The module reading the CSV files.
+:param json: The module reading the NDJSON files.
+:param BaseCommand: The base class of the management commands.
+:param CommandError: The exception raised when the command can not run.
+:param transaction: The module running each batch in a transaction.
+:param timezone: The module giving the date of the last change of the imported rows.
+:param bulk_insert: A function inserting rows of values with a single query.
+:param validate_batch: A function validating a batch of rows against model fields.
+:param deferred_search_indexing: A context manager skipping the indexing of each letting.
+:param index_lettings: A function indexing a range of lettings with one statement.
+"""
+
+import csv
+import io
+import json
+import sys
+import time
+from itertools import islice
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connections, router, transaction
+from django.db.models import Max
+from django.utils import timezone
+
+from core.bulk import bulk_insert
+from core.validation import validate_batch
+from lettings.models import Address, Letting
+from lettings.search import deferred_search_indexing, index_lettings
+
+ADDRESS_FIELDS = ("number", "street", "city", "state", "zip_code", "country_iso_code")
+LETTING_FIELDS = ("title",)
+
+try:
+    import resource
+except ImportError:  # Not available on Windows.
+    resource = None
+
+
+def read_csv(stream):
+    """
+    Yield the line number and the row of each line of a CSV file with a header.
+
+    :param stream: The text stream of the file.
+    :type stream: TextIO
+    :return: A generator of ``(line number, row)`` tuples.
+    :rtype: generator
+    """
+
+    reader = csv.DictReader(stream)
+    for row in reader:
+        yield reader.line_num, row
+
+
+def read_ndjson(stream):
+    """
+    Yield the line number and the row of each line of an NDJSON file.
+
+    The fields of a nested ``address`` object are moved to the row. A line which is not a JSON
+    object is yielded as None, to be reported as invalid.
+
+    :param stream: The text stream of the file.
+    :type stream: TextIO
+    :return: A generator of ``(line number, row)`` tuples.
+    :rtype: generator
+    """
+
+    for line_number, line in enumerate(stream, start=1):
+        if not line.strip():
+            continue
+        try:
+            row = json.loads(line)
+        except ValueError:
+            row = None
+        if not isinstance(row, dict):
+            yield line_number, None
+            continue
+        address = row.pop("address", None)
+        if isinstance(address, dict):
+            row.update(address)
+        yield line_number, row
+
+
+READERS = {"csv": read_csv, "ndjson": read_ndjson}
+
+
+def peak_memory_mib():
+    """
+    Return the peak resident set size of the process, in MiB.
+
+    :return: The peak resident set size, or None if it can not be read on this platform.
+    :rtype: float or None
+    """
+
+    if resource is None:
+        return None
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+
+class Command(BaseCommand):
+    help = "Import lettings and their addresses from a CSV or NDJSON file."
+
+    def add_arguments(self, parser):
+        parser.add_argument("path", help='The file to import, or "-" to read stdin.')
+        parser.add_argument(
+            "--format",
+            choices=sorted(READERS),
+            help="The format of the file, guessed from its extension by default.",
+        )
+        parser.add_argument(
+            "--batch-size",
+            type=int,
+            default=10000,
+            help="The number of rows validated and inserted per transaction.",
+        )
+
+    def handle(self, *args, **options):
+        path = options["path"]
+        file_format = options["format"] or path.rpartition(".")[2].lower()
+        if file_format not in READERS:
+            raise CommandError(
+                f"Unknown format {file_format!r}, use --format with one of: "
+                f"{', '.join(sorted(READERS))}."
+            )
+        if options["batch_size"] < 1:
+            raise CommandError("The batch size must be positive.")
+
+        if path == "-":
+            stream = io.TextIOWrapper(sys.stdin.buffer, encoding="utf-8", newline="")
+        else:
+            try:
+                stream = open(path, encoding="utf-8", newline="")
+            except OSError as error:
+                raise CommandError(f"Can not read {path}: {error.strerror}.")
+
+        start = time.perf_counter()
+        with stream:
+            imported, rejected = self.import_rows(
+                READERS[file_format](stream), options["batch_size"]
+            )
+        seconds = time.perf_counter() - start
+
+        rate = imported / seconds if seconds else 0
+        memory = peak_memory_mib()
+        self.stdout.write(
+            f"Imported {imported} lettings in {seconds:.2f}s ({rate:.0f} rows/s), "
+            f"rejected {rejected} rows"
+            + (f", peak memory {memory:.1f} MiB." if memory is not None else ".")
+        )
+
+    def updated_at(self):
+        """
+        Return the current date, as stored in the ``updated_at`` columns.
+
+        :return: The date, converted for the database.
+        """
+
+        field = Letting._meta.get_field("updated_at")
+        return field.get_db_prep_save(timezone.now(), connections[self.database])
+
+    def import_rows(self, rows, batch_size):
+        """
+        Validate and insert the rows, one batch per transaction.
+
+        :param rows: The ``(line number, row)`` tuples of the feed.
+        :type rows: iterator
+        :param batch_size: The number of rows per batch.
+        :type batch_size: int
+        :return: The number of imported and rejected rows.
+        :rtype: tuple of (int, int)
+        """
+
+        self.database = router.db_for_write(Letting)
+        fields = [Address._meta.get_field(name) for name in ADDRESS_FIELDS]
+        fields += [Letting._meta.get_field(name) for name in LETTING_FIELDS]
+        addresses = Address.objects.using(self.database)
+        lettings = Letting.objects.using(self.database)
+
+        imported = rejected = 0
+        while True:
+            batch = list(islice(rows, batch_size))
+            if not batch:
+                return imported, rejected
+            line_numbers = [line_number for line_number, _ in batch]
+            columns, errors = validate_batch([row or {} for _, row in batch], fields)
+            for index, (_, row) in enumerate(batch):
+                if row is None:
+                    errors[index] = ["The line is not a JSON object."]
+            for index in sorted(errors):
+                self.stderr.write(f"Line {line_numbers[index]}: {' '.join(errors[index])}")
+
+            valid = [index for index in range(len(batch)) if index not in errors]
+            updated_at = self.updated_at()
+            with transaction.atomic(using=self.database), deferred_search_indexing(self.database):
+                # Read under the write lock, so no other process creates rows with these IDs.
+                next_address_id = (addresses.aggregate(id=Max("id"))["id"] or 0) + 1
+                next_letting_id = (lettings.aggregate(id=Max("id"))["id"] or 0) + 1
+                address_ids = range(next_address_id, next_address_id + len(valid))
+                letting_ids = range(next_letting_id, next_letting_id + len(valid))
+                address_rows = zip(
+                    address_ids,
+                    *([columns[name][index] for index in valid] for name in ADDRESS_FIELDS),
+                    [updated_at] * len(valid),
+                )
+                letting_rows = zip(
+                    letting_ids,
+                    [columns["title"][index] for index in valid],
+                    address_ids,
+                    [updated_at] * len(valid),
+                )
+                bulk_insert(
+                    Address, ("id", *ADDRESS_FIELDS, "updated_at"), address_rows, self.database
+                )
+                bulk_insert(
+                    Letting, ("id", "title", "address", "updated_at"), letting_rows, self.database
+                )
+                if valid:
+                    index_lettings(letting_ids[0], letting_ids[-1], self.database)
+
+            imported += len(valid)
+            rejected += len(errors)
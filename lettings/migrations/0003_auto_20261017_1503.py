@@ -0,0 +1,25 @@
+# Generated by Django 3.0 on 2026-10-17 15:03
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('lettings', '0002_auto_20240316_1503'),
+        # The tables are renamed from the oc_lettings_site app tables by this migration.
+        ('oc_lettings_site', '0002_auto_20240311_1546'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='address',
+            name='updated_at',
+            field=models.DateTimeField(auto_now=True),
+        ),
+        migrations.AddField(
+            model_name='letting',
+            name='updated_at',
+            field=models.DateTimeField(auto_now=True, db_index=True),
+        ),
+    ]
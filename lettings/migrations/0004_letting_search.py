@@ -0,0 +1,83 @@
+# Generated by Django 3.0 on 2026-10-17 16:10
+
+from django.db import migrations
+
+# The titles, streets and cities of the lettings are indexed in an FTS5 table whose rowid is the
+# ID of the letting. The triggers keep it in sync with every write, including the queryset
+# update() and bulk inserts which do not send signals. While the deferral table holds a row, the
+# insert trigger is skipped: bulk imports index their rows with a single statement instead (see
+# lettings.search.deferred_search_indexing).
+CREATE_SEARCH_INDEX = [
+    """
+    CREATE VIRTUAL TABLE lettings_letting_search USING fts5(
+        title, street, city,
+        tokenize = 'unicode61 remove_diacritics 2', prefix = '2 3 4 5 6', detail = none
+    )
+    """,
+    "CREATE TABLE lettings_letting_search_deferred (deferred integer NOT NULL)",
+    """
+    INSERT INTO lettings_letting_search (rowid, title, street, city)
+    SELECT letting.id, letting.title, address.street, address.city
+    FROM lettings_letting AS letting
+    JOIN lettings_address AS address ON address.id = letting.address_id
+    """,
+    """
+    CREATE TRIGGER lettings_letting_search_insert AFTER INSERT ON lettings_letting
+    WHEN NOT EXISTS (SELECT 1 FROM lettings_letting_search_deferred) BEGIN
+        INSERT INTO lettings_letting_search (rowid, title, street, city)
+        SELECT NEW.id, NEW.title, street, city FROM lettings_address WHERE id = NEW.address_id;
+    END
+    """,
+    """
+    CREATE TRIGGER lettings_letting_search_update
+    AFTER UPDATE OF id, title, address_id ON lettings_letting BEGIN
+        DELETE FROM lettings_letting_search WHERE rowid = OLD.id;
+        INSERT INTO lettings_letting_search (rowid, title, street, city)
+        SELECT NEW.id, NEW.title, street, city FROM lettings_address WHERE id = NEW.address_id;
+    END
+    """,
+    """
+    CREATE TRIGGER lettings_letting_search_delete AFTER DELETE ON lettings_letting BEGIN
+        DELETE FROM lettings_letting_search WHERE rowid = OLD.id;
+    END
+    """,
+    """
+    CREATE TRIGGER lettings_address_search_update
+    AFTER UPDATE OF street, city ON lettings_address BEGIN
+        UPDATE lettings_letting_search SET street = NEW.street, city = NEW.city
+        WHERE rowid IN (SELECT id FROM lettings_letting WHERE address_id = NEW.id);
+    END
+    """,
+]
+
+DROP_SEARCH_INDEX = [
+    "DROP TRIGGER IF EXISTS lettings_address_search_update",
+    "DROP TRIGGER IF EXISTS lettings_letting_search_delete",
+    "DROP TRIGGER IF EXISTS lettings_letting_search_update",
+    "DROP TRIGGER IF EXISTS lettings_letting_search_insert",
+    "DROP TABLE IF EXISTS lettings_letting_search_deferred",
+    "DROP TABLE IF EXISTS lettings_letting_search",
+]
+
+
+def run_on_sqlite(statements):
+    def run(apps, schema_editor):
+        # FTS5 is specific to SQLite.
+        if schema_editor.connection.vendor == 'sqlite':
+            for statement in statements:
+                schema_editor.execute(statement)
+
+    return run
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('lettings', '0003_auto_20261017_1503'),
+    ]
+
+    operations = [
+        migrations.RunPython(
+            run_on_sqlite(CREATE_SEARCH_INDEX), run_on_sqlite(DROP_SEARCH_INDEX)
+        ),
+    ]
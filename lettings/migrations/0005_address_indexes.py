@@ -0,0 +1,29 @@
+# Generated by Django 3.0 on 2026-10-17 15:40
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('lettings', '0004_letting_search'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='address',
+            index=models.Index(fields=['country_iso_code', 'state', 'city'], name='address_country_state_city'),
+        ),
+        migrations.AddIndex(
+            model_name='address',
+            index=models.Index(fields=['state', 'city'], name='address_state_city'),
+        ),
+        migrations.AddIndex(
+            model_name='address',
+            index=models.Index(fields=['city'], name='address_city'),
+        ),
+        migrations.AddIndex(
+            model_name='address',
+            index=models.Index(fields=['zip_code'], name='address_zip_code'),
+        ),
+    ]
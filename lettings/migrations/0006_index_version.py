@@ -0,0 +1,82 @@
+# Generated by Django 3.0 on 2026-10-17 18:31
+
+from django.db import migrations
+
+# Every write to the lettings, and every change of an address, increases the version of the
+# lettings index page and sets its date, so the page version is read by primary key instead of
+# aggregating the tables (see core.conditional.read_index_version). The triggers also run for the
+# queryset update() and the bulk inserts, which do not send signals. While the search indexing is
+# deferred, the inserts do not increase the version one by one: it is increased once when the
+# deferral ends (see lettings.search.deferred_search_indexing).
+BUMP_VERSION = """
+    UPDATE core_indexversion
+    SET version = version + 1, updated_at = strftime('%Y-%m-%d %H:%M:%f', 'now')
+    WHERE name = 'lettings';
+"""
+
+CREATE_INDEX_VERSION = [
+    """
+    INSERT INTO core_indexversion (name, version, updated_at)
+    VALUES ('lettings', 0, strftime('%Y-%m-%d %H:%M:%f', 'now'))
+    """,
+    f"""
+    CREATE TRIGGER lettings_letting_version_insert AFTER INSERT ON lettings_letting
+    WHEN NOT EXISTS (SELECT 1 FROM lettings_letting_search_deferred) BEGIN
+        {BUMP_VERSION}
+    END
+    """,
+    f"""
+    CREATE TRIGGER lettings_letting_version_deferred_insert
+    AFTER DELETE ON lettings_letting_search_deferred BEGIN
+        {BUMP_VERSION}
+    END
+    """,
+    f"""
+    CREATE TRIGGER lettings_letting_version_update AFTER UPDATE ON lettings_letting BEGIN
+        {BUMP_VERSION}
+    END
+    """,
+    f"""
+    CREATE TRIGGER lettings_letting_version_delete AFTER DELETE ON lettings_letting BEGIN
+        {BUMP_VERSION}
+    END
+    """,
+    f"""
+    CREATE TRIGGER lettings_address_version_update AFTER UPDATE ON lettings_address BEGIN
+        {BUMP_VERSION}
+    END
+    """,
+]
+
+DROP_INDEX_VERSION = [
+    "DROP TRIGGER IF EXISTS lettings_address_version_update",
+    "DROP TRIGGER IF EXISTS lettings_letting_version_delete",
+    "DROP TRIGGER IF EXISTS lettings_letting_version_update",
+    "DROP TRIGGER IF EXISTS lettings_letting_version_deferred_insert",
+    "DROP TRIGGER IF EXISTS lettings_letting_version_insert",
+    "DELETE FROM core_indexversion WHERE name = 'lettings'",
+]
+
+
+def run_on_sqlite(statements):
+    def run(apps, schema_editor):
+        # The triggers are written for SQLite.
+        if schema_editor.connection.vendor == 'sqlite':
+            for statement in statements:
+                schema_editor.execute(statement)
+
+    return run
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0001_initial'),
+        ('lettings', '0005_address_indexes'),
+    ]
+
+    operations = [
+        migrations.RunPython(
+            run_on_sqlite(CREATE_INDEX_VERSION), run_on_sqlite(DROP_INDEX_VERSION)
+        ),
+    ]
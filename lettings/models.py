@@ -17,6 +17,9 @@ Notes:
     in the admin interface. Validators are used to enforce constraints on certain fields
     (e.g., MaxValueValidator for number and zip_code, MinLengthValidator for state
     and country_iso_code).
+    The Address model is indexed for the filters and sort orders of the lettings listings (see
+    ``lettings.filters``): each index starts with the columns filtered by equality and ends with
+    the columns the listing is sorted on.
 
 Usage:
     These models can be used to manage address information for letting properties.
@@ -69,10 +72,20 @@ class Address(models.Model):
     :type zip_code: PositiveIntegerField, required
     :param country_iso_code: The ISO code of the country (e.g., 'USA' for United States).
     :type country_iso_code: CharField, required
+    :param updated_at: The date and time of the last change of the :class:`lettings.Address`.
+    :type updated_at: DateTimeField, set automatically
     """
 
     class Meta:
         verbose_name_plural = "addresses"
+        indexes = [
+            models.Index(
+                fields=["country_iso_code", "state", "city"], name="address_country_state_city"
+            ),
+            models.Index(fields=["state", "city"], name="address_state_city"),
+            models.Index(fields=["city"], name="address_city"),
+            models.Index(fields=["zip_code"], name="address_zip_code"),
+        ]
 
     number = models.PositiveIntegerField(validators=[MaxValueValidator(9999)])
     street = models.CharField(max_length=64)
@@ -82,6 +95,7 @@ class Address(models.Model):
     country_iso_code = models.CharField(
         max_length=3, validators=[MinLengthValidator(3)]
     )
+    updated_at = models.DateTimeField(auto_now=True)
 
     def __str__(self):
         return f"{self.number} {self.street}"
@@ -101,10 +115,14 @@ class Letting(models.Model):
     :type title: CharField, required
     :param address: A one-to-one relationship with an :class:`lettings.Address`.
     :type address: OneToOneField to :class:`lettings.Address`, required
+    :param updated_at: The date and time of the last change of the :class:`lettings.Letting`.
+        The version of the lettings index page is kept by triggers in :class:`core.IndexVersion`.
+    :type updated_at: DateTimeField, set automatically
     """
 
     title = models.CharField(max_length=256)
     address = models.OneToOneField(Address, on_delete=models.CASCADE)
+    updated_at = models.DateTimeField(auto_now=True, db_index=True)
 
     def __str__(self):
         return self.title
@@ -0,0 +1,221 @@
+"""
+Full-text search of the lettings.
+
+The titles of the :class:`lettings.Letting` and the streets and cities of their
+:class:`lettings.Address` are indexed in the ``lettings_letting_search`` FTS5 table of SQLite,
+created by the ``0004_letting_search`` migration and kept in sync by triggers. A search is
+answered from the index instead of scanning the tables with ``icontains``.
+
+Functions:
+    - match_expression: Turns the text typed by a user into an FTS5 query.
+    - search_lettings: Returns the lettings matching a text, best matches first.
+    - deferred_search_indexing: A context manager skipping the indexing of each inserted
+      letting, for bulk imports.
+    - index_lettings: Indexes a range of lettings with a single statement.
+
+Notes:
+    - Every word of the text must match the beginning of a word of the title, the street or the
+      city: ``"beach hou"`` matches "Beach House, Ocean Drive". The words are matched on their
+      first ``MAX_PREFIX_LENGTH`` characters, the longest prefix stored in the index.
+    - The results are ranked by tiers: the lettings whose title matches every word first, then
+      those whose city matches every word, then the others, the most recent lettings first within
+      a tier. They are ranked among the ``settings.SEARCH_CANDIDATES`` most recent matches.
+    - The index tokenizes the text with ``unicode61`` and removes the diacritics, so ``"cafe"``
+      matches "Café".
+    - Indexing the lettings one by one from the insert trigger is about two times slower than
+      indexing a batch of lettings with one statement, so the bulk imports defer it::
+
+          with transaction.atomic(), deferred_search_indexing():
+              ...  # insert the lettings with IDs from first_id to last_id
+              index_lettings(first_id, last_id)
+
+Performance:
+    Every prefix of 2 to 6 characters is stored in the index, which does not store the positions
+    of the words (``detail = none``) to be smaller and faster to update. The matches are read in
+    ``rowid`` order and the reading stops after ``settings.SEARCH_CANDIDATES`` matches,
+    whatever the number of lettings matching the search. The BM25 ranking of SQLite is not
+    used: it counts every match of each word to weigh it, which takes tens of milliseconds for
+    common words with 1 000 000 lettings (see ``benchmarks/search_lettings.py``).
+
+Example:
+    To list the ten best matches::
+
+        lettings = search_lettings("beach hou", limit=10)
+
+:param re: The module splitting the text into words.
+:param unicodedata: The module removing the diacritics of the words.
+:param settings: The settings of the project.
+:param contextmanager: A decorator defining the context manager deferring the indexing.
+:param connections: The database connections.
+:param router: The database router choosing the database read by a search.
+:param Letting: Represents a :class:`lettings.Letting` (rental) property in the database.
+:type Letting: class:`lettings.Letting`
+:param MAX_PREFIX_LENGTH: The longest prefix of the words stored in the index.
+:type MAX_PREFIX_LENGTH: int
+"""
+
+import re
+import unicodedata
+from contextlib import contextmanager
+
+from django.conf import settings
+from django.db import connections, router
+
+from lettings.models import Letting
+
+MAX_PREFIX_LENGTH = 6
+
+# A word as split by the unicode61 tokenizer of the index: a run of letters and digits, the
+# underscore being a separator.
+WORD = re.compile(r"[^\W_]+")
+
+
+def match_expression(text):
+    """
+    Turn the text typed by a user into an FTS5 query matching every word as a prefix.
+
+    The words are quoted, so the FTS5 operators and punctuation typed by the user are not
+    interpreted.
+
+    :param text: The text typed by the user.
+    :type text: str
+    :return: The FTS5 query, or an empty string if the text holds no word.
+    :rtype: str
+    """
+
+    return " ".join(f'"{word[:MAX_PREFIX_LENGTH]}"*' for word in WORD.findall(text))
+
+
+def _normalize(text):
+    """
+    Return a text in lowercase and without diacritics, as tokenized by the index.
+
+    :param text: The text.
+    :type text: str
+    :return: The normalized text.
+    :rtype: str
+    """
+
+    text = text.lower()
+    if text.isascii():
+        return text
+    decomposed = unicodedata.normalize("NFKD", text)
+    return "".join(char for char in decomposed if not unicodedata.combining(char))
+
+
+def _tier(pattern, title, city):
+    """
+    Return the tier of a match: 0 if its title holds every word, 1 if its city does, else 2.
+
+    :param pattern: The pattern matching a text holding the beginning of every word.
+    :type pattern: Pattern
+    :param title: The indexed title of the letting.
+    :type title: str
+    :param city: The indexed city of the letting.
+    :type city: str
+    :return: The tier, 0 being the best.
+    :rtype: int
+    """
+
+    if pattern.match(_normalize(title)):
+        return 0
+    if pattern.match(_normalize(city)):
+        return 1
+    return 2
+
+
+def search_lettings(text, limit):
+    """
+    Return the lettings matching a text, best matches first.
+
+    A single query reads the ``settings.SEARCH_CANDIDATES`` most recent matches from the index,
+    which also stores the title of the lettings, then the candidates are ranked by tier and only
+    the returned ones are turned into :class:`lettings.Letting` holding their ``id`` and
+    ``title``.
+
+    :param text: The text typed by the user.
+    :type text: str
+    :param limit: The largest number of lettings returned.
+    :type limit: int
+    :return: The matching lettings.
+    :rtype: list of Letting
+    """
+
+    expression = match_expression(text)
+    if not expression:
+        return []
+
+    using = router.db_for_read(Letting)
+    with connections[using].cursor() as cursor:
+        cursor.execute(
+            "SELECT rowid, title, city FROM lettings_letting_search "
+            "WHERE lettings_letting_search MATCH %s ORDER BY rowid DESC LIMIT %s",
+            [expression, settings.SEARCH_CANDIDATES],
+        )
+        candidates = cursor.fetchall()
+
+    pattern = re.compile(
+        "".join(
+            rf"(?=.*?(?<!\w){re.escape(word[:MAX_PREFIX_LENGTH])})"
+            for word in WORD.findall(_normalize(text))
+        ),
+        re.DOTALL,
+    )
+    ranked = sorted(candidates, key=lambda row: _tier(pattern, row[1], row[2]))
+    return [
+        Letting.from_db(using, ["id", "title"], (letting_id, title))
+        for letting_id, title, _ in ranked[:limit]
+    ]
+
+
+@contextmanager
+def deferred_search_indexing(using="default"):
+    """
+    Skip the indexing of each letting inserted in the block.
+
+    The block must run in a transaction and index the inserted lettings with
+    ``index_lettings`` before it ends. As the deferral is a row written in the transaction, the
+    other connections keep indexing their inserts.
+
+    :param using: The alias of the database.
+    :type using: str
+    :return: A context manager.
+    """
+
+    if connections[using].vendor != "sqlite":
+        yield
+        return
+    with connections[using].cursor() as cursor:
+        cursor.execute("INSERT INTO lettings_letting_search_deferred (deferred) VALUES (1)")
+    try:
+        yield
+    finally:
+        with connections[using].cursor() as cursor:
+            cursor.execute("DELETE FROM lettings_letting_search_deferred")
+
+
+def index_lettings(first_id, last_id, using="default"):
+    """
+    Index the lettings whose ID is between ``first_id`` and ``last_id``, with one statement.
+
+    :param first_id: The first ID of the range.
+    :type first_id: int
+    :param last_id: The last ID of the range, included.
+    :type last_id: int
+    :param using: The alias of the database.
+    :type using: str
+    :return: None
+    :rtype: None
+    """
+
+    if connections[using].vendor != "sqlite":
+        return
+    with connections[using].cursor() as cursor:
+        cursor.execute(
+            "INSERT INTO lettings_letting_search (rowid, title, street, city) "
+            "SELECT letting.id, letting.title, address.street, address.city "
+            "FROM lettings_letting AS letting "
+            "JOIN lettings_address AS address ON address.id = letting.address_id "
+            "WHERE letting.id BETWEEN %s AND %s",
+            [first_id, last_id],
+        )
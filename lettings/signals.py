@@ -0,0 +1,68 @@
+"""
+Signal receivers of the lettings app.
+
+This module invalidates the cached page of a :class:`lettings.Letting` (see ``core.page_cache``)
+whenever the letting or its :class:`lettings.Address` is saved or deleted, including through the
+admin site.
+
+Receivers:
+    - invalidate_letting_page: Invalidates the page of a saved or deleted
+      :class:`lettings.Letting`.
+    - invalidate_address_letting_page: Invalidates the page of the :class:`lettings.Letting` of a
+      saved or deleted :class:`lettings.Address`.
+
+Note:
+    The receivers are connected when the module is imported by ``LettingsConfig.ready``. They
+    read from the database which was written, rather than from a read-only replica which may not
+    hold the change yet (see ``core.routers``).
+
+:param post_delete: A signal sent by Django after a model instance is deleted.
+:param post_save: A signal sent by Django after a model instance is saved.
+:param receiver: A decorator connecting a function to a signal.
+"""
+
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from core.page_cache import invalidate_pages, page_cache_key
+from lettings.models import Address, Letting
+
+
+@receiver(post_save, sender=Letting)
+@receiver(post_delete, sender=Letting)
+def invalidate_letting_page(sender, instance, **kwargs):
+    """
+    Invalidate the cached page of a saved or deleted :class:`lettings.Letting`.
+
+    :param sender: The :class:`lettings.Letting` model.
+    :param instance: The saved or deleted :class:`lettings.Letting`.
+    :type instance: class:`lettings.Letting`
+    :return: None
+    :rtype: None
+    """
+
+    invalidate_pages(page_cache_key("letting", instance.pk))
+
+
+@receiver(post_save, sender=Address)
+@receiver(post_delete, sender=Address)
+def invalidate_address_letting_page(sender, instance, **kwargs):
+    """
+    Invalidate the cached page of the :class:`lettings.Letting` located at an address.
+
+    When an :class:`lettings.Address` is deleted, its :class:`lettings.Letting` is deleted first by
+    the cascade, which invalidates its page, so no letting is found here.
+
+    :param sender: The :class:`lettings.Address` model.
+    :param instance: The saved or deleted :class:`lettings.Address`.
+    :type instance: class:`lettings.Address`
+    :return: None
+    :rtype: None
+    """
+
+    letting_ids = (
+        Letting.objects.using(kwargs["using"])
+        .filter(address_id=instance.pk)
+        .values_list("id", flat=True)
+    )
+    invalidate_pages(*(page_cache_key("letting", letting_id) for letting_id in letting_ids))
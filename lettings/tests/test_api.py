@@ -0,0 +1,159 @@
+"""
+Test cases for the JSON API of the lettings app.
+
+This module checks the ``/api/lettings/`` endpoint: the nested :class:`lettings.Address`, the
+sparse field selection and the cursor pagination.
+
+Classes:
+    - LettingApiTestCase (TestCase): A test case for the JSON API of the lettings app.
+
+Methods:
+    - LettingApiTestCase.setUpTestData: Method to set up test data before running tests.
+    - LettingApiTestCase.test_index_returns_lettings: Method to test the JSON document of the
+      lettings.
+    - LettingApiTestCase.test_index_selects_fields: Method to test the sparse field selection.
+    - LettingApiTestCase.test_index_rejects_unknown_field: Method to test that an unknown field
+      is answered 400.
+    - LettingApiTestCase.test_index_paginates: Method to test the cursor pagination.
+    - LettingApiTestCase.test_address_change_modifies_index: Method to test that a change of an
+      :class:`lettings.Address` changes the validators of the endpoint.
+
+:param TestCase: A subclass of Django's TestCase class for writing unit tests.
+:param override_settings: A decorator to change the settings during a test.
+:param reverse: A function provided by Django for generating URLs based on view names.
+"""
+
+from django.test import TestCase, override_settings
+from django.urls import reverse
+
+from lettings.models import Address, Letting
+
+
+class LettingApiTestCase(TestCase):
+    """
+    Test case for the JSON API listing the :class:`lettings.Letting`.
+
+    :param url: The URL of the endpoint.
+    :type url: str
+    """
+
+    @classmethod
+    def setUpTestData(cls):
+        """
+        Create three :class:`lettings.Letting` and their :class:`lettings.Address`.
+        """
+
+        for number in (1, 2, 3):
+            address = Address.objects.create(
+                number=number,
+                street="Api Street",
+                city="Api City",
+                state="AC",
+                zip_code=12345,
+                country_iso_code="USA",
+            )
+            Letting.objects.create(title=f"House {number}", address=address)
+        cls.url = reverse("lettings:api_lettings_index")
+
+    def test_index_returns_lettings(self):
+        """
+        Test that the lettings are returned with their nested address, in one query per page.
+
+        :return: None
+        :rtype: None
+        """
+
+        with self.assertNumQueries(2):
+            response = self.client.get(self.url)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response["Content-Type"], "application/json")
+        document = response.json()
+        self.assertEqual(len(document["results"]), 3)
+        self.assertEqual(
+            document["results"][0],
+            {
+                "id": Letting.objects.get(title="House 1").id,
+                "title": "House 1",
+                "address": {
+                    "number": 1,
+                    "street": "Api Street",
+                    "city": "Api City",
+                    "state": "AC",
+                    "zip_code": 12345,
+                    "country_iso_code": "USA",
+                },
+            },
+        )
+        self.assertIsNone(document["next"])
+        self.assertIsNone(document["previous"])
+
+    def test_index_selects_fields(self):
+        """
+        Test that only the requested fields are returned.
+
+        :return: None
+        :rtype: None
+        """
+
+        response = self.client.get(self.url, {"fields": "title,address.city"})
+        self.assertEqual(
+            response.json()["results"][0], {"title": "House 1", "address": {"city": "Api City"}}
+        )
+
+        response = self.client.get(self.url, {"fields": "address"})
+        self.assertEqual(len(response.json()["results"][0]["address"]), 6)
+
+    def test_index_rejects_unknown_field(self):
+        """
+        Test that an unknown field is answered with a 400 response.
+
+        :return: None
+        :rtype: None
+        """
+
+        response = self.client.get(self.url, {"fields": "title,owner"})
+        self.assertEqual(response.status_code, 400)
+        self.assertIn("owner", response.json()["error"])
+
+    @override_settings(PAGINATION_PAGE_SIZE=2)
+    def test_index_paginates(self):
+        """
+        Test that the ``next`` and ``previous`` URLs walk through the lettings.
+
+        :return: None
+        :rtype: None
+        """
+
+        first = self.client.get(self.url, {"fields": "title"}).json()
+        self.assertEqual([row["title"] for row in first["results"]], ["House 1", "House 2"])
+        self.assertIsNone(first["previous"])
+
+        second = self.client.get(first["next"]).json()
+        self.assertEqual(second["results"], [{"title": "House 3"}])
+        self.assertIsNone(second["next"])
+
+        previous = self.client.get(second["previous"]).json()
+        self.assertEqual(previous["results"], first["results"])
+
+        response = self.client.get(self.url, {"after": "invalid"})
+        self.assertEqual(response.status_code, 404)
+
+    def test_address_change_modifies_index(self):
+        """
+        Test that saving an :class:`lettings.Address` changes the ETag of the endpoint, which
+        returns the fields of the addresses.
+
+        :return: None
+        :rtype: None
+        """
+
+        etag = self.client.get(self.url)["ETag"]
+        address = Address.objects.get(number=2)
+        address.street = "Changed Street"
+        address.save()
+
+        response = self.client.get(self.url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertNotEqual(response["ETag"], etag)
+        streets = [row["address"]["street"] for row in response.json()["results"]]
+        self.assertIn("Changed Street", streets)
@@ -0,0 +1,237 @@
+"""
+Test cases for the management commands of the lettings app.
+
+This module checks that the ``import_lettings`` command imports the valid rows of CSV and NDJSON
+feeds and reports the invalid ones.
+
+Classes:
+    - ImportLettingsTestCase (TestCase): A test case for the ``import_lettings`` command.
+
+Methods:
+    - ImportLettingsTestCase.import_feed: Method to write a feed and import it.
+    - ImportLettingsTestCase.test_import_csv: Method to test the import of a CSV feed.
+    - ImportLettingsTestCase.test_import_ndjson: Method to test the import of an NDJSON feed with
+      nested addresses.
+    - ImportLettingsTestCase.test_invalid_rows_are_skipped: Method to test that invalid rows are
+      reported and skipped.
+    - ImportLettingsTestCase.test_unknown_format: Method to test that an unknown format is
+      rejected.
+    - ImportLettingsTestCase.test_import_changes_index_version: Method to test that each batch
+      changes the version of the lettings index page once.
+    - ImportLettingsTestCase.test_rows_created_between_batches_are_kept: Method to test that the
+      IDs of each batch follow the rows created by another process during the import.
+
+:param call_command: A function provided by Django to run a management command.
+:param CommandError: The exception raised when a command can not run.
+:param TestCase: A subclass of Django's TestCase class for writing unit tests.
+:param mock: A module to create a letting while the command runs.
+:param validate_batch: The function validating the batches, called before each transaction.
+"""
+
+import json
+import os
+import tempfile
+from io import StringIO
+from unittest import mock
+
+from django.core.management import call_command
+from django.core.management.base import CommandError
+from django.test import TestCase
+
+from core.conditional import read_index_version
+from core.validation import validate_batch
+from lettings.models import Address, Letting
+
+HEADER = "title,number,street,city,state,zip_code,country_iso_code\n"
+
+
+class ImportLettingsTestCase(TestCase):
+    """
+    Test case for the ``import_lettings`` command.
+
+    :param address: An existing :class:`lettings.Address`.
+    :type address: class:`lettings.Address`
+    """
+
+    @classmethod
+    def setUpTestData(cls):
+        """
+        Create a :class:`lettings.Letting`, so the imported rows follow existing ones.
+        """
+
+        cls.address = Address.objects.create(
+            number=1,
+            street="Existing Street",
+            city="Existing City",
+            state="EC",
+            zip_code=12345,
+            country_iso_code="USA",
+        )
+        Letting.objects.create(title="Existing House", address=cls.address)
+
+    def import_feed(self, content, suffix, **options):
+        """
+        Write a feed to a temporary file and import it.
+
+        :param content: The content of the feed.
+        :type content: str
+        :param suffix: The extension of the file, e.g. ``".csv"``.
+        :type suffix: str
+        :return: The output and error output of the command.
+        :rtype: tuple of (str, str)
+        """
+
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, f"feed{suffix}")
+            with open(path, "w", encoding="utf-8") as feed:
+                feed.write(content)
+            stdout, stderr = StringIO(), StringIO()
+            call_command("import_lettings", path, stdout=stdout, stderr=stderr, **options)
+        return stdout.getvalue(), stderr.getvalue()
+
+    def test_import_csv(self):
+        """
+        Test that the rows of a CSV feed are imported with their address, across batches.
+
+        :return: None
+        :rtype: None
+        """
+
+        rows = "".join(
+            f"House {number},{number},Feed Street,Feed City,FC,{number},USA\n"
+            for number in range(1, 6)
+        )
+        stdout, stderr = self.import_feed(HEADER + rows, ".csv", batch_size=2)
+
+        self.assertIn("Imported 5 lettings", stdout)
+        self.assertEqual(stderr, "")
+        self.assertEqual(Letting.objects.count(), 6)
+        letting = Letting.objects.select_related("address").get(title="House 3")
+        self.assertEqual(letting.address.number, 3)
+        self.assertEqual(letting.address.street, "Feed Street")
+        self.assertIsNotNone(letting.updated_at)
+
+    def test_import_ndjson(self):
+        """
+        Test that the rows of an NDJSON feed are imported, with flat or nested addresses.
+
+        :return: None
+        :rtype: None
+        """
+
+        address = {
+            "number": 2,
+            "street": "Json Street",
+            "city": "Json City",
+            "state": "JC",
+            "zip_code": 54321,
+            "country_iso_code": "FRA",
+        }
+        lines = [
+            json.dumps({"title": "Nested House", "address": address}),
+            "",
+            json.dumps({"title": "Flat House", **address}),
+        ]
+        stdout, stderr = self.import_feed("\n".join(lines) + "\n", ".ndjson")
+
+        self.assertIn("Imported 2 lettings", stdout)
+        self.assertEqual(
+            Letting.objects.get(title="Nested House").address.country_iso_code, "FRA"
+        )
+        self.assertEqual(Letting.objects.get(title="Flat House").address.city, "Json City")
+
+    def test_invalid_rows_are_skipped(self):
+        """
+        Test that invalid rows are reported with their line number and not imported.
+
+        :return: None
+        :rtype: None
+        """
+
+        rows = (
+            "Valid House,1,Feed Street,Feed City,FC,1,USA\n"
+            "Bad State,1,Feed Street,Feed City,F,1,USA\n"
+            "Bad Number,10000,Feed Street,Feed City,FC,1,USA\n"
+        )
+        stdout, stderr = self.import_feed(HEADER + rows, ".csv")
+
+        self.assertIn("Imported 1 lettings", stdout)
+        self.assertIn("rejected 2 rows", stdout)
+        self.assertIn("Line 3: state:", stderr)
+        self.assertIn("Line 4: number:", stderr)
+        self.assertTrue(Letting.objects.filter(title="Valid House").exists())
+        self.assertFalse(Letting.objects.filter(title__startswith="Bad").exists())
+
+        stdout, stderr = self.import_feed("not json\n", ".ndjson")
+        self.assertIn("Line 1: The line is not a JSON object.", stderr)
+
+    def test_unknown_format(self):
+        """
+        Test that a file with an unknown extension is rejected.
+
+        :return: None
+        :rtype: None
+        """
+
+        with self.assertRaises(CommandError):
+            self.import_feed(HEADER, ".xml")
+
+    def test_import_changes_index_version(self):
+        """
+        Test that each imported batch increases the version of the lettings index page once,
+        rather than once per inserted letting.
+
+        :return: None
+        :rtype: None
+        """
+
+        version = read_index_version("lettings")
+        rows = "".join(
+            f"House {number},{number},Feed Street,Feed City,FC,{number},USA\n"
+            for number in range(1, 6)
+        )
+        self.import_feed(HEADER + rows, ".csv", batch_size=2)
+
+        imported = read_index_version("lettings")
+        self.assertEqual(imported["version"], version["version"] + 3)
+        self.assertGreaterEqual(imported["updated_at"], version["updated_at"])
+
+    def test_rows_created_between_batches_are_kept(self):
+        """
+        Test that a letting created while the command validates a batch, i.e. between two
+        transactions, is kept and the batch is imported after it.
+
+        :return: None
+        :rtype: None
+        """
+
+        def validate_and_create(*args):
+            if validate.call_count == 2:
+                address = Address.objects.create(
+                    number=2,
+                    street="Concurrent Street",
+                    city="Concurrent City",
+                    state="CC",
+                    zip_code=12345,
+                    country_iso_code="USA",
+                )
+                Letting.objects.create(title="Concurrent House", address=address)
+            return validate_batch(*args)
+
+        rows = "".join(
+            f"House {number},{number},Feed Street,Feed City,FC,{number},USA\n"
+            for number in range(1, 5)
+        )
+        with mock.patch(
+            "lettings.management.commands.import_lettings.validate_batch",
+            side_effect=validate_and_create,
+        ) as validate:
+            stdout, stderr = self.import_feed(HEADER + rows, ".csv", batch_size=2)
+
+        self.assertIn("Imported 4 lettings", stdout)
+        self.assertEqual(Letting.objects.count(), 6)
+        concurrent = Letting.objects.select_related("address").get(title="Concurrent House")
+        self.assertEqual(concurrent.address.street, "Concurrent Street")
+        for number in range(1, 5):
+            letting = Letting.objects.select_related("address").get(title=f"House {number}")
+            self.assertEqual(letting.address.number, number)
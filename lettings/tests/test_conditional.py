@@ -0,0 +1,188 @@
+"""
+Test cases for the conditional requests of the lettings app views.
+
+This module checks that the lettings views send ``ETag`` and ``Last-Modified`` validators and
+answer ``304 Not Modified`` from a single query when the validators still match.
+
+Classes:
+    - LettingConditionalTestCase (TestCase): A test case for the conditional requests of the
+      lettings views.
+
+Methods:
+    - LettingConditionalTestCase.setUpTestData: Method to set up test data before running tests.
+    - LettingConditionalTestCase.test_views_send_validators: Method to test that the responses
+      hold the validators.
+    - LettingConditionalTestCase.test_not_modified_runs_one_query: Method to test the
+      ``304 Not Modified`` answers.
+    - LettingConditionalTestCase.test_address_change_modifies_letting_page: Method to test that
+      a change of the :class:`lettings.Address` changes the validators of the letting page.
+    - LettingConditionalTestCase.test_address_change_modifies_filtered_index_page: Method to test
+      that a change of a :class:`lettings.Address` changes the validators of the filtered index
+      pages.
+    - LettingConditionalTestCase.test_delete_modifies_index_page: Method to test that a deleted
+      :class:`lettings.Letting` changes the validators of the index page.
+    - LettingConditionalTestCase.test_queryset_update_modifies_index_page: Method to test that a
+      queryset update, which sends no signal, changes the validators of the index page.
+
+:param TestCase: A subclass of Django's TestCase class for writing unit tests.
+:param reverse: A function provided by Django for generating URLs based on view names.
+"""
+
+from django.test import TestCase
+from django.urls import reverse
+
+from lettings.models import Address, Letting
+
+
+class LettingConditionalTestCase(TestCase):
+    """
+    Test case for the conditional requests of the :class:`lettings.Letting` views.
+
+    :param letting: An instance of the :class:`lettings.Letting`.
+    :type letting: class:`lettings.Letting`
+    """
+
+    @classmethod
+    def setUpTestData(cls):
+        """
+        Create two :class:`lettings.Letting` and their :class:`lettings.Address`.
+        """
+
+        for number in (1, 2):
+            address = Address.objects.create(
+                number=number,
+                street="Conditional Street",
+                city="Conditional City",
+                state="CC",
+                zip_code=12345,
+                country_iso_code="USA",
+            )
+            cls.letting = Letting.objects.create(title=f"House {number}", address=address)
+        cls.urls = [
+            reverse("lettings:lettings_index"),
+            reverse("lettings:letting", kwargs={"letting_id": cls.letting.id}),
+        ]
+
+    def test_views_send_validators(self):
+        """
+        Test that the index and detail pages hold an ETag and a Last-Modified header.
+
+        :return: None
+        :rtype: None
+        """
+
+        for url in self.urls:
+            with self.subTest(url=url):
+                response = self.client.get(url)
+                self.assertTrue(response.has_header("ETag"))
+                self.assertTrue(response.has_header("Last-Modified"))
+
+    def test_not_modified_runs_one_query(self):
+        """
+        Test that a request with matching validators is answered 304 from a single query.
+
+        :return: None
+        :rtype: None
+        """
+
+        for url in self.urls:
+            with self.subTest(url=url):
+                response = self.client.get(url)
+                with self.assertNumQueries(1):
+                    not_modified = self.client.get(
+                        url,
+                        HTTP_IF_NONE_MATCH=response["ETag"],
+                        HTTP_IF_MODIFIED_SINCE=response["Last-Modified"],
+                    )
+                self.assertEqual(not_modified.status_code, 304)
+                self.assertEqual(not_modified.content, b"")
+
+                with self.assertNumQueries(1):
+                    not_modified = self.client.get(
+                        url, HTTP_IF_MODIFIED_SINCE=response["Last-Modified"]
+                    )
+                self.assertEqual(not_modified.status_code, 304)
+
+    def test_address_change_modifies_letting_page(self):
+        """
+        Test that saving the :class:`lettings.Address` changes the ETag of the letting page.
+
+        :return: None
+        :rtype: None
+        """
+
+        url = self.urls[1]
+        etag = self.client.get(url)["ETag"]
+        address = Address.objects.get(pk=self.letting.address_id)
+        address.street = "Changed Street"
+        address.save()
+
+        response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertContains(response, "Changed Street")
+
+    def test_address_change_modifies_filtered_index_page(self):
+        """
+        Test that moving the :class:`lettings.Address` of a letting to another city changes the
+        ETag of the index pages filtered on both cities.
+
+        :return: None
+        :rtype: None
+        """
+
+        url = self.urls[0]
+        etags = {
+            city: self.client.get(url, {"city": city})["ETag"]
+            for city in ("Conditional City", "Other City")
+        }
+        address = Address.objects.get(pk=self.letting.address_id)
+        address.city = "Other City"
+        address.save()
+
+        response = self.client.get(
+            url, {"city": "Conditional City"}, HTTP_IF_NONE_MATCH=etags["Conditional City"]
+        )
+        self.assertEqual(response.status_code, 200)
+        self.assertNotContains(response, self.letting.title)
+        response = self.client.get(
+            url, {"city": "Other City"}, HTTP_IF_NONE_MATCH=etags["Other City"]
+        )
+        self.assertEqual(response.status_code, 200)
+        self.assertContains(response, self.letting.title)
+
+    def test_delete_modifies_index_page(self):
+        """
+        Test that deleting a :class:`lettings.Letting` changes the ETag of the index page.
+
+        :return: None
+        :rtype: None
+        """
+
+        url = self.urls[0]
+        etag = self.client.get(url)["ETag"]
+        Letting.objects.filter(title="House 1").delete()
+
+        response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertNotContains(response, "House 1")
+
+    def test_queryset_update_modifies_index_page(self):
+        """
+        Test that updating the lettings and the addresses with ``update()``, which sends no
+        signal, changes the ETag of the index page.
+
+        :return: None
+        :rtype: None
+        """
+
+        url = self.urls[0]
+        for queryset, changes in (
+            (Letting.objects.filter(pk=self.letting.pk), {"title": "Updated House"}),
+            (Address.objects.filter(pk=self.letting.address_id), {"city": "Updated City"}),
+        ):
+            with self.subTest(model=queryset.model.__name__):
+                etag = self.client.get(url)["ETag"]
+                queryset.update(**changes)
+
+                response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+                self.assertEqual(response.status_code, 200)
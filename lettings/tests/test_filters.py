@@ -0,0 +1,240 @@
+"""
+Test cases for the filters and sort orders of the lettings listings.
+
+This module checks that the lettings index page and the JSON API filter the
+:class:`lettings.Letting` on their :class:`lettings.Address` and sort them by place, and that
+SQLite reads each filter and sort order from an index of the ``lettings_address`` table, with
+``EXPLAIN QUERY PLAN``.
+
+Classes:
+    - LettingFilterTestCase (TestCase): A test case for ``lettings.filters`` and the listings.
+
+Methods:
+    - LettingFilterTestCase.setUpTestData: Method to set up test data before running tests.
+    - LettingFilterTestCase.titles: Method to return the titles listed by the index page.
+    - LettingFilterTestCase.query_plan: Method to return the query plan of a page of lettings.
+    - LettingFilterTestCase.test_filters: Method to test each filter of the index page.
+    - LettingFilterTestCase.test_sort_orders: Method to test the sort orders and their
+      pagination.
+    - LettingFilterTestCase.test_api_filters: Method to test the filters of the JSON API.
+    - LettingFilterTestCase.test_invalid_filters: Method to test that the invalid filters and
+      sort orders are rejected.
+    - LettingFilterTestCase.test_filters_use_indexes: Method to test that each filter is read
+      from an index.
+    - LettingFilterTestCase.test_sort_orders_use_indexes: Method to test that each sort order is
+      read from an index, without sorting the lettings.
+
+:param connection: The database connection running the ``EXPLAIN QUERY PLAN`` statements.
+:param TestCase: A subclass of Django's TestCase class for writing unit tests.
+:param RequestFactory: A class provided by Django for creating mock request objects.
+:param reverse: A function provided by Django for generating URLs based on view names.
+"""
+
+import json
+
+from django.db import connection
+from django.test import RequestFactory, TestCase
+from django.urls import reverse
+
+from core.pagination import _keyset_condition
+from lettings.filters import filter_lettings
+from lettings.models import Address, Letting
+
+PLACES = [
+    ("Beach House", "USA", "CA", "Malibu", 90265),
+    ("Lake Cabin", "USA", "CA", "Tahoe City", 96145),
+    ("City Loft", "USA", "NY", "New York", 10001),
+    ("Harbour Flat", "USA", "NY", "Albany", 12201),
+    ("Ranch", "USA", "CA", "Malibu", 90265),
+    ("Chalet", "CAN", "QC", "Montreal", 10001),
+]
+
+
+class LettingFilterTestCase(TestCase):
+    """
+    Test case for the filters and sort orders of the lettings listings.
+    """
+
+    @classmethod
+    def setUpTestData(cls):
+        """
+        Create a :class:`lettings.Letting` for each of the ``PLACES``.
+        """
+
+        for number, (title, country, state, city, zip_code) in enumerate(PLACES, start=1):
+            address = Address.objects.create(
+                number=number,
+                street="Main Street",
+                city=city,
+                state=state,
+                zip_code=zip_code,
+                country_iso_code=country,
+            )
+            Letting.objects.create(title=title, address=address)
+
+    def titles(self, url, **parameters):
+        """
+        Return the titles of the lettings listed by a page of the index, and the page.
+
+        :param url: The URL of the page.
+        :type url: str
+        :param parameters: The query parameters.
+        :return: The titles and the page.
+        :rtype: tuple of (list of str, KeysetPage)
+        """
+
+        response = self.client.get(url, parameters)
+        self.assertEqual(response.status_code, 200)
+        page = response.context["page"]
+        return [letting.title for letting in page.object_list], page
+
+    def query_plan(self, after=False, **parameters):
+        """
+        Return the query plan of the first page of lettings selected by query parameters.
+
+        :param after: Whether to plan the page after the first letting, to check that the cursor
+            condition seeks into the index.
+        :type after: bool
+        :param parameters: The query parameters.
+        :return: The details of the steps of the plan, joined by newlines.
+        :rtype: str
+        """
+
+        request = RequestFactory().get("/", parameters)
+        lettings, keys = filter_lettings(request, Letting.objects.only("id", "title"))
+        lettings = lettings.order_by(*keys)
+        if after:
+            first = lettings.values_list(*keys).first()
+            lettings = lettings.filter(_keyset_condition(keys, first, "gt"))
+        sql, params = lettings[:51].query.sql_with_params()
+        with connection.cursor() as cursor:
+            cursor.execute(f"EXPLAIN QUERY PLAN {sql}", params)
+            return "\n".join(row[-1] for row in cursor.fetchall())
+
+    def test_filters(self):
+        """
+        Test that each filter selects the lettings of a place, sorted by that place.
+        """
+
+        url = reverse("lettings:lettings_index")
+        self.assertEqual(self.titles(url, country="CAN")[0], ["Chalet"])
+        self.assertEqual(
+            self.titles(url, country="USA")[0],
+            ["Beach House", "Ranch", "Lake Cabin", "Harbour Flat", "City Loft"],
+        )
+        self.assertEqual(self.titles(url, state="NY")[0], ["Harbour Flat", "City Loft"])
+        self.assertEqual(self.titles(url, city="Malibu")[0], ["Beach House", "Ranch"])
+        self.assertEqual(self.titles(url, zip="10001")[0], ["City Loft", "Chalet"])
+        self.assertEqual(
+            self.titles(url, state="CA", city="Malibu", zip="")[0], ["Beach House", "Ranch"]
+        )
+        self.assertEqual(
+            self.titles(url, state="CA", sort="id")[0], ["Beach House", "Lake Cabin", "Ranch"]
+        )
+        self.assertEqual(self.titles(url, city="Paris")[0], [])
+
+    def test_sort_orders(self):
+        """
+        Test that the sort orders list every letting once, across pages in both directions.
+        """
+
+        url = reverse("lettings:lettings_index")
+        expected = {
+            "id": [title for title, *_ in PLACES],
+            "country": [
+                "Chalet", "Beach House", "Ranch", "Lake Cabin", "Harbour Flat", "City Loft"
+            ],
+            "state": ["Beach House", "Ranch", "Lake Cabin", "Harbour Flat", "City Loft", "Chalet"],
+            "city": ["Harbour Flat", "Beach House", "Ranch", "Chalet", "City Loft", "Lake Cabin"],
+            "zip": ["City Loft", "Chalet", "Harbour Flat", "Beach House", "Ranch", "Lake Cabin"],
+        }
+        for sort, titles in expected.items():
+            with self.subTest(sort=sort):
+                listed, page = self.titles(url, sort=sort, size=4)
+                self.assertTrue(page.has_next)
+                following, page = self.titles(url + page.next_url)
+                self.assertEqual(listed + following, titles)
+                self.assertFalse(page.has_next)
+                previous, _ = self.titles(url + page.previous_url)
+                self.assertEqual(previous, titles[:4])
+
+    def test_api_filters(self):
+        """
+        Test that the JSON API filters and sorts the lettings like the index page.
+        """
+
+        url = reverse("lettings:api_lettings_index")
+        response = self.client.get(
+            url, {"state": "CA", "fields": "title,address.city", "size": 2}
+        )
+        document = json.loads(response.content)
+        self.assertEqual(
+            document["results"],
+            [
+                {"title": "Beach House", "address": {"city": "Malibu"}},
+                {"title": "Ranch", "address": {"city": "Malibu"}},
+            ],
+        )
+        document = json.loads(self.client.get(document["next"]).content)
+        self.assertEqual(
+            document["results"], [{"title": "Lake Cabin", "address": {"city": "Tahoe City"}}]
+        )
+        self.assertIsNone(document["next"])
+
+    def test_invalid_filters(self):
+        """
+        Test that an invalid filter value or sort order is rejected by the index and the API.
+        """
+
+        for parameters in ({"zip": "abc"}, {"sort": "title"}):
+            with self.subTest(**parameters):
+                response = self.client.get(reverse("lettings:lettings_index"), parameters)
+                self.assertEqual(response.status_code, 404)
+                response = self.client.get(reverse("lettings:api_lettings_index"), parameters)
+                self.assertEqual(response.status_code, 400)
+                self.assertIn("error", json.loads(response.content))
+
+    def test_filters_use_indexes(self):
+        """
+        Test that each filter, alone or with the filters on the following columns of its index,
+        searches an index of the addresses rather than scanning the lettings.
+        """
+
+        cases = [
+            ({"country": "USA"}, "address_country_state_city (country_iso_code=?)"),
+            (
+                {"country": "USA", "state": "CA"},
+                "address_country_state_city (country_iso_code=? AND state=?)",
+            ),
+            ({"state": "CA"}, "address_state_city (state=?)"),
+            ({"state": "CA", "city": "Malibu"}, "address_state_city (state=? AND city=?)"),
+            ({"city": "Malibu"}, "address_city (city=?)"),
+            ({"zip": "90265"}, "address_zip_code (zip_code=?)"),
+        ]
+        for parameters, index in cases:
+            with self.subTest(**parameters):
+                plan = self.query_plan(**parameters)
+                self.assertIn(f"SEARCH lettings_address USING COVERING INDEX {index}", plan)
+                self.assertNotIn("TEMP B-TREE", plan)
+
+    def test_sort_orders_use_indexes(self):
+        """
+        Test that each sort order, and the pages after the first one, are read from an index of
+        the addresses without sorting the lettings.
+        """
+
+        cases = [
+            ({"sort": "country"}, "address_country_state_city"),
+            ({"sort": "state"}, "address_state_city"),
+            ({"sort": "city"}, "address_city"),
+            ({"sort": "zip"}, "address_zip_code"),
+            ({"country": "USA", "sort": "state"}, "address_country_state_city"),
+        ]
+        for parameters, index in cases:
+            with self.subTest(**parameters):
+                plan = self.query_plan(**parameters)
+                self.assertIn(f"USING COVERING INDEX {index}", plan)
+                self.assertNotIn("TEMP B-TREE", plan)
+                plan = self.query_plan(after=True, **parameters)
+                self.assertIn(f"SEARCH lettings_address USING COVERING INDEX {index} (", plan)
+                self.assertNotIn("TEMP B-TREE", plan)
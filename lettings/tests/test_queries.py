@@ -0,0 +1,110 @@
+"""
+Query budget tests for the lettings app views.
+
+This module checks that the views of the lettings app run a fixed number of SQL queries, listed
+in ``lettings.views.QUERY_BUDGETS``, with 10, 1 000 and 100 000 :class:`lettings.Letting` in the
+database.
+
+Classes:
+    - LettingQueryBudgetTestCase (QueryBudgetMixin, TestCase): A test case to check the query
+      budgets of the lettings views.
+
+Methods:
+    - LettingQueryBudgetTestCase.seed_rows: Method to create :class:`lettings.Letting` and their
+      :class:`lettings.Address` in bulk.
+    - LettingQueryBudgetTestCase.test_query_budgets: Method to test that the index, detail and
+      JSON API views stay within their budget.
+    - LettingQueryBudgetTestCase.test_versions_read_without_scan: Method to test that the
+      versions of the index and detail pages do not scan the tables.
+
+:param TestCase: A subclass of Django's TestCase class for writing unit tests.
+:param QueryBudgetMixin: A mixin asserting that views run a bounded number of queries.
+"""
+
+from django.test import TestCase
+
+from core.testing import QueryBudgetMixin
+from lettings import api
+from lettings.models import Address, Letting
+from lettings.views import QUERY_BUDGETS, index, index_version, letting, letting_version
+
+
+class LettingQueryBudgetTestCase(QueryBudgetMixin, TestCase):
+    """
+    Test case for the query budgets of the lettings views.
+
+    Methods:
+        - seed_rows: Method to create rows until ``count`` :class:`lettings.Letting` exist.
+        - test_query_budgets: Method to test the query budgets of the index and detail views.
+        - test_versions_read_without_scan: Method to test the plans of the version queries.
+    """
+
+    def seed_rows(self, count):
+        """
+        Create :class:`lettings.Letting` and :class:`lettings.Address` until ``count`` exist.
+
+        The primary keys are set explicitly so each letting can reference its address without
+        reading the addresses back.
+
+        :param count: The number of :class:`lettings.Letting` the database must hold.
+        :type count: int
+        """
+
+        start = Letting.objects.count() + 1
+        ids = range(start, count + 1)
+        Address.objects.bulk_create(
+            Address(
+                id=pk,
+                number=pk % 10000,
+                street=f"Street {pk}",
+                city="Budget City",
+                state="BC",
+                zip_code=pk % 100000,
+                country_iso_code="USA",
+            )
+            for pk in ids
+        )
+        Letting.objects.bulk_create(
+            Letting(id=pk, title=f"Letting {pk}", address_id=pk) for pk in ids
+        )
+
+    def test_query_budgets(self):
+        """
+        Test that the index, detail and JSON API views stay within their query budget.
+
+        :return: None
+        :rtype: None
+        """
+
+        self.assertViewsWithinBudget(
+            [
+                ("index", index, dict, QUERY_BUDGETS["index"]),
+                ("api_index", api.index, dict, QUERY_BUDGETS["index"]),
+                (
+                    "letting",
+                    letting,
+                    lambda: {"letting_id": Letting.objects.latest("id").id},
+                    QUERY_BUDGETS["letting"],
+                ),
+            ]
+        )
+
+    def test_versions_read_without_scan(self):
+        """
+        Test that the versions of the index and detail pages are read without scanning a table,
+        so answering ``304 Not Modified`` does not slow down as the lettings grow.
+
+        :return: None
+        :rtype: None
+        """
+
+        self.assertVersionsReadWithoutScan(
+            [
+                ("index", index_version, dict),
+                (
+                    "letting",
+                    letting_version,
+                    lambda: {"letting_id": Letting.objects.latest("id").id},
+                ),
+            ]
+        )
@@ -0,0 +1,215 @@
+"""
+Test cases for the full-text search of the lettings.
+
+This module checks that the search index of the lettings is kept in sync with the
+:class:`lettings.Letting` and :class:`lettings.Address` by its triggers and by the
+``import_lettings`` command, and that the search view ranks the matching lettings.
+
+Classes:
+    - LettingSearchTestCase (TestCase): A test case for ``lettings.search`` and the search view.
+
+Methods:
+    - LettingSearchTestCase.setUpTestData: Method to set up test data before running tests.
+    - LettingSearchTestCase.search: Method to return the titles of the lettings matching a text.
+    - LettingSearchTestCase.test_match_expression: Method to test the FTS5 query built from a
+      text.
+    - LettingSearchTestCase.test_search_title_street_and_city: Method to test that the title,
+      the street and the city are searched.
+    - LettingSearchTestCase.test_search_prefixes: Method to test the prefix matching, with the
+      words split on the separators of the index.
+    - LettingSearchTestCase.test_search_ranking: Method to test that the title matches come
+      before the city matches, then the street matches.
+    - LettingSearchTestCase.test_index_follows_changes: Method to test that the index follows the
+      changes of the lettings and their addresses.
+    - LettingSearchTestCase.test_imported_lettings_are_searchable: Method to test that the
+      lettings imported in bulk are indexed.
+    - LettingSearchTestCase.test_search_view: Method to test the search view.
+    - LettingSearchTestCase.test_search_view_empty_query: Method to test the search view without
+      a search.
+
+:param call_command: A function provided by Django to run a management command.
+:param TestCase: A subclass of Django's TestCase class for writing unit tests.
+:param reverse: A function provided by Django for generating URLs based on view names.
+"""
+
+import os
+import tempfile
+from io import StringIO
+
+from django.core.management import call_command
+from django.test import TestCase
+from django.urls import reverse
+
+from lettings.models import Address, Letting
+from lettings.search import match_expression, search_lettings
+
+
+class LettingSearchTestCase(TestCase):
+    """
+    Test case for the full-text search of the lettings.
+
+    :param beach: A :class:`lettings.Letting` whose title holds "Beach".
+    :type beach: class:`lettings.Letting`
+    :param city: A :class:`lettings.Letting` whose city is "Beachwood".
+    :type city: class:`lettings.Letting`
+    :param street: A :class:`lettings.Letting` whose street is "Beach Road".
+    :type street: class:`lettings.Letting`
+    """
+
+    @classmethod
+    def setUpTestData(cls):
+        """
+        Create three :class:`lettings.Letting` matching "beach" by their title, city and street.
+        """
+
+        def create(title, street, city):
+            address = Address.objects.create(
+                number=1,
+                street=street,
+                city=city,
+                state="CA",
+                zip_code=90210,
+                country_iso_code="USA",
+            )
+            return Letting.objects.create(title=title, address=address)
+
+        cls.beach = create("Beach House", "Ocean Drive", "Malibu")
+        cls.city = create("Quiet Cottage", "Elm Street", "Beachwood")
+        cls.street = create("Café Loft", "Beach Road", "Springfield")
+
+    def search(self, text, limit=10):
+        """
+        Return the titles of the lettings matching a text, best matches first.
+
+        :param text: The searched text.
+        :type text: str
+        :param limit: The largest number of lettings returned.
+        :type limit: int
+        :return: The titles.
+        :rtype: list of str
+        """
+
+        return [letting.title for letting in search_lettings(text, limit)]
+
+    def test_match_expression(self):
+        """
+        Test that every word is quoted and matched as a prefix of at most six characters, the
+        words being split on the separators of the tokenizer of the index.
+        """
+
+        self.assertEqual(match_expression('beach "hou* OR'), '"beach"* "hou"* "OR"*')
+        self.assertEqual(match_expression("Springfield"), '"Spring"*')
+        self.assertEqual(match_expression(" - "), "")
+        self.assertEqual(match_expression("foo_bar"), '"foo"* "bar"*')
+        self.assertEqual(match_expression("beach·house"), '"beach"* "house"*')
+
+    def test_search_title_street_and_city(self):
+        """
+        Test that the title, the street and the city are searched, without the diacritics.
+        """
+
+        self.assertEqual(self.search("cottage"), ["Quiet Cottage"])
+        self.assertEqual(self.search("ocean drive"), ["Beach House"])
+        self.assertEqual(self.search("springfield"), ["Café Loft"])
+        self.assertEqual(self.search("cafe"), ["Café Loft"])
+        self.assertEqual(self.search("malibu cottage"), [])
+
+    def test_search_prefixes(self):
+        """
+        Test that the words match the beginning of the indexed words only.
+        """
+
+        self.assertEqual(self.search("cot"), ["Quiet Cottage"])
+        self.assertEqual(self.search("beach hou"), ["Beach House"])
+        self.assertEqual(self.search("beach_hou"), ["Beach House"])
+        self.assertEqual(self.search("ottage"), [])
+
+    def test_search_ranking(self):
+        """
+        Test that the title matches come first, then the city matches, then the street matches.
+        """
+
+        self.assertEqual(self.search("beach"), ["Beach House", "Quiet Cottage", "Café Loft"])
+        self.assertEqual(self.search("beach", limit=2), ["Beach House", "Quiet Cottage"])
+
+    def test_index_follows_changes(self):
+        """
+        Test that the index follows the changes of the lettings and their addresses.
+        """
+
+        letting = Letting.objects.get(pk=self.beach.pk)
+        letting.title = "Lake House"
+        letting.save()
+        self.assertEqual(self.search("lake"), ["Lake House"])
+
+        address = Address.objects.get(pk=self.city.address_id)
+        address.city = "Oakland"
+        address.save()
+        self.assertEqual(self.search("beach"), ["Café Loft"])
+        self.assertEqual(self.search("oakland"), ["Quiet Cottage"])
+
+        Letting.objects.filter(pk=self.street.pk).delete()
+        self.assertEqual(self.search("beach"), [])
+
+    def test_imported_lettings_are_searchable(self):
+        """
+        Test that the lettings imported by the ``import_lettings`` command are indexed, and that
+        the lettings created after an import are indexed by the trigger again.
+        """
+
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, "feed.csv")
+            with open(path, "w", encoding="utf-8") as feed:
+                feed.write("title,number,street,city,state,zip_code,country_iso_code\n")
+                feed.write("Harbour View,2,Pier Lane,Beachport,WA,98101,USA\n")
+            call_command("import_lettings", path, stdout=StringIO(), stderr=StringIO())
+
+        self.assertEqual(self.search("harbour"), ["Harbour View"])
+        self.assertEqual(
+            self.search("beach"), ["Beach House", "Harbour View", "Quiet Cottage", "Café Loft"]
+        )
+
+        address = Address.objects.create(
+            number=3,
+            street="Pier Lane",
+            city="Seattle",
+            state="WA",
+            zip_code=98101,
+            country_iso_code="USA",
+        )
+        Letting.objects.create(title="Harbour Inn", address=address)
+        self.assertEqual(self.search("harbour"), ["Harbour Inn", "Harbour View"])
+
+    def test_search_view(self):
+        """
+        Test that the search view lists the matching lettings with one query.
+        """
+
+        with self.assertNumQueries(1):
+            response = self.client.get(reverse("lettings:lettings_search"), {"q": "beach"})
+
+        self.assertEqual(response.status_code, 200)
+        self.assertTemplateUsed(response, "lettings_index.html")
+        self.assertEqual(
+            [letting.title for letting in response.context["lettings_list"]],
+            ["Beach House", "Quiet Cottage", "Café Loft"],
+        )
+        self.assertContains(response, 'value="beach"')
+        self.assertContains(response, reverse("lettings:letting", args=[self.beach.pk]))
+
+        response = self.client.get(reverse("lettings:lettings_search"), {"q": "nowhere"})
+        self.assertContains(response, "No lettings match")
+
+        response = self.client.get(reverse("lettings:lettings_search"), {"q": "foo_bar"})
+        self.assertContains(response, "No lettings match")
+
+    def test_search_view_empty_query(self):
+        """
+        Test that the search view lists no letting and runs no query without a search.
+        """
+
+        with self.assertNumQueries(0):
+            response = self.client.get(reverse("lettings:lettings_search"))
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(list(response.context["lettings_list"]), [])
@@ -0,0 +1,180 @@
+"""
+Test cases for the cache of the lettings detail pages.
+
+This module checks that the rendered page of a :class:`lettings.Letting` is served from the cache
+and invalidated by the signal receivers of the lettings app when the letting or its
+:class:`lettings.Address` is saved or deleted, including through the admin site.
+
+Classes:
+    - LettingPageCacheTestCase (TestCase): A test case for the cache of the letting pages.
+
+Methods:
+    - LettingPageCacheTestCase.setUpTestData: Method to set up test data before running tests.
+    - LettingPageCacheTestCase.setUp: Method to clear the cache before each test.
+    - LettingPageCacheTestCase.test_letting_page_served_from_cache: Method to test that a cached
+      page is served with only the query reading its version.
+    - LettingPageCacheTestCase.test_letting_save_invalidates_page: Method to test the invalidation
+      when the :class:`lettings.Letting` is saved.
+    - LettingPageCacheTestCase.test_address_save_invalidates_page: Method to test the invalidation
+      when the :class:`lettings.Address` is saved.
+    - LettingPageCacheTestCase.test_letting_delete_invalidates_page: Method to test the
+      invalidation when the :class:`lettings.Letting` is deleted.
+    - LettingPageCacheTestCase.test_admin_change_invalidates_page: Method to test the invalidation
+      when the :class:`lettings.Address` is changed through the admin site.
+    - LettingPageCacheTestCase.test_deployment_changes_page_key: Method to test that the pages
+      cached by a previous deployment are not served.
+
+:param get_user_model: A function provided by Django to get the currently active user model.
+:param cache: The default cache.
+:param mock: A module to replace the version of the templates during a test.
+:param TestCase: A subclass of Django's TestCase class for writing unit tests.
+:param reverse: A function provided by Django for generating URLs based on view names.
+"""
+
+from unittest import mock
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.test import TestCase
+from django.urls import reverse
+
+from lettings.models import Address, Letting
+
+
+class LettingPageCacheTestCase(TestCase):
+    """
+    Test case for the cache of the :class:`lettings.Letting` detail pages.
+
+    :param address: An instance of the :class:`lettings.Address`.
+    :type address: class:`lettings.Address`
+    :param letting: An instance of the :class:`lettings.Letting`.
+    :type letting: class:`lettings.Letting`
+    """
+
+    @classmethod
+    def setUpTestData(cls):
+        """
+        Create an :class:`lettings.Address` and its :class:`lettings.Letting`.
+
+        The tests change copies read from the database, as these instances are shared by the
+        tests of the class.
+        """
+
+        cls.address = Address.objects.create(
+            number=7,
+            street="Cache Street",
+            city="Cache City",
+            state="CC",
+            zip_code=12345,
+            country_iso_code="USA",
+        )
+        cls.letting = Letting.objects.create(title="Cached House", address=cls.address)
+        cls.url = reverse("lettings:letting", kwargs={"letting_id": cls.letting.id})
+
+    def setUp(self):
+        """
+        Clear the cache, which is not rolled back with the database between tests.
+        """
+
+        cache.clear()
+
+    def test_letting_page_served_from_cache(self):
+        """
+        Test that the second request of a letting page only reads the version of the page.
+
+        :return: None
+        :rtype: None
+        """
+
+        first = self.client.get(self.url)
+        with self.assertNumQueries(1):
+            second = self.client.get(self.url)
+
+        self.assertEqual(second.status_code, 200)
+        self.assertEqual(first.content, second.content)
+
+    def test_letting_save_invalidates_page(self):
+        """
+        Test that saving the :class:`lettings.Letting` invalidates its cached page.
+
+        :return: None
+        :rtype: None
+        """
+
+        self.client.get(self.url)
+        letting = Letting.objects.get(pk=self.letting.pk)
+        letting.title = "Renamed House"
+        letting.save()
+
+        self.assertContains(self.client.get(self.url), "Renamed House")
+
+    def test_address_save_invalidates_page(self):
+        """
+        Test that saving the :class:`lettings.Address` invalidates the page of its letting.
+
+        :return: None
+        :rtype: None
+        """
+
+        self.client.get(self.url)
+        address = Address.objects.get(pk=self.address.pk)
+        address.city = "Moved City"
+        address.save()
+
+        self.assertContains(self.client.get(self.url), "Moved City")
+
+    def test_letting_delete_invalidates_page(self):
+        """
+        Test that deleting the :class:`lettings.Letting` invalidates its cached page.
+
+        :return: None
+        :rtype: None
+        """
+
+        self.client.get(self.url)
+        Letting.objects.get(pk=self.letting.pk).delete()
+
+        self.assertEqual(self.client.get(self.url).status_code, 404)
+
+    def test_admin_change_invalidates_page(self):
+        """
+        Test that changing the :class:`lettings.Address` in the admin invalidates the page.
+
+        :return: None
+        :rtype: None
+        """
+
+        admin = get_user_model().objects.create_superuser("admin", "admin@mail.com", "Abc1234!")
+        self.client.force_login(admin)
+        self.client.get(self.url)
+
+        response = self.client.post(
+            reverse("admin:lettings_address_change", args=[self.address.id]),
+            {
+                "number": 8,
+                "street": "Admin Street",
+                "city": "Admin City",
+                "state": "AC",
+                "zip_code": 54321,
+                "country_iso_code": "USA",
+            },
+        )
+
+        self.assertEqual(response.status_code, 302)
+        self.assertContains(self.client.get(self.url), "Admin Street")
+
+    def test_deployment_changes_page_key(self):
+        """
+        Test that a page cached before a deployment changing the templates is rendered again.
+
+        :return: None
+        :rtype: None
+        """
+
+        cached_key = self.client.get(self.url).page_cache_key
+        with mock.patch("core.conditional.templates_version", return_value="deployed"):
+            with self.assertNumQueries(2):
+                response = self.client.get(self.url)
+
+        self.assertEqual(response.status_code, 200)
+        self.assertNotEqual(response.page_cache_key, cached_key)
@@ -12,6 +12,10 @@ Classes:
       the index view for :class:`lettings.Letting`.
     - LettingsDetailViewTestCase (LettingViewTestCase): A subclass of LettingViewTestCase to test
       the detail view for :class:`lettings.Letting`.
+    - LettingsPaginationViewTestCase (LettingViewTestCase): A subclass of LettingViewTestCase to
+      test the keyset pagination of the index view.
+    - LettingsStreamingViewTestCase (LettingsPaginationViewTestCase): A subclass of
+      LettingsPaginationViewTestCase to test the streaming mode of the index view.
 
 Methods:
     - LettingViewTestCase.setUpTestData: Method to set up test data before running tests.
@@ -21,17 +25,29 @@ Methods:
       the detail view for a valid :class:`lettings.Letting` ID.
     - LettingsDetailViewTestCase.test_letting_id_view_failed: Method to test the behavior of the
       detail view for an invalid :class:`lettings.Letting` ID.
+    - LettingsPaginationViewTestCase.test_letting_index_next_and_previous_pages: Method to test
+      the navigation between the pages of the index view.
+    - LettingsPaginationViewTestCase.test_letting_index_invalid_cursor: Method to test the index
+      view with an invalid cursor.
+    - LettingsPaginationViewTestCase.test_letting_index_wrong_typed_cursor: Method to test the
+      index pages with a cursor holding values of the wrong type.
+    - LettingsStreamingViewTestCase.test_letting_index_streamed_pages: Method to test that the
+      streamed pages hold the same lettings and links as the rendered pages.
+    - LettingsStreamingViewTestCase.test_letting_index_streamed_empty_page: Method to test the
+      streamed page when there is no letting.
 
 :param Http404: An exception raised when a requested object is not found.
 :param TestCase: A subclass of Django's TestCase class for writing unit tests.
 :param RequestFactory: A class provided by Django for creating mock request objects.
+:param override_settings: A decorator provided by Django to change settings in tests.
 :param reverse: A function provided by Django for generating URLs based on view names.
 """
 
 from django.http import Http404
-from django.test import TestCase, RequestFactory
+from django.test import TestCase, RequestFactory, override_settings
 from django.urls import reverse
 
+from core.pagination import encode_cursor
 from lettings.models import Letting, Address
 from lettings.views import index, letting
 
@@ -157,3 +173,159 @@ class LettingsDetailViewTestCase(LettingViewTestCase):
         )
         with self.assertRaises(Http404):
             letting(request, letting_id=6)
+
+
+@override_settings(PAGINATION_PAGE_SIZE=2)
+class LettingsPaginationViewTestCase(LettingViewTestCase):
+    """
+    Test case for the keyset pagination of the index view for :class:`lettings.Letting`.
+
+    Methods:
+        - setUpTestData: Method to create more :class:`lettings.Letting` than fit on one page.
+        - test_letting_index_next_and_previous_pages: Method tests the navigation between pages.
+        - test_letting_index_invalid_cursor: Method tests the index view with an invalid cursor.
+        - test_letting_index_wrong_typed_cursor: Method tests the index pages with a cursor
+          holding values of the wrong type.
+    """
+
+    @classmethod
+    def setUpTestData(cls):
+        """
+        Create four more :class:`lettings.Letting`, so the index spans three pages of two.
+        """
+
+        super().setUpTestData()
+        for number in range(2, 6):
+            address = Address.objects.create(
+                number=number,
+                street="Test Street View",
+                city="Test City View",
+                state="TS",
+                zip_code=52369,
+                country_iso_code="USA",
+            )
+            Letting.objects.create(title=f"Test House {number}", address=address)
+
+    def test_letting_index_next_and_previous_pages(self):
+        """
+        Test the navigation between the pages of the index view.
+
+        Follows the next links to the last page, then the previous link back, and asserts the
+        lettings of each page are ordered by ID.
+
+        :return: None
+        :rtype: None
+        """
+
+        url = reverse("lettings:lettings_index")
+        titles = []
+        response = self.client.get(url)
+        while True:
+            page = response.context["page"]
+            titles.extend(letting.title for letting in page.object_list)
+            if not page.has_next:
+                break
+            response = self.client.get(url + page.next_url)
+
+        self.assertEqual(titles, [f"Test House {number}" for number in range(1, 6)])
+        self.assertFalse(page.has_next)
+        self.assertTrue(page.has_previous)
+
+        response = self.client.get(url + page.previous_url)
+        previous_titles = [letting.title for letting in response.context["lettings_list"]]
+        self.assertEqual(previous_titles, ["Test House 3", "Test House 4"])
+        self.assertTrue(response.context["page"].has_previous)
+        self.assertTrue(response.context["page"].has_next)
+
+    def test_letting_index_invalid_cursor(self):
+        """
+        Test the behavior of the index view for an invalid cursor.
+
+        :raises Http404: If the cursor can not be decoded.
+        """
+
+        request = RequestFactory().get(reverse("lettings:lettings_index"), {"after": "invalid"})
+        with self.assertRaises(Http404):
+            index(request)
+
+    def test_letting_index_wrong_typed_cursor(self):
+        """
+        Test that the index page and the API answer 404 to a cursor which decodes, but holds
+        values of the wrong type for its keys.
+
+        :return: None
+        :rtype: None
+        """
+
+        cursors = [
+            ({}, ["x"]),
+            ({}, [None]),
+            ({}, [{"a": 1}]),
+            ({"sort": "city"}, ["Test City View", "x"]),
+        ]
+        for url in (reverse("lettings:lettings_index"), reverse("lettings:api_lettings_index")):
+            for parameters, values in cursors:
+                for name in ("after", "before"):
+                    with self.subTest(url=url, values=values, name=name):
+                        response = self.client.get(
+                            url, {**parameters, name: encode_cursor(values)}
+                        )
+                        self.assertEqual(response.status_code, 404)
+
+
+class LettingsStreamingViewTestCase(LettingsPaginationViewTestCase):
+    """
+    Test case for the streaming mode of the index view for :class:`lettings.Letting`.
+
+    It inherits the pagination tests, which run against the rendered pages.
+
+    Methods:
+        - test_letting_index_streamed_pages: Method tests that the streamed pages match the
+          rendered pages.
+        - test_letting_index_streamed_empty_page: Method tests the streamed page without letting.
+    """
+
+    def test_letting_index_streamed_pages(self):
+        """
+        Test that the streamed pages hold the same lettings and links as the rendered pages.
+
+        Follows the next links of the rendered pages and compares each of them with the streamed
+        page of the same URL.
+
+        :return: None
+        :rtype: None
+        """
+
+        url = reverse("lettings:lettings_index")
+        next_url = ""
+        while next_url is not None:
+            rendered = self.client.get(url + next_url)
+            page = rendered.context["page"]
+            with self.settings(STREAMING_INDEX_PAGES=True):
+                streamed = self.client.get(url + next_url)
+
+            self.assertTrue(streamed.streaming)
+            content = b"".join(streamed.streaming_content).decode()
+            for row in page.object_list:
+                self.assertIn(row.title, content)
+            for link in (page.next_url, page.previous_url):
+                if link:
+                    self.assertIn(link.replace("&", "&amp;"), content)
+            self.assertEqual(content.count("list-group-item"), len(page.object_list))
+            next_url = page.next_url
+
+    @override_settings(STREAMING_INDEX_PAGES=True)
+    def test_letting_index_streamed_empty_page(self):
+        """
+        Test the streamed index page when there is no letting.
+
+        :return: None
+        :rtype: None
+        """
+
+        Letting.objects.all().delete()
+        response = self.client.get(reverse("lettings:lettings_index"))
+
+        content = b"".join(response.streaming_content).decode()
+        self.assertIn("No lettings are available.", content)
+        self.assertTrue(content.rstrip().endswith("</html>"))
@@ -7,8 +7,12 @@ app is responsible for managing :class:`lettings.Letting` properties and related
 URL Patterns:
     - ``/lettings/`` - URL for the lettings index page, displaying a list of
       :class:`lettings.Letting` properties.
+    - ``/lettings/search/?q=<text>`` - URL of the search of :class:`lettings.Letting` properties
+      by title, street and city.
     - ``/lettings/<int:letting_id>/`` - URL pattern for viewing details of a specific
       :class:`lettings.Letting` property identified by its ID.
+    - ``/api/lettings/`` - URL of the JSON API listing the :class:`lettings.Letting` properties
+      with their :class:`lettings.Address`.
 
 Note:
     This file should only include URL patterns specific to the lettings app. Global URL
@@ -20,11 +24,13 @@ Note:
 
 from django.urls import path
 
-from lettings import views
+from lettings import api, views
 
 app_name = "lettings"
 
 urlpatterns = [
     path("lettings/", views.index, name="lettings_index"),
+    path("lettings/search/", views.search, name="lettings_search"),
     path("lettings/<int:letting_id>/", views.letting, name="letting"),
+    path("api/lettings/", api.index, name="api_lettings_index"),
 ]
@@ -5,67 +5,187 @@ This module defines views for handling HTTP requests related to :class:`lettings
 properties in the lettings app of the project.
 
 Views:
-    - index: Renders the lettings index page, displaying a list of all :class:`lettings.Letting`
-      properties.
+    - index: Renders the lettings index page, displaying a page of :class:`lettings.Letting`
+      properties ordered by ID, or filtered and sorted by place (see ``lettings.filters``).
     - letting: Renders the details page for a specific :class:`lettings.Letting` property
-      identified by its ID.
+      identified by its ID. The rendered page is cached until the letting or its address changes.
+    - search: Renders the lettings index page with the :class:`lettings.Letting` properties
+      matching a search, best matches first (see ``lettings.search``).
 
 Usage:
     These views can be used to display information about letting properties, including their titles
     and addresses. They interact with the Letting model retrieve data from the database and render
     it in the appropriate templates.
 
+Conditional requests:
+    Both views send ``ETag`` and ``Last-Modified`` validators and answer ``304 Not Modified``
+    from one small query reading the version of the page (see ``core.conditional``), without
+    rendering it. The version of the index is counted by triggers on every write to the lettings
+    and their addresses and read by primary key, the version of a letting page the last
+    modification of the letting and of its address.
+
+Query budgets:
+    Every view runs a fixed number of SQL queries, whatever the number of rows in the
+    database. The budgets are listed in ``QUERY_BUDGETS`` and enforced by
+    ``lettings/tests/test_queries.py``:
+
+    - index: 2 queries, the version of the page and the ``id`` and ``title`` columns of one page
+      of lettings, and only the first one when answering ``304 Not Modified``.
+    - letting: 2 queries, the version of the page and the :class:`lettings.Letting` joined to its
+      :class:`lettings.Address`, and only the first one when the page is served from the cache
+      or answering ``304 Not Modified``.
+    - search: 1 query on the full-text search index, and none when the search is empty.
+
 Example:
     To render the lettings index page::
 
-        lettings_list = Letting.objects.all()
-        context = {'lettings_list': lettings_list}
+        page = paginate_keyset(request, Letting.objects.only("id", "title"), keys=("id",))
+        context = {'lettings_list': page.object_list, 'page': page}
         return render(request, 'lettings_index.html', context)
 
     To render the details page for a specific letting property::
 
-        single_letting = get_object_or_404(Letting, pk=letting_id)
+        lettings_list = Letting.objects.select_related("address")
+        single_letting = get_object_or_404(lettings_list, pk=letting_id)
         context = {'title': single_letting.title, 'address': single_letting.address}
         return render(request, 'letting.html', context)
 
 :param Letting: Represents a :class:`lettings.Letting` (rental) property in the database.
 :type Letting: class:`lettings.Letting`
+:param Http404: An exception raised when a filter or the cursor is invalid.
+:param LettingFilterError: The exception raised when a filter or the sort order is invalid.
+:param filter_lettings: A function returning the lettings selected by the query parameters.
+:param read_index_version: A function returning the version of an index page.
+:param versioned_page: A view decorator answering the conditional requests.
+:param cache_rendered_page: A view decorator serving the rendered page from the cache.
+:param paginate_keyset: A function returning one page of a queryset selected by a cursor.
+:param stream_keyset: A function returning one page of a queryset read lazily.
+:param stream_index: A function returning a streaming response rendering an index page.
+:param get_page_size: A function returning the number of rows requested per page.
+:param search_lettings: A function returning the lettings matching a text.
+:param settings: The settings of the project.
 :param render: A module to render templates in Django views.
 :param get_object_or_404: A function provided by Django that retrieves an object from the database
     or raises a Http404 exception if the object does not exist.
 """
 
+from django.conf import settings
+from django.http import Http404
 from django.shortcuts import render, get_object_or_404
 
+from core.conditional import read_index_version, versioned_page
+from core.page_cache import cache_rendered_page
+from core.pagination import get_page_size, paginate_keyset, stream_keyset
+from core.streaming import stream_index
+from lettings.filters import LettingFilterError, filter_lettings
 from lettings.models import Letting
+from lettings.search import search_lettings
+
+QUERY_BUDGETS = {
+    "index": 2,
+    "letting": 2,
+    "search": 1,
+}
+
+
+def index_version(request):
+    """
+    Return the version of the lettings index page.
+
+    The page is filtered and sorted on the fields of the addresses (see ``lettings.filters``),
+    so a change of an address changes the version too. The version is kept up to date by the
+    triggers of the ``0006_index_version`` migration and read by primary key, whatever the number
+    of lettings.
+
+    :param request: The HTTP request object.
+    :type request: HttpRequest
+    :return: The number of writes to the lettings and their addresses and the date of the last
+        one.
+    :rtype: dict
+    """
+
+    return read_index_version("lettings")
+
+
+def letting_version(request, letting_id):
+    """
+    Return the version of the details page of a letting property.
+
+    :param request: The HTTP request object.
+    :type request: HttpRequest
+    :param letting_id: The ID of the letting property.
+    :type letting_id: int
+    :return: The date of the last change of the letting or its address, or None if the letting
+        does not exist.
+    :rtype: dict or None
+    """
+
+    dates = (
+        Letting.objects.filter(pk=letting_id)
+        .values_list("updated_at", "address__updated_at")
+        .first()
+    )
+    return None if dates is None else {"updated_at": max(dates)}
 
 
+@versioned_page(index_version)
 def index(request):
     """
     Render the lettings index page.
 
-    This view retrieves all letting properties from the database and renders the lettings
-    index page ('lettings_index.html') with a list of letting properties.
+    This view retrieves one page of letting properties from the database and renders the lettings
+    index page ('lettings_index.html') with the list of letting properties. Only the columns used
+    by the template are selected.
+
+    The lettings are ordered by ID and paginated on it: the ``after`` and ``before`` query
+    parameters hold the cursor of the page and ``size`` the number of lettings per page. The
+    ``country``, ``state``, ``city``, ``zip`` and ``sort`` query parameters filter the lettings
+    on their address and sort them by place (see ``lettings.filters``).
+
+    When ``settings.STREAMING_INDEX_PAGES`` is enabled, the page is streamed: the top of the page
+    is sent before the lettings are read, then each letting is sent while it is read (see
+    ``core.streaming``).
 
     :param request: The HTTP request object.
     :type request: HttpRequest
 
     :return: The HTTP response object containing the rendered template.
-    :rtype: HttpResponse
+    :rtype: HttpResponse or StreamingHttpResponse
+    :raises Http404: If a filter, the sort order or the cursor is invalid.
     """
 
-    lettings_list = Letting.objects.all()
-    context = {"lettings_list": lettings_list}
+    try:
+        lettings_list, keys = filter_lettings(request, Letting.objects.only("id", "title"))
+    except LettingFilterError as error:
+        raise Http404(str(error))
+    if settings.STREAMING_INDEX_PAGES:
+        page = stream_keyset(request, lettings_list, keys)
+        return stream_index(
+            request,
+            "lettings_index.html",
+            page,
+            "lettings_index_row.html",
+            "letting",
+            "No lettings are available.",
+        )
+
+    page = paginate_keyset(request, lettings_list, keys)
+    context = {"lettings_list": page.object_list, "page": page}
     return render(request, "lettings_index.html", context)
 
 
+@versioned_page(letting_version)
+@cache_rendered_page("letting", "letting_id")
 def letting(request, letting_id):
     """
     Render the details page for a specific letting property.
 
     This view retrieves a letting property with the specified ID from the database and renders the
     details page ('letting.html') with information about the letting property, including its
-    title and address.
+    title and address. The :class:`lettings.Address` is fetched in the same query.
+
+    The rendered page is cached by letting ID and invalidated by the receivers in
+    ``lettings/signals.py`` when the letting or its address is saved or deleted.
 
     :param request: The HTTP request object.
     :type request: HttpRequest
@@ -76,9 +196,36 @@ def letting(request, letting_id):
     :rtype: HttpResponse
     """
 
-    single_letting = get_object_or_404(Letting, pk=letting_id)
+    single_letting = get_object_or_404(
+        Letting.objects.select_related("address"), pk=letting_id
+    )
     context = {
         "title": single_letting.title,
         "address": single_letting.address,
     }
     return render(request, "letting.html", context)
+
+
+def search(request):
+    """
+    Render the lettings index page with the letting properties matching a search.
+
+    This view reads the text typed in the search box from the ``q`` query parameter and renders
+    the lettings index page ('lettings_index.html') with the matching letting properties, best
+    matches first. The search is answered from the full-text search index of the lettings, so it
+    runs a single query whatever the number of lettings. The ``size`` query parameter holds the
+    largest number of results.
+
+    :param request: The HTTP request object.
+    :type request: HttpRequest
+
+    :return: The HTTP response object containing the rendered template.
+    :rtype: HttpResponse
+    """
+
+    query = request.GET.get("q", "").strip()
+    context = {
+        "lettings_list": search_lettings(query, get_page_size(request)),
+        "query": query,
+    }
+    return render(request, "lettings_index.html", context)
@@ -0,0 +1,182 @@
+"""
+Configuration of gunicorn for the production server.
+
+This module is the server profile of ``deploy.sh``, read with
+``gunicorn -c python:oc_lettings_site.gunicorn_config``. The application is loaded once in the
+master process and the workers are forked from it, so a new worker does not import Django
+again. The templates and the URL patterns are loaded before the first fork (see ``core.warmup``),
+and each worker opens its database connections before it accepts requests.
+
+Environment variables:
+    - SERVER_MODE: ``asgi`` for the uvicorn workers of ``oc_lettings_site.asgi``, the sync or
+      ``gthread`` workers of ``oc_lettings_site.wsgi`` otherwise.
+    - GUNICORN_BIND: The address to listen on, ``0.0.0.0:8000`` by default.
+    - GUNICORN_WORKERS: The number of workers: by default, 2 per CPU plus 1 in WSGI mode, and 1
+      per CPU in ASGI mode, whose workers run ``ASGI_THREADS`` threads each.
+    - GUNICORN_THREADS: The threads of each WSGI worker, 1 by default. Above 1, the workers are
+      ``gthread`` workers.
+    - GUNICORN_MAX_REQUESTS: The requests after which a worker is replaced, which caps the growth
+      of its memory, 1000 by default.
+    - GUNICORN_MAX_REQUESTS_JITTER: The maximum random number of requests added to
+      ``GUNICORN_MAX_REQUESTS`` for each worker, so the workers are not replaced at once, 100 by
+      default.
+    - GUNICORN_TIMEOUT: The seconds after which a silent worker is replaced, 30 by default.
+    - PROMETHEUS_MULTIPROC_DIR: The directory where the workers write their metrics (see
+      ``core.metrics``), ``oc_lettings_site_metrics`` in the temporary directory by default. It
+      is emptied when the server starts.
+
+The number of workers is passed to the application in the ``WEB_CONCURRENCY`` environment
+variable.
+
+Hooks:
+    - on_starting: Empties the directory of the metrics.
+    - when_ready: Compiles the templates and builds the URL resolvers in the master process.
+    - post_worker_init: Opens the database connections of a worker, in each thread of the pool of
+      the ASGI handler in ASGI mode (see ``core.asgi``).
+    - child_exit: Marks the metrics of a worker as those of a dead process.
+
+:param os: The module reading the environment and the CPUs.
+:param shutil: The module emptying the directory of the metrics.
+:param tempfile: The module giving the temporary directory.
+:param time: The module measuring the duration of the warmup.
+"""
+
+import os
+import shutil
+import tempfile
+import time
+
+
+def _cpu_count():
+    """
+    Return the number of CPUs the server can run on, which is lower than the number of CPUs of
+    the host in a container restricted to some CPUs.
+
+    :return: The number of CPUs.
+    :rtype: int
+    """
+
+    if hasattr(os, "sched_getaffinity"):
+        return len(os.sched_getaffinity(0))
+    return os.cpu_count() or 1
+
+
+ASGI = os.environ.get("SERVER_MODE") == "asgi"
+
+bind = os.environ.get("GUNICORN_BIND", "0.0.0.0:8000")
+preload_app = True
+
+if ASGI:
+    wsgi_app = "oc_lettings_site.asgi:application"
+    worker_class = "uvicorn.workers.UvicornWorker"
+    workers = int(os.environ.get("GUNICORN_WORKERS", _cpu_count()))
+else:
+    wsgi_app = "oc_lettings_site.wsgi:application"
+    threads = int(os.environ.get("GUNICORN_THREADS", 1))
+    worker_class = "gthread" if threads > 1 else "sync"
+    workers = int(os.environ.get("GUNICORN_WORKERS", 2 * _cpu_count() + 1))
+
+max_requests = int(os.environ.get("GUNICORN_MAX_REQUESTS", 1000))
+max_requests_jitter = int(os.environ.get("GUNICORN_MAX_REQUESTS_JITTER", 100))
+timeout = int(os.environ.get("GUNICORN_TIMEOUT", 30))
+graceful_timeout = timeout
+
+METRICS_DIR = os.environ.get(
+    "PROMETHEUS_MULTIPROC_DIR", os.path.join(tempfile.gettempdir(), "oc_lettings_site_metrics")
+)
+# Set by gunicorn before the application is loaded, as prometheus_client reads the directory of
+# the metrics when it is imported. The number of workers divides the budget of the Sentry traces
+# between them (see core.tracing).
+raw_env = [f"PROMETHEUS_MULTIPROC_DIR={METRICS_DIR}", f"WEB_CONCURRENCY={workers}"]
+
+
+def on_starting(server):
+    """
+    Empty the directory of the metrics, so the metrics of a previous run are not added to those
+    of the workers of this run.
+
+    :param server: The master process.
+    :type server: gunicorn.arbiter.Arbiter
+    :return: None
+    :rtype: None
+    """
+
+    shutil.rmtree(METRICS_DIR, ignore_errors=True)
+    os.makedirs(METRICS_DIR)
+
+
+def when_ready(server):
+    """
+    Compile the templates and build the URL resolvers in the master process, once the application
+    is loaded and before the workers are forked.
+
+    :param server: The master process.
+    :type server: gunicorn.arbiter.Arbiter
+    :return: None
+    :rtype: None
+    """
+
+    from django.db import connections
+
+    from core.warmup import compile_templates, resolve_urls
+
+    start = time.perf_counter()
+    templates = compile_templates()
+    patterns = resolve_urls()
+    # The workers must not share a connection opened by the master process.
+    connections.close_all()
+    server.log.info(
+        f"Compiled {templates} templates and resolved {patterns} URL patterns in "
+        f"{time.perf_counter() - start:.2f}s."
+    )
+
+
+def post_worker_init(worker):
+    """
+    Open the database connections of a worker before it accepts requests.
+
+    The sync workers serve the requests in their main thread, which opens the connections. The
+    ASGI handler serves them in the threads of its pool, which each open their own connections.
+    The threads of the ``gthread`` workers are only started by the requests, and open their
+    connections on their first request.
+
+    :param worker: The worker process.
+    :type worker: gunicorn.workers.base.Worker
+    :return: None
+    :rtype: None
+    """
+
+    from threading import BrokenBarrierError
+
+    from django.db import DatabaseError
+
+    from core.warmup import open_connections
+
+    application = worker.wsgi
+    try:
+        if hasattr(application, "open_connections"):
+            aliases = application.open_connections()
+        else:
+            aliases = open_connections()
+    except (DatabaseError, BrokenBarrierError) as error:
+        worker.log.warning(f"Can not open the database connections: {error!r}.")
+    else:
+        worker.log.debug(f"Opened the connections to {', '.join(aliases)}.")
+
+
+def child_exit(server, worker):
+    """
+    Mark the metrics of a worker which exited as those of a dead process. Its counters and
+    histograms are still served by ``/metrics``.
+
+    :param server: The master process.
+    :type server: gunicorn.arbiter.Arbiter
+    :param worker: The worker process.
+    :type worker: gunicorn.workers.base.Worker
+    :return: None
+    :rtype: None
+    """
+
+    from prometheus_client import multiprocess
+
+    multiprocess.mark_process_dead(worker.pid)
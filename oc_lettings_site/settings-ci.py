@@ -4,3 +4,10 @@ SECRET_KEY = "top-secret"
 STATICFILES_STORAGE = "django.contrib.staticfiles.storage.StaticFilesStorage"
 DEBUG = True
 ALLOWED_HOSTS = ["*"]
+CACHES = {
+    "default": {
+        "BACKEND": "django.core.cache.backends.locmem.LocMemCache",
+    }
+}
+# The timings of the requests of the tests are not logged
+LOGGING["loggers"]["core.timing"]["level"] = "WARNING"  # noqa
@@ -39,3 +39,13 @@ improving the overall quality and stability of the application.
 https://docs.sentry.io/platforms/python/integrations/django/#install
 """
 # SENTRY_DSN =
+
+"""
+The templates are read on each request, as they are written, so the changes made to them are
+visible without restarting the server, and the errors of the debug pages point to their lines:
+the minifying and cached loaders of the main settings are left out (see core/loaders.py).
+"""
+TEMPLATES[0]["OPTIONS"]["loaders"] = [  # noqa
+    "django.template.loaders.filesystem.Loader",
+    "django.template.loaders.app_directories.Loader",
+]
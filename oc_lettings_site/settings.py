@@ -1,4 +1,6 @@
 import os
+import tempfile
+
 import sentry_sdk
 
 from pathlib import Path
@@ -38,13 +40,17 @@ INSTALLED_APPS = [
     "django.contrib.staticfiles",
     # custom apps:
     "core",
-    "lettings",
-    "profiles",
+    "lettings.apps.LettingsConfig",
+    "profiles.apps.ProfilesConfig",
 ]
 
 MIDDLEWARE = [
     "django.middleware.security.SecurityMiddleware",
     "whitenoise.middleware.WhiteNoiseMiddleware",
+    "core.metrics.MetricsMiddleware",
+    "core.timing.ServerTimingMiddleware",
+    "core.compression.CompressionMiddleware",
+    "core.middleware.ReplicaPinningMiddleware",
     "django.contrib.sessions.middleware.SessionMiddleware",
     "django.middleware.common.CommonMiddleware",
     "django.middleware.csrf.CsrfViewMiddleware",
@@ -57,10 +63,19 @@ ROOT_URLCONF = "oc_lettings_site.urls"
 
 TEMPLATES = [
     {
-        "BACKEND": "django.template.backends.django.DjangoTemplates",
+        # The Django template backend, timing the rendering of the templates (see core.timing)
+        "BACKEND": "core.timing.DjangoTemplates",
+        "NAME": "django",
         "DIRS": [os.path.join(BASE_DIR, "templates")],
-        "APP_DIRS": True,
         "OPTIONS": {
+            # The templates are minified when they are loaded, and compiled once per process
+            # (see core/loaders.py)
+            "loaders": [
+                (
+                    "django.template.loaders.cached.Loader",
+                    ["core.loaders.FilesystemLoader", "core.loaders.AppDirectoriesLoader"],
+                ),
+            ],
             "context_processors": [
                 "django.template.context_processors.debug",
                 "django.template.context_processors.request",
@@ -73,17 +88,88 @@ TEMPLATES = [
 
 WSGI_APPLICATION = "oc_lettings_site.wsgi.application"
 
+# Threads of each ASGI worker running the requests (see core.asgi), which bounds the database
+# connections of the worker
+ASGI_THREADS = int(os.environ.get("ASGI_THREADS", 8))
+
 
 # Database
 # https://docs.djangoproject.com/en/3.0/ref/settings/#databases
 
 DATABASES = {
     "default": {
-        "ENGINE": "django.db.backends.sqlite3",
-        "NAME": os.path.join(BASE_DIR, "oc-lettings-site.sqlite3"),
+        # The SQLite backend of Django, tuned by SQLITE_PRAGMAS
+        "ENGINE": "core.backends.sqlite3",
+        "NAME": os.environ.get(
+            "DATABASE_NAME", os.path.join(BASE_DIR, "oc-lettings-site.sqlite3")
+        ),
+        # Seconds a thread keeps its connection open between requests
+        "CONN_MAX_AGE": int(os.environ.get("CONN_MAX_AGE", 600)),
+    }
+}
+
+# Read-only replicas of the database: snapshots of the primary database written by
+# `manage.py snapshot_replicas`, serving the reads of the public pages (see core.routers). A
+# client which wrote, and the cached pages invalidated by a change, read from the primary database
+# for REPLICA_PIN_SECONDS, which must exceed the interval between the snapshots. A connection to a
+# replica keeps reading the file it opened after a snapshot is renamed over it, so it is closed
+# at the end of each request and the next request reads the last snapshot
+DATABASE_REPLICAS = [path for path in os.environ.get("DATABASE_REPLICAS", "").split(",") if path]
+for index, path in enumerate(DATABASE_REPLICAS):
+    DATABASES[f"replica_{index}"] = {
+        "ENGINE": "core.backends.sqlite3",
+        "NAME": f"file:{path}?mode=ro&immutable=1",
+        "OPTIONS": {"uri": True},
+        "CONN_MAX_AGE": 0,
+    }
+DATABASE_ROUTERS = ["core.routers.ReplicaRouter"]
+REPLICA_PIN_SECONDS = int(os.environ.get("REPLICA_PIN_SECONDS", 300))
+
+# PRAGMAs applied to each new SQLite connection by core.backends.sqlite3: the write-ahead log
+# lets the workers read while another one writes, and the busy timeout makes a writer wait for
+# the lock instead of failing with "database is locked"
+SQLITE_PRAGMAS = {
+    "journal_mode": "wal",
+    "synchronous": "normal",
+    "busy_timeout": int(os.environ.get("SQLITE_BUSY_TIMEOUT", 5000)),
+    "cache_size": -int(os.environ.get("SQLITE_CACHE_SIZE_KIB", 20000)),
+    "mmap_size": int(os.environ.get("SQLITE_MMAP_SIZE", 256 * 2**20)),
+    "temp_store": "memory",
+}
+
+
+# Cache
+# https://docs.djangoproject.com/en/3.0/topics/cache/
+# The file based cache is shared by all the worker processes of a host, so a page invalidated by
+# one worker is not served anymore by the others. Each cached detail page takes up to three
+# entries, its HTML and its Brotli and gzip variants (see core/compression.py), so the default
+# MAX_ENTRIES of 300 would hold 100 pages: 30000 entries hold 10000 pages. When it is full, a
+# tenth of the entries is removed at random. core.backends.filebased lists the directory once per
+# culling rather than on every write, which would take tens of milliseconds at this size.
+
+CACHES = {
+    "default": {
+        "BACKEND": "core.backends.filebased.FileBasedCache",
+        "LOCATION": os.environ.get(
+            "CACHE_LOCATION", os.path.join(tempfile.gettempdir(), "oc_lettings_site_cache")
+        ),
+        "OPTIONS": {
+            "MAX_ENTRIES": int(os.environ.get("CACHE_MAX_ENTRIES", 30000)),
+            "CULL_FREQUENCY": int(os.environ.get("CACHE_CULL_FREQUENCY", 10)),
+        },
     }
 }
 
+# Lifetime in seconds of the cached detail pages, which are also invalidated on every save
+PAGE_CACHE_TIMEOUT = int(os.environ.get("PAGE_CACHE_TIMEOUT", 3600))
+# The responses of the views are compressed with the first of these encodings the client accepts,
+# at its level, when they are at least COMPRESSION_MIN_LENGTH bytes long (see core/compression.py)
+COMPRESSION_LEVELS = {
+    "br": int(os.environ.get("COMPRESSION_BROTLI_LEVEL", 4)),
+    "gzip": int(os.environ.get("COMPRESSION_GZIP_LEVEL", 6)),
+}
+COMPRESSION_MIN_LENGTH = 512
+
 
 # Password validation
 # https://docs.djangoproject.com/en/3.0/ref/settings/#auth-password-validators
@@ -121,24 +207,130 @@ USE_TZ = True
 # Static files (CSS, JavaScript, Images)
 # https://docs.djangoproject.com/en/3.0/howto/static-files/
 
-STATIC_ROOT = os.path.join(BASE_DIR, "core/staticfiles")
+STATIC_ROOT = os.environ.get("STATIC_ROOT", os.path.join(BASE_DIR, "core/staticfiles"))
 
 STATIC_URL = "/static/"
 STATICFILES_DIRS = [
     BASE_DIR / "core/static",
 ]
-STATICFILES_STORAGE = "whitenoise.storage.CompressedStaticFilesStorage"
+# collectstatic builds the bundles, then names the files after a hash of their content, which
+# WhiteNoise serves with a far-future Cache-Control: immutable header
+STATICFILES_STORAGE = "core.storage.BundledStaticFilesStorage"
+# The bundles of the front-end assets, and their sources, in order (see core/storage.py)
+STATIC_BUNDLES = {
+    "css/site.css": ["css/styles.css"],
+    "js/site.js": [
+        "vendor/popper/popper.min.js",
+        "vendor/bootstrap/bootstrap.min.js",
+        "js/scripts.js",
+    ],
+}
+# The rules of the CSS bundles matching nothing in the templates and the scripts are removed, but
+# those of the classes matching these patterns, built by the scripts at run time (see core/css.py)
+CSS_PURGE_SAFELIST = [r"^bs-(tooltip|popover)-", r"^carousel-item-"]
+# The templates of the top of the pages, whose rules of a CSS bundle are inlined in the pages,
+# which load the whole bundle without blocking their rendering
+STATIC_CRITICAL_CSS = {"css/site.css": ["base.html"]}
+# The characters of the fonts of the CSS bundles, converted to WOFF2 (see core/fonts.py): the
+# Latin range of Google Fonts by default
+FONT_UNICODE_RANGE = os.environ.get(
+    "FONT_UNICODE_RANGE",
+    "U+0000-00FF,U+0131,U+0152-0153,U+02BB-02BC,U+02C6,U+02DA,U+02DC,U+2000-206F,U+2074,U+20AC,"
+    "U+2122,U+2191,U+2193,U+2212,U+2215,U+FEFF,U+FFFD",
+)
+# The width of the static images in the pages, in CSS pixels: collectstatic saves their variants
+# at each pixel density, in each format, and in their own format (see core/images.py)
+STATIC_IMAGES = {"assets/img/logo.png": 70}
+IMAGE_DENSITIES = [1, 2]
+IMAGE_FORMATS = ["avif", "webp"]
+# The image drawn as the favicons of the pages
+FAVICON = "assets/img/logo.png"
+
+# Keyset pagination of the index pages
+PAGINATION_PAGE_SIZE = int(os.environ.get("PAGINATION_PAGE_SIZE", 50))
+PAGINATION_MAX_PAGE_SIZE = int(os.environ.get("PAGINATION_MAX_PAGE_SIZE", 500))
+
+# Streaming of the index pages: the top of the page is sent before the rows are read, then the
+# rows are read STREAMING_CHUNK_SIZE at a time and sent STREAMING_FLUSH_ROWS at a time
+STREAMING_INDEX_PAGES = os.environ.get("STREAMING_INDEX_PAGES", "False") == "True"
+STREAMING_MAX_PAGE_SIZE = int(os.environ.get("STREAMING_MAX_PAGE_SIZE", 100000))
+STREAMING_CHUNK_SIZE = 2000
+STREAMING_FLUSH_ROWS = 100
+
+# Export of the catalog (manage.py export_catalog and /export/): the rows are read
+# EXPORT_CHUNK_SIZE at a time
+EXPORT_CHUNK_SIZE = int(os.environ.get("EXPORT_CHUNK_SIZE", 5000))
+
+# Full-text search of the lettings: the results are ranked among the SEARCH_CANDIDATES most
+# recent lettings matching the search, which bounds the cost of the searches of common words
+SEARCH_CANDIDATES = int(os.environ.get("SEARCH_CANDIDATES", 500))
+
+# Timings of the requests (see core.timing): sent in the Server-Timing header of the responses
+# when SERVER_TIMING is on, and logged to the console by the core.timing logger
+SERVER_TIMING = os.environ.get("SERVER_TIMING", "True") == "True"
+
+LOGGING = {
+    "version": 1,
+    "disable_existing_loggers": False,
+    "handlers": {
+        "console": {
+            "class": "logging.StreamHandler",
+        },
+    },
+    "loggers": {
+        "core.timing": {
+            "handlers": ["console"],
+            "level": os.environ.get("TIMING_LOG_LEVEL", "INFO"),
+            "propagate": False,
+        },
+    },
+}
+
+# The metrics of /metrics are served to the clients of these networks (the host itself by
+# default) and to the requests holding "Authorization: Bearer <METRICS_TOKEN>", e.g. a Prometheus
+# server scraping through a proxy; the other requests are refused (see core/metrics.py)
+METRICS_ALLOWED_NETWORKS = [
+    network
+    for network in os.environ.get("METRICS_ALLOWED_NETWORKS", "127.0.0.1/32,::1/128").split(",")
+    if network
+]
+METRICS_TOKEN = os.environ.get("METRICS_TOKEN", "")
 
 # Settings for Sentry
 SENTRY_DSN = os.environ.get("SENTRY_DSN")
+
+# Sampling of the Sentry traces (see core.tracing): the requests of a URL name are traced at its
+# rate in SENTRY_TRACES_ROUTE_RATES ("name=rate,..."), or at SENTRY_TRACES_SAMPLE_RATE, and all
+# of them for SENTRY_BOOST_SECONDS after one of them took SENTRY_SLOW_REQUEST_SECONDS or failed.
+# The server sends at most SENTRY_TRACES_PER_SECOND traces per second, and never traces the paths
+# starting with one of SENTRY_TRACES_IGNORED_PATHS (add the path of the health checks of the host)
+SENTRY_TRACES_SAMPLE_RATE = float(os.environ.get("SENTRY_TRACES_SAMPLE_RATE", 0.01))
+SENTRY_TRACES_ROUTE_RATES = {
+    name: float(rate)
+    for name, rate in (
+        item.split("=") for item in os.environ.get("SENTRY_TRACES_ROUTE_RATES", "").split(",")
+        if item
+    )
+}
+SENTRY_TRACES_PER_SECOND = float(os.environ.get("SENTRY_TRACES_PER_SECOND", 5))
+SENTRY_TRACES_IGNORED_PATHS = [STATIC_URL, "/metrics", "/favicon.ico"] + [
+    path for path in os.environ.get("SENTRY_TRACES_IGNORED_PATHS", "").split(",") if path
+]
+SENTRY_SLOW_REQUEST_SECONDS = float(os.environ.get("SENTRY_SLOW_REQUEST_SECONDS", 1))
+SENTRY_BOOST_SECONDS = float(os.environ.get("SENTRY_BOOST_SECONDS", 60))
+# Share of the traced requests which are also profiled
+SENTRY_PROFILES_SAMPLE_RATE = float(os.environ.get("SENTRY_PROFILES_SAMPLE_RATE", 0))
+
 if SENTRY_DSN:
+    from core.tracing import django_integration, sample_trace
+
     sentry_sdk.init(
         dsn=SENTRY_DSN,
-        # Set traces_sample_rate to 1.0 to capture 100%
-        # of transactions for performance monitoring.
-        traces_sample_rate=1.0,
-        # Set profiles_sample_rate to 1.0 to profile 100%
-        # of sampled transactions.
-        # We recommend adjusting this value in production.
-        profiles_sample_rate=1.0,
+        integrations=[django_integration()],
+        traces_sampler=sample_trace,
+        profiles_sample_rate=SENTRY_PROFILES_SAMPLE_RATE,
+    )
+    MIDDLEWARE.insert(
+        MIDDLEWARE.index("core.timing.ServerTimingMiddleware"),
+        "core.tracing.TraceSamplingMiddleware",
     )
@@ -0,0 +1,62 @@
+"""
+JSON API of the profiles app.
+
+This module defines the read-only JSON endpoint listing the :class:`profiles.Profile` with the
+names of their :class:`User`, for the partner integrations.
+
+Views defined here include:
+    - index: Returns one page of :class:`profiles.Profile` as JSON, ordered by username.
+
+Usage:
+    ``GET /api/profiles/`` returns ``{"results": [...], "next": url, "previous": url}``. The
+    query parameters are:
+
+    - ``fields``: The comma separated fields to return, e.g. ``username,favorite_city``. All the
+      fields are returned by default.
+    - ``size``: The number of profiles per page, bounded by ``settings.PAGINATION_MAX_PAGE_SIZE``.
+    - ``after`` and ``before``: The cursors of the page, read from the ``next`` and ``previous``
+      URLs.
+
+Notes:
+    The rows are read with ``values_list()`` and only the requested columns are selected, so no
+    model instance is built and no template is rendered (see ``core.api``). The email addresses
+    are not exposed. The endpoint answers the conditional requests like the HTML index page, from
+    the same version.
+
+:param PROFILE_FIELDS: The fields of a profile, mapping their name in the JSON output to their
+    column.
+:type PROFILE_FIELDS: dict
+:param versioned_page: A view decorator answering the conditional requests.
+:param json_page: A function returning a JSON response holding one page of rows.
+:param index_version: A function returning the version of the profiles index.
+"""
+
+from core.api import json_page
+from core.conditional import versioned_page
+from profiles.models import Profile
+from profiles.views import index_version
+
+PROFILE_FIELDS = {
+    "username": "user__username",
+    "first_name": "user__first_name",
+    "last_name": "user__last_name",
+    "favorite_city": "favorite_city",
+}
+
+
+@versioned_page(index_version)
+def index(request):
+    """
+    Return one page of user profiles as JSON.
+
+    Parameters:
+        request (HttpRequest): The HTTP request object.
+
+    Returns:
+        HttpResponse: The JSON response, or a ``400 Bad Request`` response if a field is unknown.
+
+    Raises:
+        Http404: If the cursor is invalid.
+    """
+
+    return json_page(request, Profile.objects.all(), PROFILE_FIELDS, keys=("user__username",))
@@ -3,3 +3,7 @@ from django.apps import AppConfig
 
 class ProfilesConfig(AppConfig):
     name = 'profiles'
+
+    def ready(self):
+        # Connect the receivers invalidating the cached profile pages.
+        from profiles import signals  # noqa: F401
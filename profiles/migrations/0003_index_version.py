@@ -0,0 +1,75 @@
+# Generated by Django 3.0 on 2026-10-17 18:31
+
+from django.conf import settings
+from django.db import migrations
+
+# Every write to the profiles, and every change of the names of a user, increases the version of
+# the profiles index page and sets its date, so the page version is read by primary key instead of
+# aggregating the table (see core.conditional.read_index_version). The triggers also run for the
+# queryset update() and the bulk inserts, which do not send signals.
+BUMP_VERSION = """
+    UPDATE core_indexversion
+    SET version = version + 1, updated_at = strftime('%Y-%m-%d %H:%M:%f', 'now')
+    WHERE name = 'profiles';
+"""
+
+CREATE_INDEX_VERSION = [
+    """
+    INSERT INTO core_indexversion (name, version, updated_at)
+    VALUES ('profiles', 0, strftime('%Y-%m-%d %H:%M:%f', 'now'))
+    """,
+    f"""
+    CREATE TRIGGER profiles_profile_version_insert AFTER INSERT ON profiles_profile BEGIN
+        {BUMP_VERSION}
+    END
+    """,
+    f"""
+    CREATE TRIGGER profiles_profile_version_update AFTER UPDATE ON profiles_profile BEGIN
+        {BUMP_VERSION}
+    END
+    """,
+    f"""
+    CREATE TRIGGER profiles_profile_version_delete AFTER DELETE ON profiles_profile BEGIN
+        {BUMP_VERSION}
+    END
+    """,
+    f"""
+    CREATE TRIGGER profiles_user_version_update
+    AFTER UPDATE OF username, first_name, last_name ON auth_user BEGIN
+        {BUMP_VERSION}
+    END
+    """,
+]
+
+DROP_INDEX_VERSION = [
+    "DROP TRIGGER IF EXISTS profiles_user_version_update",
+    "DROP TRIGGER IF EXISTS profiles_profile_version_delete",
+    "DROP TRIGGER IF EXISTS profiles_profile_version_update",
+    "DROP TRIGGER IF EXISTS profiles_profile_version_insert",
+    "DELETE FROM core_indexversion WHERE name = 'profiles'",
+]
+
+
+def run_on_sqlite(statements):
+    def run(apps, schema_editor):
+        # The triggers are written for SQLite.
+        if schema_editor.connection.vendor == 'sqlite':
+            for statement in statements:
+                schema_editor.execute(statement)
+
+    return run
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+        ('core', '0001_initial'),
+        ('profiles', '0002_profile_updated_at'),
+    ]
+
+    operations = [
+        migrations.RunPython(
+            run_on_sqlite(CREATE_INDEX_VERSION), run_on_sqlite(DROP_INDEX_VERSION)
+        ),
+    ]
@@ -54,10 +54,15 @@ class Profile(models.Model):
     :type user: OneToOneField to :class:`User`
     :param favorite_city: A field for storing the user's favorite city.
     :type favorite_city: CharField, optional
+    :param updated_at: The date and time of the last change of the :class:`profile.Profile` or of
+        its :class:`User`. The version of the profiles index page is kept by triggers in
+        :class:`core.IndexVersion`.
+    :type updated_at: DateTimeField, set automatically
     """
 
     user = models.OneToOneField(User, on_delete=models.CASCADE)
     favorite_city = models.CharField(max_length=64, blank=True)
+    updated_at = models.DateTimeField(auto_now=True, db_index=True)
 
     def __str__(self):
         return self.user.username
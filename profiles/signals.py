@@ -0,0 +1,166 @@
+"""
+Signal receivers of the profiles app.
+
+This module invalidates the cached page of a :class:`profiles.Profile` (see ``core.page_cache``)
+whenever the profile or its :class:`User` is saved or deleted, including through the admin site,
+and keeps the ``updated_at`` date of the profile up to date when its :class:`User` changes.
+The pages are keyed by username, so the previous username of a renamed :class:`User`, or of the
+previous :class:`User` of a :class:`profiles.Profile`, is read before saving to invalidate its page
+too.
+
+Receivers:
+    - remember_previous_username: Reads the username of a :class:`User` before it is saved.
+    - invalidate_user_profile_page: Invalidates the page of a saved or deleted :class:`User`.
+    - remember_previous_profile_username: Reads the username of the :class:`User` of a
+      :class:`profiles.Profile` before it is saved.
+    - invalidate_profile_page: Invalidates the page of a saved or deleted
+      :class:`profiles.Profile`.
+
+Note:
+    The receivers are connected when the module is imported by ``ProfilesConfig.ready``. They
+    read from the database which is written, rather than from a read-only replica which may not
+    hold the previous changes yet (see ``core.routers``).
+
+:param get_user_model: A function provided by Django to get the currently active user model.
+:param post_delete: A signal sent by Django after a model instance is deleted.
+:param post_save: A signal sent by Django after a model instance is saved.
+:param pre_save: A signal sent by Django before a model instance is saved.
+:param receiver: A decorator connecting a function to a signal.
+:param timezone: A module provided by Django to get the current date and time.
+"""
+
+from django.contrib.auth import get_user_model
+from django.db.models.signals import post_delete, post_save, pre_save
+from django.dispatch import receiver
+from django.utils import timezone
+
+from core.page_cache import invalidate_pages, page_cache_key
+from profiles.models import Profile
+
+UserModel = get_user_model()
+
+# The fields of the User displayed on the profile page.
+PROFILE_PAGE_USER_FIELDS = {"username", "first_name", "last_name", "email"}
+
+
+def _displays_changes(update_fields):
+    """
+    Tell if a save of a :class:`User` may change the profile page.
+
+    :param update_fields: The fields passed to ``save()``, or None if all fields are saved.
+    :type update_fields: frozenset or None
+    :return: False if only fields not displayed on the page are saved, e.g. ``last_login``.
+    :rtype: bool
+    """
+
+    return update_fields is None or bool(PROFILE_PAGE_USER_FIELDS & update_fields)
+
+
+def _invalidate_profile_pages(*usernames):
+    """
+    Invalidate the cached profile pages of usernames.
+
+    :param usernames: The usernames, None values are ignored.
+    :type usernames: str or None
+    :return: None
+    :rtype: None
+    """
+
+    invalidate_pages(
+        *(page_cache_key("profile", username) for username in set(usernames) if username)
+    )
+
+
+@receiver(pre_save, sender=UserModel)
+def remember_previous_username(sender, instance, update_fields=None, **kwargs):
+    """
+    Read the username of a :class:`User` before it is saved, in case it is renamed.
+
+    :param sender: The :class:`User` model.
+    :param instance: The :class:`User` about to be saved.
+    :type instance: class:`User`
+    :param update_fields: The fields passed to ``save()``.
+    :type update_fields: frozenset or None
+    :return: None
+    :rtype: None
+    """
+
+    instance._previous_username = None
+    if instance.pk is not None and _displays_changes(update_fields):
+        instance._previous_username = (
+            sender.objects.using(kwargs["using"])
+            .filter(pk=instance.pk)
+            .values_list("username", flat=True)
+            .first()
+        )
+
+
+@receiver(post_save, sender=UserModel)
+@receiver(post_delete, sender=UserModel)
+def invalidate_user_profile_page(sender, instance, update_fields=None, **kwargs):
+    """
+    Invalidate the cached profile page of a saved or deleted :class:`User`.
+
+    When the :class:`User` is saved, the ``updated_at`` date of its :class:`profiles.Profile` is
+    updated too, as it is the version of the profile pages (see ``profiles.views``).
+
+    :param sender: The :class:`User` model.
+    :param instance: The saved or deleted :class:`User`.
+    :type instance: class:`User`
+    :param update_fields: The fields passed to ``save()``.
+    :type update_fields: frozenset or None
+    :return: None
+    :rtype: None
+    """
+
+    if _displays_changes(update_fields):
+        if kwargs["signal"] is post_save:
+            Profile.objects.filter(user_id=instance.pk).update(updated_at=timezone.now())
+        _invalidate_profile_pages(
+            instance.username, getattr(instance, "_previous_username", None)
+        )
+
+
+@receiver(pre_save, sender=Profile)
+def remember_previous_profile_username(sender, instance, **kwargs):
+    """
+    Read the username of the :class:`User` of a :class:`profiles.Profile` before it is saved, in
+    case the profile is moved to another :class:`User`.
+
+    :param sender: The :class:`profiles.Profile` model.
+    :param instance: The :class:`profiles.Profile` about to be saved.
+    :type instance: class:`profiles.Profile`
+    :return: None
+    :rtype: None
+    """
+
+    instance._previous_username = None
+    if instance.pk is not None:
+        instance._previous_username = (
+            sender.objects.using(kwargs["using"])
+            .filter(pk=instance.pk)
+            .values_list("user__username", flat=True)
+            .first()
+        )
+
+
+@receiver(post_save, sender=Profile)
+@receiver(post_delete, sender=Profile)
+def invalidate_profile_page(sender, instance, **kwargs):
+    """
+    Invalidate the cached page of a saved or deleted :class:`profiles.Profile`.
+
+    :param sender: The :class:`profiles.Profile` model.
+    :param instance: The saved or deleted :class:`profiles.Profile`.
+    :type instance: class:`profiles.Profile`
+    :return: None
+    :rtype: None
+    """
+
+    username = (
+        UserModel.objects.using(kwargs["using"])
+        .filter(pk=instance.user_id)
+        .values_list("username", flat=True)
+        .first()
+    )
+    _invalidate_profile_pages(username, getattr(instance, "_previous_username", None))
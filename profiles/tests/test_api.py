@@ -0,0 +1,109 @@
+"""
+Test cases for the JSON API of the profiles app.
+
+This module checks the ``/api/profiles/`` endpoint: the fields of the :class:`User`, the sparse
+field selection and the cursor pagination.
+
+Classes:
+    - ProfileApiTestCase (TestCase): A test case for the JSON API of the profiles app.
+
+Methods:
+    - ProfileApiTestCase.setUpTestData: Method to set up test data before running tests.
+    - ProfileApiTestCase.test_index_returns_profiles: Method to test the JSON document of the
+      profiles.
+    - ProfileApiTestCase.test_index_selects_fields: Method to test the sparse field selection.
+    - ProfileApiTestCase.test_index_paginates: Method to test the cursor pagination.
+
+:param get_user_model: A function provided by Django to get the currently active user model.
+:param TestCase: A subclass of Django's TestCase class for writing unit tests.
+:param override_settings: A decorator to change the settings during a test.
+:param reverse: A function provided by Django for generating URLs based on view names.
+"""
+
+from django.contrib.auth import get_user_model
+from django.test import TestCase, override_settings
+from django.urls import reverse
+
+from profiles.models import Profile
+
+UserModel = get_user_model()
+
+
+class ProfileApiTestCase(TestCase):
+    """
+    Test case for the JSON API listing the :class:`profile.Profile`.
+
+    :param url: The URL of the endpoint.
+    :type url: str
+    """
+
+    @classmethod
+    def setUpTestData(cls):
+        """
+        Create three :class:`User` and their :class:`profile.Profile`.
+        """
+
+        for username in ("carol", "alice", "bob"):
+            user = UserModel.objects.create_user(
+                username=username,
+                password="Password",
+                first_name=username.title(),
+                last_name="Api",
+                email=f"{username}@mail.com",
+            )
+            Profile.objects.create(user=user, favorite_city=f"{username.title()} City")
+        cls.url = reverse("profiles:api_profiles_index")
+
+    def test_index_returns_profiles(self):
+        """
+        Test that the profiles are returned ordered by username, without the email addresses.
+
+        :return: None
+        :rtype: None
+        """
+
+        with self.assertNumQueries(2):
+            response = self.client.get(self.url)
+        self.assertEqual(response.status_code, 200)
+        results = response.json()["results"]
+        self.assertEqual([row["username"] for row in results], ["alice", "bob", "carol"])
+        self.assertEqual(
+            results[0],
+            {
+                "username": "alice",
+                "first_name": "Alice",
+                "last_name": "Api",
+                "favorite_city": "Alice City",
+            },
+        )
+
+    def test_index_selects_fields(self):
+        """
+        Test that only the requested fields are returned, and that unknown fields are rejected.
+
+        :return: None
+        :rtype: None
+        """
+
+        response = self.client.get(self.url, {"fields": "favorite_city"})
+        self.assertEqual(response.json()["results"][0], {"favorite_city": "Alice City"})
+
+        response = self.client.get(self.url, {"fields": "email"})
+        self.assertEqual(response.status_code, 400)
+
+    @override_settings(PAGINATION_PAGE_SIZE=2)
+    def test_index_paginates(self):
+        """
+        Test that the ``next`` URL returns the following profiles.
+
+        :return: None
+        :rtype: None
+        """
+
+        first = self.client.get(self.url, {"fields": "username"}).json()
+        self.assertEqual(first["results"], [{"username": "alice"}, {"username": "bob"}])
+
+        second = self.client.get(first["next"]).json()
+        self.assertEqual(second["results"], [{"username": "carol"}])
+        self.assertIsNone(second["next"])
+        self.assertEqual(self.client.get(second["previous"]).json()["results"], first["results"])
@@ -0,0 +1,104 @@
+"""
+Test cases for the conditional requests of the profiles app views.
+
+This module checks that the profiles views send ``ETag`` and ``Last-Modified`` validators and
+answer ``304 Not Modified`` from a single query when the validators still match.
+
+Classes:
+    - ProfileConditionalTestCase (TestCase): A test case for the conditional requests of the
+      profiles views.
+
+Methods:
+    - ProfileConditionalTestCase.setUpTestData: Method to set up test data before running tests.
+    - ProfileConditionalTestCase.test_not_modified_runs_one_query: Method to test the
+      ``304 Not Modified`` answers.
+    - ProfileConditionalTestCase.test_user_change_modifies_pages: Method to test that a change of
+      the :class:`User` changes the validators of the profile pages.
+    - ProfileConditionalTestCase.test_username_update_modifies_index_page: Method to test that
+      renaming a :class:`User` with a queryset update changes the validators of the index page.
+
+:param get_user_model: A function provided by Django to get the currently active user model.
+:param TestCase: A subclass of Django's TestCase class for writing unit tests.
+:param reverse: A function provided by Django for generating URLs based on view names.
+"""
+
+from django.contrib.auth import get_user_model
+from django.test import TestCase
+from django.urls import reverse
+
+from profiles.models import Profile
+
+UserModel = get_user_model()
+
+
+class ProfileConditionalTestCase(TestCase):
+    """
+    Test case for the conditional requests of the :class:`profile.Profile` views.
+
+    :param user: An instance of :class:`User` model.
+    :type user: class:`User`
+    """
+
+    @classmethod
+    def setUpTestData(cls):
+        """
+        Create a :class:`User` and its :class:`profile.Profile`.
+        """
+
+        cls.user = UserModel.objects.create_user(username="conditional", password="Password")
+        Profile.objects.create(user=cls.user, favorite_city="Conditional City")
+        cls.urls = [
+            reverse("profiles:profiles_index"),
+            reverse("profiles:profile", kwargs={"username": cls.user.username}),
+        ]
+
+    def test_not_modified_runs_one_query(self):
+        """
+        Test that a request with a matching ETag is answered 304 from a single query.
+
+        :return: None
+        :rtype: None
+        """
+
+        for url in self.urls:
+            with self.subTest(url=url):
+                response = self.client.get(url)
+                self.assertTrue(response.has_header("Last-Modified"))
+                with self.assertNumQueries(1):
+                    not_modified = self.client.get(url, HTTP_IF_NONE_MATCH=response["ETag"])
+                self.assertEqual(not_modified.status_code, 304)
+
+    def test_user_change_modifies_pages(self):
+        """
+        Test that saving the :class:`User` changes the ETag of the index and profile pages.
+
+        :return: None
+        :rtype: None
+        """
+
+        etags = [self.client.get(url)["ETag"] for url in self.urls]
+        user = UserModel.objects.get(pk=self.user.pk)
+        user.last_name = "Changed"
+        user.save()
+
+        for url, etag in zip(self.urls, etags):
+            with self.subTest(url=url):
+                response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+                self.assertEqual(response.status_code, 200)
+
+    def test_username_update_modifies_index_page(self):
+        """
+        Test that renaming the :class:`User` with ``update()``, which sends no signal, changes
+        the ETag of the index page.
+
+        :return: None
+        :rtype: None
+        """
+
+        url = self.urls[0]
+        etag = self.client.get(url)["ETag"]
+        UserModel.objects.filter(pk=self.user.pk).update(username="renamed")
+
+        response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertContains(response, "renamed")
@@ -0,0 +1,112 @@
+"""
+Query budget tests for the profiles app views.
+
+This module checks that the views of the profiles app run a fixed number of SQL queries, listed
+in ``profiles.views.QUERY_BUDGETS``, with 10, 1 000 and 100 000 :class:`profile.Profile` in the
+database.
+
+Classes:
+    - ProfileQueryBudgetTestCase (QueryBudgetMixin, TestCase): A test case to check the query
+      budgets of the profiles views.
+
+Methods:
+    - ProfileQueryBudgetTestCase.seed_rows: Method to create :class:`User` and their
+      :class:`profile.Profile` in bulk.
+    - ProfileQueryBudgetTestCase.test_query_budgets: Method to test that the index, detail and
+      JSON API views stay within their budget.
+    - ProfileQueryBudgetTestCase.test_versions_read_without_scan: Method to test that the
+      versions of the index and detail pages do not scan the tables.
+
+:param get_user_model: A function provided by Django to get the currently active user model.
+:param TestCase: A subclass of Django's TestCase class for writing unit tests.
+:param QueryBudgetMixin: A mixin asserting that views run a bounded number of queries.
+"""
+
+from django.contrib.auth import get_user_model
+from django.test import TestCase
+
+from core.testing import QueryBudgetMixin
+from profiles import api
+from profiles.models import Profile
+from profiles.views import QUERY_BUDGETS, index, index_version, profile, profile_version
+
+UserModel = get_user_model()
+
+
+class ProfileQueryBudgetTestCase(QueryBudgetMixin, TestCase):
+    """
+    Test case for the query budgets of the profiles views.
+
+    Methods:
+        - seed_rows: Method to create rows until ``count`` :class:`profile.Profile` exist.
+        - test_query_budgets: Method to test the query budgets of the index and detail views.
+        - test_versions_read_without_scan: Method to test the plans of the version queries.
+    """
+
+    def seed_rows(self, count):
+        """
+        Create :class:`User` and :class:`profile.Profile` until ``count`` profiles exist.
+
+        The primary keys are set explicitly so each profile can reference its user without
+        reading the users back.
+
+        :param count: The number of :class:`profile.Profile` the database must hold.
+        :type count: int
+        """
+
+        start = Profile.objects.count() + 1
+        ids = range(start, count + 1)
+        UserModel.objects.bulk_create(
+            UserModel(
+                id=pk,
+                username=f"user{pk:06d}",
+                first_name="Budget",
+                last_name=f"User {pk}",
+                email=f"user{pk}@mail.com",
+            )
+            for pk in ids
+        )
+        Profile.objects.bulk_create(
+            Profile(id=pk, user_id=pk, favorite_city="Budget City") for pk in ids
+        )
+
+    def test_query_budgets(self):
+        """
+        Test that the index, detail and JSON API views stay within their query budget.
+
+        :return: None
+        :rtype: None
+        """
+
+        self.assertViewsWithinBudget(
+            [
+                ("index", index, dict, QUERY_BUDGETS["index"]),
+                ("api_index", api.index, dict, QUERY_BUDGETS["index"]),
+                (
+                    "profile",
+                    profile,
+                    lambda: {"username": UserModel.objects.latest("id").username},
+                    QUERY_BUDGETS["profile"],
+                ),
+            ]
+        )
+
+    def test_versions_read_without_scan(self):
+        """
+        Test that the versions of the index and detail pages are read without scanning a table,
+        so answering ``304 Not Modified`` does not slow down as the profiles grow.
+
+        :return: None
+        :rtype: None
+        """
+
+        self.assertVersionsReadWithoutScan(
+            [
+                ("index", index_version, dict),
+                (
+                    "profile",
+                    profile_version,
+                    lambda: {"username": UserModel.objects.latest("id").username},
+                ),
+            ]
+        )
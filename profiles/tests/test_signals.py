@@ -0,0 +1,166 @@
+"""
+Test cases for the cache of the profiles detail pages.
+
+This module checks that the rendered page of a :class:`profile.Profile` is served from the cache
+and invalidated by the signal receivers of the profiles app when the profile or its :class:`User`
+is saved or deleted.
+
+Classes:
+    - ProfilePageCacheTestCase (TestCase): A test case for the cache of the profile pages.
+
+Methods:
+    - ProfilePageCacheTestCase.setUpTestData: Method to set up test data before running tests.
+    - ProfilePageCacheTestCase.setUp: Method to clear the cache before each test.
+    - ProfilePageCacheTestCase.test_profile_page_served_from_cache: Method to test that a cached
+      page is served with only the query reading its version.
+    - ProfilePageCacheTestCase.test_profile_save_invalidates_page: Method to test the invalidation
+      when the :class:`profile.Profile` is saved.
+    - ProfilePageCacheTestCase.test_user_save_invalidates_page: Method to test the invalidation
+      when the :class:`User` is saved.
+    - ProfilePageCacheTestCase.test_user_rename_invalidates_previous_page: Method to test the
+      invalidation of the page of the previous username.
+    - ProfilePageCacheTestCase.test_user_delete_invalidates_page: Method to test the invalidation
+      when the :class:`User` is deleted.
+    - ProfilePageCacheTestCase.test_last_login_keeps_page: Method to test that a login does not
+      invalidate the page.
+
+:param get_user_model: A function provided by Django to get the currently active user model.
+:param update_last_login: A function provided by Django to save the last login of a user.
+:param cache: The default cache.
+:param TestCase: A subclass of Django's TestCase class for writing unit tests.
+:param reverse: A function provided by Django for generating URLs based on view names.
+"""
+
+from django.contrib.auth import get_user_model
+from django.contrib.auth.models import update_last_login
+from django.core.cache import cache
+from django.test import TestCase
+from django.urls import reverse
+
+from core.page_cache import page_cache_key
+from profiles.models import Profile
+
+UserModel = get_user_model()
+
+
+class ProfilePageCacheTestCase(TestCase):
+    """
+    Test case for the cache of the :class:`profile.Profile` detail pages.
+
+    :param user: An instance of :class:`User` model.
+    :type user: class:`User`
+    :param profile: An instance of :class:`profile.Profile` model.
+    :type profile: class:`profile.Profile`
+    """
+
+    @classmethod
+    def setUpTestData(cls):
+        """
+        Create a :class:`User` and its :class:`profile.Profile`.
+
+        The tests change copies read from the database, as these instances are shared by the
+        tests of the class.
+        """
+
+        cls.user = UserModel.objects.create_user(
+            username="cached", password="TestPassword", first_name="John"
+        )
+        cls.profile = Profile.objects.create(user=cls.user, favorite_city="Cache City")
+        cls.url = reverse("profiles:profile", kwargs={"username": cls.user.username})
+
+    def setUp(self):
+        """
+        Clear the cache, which is not rolled back with the database between tests.
+        """
+
+        cache.clear()
+
+    def test_profile_page_served_from_cache(self):
+        """
+        Test that the second request of a profile page only reads the version of the page.
+
+        :return: None
+        :rtype: None
+        """
+
+        first = self.client.get(self.url)
+        with self.assertNumQueries(1):
+            second = self.client.get(self.url)
+
+        self.assertEqual(second.status_code, 200)
+        self.assertEqual(first.content, second.content)
+
+    def test_profile_save_invalidates_page(self):
+        """
+        Test that saving the :class:`profile.Profile` invalidates its cached page.
+
+        :return: None
+        :rtype: None
+        """
+
+        self.client.get(self.url)
+        profile = Profile.objects.get(pk=self.profile.pk)
+        profile.favorite_city = "New City"
+        profile.save()
+
+        self.assertContains(self.client.get(self.url), "New City")
+
+    def test_user_save_invalidates_page(self):
+        """
+        Test that saving the :class:`User` invalidates the page of its profile.
+
+        :return: None
+        :rtype: None
+        """
+
+        self.client.get(self.url)
+        user = UserModel.objects.get(pk=self.user.pk)
+        user.first_name = "Jane"
+        user.save()
+
+        self.assertContains(self.client.get(self.url), "Jane")
+
+    def test_user_rename_invalidates_previous_page(self):
+        """
+        Test that renaming the :class:`User` invalidates the page of the previous username.
+
+        :return: None
+        :rtype: None
+        """
+
+        self.client.get(self.url)
+        user = UserModel.objects.get(pk=self.user.pk)
+        user.username = "renamed"
+        user.save()
+
+        self.assertEqual(self.client.get(self.url).status_code, 404)
+        self.assertContains(
+            self.client.get(reverse("profiles:profile", kwargs={"username": "renamed"})),
+            "renamed",
+        )
+
+    def test_user_delete_invalidates_page(self):
+        """
+        Test that deleting the :class:`User` invalidates the page of its profile.
+
+        :return: None
+        :rtype: None
+        """
+
+        self.client.get(self.url)
+        UserModel.objects.get(pk=self.user.pk).delete()
+
+        self.assertEqual(self.client.get(self.url).status_code, 404)
+
+    def test_last_login_keeps_page(self):
+        """
+        Test that updating the last login of the :class:`User` keeps the page in the cache.
+
+        :return: None
+        :rtype: None
+        """
+
+        self.client.get(self.url)
+        update_last_login(None, UserModel.objects.get(pk=self.user.pk))
+
+        self.assertIsNotNone(cache.get(page_cache_key("profile", self.user.username)))
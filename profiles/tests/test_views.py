@@ -11,6 +11,8 @@ Classes:
       for profiles.
     - ProfileDetailViewTestCase(ProfileViewTestCase): A subclass of TestCase to test the detail
       view for profiles.
+    - ProfilePaginationViewTestCase(ProfileViewTestCase): A subclass of TestCase to test the
+      keyset pagination of the index view for profiles.
 
 Methods:
     - ProfileViewTestCase.setUpTestData: Method to set up test data before running tests.
@@ -20,17 +22,24 @@ Methods:
       detail view for a valid profile username.
     - ProfileDetailViewTestCase.test_profile_id_view_failed: Method to test the behavior of the
       detail view for an invalid profile username.
+    - ProfilePaginationViewTestCase.test_profile_index_pages: Method to test the navigation between
+      the pages of the index view for profiles.
+    - ProfilePaginationViewTestCase.test_profile_index_page_size: Method to test the page size
+      read from the query string.
+    - ProfilePaginationViewTestCase.test_profile_index_streamed_page: Method to test the streaming
+      mode of the index view for profiles.
 
 :param get_user_model: A function provided by Django to get the currently active user model.
 :param Http404: An exception raised when a requested object is not found.
 :param TestCase: A subclass of Django's TestCase class for writing unit tests.
 :param RequestFactory: A class provided by Django for creating mock request objects.
+:param override_settings: A decorator provided by Django to change settings in tests.
 :param reverse: A function provided by Django for generating URLs based on view names.
 """
 
 from django.contrib.auth import get_user_model
 from django.http import Http404
-from django.test import TestCase, RequestFactory
+from django.test import TestCase, RequestFactory, override_settings
 from django.urls import reverse
 
 from profiles.models import Profile
@@ -180,3 +189,95 @@ class ProfileDetailViewTestCase(ProfileViewTestCase):
 
         with self.assertRaises(Http404):
             profile(request, username="Invalid Test Username")
+
+
+@override_settings(PAGINATION_PAGE_SIZE=2, PAGINATION_MAX_PAGE_SIZE=3)
+class ProfilePaginationViewTestCase(ProfileViewTestCase):
+    """
+    Test case for the keyset pagination of the index view for profiles.
+
+    Methods:
+        - setUpTestData: Method to create more profiles than fit on one page.
+        - test_profile_index_pages: Method to test the navigation between pages.
+        - test_profile_index_page_size: Method to test the page size read from the query string.
+        - test_profile_index_streamed_page: Method to test the streaming mode of the index view.
+    """
+
+    USERNAMES = ["Alice", "Bob", "Carol", "Dave"]
+
+    @classmethod
+    def setUpTestData(cls):
+        """
+        Create four more profiles, so the index spans three pages of two.
+        """
+
+        super().setUpTestData()
+        for username in cls.USERNAMES:
+            user = UserModel.objects.create_user(username=username, password=cls.USER_PASSWORD)
+            Profile.objects.create(user=user, favorite_city="Test City")
+
+    def test_profile_index_pages(self):
+        """
+        Test the navigation between the pages of the index view for profiles.
+
+        Follows the next links to the last page and asserts the profiles are ordered by username.
+
+        :return: None
+        :rtype: None
+        """
+
+        url = reverse("profiles:profiles_index")
+        usernames = []
+        response = self.client.get(url)
+        while True:
+            page = response.context["page"]
+            usernames.extend(profile.user.username for profile in page.object_list)
+            if not page.has_next:
+                break
+            response = self.client.get(url + page.next_url)
+
+        self.assertEqual(usernames, sorted(self.USERNAMES + [self.USERNAME]))
+
+        response = self.client.get(url + page.previous_url)
+        page = response.context["page"]
+        previous_usernames = [profile.user.username for profile in page.object_list]
+        self.assertEqual(previous_usernames, ["Carol", "Dave"])
+
+    def test_profile_index_page_size(self):
+        """
+        Test the page size read from the query string, bounded by the maximum page size.
+
+        :return: None
+        :rtype: None
+        """
+
+        url = reverse("profiles:profiles_index")
+        response = self.client.get(url, {"size": 1})
+        self.assertEqual(len(response.context["profiles_list"]), 1)
+
+        response = self.client.get(url, {"size": 100})
+        self.assertEqual(len(response.context["profiles_list"]), 3)
+
+    def test_profile_index_streamed_page(self):
+        """
+        Test the streaming mode of the index view for profiles.
+
+        Asserts that the second streamed page holds the profiles of the second rendered page and
+        the links to the first and third pages.
+
+        :return: None
+        :rtype: None
+        """
+
+        url = reverse("profiles:profiles_index")
+        next_url = self.client.get(url).context["page"].next_url
+        page = self.client.get(url + next_url).context["page"]
+        with self.settings(STREAMING_INDEX_PAGES=True):
+            response = self.client.get(url + next_url)
+
+        content = b"".join(response.streaming_content).decode()
+        self.assertIn(">Carol</a>", content)
+        self.assertIn(">Dave</a>", content)
+        self.assertNotIn(">Bob</a>", content)
+        self.assertIn(page.next_url.replace("&", "&amp;"), content)
+        self.assertIn(page.previous_url.replace("&", "&amp;"), content)
@@ -8,6 +8,7 @@ Patterns defined here include:
     - /profiles/ - URL pattern for the profiles index page, displaying a list of all user profiles.
     - /profiles/<str:username>/ - URL pattern for viewing details of a specific user profile
         identified by the username.
+    - /api/profiles/ - URL pattern of the JSON API listing the user profiles.
 
 Notes:
     The URL patterns are namespaced under 'profiles' to prevent naming conflicts and provide better
@@ -24,11 +25,12 @@ Usage:
 
 from django.urls import path
 
-from profiles import views
+from profiles import api, views
 
 app_name = "profiles"
 
 urlpatterns = [
     path("profiles/", views.index, name="profiles_index"),
     path("profiles/<str:username>/", views.profile, name="profile"),
+    path("api/profiles/", api.index, name="api_profiles_index"),
 ]
@@ -5,9 +5,10 @@ This module defines views for handling HTTP requests related to :class:`profiles
 profiles app of the project.
 
 Views defined here include:
-    - index: Renders the profiles index page, displaying a list of all :class:`profiles.Profile`.
+    - index: Renders the profiles index page, displaying a page of :class:`profiles.Profile`
+      ordered by username.
     - profile: Renders the details page for a specific :class:`profiles.Profile` identified by
-      username.
+      username. The rendered page is cached until the profile or its user changes.
 
 Usage:
     These views can be used to display information about :class:`profiles.Profile`, including
@@ -15,54 +16,162 @@ Usage:
     with the :class:`profiles.Profile` model to retrieve data from the database and render it in
     the appropriate templates.
 
+Conditional requests:
+    Both views send ``ETag`` and ``Last-Modified`` validators and answer ``304 Not Modified``
+    from one small query reading the version of the page (see ``core.conditional``), without
+    rendering it. The version of the index is counted by triggers on every write to the profiles
+    and to the names of their :class:`User` and read by primary key, the version of a profile
+    page the last modification of the profile, which is also updated when its :class:`User`
+    changes.
+
+Query budgets:
+    Every view runs a fixed number of SQL queries, whatever the number of rows in the
+    database. The budgets are listed in ``QUERY_BUDGETS`` and enforced by
+    ``profiles/tests/test_queries.py``:
+
+    - index: 2 queries, the version of the page and the profiles of one page joined to their
+      :class:`User` to select only the usernames, and only the first one when answering
+      ``304 Not Modified``.
+    - profile: 2 queries, the version of the page and the profile joined to its :class:`User` to
+      select only the displayed columns, and only the first one when the page is served from the
+      cache or answering ``304 Not Modified``.
+
 Example:
     To render the profiles index page:
-        Profile.objects.all()  # Retrieve all user profiles from the database.
+        paginate_keyset(request, profiles_list, keys=("user__username",))  # Retrieve one page
+        of user profiles and their usernames from the database.
         render(request, 'profiles_index.html', context)  # Render the index page with the profile
         data.
 
     To render the details page for a specific user profile:
-        get_object_or_404(Profile, user__username=username)  # Retrieve the profile with the
-        specified username.
+        get_object_or_404(profiles_list, user__username=username)  # Retrieve the profile with
+        the specified username.
         render(request, 'profile.html', context)  # Render the details page with the profile data.
 
 :param Letting: Represents a :class:`lettings.Letting` (rental) property in the database.
 :type Letting: class:`lettings.Letting`
+:param read_index_version: A function returning the version of an index page.
+:param versioned_page: A view decorator answering the conditional requests.
+:param cache_rendered_page: A view decorator serving the rendered page from the cache.
+:param paginate_keyset: A function returning one page of a queryset selected by a cursor.
+:param stream_keyset: A function returning one page of a queryset read lazily.
+:param stream_index: A function returning a streaming response rendering an index page.
+:param settings: The settings of the project.
 :param render: A module to render templates in Django views.
 :param get_object_or_404: A function provided by Django that retrieves an object from the database
     or raises a Http404 exception if the object does not exist.
 """
 
+from django.conf import settings
 from django.shortcuts import render, get_object_or_404
 
+from core.conditional import read_index_version, versioned_page
+from core.page_cache import cache_rendered_page
+from core.pagination import paginate_keyset, stream_keyset
+from core.streaming import stream_index
 from profiles.models import Profile
 
+QUERY_BUDGETS = {
+    "index": 2,
+    "profile": 2,
+}
+
+
+def index_version(request):
+    """
+    Return the version of the profiles index page.
+
+    The version is kept up to date by the triggers of the ``0003_index_version`` migration and
+    read by primary key, whatever the number of profiles.
+
+    Parameters:
+        request (HttpRequest): The HTTP request object.
+
+    Returns:
+        dict: The number of writes to the profiles and the names of their users and the date of
+        the last one.
+    """
+
+    return read_index_version("profiles")
+
+
+def profile_version(request, username):
+    """
+    Return the version of the details page of a user profile.
+
+    Parameters:
+        request (HttpRequest): The HTTP request object.
+        username (str): The username of the user profile.
+
+    Returns:
+        dict or None: The date of the last change of the profile, or None if the profile does
+        not exist.
+    """
 
+    updated_at = (
+        Profile.objects.filter(user__username=username)
+        .values_list("updated_at", flat=True)
+        .first()
+    )
+    return None if updated_at is None else {"updated_at": updated_at}
+
+
+@versioned_page(index_version)
 def index(request):
     """
     Render the profiles index page.
 
-    This view retrieves all user profiles from the database and renders
-    the profiles index page ('profiles_index.html') with a list of user profiles.
+    This view retrieves one page of user profiles from the database and renders
+    the profiles index page ('profiles_index.html') with the list of user profiles. The
+    :class:`User` is joined in the same query and only its username is selected.
+
+    The profiles are ordered by username and paginated on it: the ``after`` and ``before`` query
+    parameters hold the cursor of the page and ``size`` the number of profiles per page.
+
+    When ``settings.STREAMING_INDEX_PAGES`` is enabled, the page is streamed: the top of the page
+    is sent before the profiles are read, then each profile is sent while it is read (see
+    ``core.streaming``).
 
     Parameters:
         request (HttpRequest): The HTTP request object.
 
     Returns:
-        HttpResponse: The HTTP response object containing the rendered template.
+        HttpResponse or StreamingHttpResponse: The HTTP response object containing the rendered
+        template.
+
+    Raises:
+        Http404: If the cursor is invalid.
     """
 
-    profiles_list = Profile.objects.all()
-    context = {"profiles_list": profiles_list}
+    profiles_list = Profile.objects.select_related("user").only("user__username")
+    if settings.STREAMING_INDEX_PAGES:
+        page = stream_keyset(request, profiles_list, keys=("user__username",))
+        return stream_index(
+            request,
+            "profiles_index.html",
+            page,
+            "profiles_index_row.html",
+            "profile",
+            "No profiles are available.",
+        )
+
+    page = paginate_keyset(request, profiles_list, keys=("user__username",))
+    context = {"profiles_list": page.object_list, "page": page}
     return render(request, "profiles_index.html", context)
 
 
+@versioned_page(profile_version)
+@cache_rendered_page("profile", "username")
 def profile(request, username):
     """
     Render the details page for a specific user profile.
 
     This view retrieves a user profile with the specified username from the database
-    and renders the details page ('profile.html') with information about the user profile.
+    and renders the details page ('profile.html') with information about the user profile. The
+    :class:`User` is joined in the same query and only the displayed columns are selected.
+
+    The rendered page is cached by username and invalidated by the receivers in
+    ``profiles/signals.py`` when the profile or its user is saved or deleted.
 
     Parameters:
         request (HttpRequest): The HTTP request object.
@@ -72,6 +181,13 @@ def profile(request, username):
         HttpResponse: The HTTP response object containing the rendered template.
     """
 
-    single_profile = get_object_or_404(Profile, user__username=username)
+    profiles_list = Profile.objects.select_related("user").only(
+        "favorite_city",
+        "user__username",
+        "user__first_name",
+        "user__last_name",
+        "user__email",
+    )
+    single_profile = get_object_or_404(profiles_list, user__username=username)
     context = {"profile": single_profile}
     return render(request, "profile.html", context)